@@ -0,0 +1,322 @@
+"""
+Dataset-size scaling harness for the Lisbon house price pipeline.
+Runs cleaning, feature engineering, model training and batch prediction on
+synthetic listings of increasing size and records the wall time and peak
+memory of every stage, so scaling limits show up before production data does.
+Training runs a budgeted randomized search, so every stage reaches the largest
+sizes; the resident memory of the search's worker processes is sampled too.
+
+Usage: python backend/benchmarks/scaling_harness.py [rows ...]
+"""
+import os
+import io
+import sys
+import time
+import threading
+import tempfile
+import tracemalloc
+import contextlib
+import numpy as np
+import pandas as pd
+import psutil
+import matplotlib.pyplot as plt
+
+# Use imports based on the directory structure, like the model scripts
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+sys.path.append(os.path.join(BACKEND_DIR, 'models'))
+from utils.data_utils import apply_schema
+from utils.cache_utils import write_json_atomic
+from utils.stats_utils import save_cleaning_stats
+from data.preprocessing import clean_data_with_stats, engineer_features
+from data.synthetic_data import DEFAULT_SOURCE, fit_listing_distribution, generate_listings
+from model_training import prepare_data_for_modeling, split_data, train_all_models
+from model_prediction import predict_batch
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+STAGES = ['clean', 'engineer', 'train', 'predict']
+
+# The exhaustive grid's cost grows much faster than the data; a randomized search
+# within this budget fits one candidate per fold (two for the 2-fold SVR search)
+DEFAULT_SEARCH = 'random'
+DEFAULT_MAX_FITS = 5
+
+# Seconds between samples of the resident memory of the process and its workers
+RSS_SAMPLE_SECONDS = 0.05
+
+DEFAULT_OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+def get_tree_rss(process=None):
+    """
+    Args:
+        process (psutil.Process, optional): Root process, the current one by default
+
+    Returns:
+        int: Resident bytes of the process and all its live child processes
+    """
+    process = psutil.Process() if process is None else process
+    total = 0
+    for proc in [process] + process.children(recursive=True):
+        try:
+            total += proc.memory_info().rss
+        except psutil.Error:
+            # Workers can exit between listing and sampling them
+            continue
+    return total
+
+def _sample_peak_rss(stop, peak, interval=RSS_SAMPLE_SECONDS):
+    """Record the largest resident memory of the process tree in peak[0] until stop is set."""
+    process = psutil.Process()
+    while not stop.is_set():
+        peak[0] = max(peak[0], get_tree_rss(process))
+        stop.wait(interval)
+
+def measure(func, *args, quiet=True, **kwargs):
+    """
+    Run a function, measuring its wall time and the peak memory it allocates.
+
+    Memory is tracked with tracemalloc (NumPy and pandas buffers included) when
+    tracing is active, which misses the search's worker processes, and as the
+    sampled resident memory of this process and its workers, which includes them.
+
+    Args:
+        func (callable): Function to run
+        *args: Positional arguments for func
+        quiet (bool): Silence what func prints
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        tuple: (result of func, seconds, peak memory in MB or None when not tracing,
+                peak resident memory of the process tree above its starting level in MB)
+    """
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+
+    rss_baseline = get_tree_rss()
+    rss_peak = [rss_baseline]
+    stop = threading.Event()
+    sampler = threading.Thread(target=_sample_peak_rss, args=(stop, rss_peak), daemon=True)
+    sampler.start()
+
+    output = io.StringIO() if quiet else sys.stdout
+    start_time = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(output):
+            result = func(*args, **kwargs)
+    finally:
+        seconds = time.perf_counter() - start_time
+        stop.set()
+        sampler.join()
+
+    peak_mb = (tracemalloc.get_traced_memory()[1] - baseline) / 1e6 if tracing else None
+    rss_mb = (max(rss_peak[0], get_tree_rss()) - rss_baseline) / 1e6
+    return result, seconds, peak_mb, rss_mb
+
+def _batch_inputs(raw_rows):
+    """Convert raw listings into the request dictionaries batch prediction receives."""
+    inputs = raw_rows.drop(columns=[col for col in ['Id', 'Price', 'Price M2'] if col in raw_rows.columns])
+    return inputs.astype(object).where(inputs.notna(), None).to_dict('records')
+
+def run_scaling_benchmark(sizes=None, stages=None, max_train_rows=None, max_predict_rows=None,
+                          predict_model='ridge', search=DEFAULT_SEARCH, max_fits=DEFAULT_MAX_FITS,
+                          random_state=42, trace_memory=True):
+    """
+    Run the pipeline stages on synthetic datasets of increasing size.
+
+    Args:
+        sizes (list, optional): Numbers of listings, DEFAULT_SIZES by default
+        stages (list, optional): Stages to measure, all of STAGES by default
+        max_train_rows (int, optional): Largest dataset that training (and so prediction) runs on;
+            larger ones are recorded as skipped. Every size is trained by default
+        max_predict_rows (int, optional): Largest batch sent to batch prediction, the whole test split by default
+        predict_model (str): Model used for batch prediction
+        search (str): Hyperparameter search strategy of training, see model_search.SEARCH_STRATEGIES
+        max_fits (int, optional): Fit budget of the search per model
+        random_state (int): Seed of the synthetic listings
+        trace_memory (bool): Track peak memory, which slows Python-heavy stages down
+
+    Returns:
+        list: One dict per size and stage with rows, stage, seconds, peak_memory_mb, peak_rss_mb and status
+    """
+    sizes = DEFAULT_SIZES if sizes is None else sizes
+    stages = STAGES if stages is None else stages
+    distribution = fit_listing_distribution(pd.read_csv(DEFAULT_SOURCE))
+    results = []
+
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+
+    try:
+        for n in sizes:
+            raw_data = apply_schema(generate_listings(n, distribution, random_state))
+            context = {}
+
+            def record(stage, func, *args, skip_reason=None, **kwargs):
+                """Measure one stage, recording it as skipped or failed instead of stopping the run."""
+                if stage not in stages:
+                    return None
+                entry = {'rows': n, 'stage': stage, 'seconds': None, 'peak_memory_mb': None, 'peak_rss_mb': None,
+                         'status': 'ok'}
+                result = None
+                if skip_reason is not None:
+                    entry['status'] = f'skipped: {skip_reason}'
+                else:
+                    try:
+                        result, entry['seconds'], entry['peak_memory_mb'], entry['peak_rss_mb'] = measure(
+                            func, *args, **kwargs
+                        )
+                    except Exception as e:
+                        entry['status'] = f'error: {e}'
+                results.append(entry)
+                print(f"{n:>9} rows  {stage:<9} " + (
+                    f"{entry['seconds']:8.3f}s" + (f"  {entry['peak_memory_mb']:9.1f} MB" if trace_memory else '')
+                    + f"  {entry['peak_rss_mb']:9.1f} MB RSS"
+                    if entry['status'] == 'ok' else entry['status']
+                ))
+                return result
+
+            cleaned = record('clean', clean_data_with_stats, raw_data)
+            if cleaned is None:
+                cleaned = measure(clean_data_with_stats, raw_data)[0]
+            cleaned_data, context['stats'] = cleaned
+
+            processed = record('engineer', engineer_features, cleaned_data, explore=False)
+            if processed is None:
+                processed = measure(engineer_features, cleaned_data, explore=False)[0]
+
+            too_large = f'more than {max_train_rows} rows' if max_train_rows is not None and n > max_train_rows else None
+            with tempfile.TemporaryDirectory() as models_dir:
+                if too_large is None and ('train' in stages or 'predict' in stages):
+                    X_train, X_test, y_train, y_test = measure(
+                        lambda: split_data(prepare_data_for_modeling(processed))
+                    )[0]
+                    measure(save_cleaning_stats, context['stats'], models_dir)
+                    train_options = {'search': search, 'max_fits': max_fits}
+                    trained = record('train', train_all_models, X_train, y_train, models_dir, **train_options)
+                    if trained is None and 'train' not in stages:
+                        trained = measure(train_all_models, X_train, y_train, models_dir, **train_options)[0]
+                    # Raw listings of the test split, as clients would send them
+                    test_rows = raw_data.loc[raw_data.index.intersection(X_test.index)]
+                    batch = _batch_inputs(test_rows if max_predict_rows is None else test_rows.head(max_predict_rows))
+                    record('predict', predict_batch, predict_model, batch, models_dir,
+                           skip_reason=None if trained is not None else 'training failed')
+                else:
+                    record('train', None, skip_reason=too_large)
+                    record('predict', None, skip_reason=too_large)
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+
+    return results
+
+def fit_scaling_exponents(results):
+    """
+    Estimate how each stage scales: the slope of log(time) and log(memory) against log(rows).
+
+    An exponent near 1 means linear scaling, near 2 quadratic.
+
+    Args:
+        results (list): Output of run_scaling_benchmark
+
+    Returns:
+        dict: Per stage, the time, memory and resident memory exponents (None with fewer than two sizes)
+    """
+    df = pd.DataFrame(results)
+    exponents = {}
+    for stage, rows in df[df['status'] == 'ok'].groupby('stage', sort=False):
+        exponents[stage] = {}
+        for metric, name in [('seconds', 'time_exponent'), ('peak_memory_mb', 'memory_exponent'),
+                             ('peak_rss_mb', 'rss_exponent')]:
+            valid = rows[rows[metric].notna() & (rows[metric] > 0)]
+            exponents[stage][name] = (
+                float(np.polyfit(np.log(valid['rows']), np.log(valid[metric].astype(np.float64)), 1)[0])
+                if valid['rows'].nunique() >= 2 else None
+            )
+    return exponents
+
+def plot_scaling_curves(results, save_path=None):
+    """
+    Plot time, peak memory and peak resident memory against dataset size on log-log axes,
+    one line per stage. Sizes a stage was skipped or failed at are marked with crosses
+    along the bottom of each panel, so missing points are not mistaken for gaps in the data.
+
+    Args:
+        results (list): Output of run_scaling_benchmark
+        save_path (str, optional): Path to save the figure
+
+    Returns:
+        matplotlib.figure.Figure: The figure
+    """
+    df = pd.DataFrame(results)
+    ok = df[df['status'] == 'ok']
+    not_run = df[df['status'] != 'ok']
+    fig, axes = plt.subplots(1, 3, figsize=(20, 5))
+
+    for ax, metric, label in [(axes[0], 'seconds', 'Wall time (s)'), (axes[1], 'peak_memory_mb', 'Peak memory (MB)'),
+                              (axes[2], 'peak_rss_mb', 'Peak resident memory with workers (MB)')]:
+        colors = {}
+        for stage, rows in ok.groupby('stage', sort=False):
+            rows = rows[rows[metric].notna() & (rows[metric] > 0)]
+            if len(rows) > 0:
+                colors[stage] = ax.plot(rows['rows'], rows[metric], marker='o', label=stage)[0].get_color()
+        ax.set_xscale('log')
+        ax.set_yscale('log')
+        bottom = ax.get_ylim()[0]
+        for stage, rows in not_run.groupby('stage', sort=False):
+            ax.plot(rows['rows'], [bottom] * len(rows), marker='x', markersize=10, linestyle='none',
+                    color=colors.get(stage), label=f'{stage} not run', clip_on=False)
+        ax.set_xlabel('Listings')
+        ax.set_ylabel(label)
+        ax.grid(True, which='both', alpha=0.3)
+        ax.legend()
+
+    axes[0].set_title('Stage time by dataset size')
+    axes[1].set_title('Stage peak memory by dataset size')
+    axes[2].set_title('Stage resident memory by dataset size')
+    plt.tight_layout()
+
+    if save_path:
+        plt.savefig(save_path)
+        print(f"Scaling curves saved to {save_path}")
+    plt.close(fig)
+    return fig
+
+def save_scaling_results(results, output_dir=DEFAULT_OUTPUT_DIR):
+    """
+    Save the measurements as CSV, the fitted exponents as JSON and the curves as PNG.
+
+    Args:
+        results (list): Output of run_scaling_benchmark
+        output_dir (str): Directory for scaling_results.csv, scaling_exponents.json and scaling_curves.png
+
+    Returns:
+        bool: True if saved successfully, False otherwise
+    """
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        pd.DataFrame(results).to_csv(os.path.join(output_dir, 'scaling_results.csv'), index=False)
+        write_json_atomic(fit_scaling_exponents(results), os.path.join(output_dir, 'scaling_exponents.json'), indent=2)
+        plot_scaling_curves(results, os.path.join(output_dir, 'scaling_curves.png'))
+        print(f"Scaling results saved to {output_dir}")
+        return True
+    except Exception as e:
+        print(f"Error saving scaling results: {e}")
+        return False
+
+def main():
+    """
+    Run the scaling benchmark on the sizes given on the command line and save the results.
+    """
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    results = run_scaling_benchmark(sizes)
+    for stage, exponents in fit_scaling_exponents(results).items():
+        print(f"{stage}: time ~ rows^{exponents['time_exponent']}, memory ~ rows^{exponents['memory_exponent']}, "
+              f"resident memory ~ rows^{exponents['rss_exponent']}")
+    save_scaling_results(results)
+    return results
+
+if __name__ == "__main__":
+    main()
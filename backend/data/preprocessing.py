@@ -4,6 +4,9 @@ This module handles data cleaning, feature engineering, and preprocessing for th
 """
 import os
 import sys
+import time
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
@@ -14,27 +17,136 @@ from sklearn.pipeline import Pipeline
 
 # Use relative imports based on the directory structure
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.data_utils import load_data, save_processed_data, check_missing_values, explore_numeric_features
+from utils.data_utils import (
+    load_data, save_processed_data, check_missing_values, explore_numeric_features, get_columnar_path,
+    iter_table_chunks, round_float_columns, apply_schema, append_table, load_summary_aggregates,
+    update_data_summary, read_table, list_data_shards, get_path_size
+)
+from utils.sketch_utils import KLLSketch
+from utils.feature_utils import compute_features
+from utils.stats_utils import save_cleaning_stats, load_cleaning_stats
+from utils.profile_utils import (
+    CorrelationAccumulator, DataProfiler, profile_dataframe, save_profile, load_profiler, update_profile
+)
+from utils.validation_utils import split_invalid_rows, quarantine_invalid_rows, get_quarantine_path, write_quarantine
+from utils.dedup_utils import (
+    RowHashSet, hash_rows, deduplicate, find_near_duplicates, build_dedup_report, save_dedup_report
+)
 
-def clean_data(df):
+# Columns whose outliers are capped with the 1.5 * IQR rule
+OUTLIER_COLUMNS = ['Price', 'Price M2', 'AreaNet', 'AreaGross']
+
+# 'Price M2' is removed when its absolute correlation with Price is below this value
+PRICE_M2_MIN_CORRELATION = 0.3
+
+def get_iqr_bounds(q1, q3):
     """
-    Clean the dataset by handling missing values, outliers, and redundant features.
+    Get the outlier capping bounds from the first and third quartiles.
     
     Args:
-        df (pd.DataFrame): Raw dataframe
+        q1 (float): First quartile
+        q3 (float): Third quartile
+        
+    Returns:
+        tuple: (lower_bound, upper_bound)
+    """
+    iqr = q3 - q1
+    return q1 - 1.5 * iqr, q3 + 1.5 * iqr
+
+def fill_missing_values(df, fill_values):
+    """
+    Fill missing values in place with precomputed per-column values.
+    
+    Args:
+        df (pd.DataFrame): Dataframe to fill
+        fill_values (dict): Fill value for each column (medians and modes)
+        
+    Returns:
+        pd.DataFrame: The filled dataframe
+    """
+    for col, value in fill_values.items():
+        if col not in df.columns or value is None:
+            continue
+        if isinstance(df[col].dtype, pd.CategoricalDtype) and value not in df[col].cat.categories:
+            df[col] = df[col].cat.add_categories([value])
+        df[col] = df[col].fillna(value)
+    return df
+
+def cap_outliers(df, col, lower_bound, upper_bound):
+    """
+    Cap the values of a column in place to the given bounds.
+    
+    An integer column capped to a fractional bound is converted to float64 first.
+    
+    Args:
+        df (pd.DataFrame): Dataframe to modify
+        col (str): Column to cap
+        lower_bound (float): Values below are set to this bound
+        upper_bound (float): Values above are set to this bound
+        
+    Returns:
+        int: Number of values that were outside the bounds
+    """
+    below = df[col] < lower_bound
+    above = df[col] > upper_bound
+    if pd.api.types.is_integer_dtype(df[col].dtype) and (
+        (below.any() and not float(lower_bound).is_integer()) or (above.any() and not float(upper_bound).is_integer())
+    ):
+        df[col] = df[col].astype('float64')
+    df.loc[below, col] = lower_bound
+    df.loc[above, col] = upper_bound
+    return int((below | above).sum())
+
+def apply_cleaning_stats(df, stats):
+    """
+    Clean a dataframe with statistics computed beforehand by clean_data_with_stats or clean_data_chunked.
+    
+    Duplicates are not removed here, since that depends on the rows seen before.
+    
+    Args:
+        df (pd.DataFrame): Dataframe with the raw columns
+        stats (dict): Cleaning statistics
         
     Returns:
         pd.DataFrame: Cleaned dataframe
     """
-    cleaned_df = df.copy()
+    cleaned_df = df.drop(columns=[col for col in stats['dropped_columns'] if col in df.columns])
+    fill_missing_values(cleaned_df, stats['fill_values'])
     
-    original_rows = len(cleaned_df)
-    cleaned_df.drop_duplicates(inplace=True)
-    if len(cleaned_df) < original_rows:
-        print(f"Removed {original_rows - len(cleaned_df)} duplicate rows")
+    for col in stats['capped_columns']:
+        if col in cleaned_df.columns:
+            lower_bound, upper_bound = stats['outlier_bounds'][col]
+            cap_outliers(cleaned_df, col, lower_bound, upper_bound)
+    
+    return cleaned_df.drop(columns=[col for col in stats['late_dropped_columns'] if col in cleaned_df.columns])
+
+def clean_data_with_stats(df, near_duplicates=False, dedup_report_path=None, **near_duplicate_options):
+    """
+    Clean the dataset and return the statistics the cleaning was based on.
+    
+    Args:
+        df (pd.DataFrame): Raw dataframe
+        near_duplicates (bool): Also remove reposted listings (see utils.dedup_utils.find_near_duplicates)
+        dedup_report_path (str, optional): Where to save the report of the removed duplicates
+        **near_duplicate_options: Tolerances for the near-duplicate search
+        
+    Returns:
+        tuple: (cleaned dataframe, stats dict with dropped_columns, fill_values,
+            outlier_bounds, capped_columns and late_dropped_columns)
+    """
+    cleaned_df, dedup_report = deduplicate(df, near_duplicates=near_duplicates, **near_duplicate_options)
     
-    unique_counts = cleaned_df.nunique()
-    single_value_cols = unique_counts[unique_counts == 1].index.tolist()
+    if dedup_report['exact_duplicates_removed'] > 0:
+        print(f"Removed {dedup_report['exact_duplicates_removed']} duplicate rows")
+    if dedup_report['near_duplicates_removed'] > 0:
+        print(f"Removed {dedup_report['near_duplicates_removed']} near-duplicate listings")
+    if dedup_report_path is not None:
+        save_dedup_report(dedup_report, dedup_report_path)
+    
+    # One pass for the distinct and missing counts of every column
+    profile = profile_dataframe(cleaned_df)
+    single_value_cols = [col for col in cleaned_df.columns if profile['columns'][col]['distinct'] == 1]
+    dropped_columns = list(single_value_cols)
     
     if single_value_cols:
         print(f"Removing columns with only one unique value: {single_value_cols}")
@@ -43,87 +155,659 @@ def clean_data(df):
     if 'Id' in cleaned_df.columns:
         print("Removing redundant Id column")
         cleaned_df = cleaned_df.drop(columns=['Id'])
+        dropped_columns.append('Id')
     
     # Check and report missing values
-    check_missing_values(cleaned_df)
+    check_missing_values(cleaned_df, profile)
     
     # Handle missing values
-    numeric_cols = cleaned_df.select_dtypes(include=['int64', 'float64']).columns
-    for col in numeric_cols:
-        cleaned_df[col] = cleaned_df[col].fillna(cleaned_df[col].median())
-    
-    categorical_cols = cleaned_df.select_dtypes(include=['object']).columns
-    for col in categorical_cols:
-        cleaned_df[col] = cleaned_df[col].fillna(cleaned_df[col].mode()[0])
+    fill_values = {}
+    for col in cleaned_df.select_dtypes(include=['number']).columns:
+        fill_values[col] = cleaned_df[col].median()
     
-    print("Missing values after cleaning:")
-    print(cleaned_df.isnull().sum())
+    for col in cleaned_df.select_dtypes(include=['object', 'category']).columns:
+        modes = cleaned_df[col].mode()
+        fill_values[col] = modes[0] if len(modes) > 0 else None
     
-    price_features = ['Price', 'Price M2']
-    area_features = ['AreaNet', 'AreaGross']
+    fill_missing_values(cleaned_df, fill_values)
     
-    for col in price_features + area_features:
+    # Filling only leaves the missing values of columns without a fill value
+    print("Missing values after cleaning:")
+    print(pd.Series(
+        [0 if fill_values.get(col) is not None else profile['columns'][col]['nulls'] for col in cleaned_df.columns],
+        index=cleaned_df.columns, dtype=np.int64
+    ))
+    
+    outlier_bounds = {}
+    capped_columns = []
+    for col in OUTLIER_COLUMNS:
         if col in cleaned_df.columns:
-            Q1 = cleaned_df[col].quantile(0.25)
-            Q3 = cleaned_df[col].quantile(0.75)
-            IQR = Q3 - Q1
-            lower_bound = Q1 - 1.5 * IQR
-            upper_bound = Q3 + 1.5 * IQR
+            sketch = KLLSketch.from_values(cleaned_df[col].to_numpy(dtype='float64'))
+            lower_bound, upper_bound = get_iqr_bounds(*sketch.quantiles([0.25, 0.75]))
+            outlier_bounds[col] = (lower_bound, upper_bound)
             
             outlier_mask = (cleaned_df[col] < lower_bound) | (cleaned_df[col] > upper_bound)
             outlier_count = outlier_mask.sum()
             
             if outlier_count > 0:
                 print(f"Capping {outlier_count} outliers in {col}")
-                cleaned_df.loc[cleaned_df[col] < lower_bound, col] = lower_bound
-                cleaned_df.loc[cleaned_df[col] > upper_bound, col] = upper_bound
+                cap_outliers(cleaned_df, col, lower_bound, upper_bound)
+                capped_columns.append(col)
     
+    late_dropped_columns = []
     if 'Price M2' in cleaned_df.columns and 'Price' in cleaned_df.columns:
         corr = cleaned_df['Price M2'].corr(cleaned_df['Price'])
         print(f"Correlation between Price M2 and Price: {corr:.4f}")
-        if abs(corr) < 0.3:  
+        if abs(corr) < PRICE_M2_MIN_CORRELATION:
             print("Removing 'Price M2' due to low correlation with target and practical considerations")
             cleaned_df = cleaned_df.drop(columns=['Price M2'])
+            late_dropped_columns.append('Price M2')
+    
+    stats = {
+        'dropped_columns': dropped_columns,
+        'fill_values': fill_values,
+        'outlier_bounds': outlier_bounds,
+        'capped_columns': capped_columns,
+        'late_dropped_columns': late_dropped_columns
+    }
+    return cleaned_df, stats
+
+def clean_data(df):
+    """
+    Clean the dataset by handling missing values, outliers, and redundant features.
     
+    Args:
+        df (pd.DataFrame): Raw dataframe
+        
+    Returns:
+        pd.DataFrame: Cleaned dataframe
+    """
+    cleaned_df, _ = clean_data_with_stats(df)
     return cleaned_df
 
-def engineer_features(df):
+def _is_number_dtype(dtype):
+    """Whether a dtype is selected by select_dtypes(include=['number'])."""
+    return pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+
+def _deduplicate_chunks(input_filepath, chunksize, typed, near_duplicates, hash_store_dir,
+                        near_duplicate_options, quarantine_path=None):
     """
-    Create basic new features and transform existing ones.
+    Find the rows to keep in each chunk, removing rows failing validation (written to
+    the quarantine file, if given), exact duplicates by row hash and, optionally,
+    near-duplicates found among the location, area and bedroom columns.
+    
+    Returns:
+        tuple: (list of boolean keep masks per chunk, deduplication report)
+    """
+    keep_masks = []
+    invalid_rows = 0
+    near_columns = ['Latitude', 'Longitude', 'Bedrooms', near_duplicate_options.get('area_column', 'AreaNet')]
+    points = []
+    row_offset = 0
+    
+    store_path = None
+    if hash_store_dir is not None:
+        os.makedirs(hash_store_dir, exist_ok=True)
+        fd, store_path = tempfile.mkstemp(prefix='.row_hashes_', suffix='.sqlite', dir=hash_store_dir)
+        os.close(fd)
+    
+    try:
+        with RowHashSet(store_path) as seen_rows:
+            for chunk in iter_table_chunks(input_filepath, chunksize, typed=typed):
+                valid, quarantined = split_invalid_rows(chunk)
+                if quarantine_path is not None:
+                    write_quarantine(quarantined, quarantine_path, append=True)
+                invalid_rows += len(quarantined)
+                
+                keep = seen_rows.add(hash_rows(chunk)) & chunk.index.isin(valid.index)
+                keep_masks.append(keep)
+                
+                if near_duplicates and all(col in chunk.columns for col in near_columns):
+                    kept_points = chunk.loc[keep, near_columns].astype('float64')
+                    kept_points.index = row_offset + np.flatnonzero(keep)
+                    points.append(kept_points)
+                row_offset += len(chunk)
+    finally:
+        if store_path is not None and os.path.exists(store_path):
+            os.unlink(store_path)
+    
+    if invalid_rows > 0:
+        print(f"Quarantined {invalid_rows} invalid rows")
+    exact_duplicates = row_offset - invalid_rows - sum(int(keep.sum()) for keep in keep_masks)
+    near_pairs = find_near_duplicates(pd.DataFrame(columns=near_columns))
+    if points:
+        # Index labels are row numbers in the input, so removals map straight back to chunks
+        near_pairs = find_near_duplicates(pd.concat(points), **near_duplicate_options)
+        for row in near_pairs['removed'].tolist():
+            keep_masks[row // chunksize][row % chunksize] = False
+    
+    return keep_masks, build_dedup_report(exact_duplicates, near_pairs)
+
+def clean_data_chunked(input_filepath, output_filepath, chunksize=100000, typed=True,
+                       engineer=False, decimal_places=3, near_duplicates=False,
+                       hash_store_dir=None, dedup_report_path=None, quarantine_path=None,
+                       **near_duplicate_options):
+    """
+    Clean a dataset too large for memory in passes over chunks of rows.
+    
+    The first pass validates every chunk (see utils.validation_utils) and finds
+    duplicate rows by hash (and near-duplicates, if asked).
+    The second collects the statistics the in-memory clean_data uses: distinct
+    values for constant-column detection, mode counters and a quantile sketch
+    per numeric column for medians and IQR bounds (exact as long as a column has
+    no more values than the sketch keeps). A light pass over the outlier columns
+    then counts the outliers and computes the Price M2 correlation after capping.
+    The last pass imputes, caps and appends each chunk to the output CSV, so the
+    output matches clean_data on the valid rows (and engineer_features when
+    engineer is True).
+    
+    Memory grows with the number of rows only through the keep mask, the row
+    hashes (unless hash_store_dir moves them to disk) and, for the near-duplicate
+    search, four numeric columns.
     
     Args:
-        df (pd.DataFrame): Cleaned dataframe
+        input_filepath (str): Path to the raw dataset
+        output_filepath (str): Path of the CSV file to write
+        chunksize (int): Number of rows per chunk
+        typed (bool): Read the chunks with the declared schema
+        engineer (bool): Also apply engineer_features to each cleaned chunk
+        decimal_places (int): Number of decimal places kept for float columns
+        near_duplicates (bool): Also remove reposted listings
+        hash_store_dir (str, optional): Directory for a temporary on-disk row hash set
+        dedup_report_path (str, optional): Where to save the report of the removed duplicates
+        quarantine_path (str, optional): CSV file the rows failing validation are appended to
+        **near_duplicate_options: Tolerances for the near-duplicate search
         
     Returns:
-        pd.DataFrame: Dataframe with engineered features
+        dict or None: Cleaning statistics (see clean_data_with_stats) or None if cleaning fails
     """
-    engineered_df = df.copy()
-    
-    if 'Price' in engineered_df.columns and 'Bedrooms' in engineered_df.columns:
-        engineered_df['PricePerBedroom'] = engineered_df.apply(
-            lambda row: row['Price'] / row['Bedrooms'] if row['Bedrooms'] > 0 else row['Price'],
-            axis=1
+    try:
+        # Pass 1: quarantine invalid rows and find exact and near-duplicate rows
+        keep_masks, dedup_report = _deduplicate_chunks(
+            input_filepath, chunksize, typed, near_duplicates, hash_store_dir, near_duplicate_options,
+            quarantine_path
         )
+        if dedup_report_path is not None:
+            save_dedup_report(dedup_report, dedup_report_path)
+        
+        # Pass 2: collect column statistics of the kept rows
+        columns = None
+        numeric_columns = set()
+        float_columns = set()
+        text_columns = set()
+        distinct_values = {}
+        null_counts = {}
+        sketches = {}
+        value_counts = {}
+        kept_rows = sum(int(keep.sum()) for keep in keep_masks)
+        
+        for chunk, keep in zip(iter_table_chunks(input_filepath, chunksize, typed=typed), keep_masks):
+            if columns is None:
+                columns = chunk.columns.tolist()
+                distinct_values = {col: set() for col in columns}
+                null_counts = {col: 0 for col in columns}
+            
+            kept = chunk[keep]
+            for col in columns:
+                values = kept[col]
+                null_counts[col] += int(values.isnull().sum())
+                if pd.api.types.is_float_dtype(values.dtype):
+                    float_columns.add(col)
+                values = values.dropna()
+                
+                # All-missing chunks are parsed as float whatever the column holds
+                if len(values) == 0:
+                    continue
+                
+                if _is_number_dtype(values.dtype):
+                    numeric_columns.add(col)
+                    sketches.setdefault(col, KLLSketch()).update_many(values.to_numpy(dtype='float64'))
+                else:
+                    text_columns.add(col)
+                    counts = value_counts.setdefault(col, {})
+                    for value, count in values.astype(object).value_counts().items():
+                        counts[value] = counts.get(value, 0) + count
+                
+                # Two distinct values are enough to know a column is not constant
+                if len(distinct_values[col]) < 2:
+                    distinct_values[col].update(values.unique()[:2].tolist())
+        
+        if columns is None:
+            raise ValueError(f"No rows found in {input_filepath}")
+        
+        mixed_columns = numeric_columns & text_columns
+        if mixed_columns:
+            raise ValueError(f"Columns with inconsistent types across chunks: {sorted(mixed_columns)}")
+        
+        if dedup_report['exact_duplicates_removed'] > 0:
+            print(f"Removed {dedup_report['exact_duplicates_removed']} duplicate rows")
+        if dedup_report['near_duplicates_removed'] > 0:
+            print(f"Removed {dedup_report['near_duplicates_removed']} near-duplicate listings")
+        
+        dropped_columns = [col for col in columns if len(distinct_values[col]) == 1]
+        if dropped_columns:
+            print(f"Removing columns with only one unique value: {dropped_columns}")
+        if 'Id' in columns and 'Id' not in dropped_columns:
+            print("Removing redundant Id column")
+            dropped_columns.append('Id')
+        remaining_columns = [col for col in columns if col not in dropped_columns]
+        
+        fill_values = {}
+        for col in remaining_columns:
+            if col in numeric_columns:
+                fill_values[col] = sketches[col].quantile(0.5)
+            else:
+                counts = value_counts.get(col, {})
+                top_count = max(counts.values(), default=0)
+                fill_values[col] = min(v for v, c in counts.items() if c == top_count) if counts else None
+        
+        missing = {col: null_counts[col] for col in remaining_columns if null_counts[col] > 0}
+        print(f"Missing values per column: {missing}" if missing else "No missing values found.")
+        
+        # Quartiles of the imputed columns: observed values plus one median per missing value
+        outlier_bounds = {}
+        for col in OUTLIER_COLUMNS:
+            if col in remaining_columns and col in numeric_columns:
+                sketches[col].update_repeated(fill_values[col], null_counts[col])
+                outlier_bounds[col] = get_iqr_bounds(*sketches[col].quantiles([0.25, 0.75]))
+        
+        # Pass 3: count outliers and correlate the capped Price M2 and Price columns
+        outlier_counts = {col: 0 for col in outlier_bounds}
+        correlation = CorrelationAccumulator()
+        bound_columns = list(outlier_bounds)
+        if bound_columns:
+            chunks = iter_table_chunks(input_filepath, chunksize, columns=bound_columns, typed=typed)
+            for chunk, keep in zip(chunks, keep_masks):
+                kept = fill_missing_values(chunk[keep].astype('float64'), fill_values)
+                for col in bound_columns:
+                    lower_bound, upper_bound = outlier_bounds[col]
+                    outlier_counts[col] += cap_outliers(kept, col, lower_bound, upper_bound)
+                if 'Price M2' in bound_columns and 'Price' in bound_columns:
+                    correlation.update(kept['Price M2'], kept['Price'])
+        
+        capped_columns = [col for col in bound_columns if outlier_counts[col] > 0]
+        for col in capped_columns:
+            print(f"Capping {outlier_counts[col]} outliers in {col}")
+        
+        late_dropped_columns = []
+        if 'Price M2' in remaining_columns and 'Price' in remaining_columns:
+            corr = correlation.correlation()
+            print(f"Correlation between Price M2 and Price: {corr:.4f}")
+            if abs(corr) < PRICE_M2_MIN_CORRELATION:
+                print("Removing 'Price M2' due to low correlation with target and practical considerations")
+                late_dropped_columns.append('Price M2')
+        
+        stats = {
+            'dropped_columns': dropped_columns,
+            'fill_values': fill_values,
+            'outlier_bounds': outlier_bounds,
+            'capped_columns': capped_columns,
+            'late_dropped_columns': late_dropped_columns
+        }
+        
+        # Pass 4: clean every chunk with the global statistics and append it to the output
+        os.makedirs(os.path.dirname(os.path.abspath(output_filepath)), exist_ok=True)
+        float_format = f'%.{decimal_places}f'
+        first_chunk = True
+        for chunk, keep in zip(iter_table_chunks(input_filepath, chunksize, typed=typed), keep_masks):
+            kept = chunk[keep]
+            # Give each column the dtype it has when the whole file is loaded at once
+            kept = kept.astype({
+                col: 'float64' if col in float_columns else 'int64'
+                for col in numeric_columns if col in kept.columns
+            })
+            cleaned = apply_cleaning_stats(kept, stats)
+            if engineer:
+                cleaned = engineer_features(cleaned, explore=False)
+            
+            round_float_columns(cleaned, decimal_places).to_csv(
+                output_filepath, mode='w' if first_chunk else 'a', header=first_chunk,
+                index=False, float_format=float_format
+            )
+            first_chunk = False
+        
+        print(f"Cleaned {kept_rows} rows in chunks of {chunksize} and saved them to {output_filepath}")
+        return stats
+    except Exception as e:
+        print(f"Error cleaning data in chunks: {e}")
+        return None
+
+def get_row_hash_store_path(output_filepath):
+    """
+    Get the path of the store of raw row hashes kept next to the processed data.
     
-    if 'Bathrooms' in engineered_df.columns and 'Bedrooms' in engineered_df.columns:
-        engineered_df['BathroomToBedroom'] = engineered_df.apply(
-            lambda row: row['Bathrooms'] / row['Bedrooms'] if row['Bedrooms'] > 0 else row['Bathrooms'],
-            axis=1
-        )
+    Args:
+        output_filepath (str): Path of the processed CSV
+        
+    Returns:
+        str: Path of the SQLite hash store
+    """
+    root, _ = os.path.splitext(output_filepath)
+    return f"{root}_row_hashes.sqlite"
+
+def build_row_hash_store(raw_df, store_path):
+    """
+    Replace the row hash store with the hashes of the raw rows the processed data was built from.
     
-    if 'AreaNet' in engineered_df.columns and 'AreaGross' in engineered_df.columns:
-        engineered_df['AreaUtilizationRatio'] = engineered_df.apply(
-            lambda row: row['AreaNet'] / row['AreaGross'] if row['AreaGross'] > 0 else 0,
-            axis=1
-        )
+    Args:
+        raw_df (pd.DataFrame): Raw dataframe, loaded the same way later appends are
+        store_path (str): Path of the SQLite hash store
+    """
+    if os.path.isfile(store_path):
+        os.unlink(store_path)
+    with RowHashSet(store_path) as seen_rows:
+        seen_rows.add(hash_rows(raw_df))
+
+def append_listings(new_data, output_filepath, models_dir, decimal_places=3):
+    """
+    Clean new raw listings with the persisted statistics and append them to the processed data.
+    
+    Rows failing validation are quarantined and rows already processed (by raw
+    row hash) are skipped. The remaining rows are imputed, capped and engineered
+    exactly like the full pipeline would, then appended to the processed CSV and
+    its columnar store, whose summary sidecars and profiles are updated from
+    mergeable aggregates instead of being recomputed.
     
-    if 'PropertyType' in engineered_df.columns and 'PropertySubType' in engineered_df.columns:
-        engineered_df['PropertyCategory'] = engineered_df['PropertyType'] + '_' + engineered_df['PropertySubType']
+    Args:
+        new_data (str or pd.DataFrame): Path of a raw listings file or the raw listings
+        output_filepath (str): Path of the processed CSV written by main
+        models_dir (str): Directory containing the saved cleaning statistics
+        decimal_places (int): Number of decimal places to round numeric values
+        
+    Returns:
+        int or None: Number of appended rows, or None if an error occurred
+    """
+    try:
+        stats = load_cleaning_stats(models_dir)
+        if stats is None:
+            print(f"No cleaning statistics found in {models_dir}; run the full preprocessing first")
+            return None
+        
+        new_df = load_data(new_data) if isinstance(new_data, str) else apply_schema(new_data)
+        if new_df is None:
+            return None
+        new_df = quarantine_invalid_rows(new_df, get_quarantine_path(output_filepath))
+        
+        with RowHashSet(get_row_hash_store_path(output_filepath)) as seen_rows:
+            hashes = hash_rows(new_df)
+            is_new = seen_rows.find_new(hashes)
+            new_rows = new_df.take(np.flatnonzero(is_new))
+            print(f"Skipping {len(new_df) - len(new_rows)} listings that were already processed")
+            if len(new_rows) == 0:
+                return 0
+            
+            # Cap in float so that integer columns are not upcast row by row
+            new_rows = new_rows.astype({
+                col: 'float64' for col in stats['outlier_bounds']
+                if col in new_rows.columns and _is_number_dtype(new_rows[col].dtype)
+            })
+            cleaned = engineer_features(apply_cleaning_stats(new_rows, stats), explore=False)
+            cleaned = round_float_columns(cleaned, decimal_places)
+            
+            for filepath in [get_columnar_path(output_filepath), output_filepath]:
+                if not (os.path.isfile(filepath) or os.path.isdir(filepath)):
+                    continue
+                previous_aggregates = load_summary_aggregates(filepath)
+                previous_profiler = load_profiler(filepath)
+                append_table(cleaned, filepath, decimal_places=decimal_places)
+                update_data_summary(filepath, cleaned, previous_aggregates)
+                update_profile(filepath, cleaned, previous_profiler)
+            
+            # Only remember the rows once they are stored
+            seen_rows.add(hashes[is_new])
+        
+        print(f"Appended {len(cleaned)} new listings to {output_filepath}")
+        return len(cleaned)
+    except Exception as e:
+        print(f"Error appending listings: {e}")
+        return None
+
+def _parse_shard(path):
+    """Read a shard with the declared schema, set aside invalid rows and hash the others (runs in a worker process)."""
+    start = time.perf_counter()
+    df = read_table(path, typed=True)
+    valid, quarantined = split_invalid_rows(df)
+    return {'frame': valid, 'quarantined': quarantined, 'hashes': hash_rows(valid), 'rows': len(df),
+            'bytes': get_path_size(path), 'parse_seconds': time.perf_counter() - start}
+
+def _profile_shard(df):
+    """Profile the kept rows of a shard and count the values of its text columns (runs in a worker process)."""
+    start = time.perf_counter()
+    profiler = DataProfiler().update(df)
+    # Modes need every value count, which the profiler drops for high-cardinality columns
+    value_counts = {}
+    for col in df.columns:
+        if not _is_number_dtype(df[col].dtype):
+            counts = df[col].astype(object).value_counts()
+            value_counts[col] = counts[counts > 0]
+    return profiler, value_counts, time.perf_counter() - start
+
+def _clean_shard(df, stats):
+    """
+    Impute and cap a shard with the merged statistics (runs in a worker process).
+    
+    Returns:
+        tuple: (cleaned shard, outliers per bounded column, Price M2 and Price co-moments, seconds)
+    """
+    start = time.perf_counter()
+    cleaned = df.drop(columns=[col for col in stats['dropped_columns'] if col in df.columns])
+    fill_missing_values(cleaned, stats['fill_values'])
+    
+    outlier_counts = {}
+    for col, (lower_bound, upper_bound) in stats['outlier_bounds'].items():
+        if col not in cleaned.columns:
+            continue
+        outlier_mask = (cleaned[col] < lower_bound) | (cleaned[col] > upper_bound)
+        outlier_counts[col] = int(outlier_mask.sum())
+        if outlier_counts[col] == 0:
+            continue
+        cap_outliers(cleaned, col, lower_bound, upper_bound)
+    
+    correlation = CorrelationAccumulator()
+    if 'Price M2' in cleaned.columns and 'Price' in cleaned.columns:
+        correlation.update(cleaned['Price M2'], cleaned['Price'])
+    return cleaned, outlier_counts, correlation, time.perf_counter() - start
+
+def _concat_shards(frames):
+    """Concatenate shards, restoring the categorical dtype of columns whose categories differ per shard."""
+    combined = pd.concat(frames)
+    for col in combined.columns:
+        if combined[col].dtype == object and any(
+            isinstance(df[col].dtype, pd.CategoricalDtype) for df in frames if col in df.columns
+        ):
+            combined[col] = combined[col].astype('category')
+    return combined
+
+def _fit_shard_stats(profiler, value_counts):
+    """Derive the constant columns, fill values and outlier bounds from the merged shard profiles."""
+    dropped_columns = [col for col, column_profile in profiler.columns.items() if column_profile.distinct == 1]
+    if dropped_columns:
+        print(f"Removing columns with only one unique value: {dropped_columns}")
+    if 'Id' in profiler.columns and 'Id' not in dropped_columns:
+        print("Removing redundant Id column")
+        dropped_columns.append('Id')
+    remaining_columns = [col for col in profiler.columns if col not in dropped_columns]
+    
+    fill_values = {}
+    for col in remaining_columns:
+        column_profile = profiler.columns[col]
+        if column_profile.numeric:
+            fill_values[col] = column_profile.quantile_sketch.quantile(0.5)
+        else:
+            counts = value_counts.get(col, {})
+            top_count = max(counts.values(), default=0)
+            fill_values[col] = min(v for v, c in counts.items() if c == top_count) if len(counts) else None
+    
+    missing = {col: profiler.columns[col].nulls for col in remaining_columns if profiler.columns[col].nulls > 0}
+    print(f"Missing values per column: {missing}" if missing else "No missing values found.")
+    
+    # Quartiles of the imputed columns: observed values plus one median per missing value
+    outlier_bounds = {}
+    for col in OUTLIER_COLUMNS:
+        if col in remaining_columns and profiler.columns[col].numeric:
+            sketch = profiler.columns[col].quantile_sketch
+            sketch.update_repeated(fill_values[col], profiler.columns[col].nulls)
+            outlier_bounds[col] = get_iqr_bounds(*sketch.quantiles([0.25, 0.75]))
+    
+    return {
+        'dropped_columns': dropped_columns,
+        'fill_values': fill_values,
+        'outlier_bounds': outlier_bounds,
+        'capped_columns': [],
+        'late_dropped_columns': []
+    }
+
+def ingest_shards(source, max_workers=None, hash_store_path=None, quarantine_path=None):
+    """
+    Load and clean a dataset delivered as many raw shards, e.g. one CSV per portal and day.
+    
+    Shards are parsed with the declared schema, validated and hashed in a process
+    pool. Rows failing validation are set aside with their reason codes. Duplicate
+    rows are then removed across all shards in shard order, each shard is
+    profiled in the pool, and the profiles are merged into the statistics
+    clean_data_with_stats would compute on the concatenated shards (medians and
+    quartiles come from mergeable quantile sketches, exact while a column has no
+    more values than a sketch keeps). Finally every shard is imputed and capped
+    in the pool and the cleaned shards are concatenated in order.
+    
+    Args:
+        source (str): Directory of shards, glob pattern or single data file
+        max_workers (int, optional): Worker processes; defaults to the number of CPUs,
+            1 processes the shards in this process
+        hash_store_path (str, optional): SQLite row hash store to rebuild from the
+            ingested rows, see append_listings
+        quarantine_path (str, optional): CSV file the rows failing validation are appended to
+        
+    Returns:
+        tuple: (cleaned dataframe, cleaning statistics, per-shard report), or
+            (None, None, None) if ingestion fails
+    """
+    try:
+        paths = list_data_shards(source)
+        if not paths:
+            raise ValueError(f"No data files found for {source}")
+        
+        executor = None
+        if (max_workers or os.cpu_count() or 1) > 1 and len(paths) > 1:
+            executor = ProcessPoolExecutor(max_workers=max_workers)
+        map_shards = executor.map if executor is not None else map
+        
+        try:
+            parsed = list(map_shards(_parse_shard, paths))
+            
+            # Hashes depend on the column order, so rehash shards whose columns differ
+            columns = list(dict.fromkeys(col for shard in parsed for col in shard['frame'].columns))
+            for shard in parsed:
+                if shard['frame'].columns.tolist() != columns:
+                    shard['frame'] = shard['frame'].reindex(columns=columns)
+                    shard['hashes'] = hash_rows(shard['frame'])
+            
+            if hash_store_path is not None and os.path.isfile(hash_store_path):
+                os.unlink(hash_store_path)
+            kept_frames = []
+            row_offset = 0
+            with RowHashSet(hash_store_path) as seen_rows:
+                for shard in parsed:
+                    keep = seen_rows.add(shard['hashes'])
+                    shard['duplicates_removed'] = int((~keep).sum())
+                    # Label rows by their position in the concatenated shards
+                    shard['frame'].index = shard['frame'].index + row_offset
+                    row_offset += shard['rows']
+                    kept_frames.append(shard.pop('frame').take(np.flatnonzero(keep)))
+            
+            quarantined = [shard.pop('quarantined') for shard in parsed]
+            for shard, rows in zip(parsed, quarantined):
+                shard['quarantined'] = len(rows)
+                if quarantine_path is not None:
+                    write_quarantine(rows, quarantine_path, append=True)
+            if sum(len(rows) for rows in quarantined) > 0:
+                print(f"Quarantined {sum(len(rows) for rows in quarantined)} invalid rows")
+            
+            duplicates = sum(shard['duplicates_removed'] for shard in parsed)
+            if duplicates > 0:
+                print(f"Removed {duplicates} duplicate rows across {len(paths)} shards")
+            
+            profiler = DataProfiler()
+            value_counts = {}
+            for shard, (shard_profiler, shard_counts, seconds) in zip(parsed, map_shards(_profile_shard, kept_frames)):
+                profiler.merge(shard_profiler)
+                for col, counts in shard_counts.items():
+                    value_counts[col] = value_counts[col].add(counts, fill_value=0) if col in value_counts else counts
+                shard['profile_seconds'] = seconds
+            
+            stats = _fit_shard_stats(profiler, {col: counts.to_dict() for col, counts in value_counts.items()})
+            
+            cleaned_frames = []
+            outlier_counts = {col: 0 for col in stats['outlier_bounds']}
+            correlation = CorrelationAccumulator()
+            for shard, (cleaned, shard_outliers, shard_correlation, seconds) in zip(
+                parsed, map_shards(_clean_shard, kept_frames, [stats] * len(kept_frames))
+            ):
+                cleaned_frames.append(cleaned)
+                for col, count in shard_outliers.items():
+                    outlier_counts[col] += count
+                correlation.merge(shard_correlation)
+                shard['clean_seconds'] = seconds
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        
+        stats['capped_columns'] = [col for col in stats['outlier_bounds'] if outlier_counts[col] > 0]
+        for col in stats['capped_columns']:
+            print(f"Capping {outlier_counts[col]} outliers in {col}")
+        
+        cleaned_df = _concat_shards(cleaned_frames)
+        if 'Price M2' in cleaned_df.columns and 'Price' in cleaned_df.columns:
+            corr = correlation.correlation()
+            print(f"Correlation between Price M2 and Price: {corr:.4f}")
+            if abs(corr) < PRICE_M2_MIN_CORRELATION:
+                print("Removing 'Price M2' due to low correlation with target and practical considerations")
+                cleaned_df = cleaned_df.drop(columns=['Price M2'])
+                stats['late_dropped_columns'].append('Price M2')
+        
+        report = []
+        for path, shard in zip(paths, parsed):
+            seconds = shard['parse_seconds'] + shard['profile_seconds'] + shard['clean_seconds']
+            report.append({
+                'path': path,
+                'rows': shard['rows'],
+                'quarantined': shard['quarantined'],
+                'duplicates_removed': shard['duplicates_removed'],
+                'bytes': shard['bytes'],
+                'parse_seconds': shard['parse_seconds'],
+                'profile_seconds': shard['profile_seconds'],
+                'clean_seconds': shard['clean_seconds'],
+                'rows_per_second': shard['rows'] / seconds if seconds > 0 else None
+            })
+            throughput = f", {report[-1]['rows_per_second']:,.0f} rows/s" if seconds > 0 else ""
+            print(f"{os.path.basename(os.path.normpath(path))}: {shard['rows']} rows "
+                  f"({shard['bytes'] / 1e6:.2f} MB) in {seconds:.3f}s{throughput}")
+        
+        print(f"Ingested {len(cleaned_df)} rows from {len(paths)} shards")
+        return cleaned_df, stats, report
+    except Exception as e:
+        print(f"Error ingesting shards: {e}")
+        return None, None, None
+
+def engineer_features(df, explore=True):
+    """
+    Create basic new features and transform existing ones.
+    
+    Args:
+        df (pd.DataFrame): Cleaned dataframe
+        explore (bool): Print statistics of the numeric features afterwards
+        
+    Returns:
+        pd.DataFrame: Dataframe with engineered features
+    """
+    # Vectorized definitions shared with serving (see utils.feature_utils)
+    engineered_df = compute_features(df)
     
     print("Created basic engineered features")
     
     # Explore the numeric features including newly created ones
-    explore_numeric_features(engineered_df, target_column='Price')
+    if explore:
+        explore_numeric_features(engineered_df, target_column='Price')
     
     return engineered_df
 
@@ -150,8 +834,8 @@ def preprocess_data(df, target_col='Price', test_size=0.2, random_state=42):
     print(f"Training set: {X_train.shape[0]} samples")
     print(f"Testing set: {X_test.shape[0]} samples")
     
-    numeric_features = X.select_dtypes(include=['int64', 'float64']).columns.tolist()
-    categorical_features = X.select_dtypes(include=['object']).columns.tolist()
+    numeric_features = X.select_dtypes(include=['number']).columns.tolist()
+    categorical_features = X.select_dtypes(include=['object', 'category']).columns.tolist()
     
     numeric_transformer = Pipeline(steps=[
         ('imputer', SimpleImputer(strategy='median')),
@@ -175,26 +859,56 @@ def preprocess_data(df, target_col='Price', test_size=0.2, random_state=42):
     
     return X_train_processed, X_test_processed, y_train, y_test, preprocessor
 
-def main():
+def main(input_source=None, max_workers=None):
     """
     Main function to run the preprocessing pipeline.
+    
+    Args:
+        input_source (str, optional): Directory or glob pattern of raw listing shards
+            to ingest in parallel instead of the bundled lisbon-houses.csv
+        max_workers (int, optional): Worker processes for the shard ingestion
     """
     # Define file paths
     data_dir = os.path.dirname(os.path.abspath(__file__))
     input_filepath = os.path.join(data_dir, 'lisbon-houses.csv')
     output_filepath = os.path.join(data_dir, 'processed', 'lisbon_houses_processed.csv')
-    
-    raw_data = load_data(input_filepath)
-    
-    if raw_data is not None:
-        # Clean data
-        cleaned_data = clean_data(raw_data)
+    models_dir = os.path.join(os.path.dirname(data_dir), 'models', 'saved_models')
+    
+    # Rows failing validation are quarantined next to the processed data, replacing earlier runs
+    quarantine_path = get_quarantine_path(output_filepath)
+    if os.path.isfile(quarantine_path):
+        os.unlink(quarantine_path)
+    
+    if input_source is not None:
+        # Shards are deduplicated against each other into a fresh row hash store while ingesting
+        cleaned_data, stats, _ = ingest_shards(
+            input_source, max_workers=max_workers, hash_store_path=get_row_hash_store_path(output_filepath),
+            quarantine_path=quarantine_path
+        )
+        source_path = input_source if os.path.isfile(input_source) or os.path.isdir(input_source) else None
+    else:
+        raw_data = load_data(input_filepath)
+        cleaned_data, stats, source_path = None, None, input_filepath
+        if raw_data is not None:
+            raw_data = quarantine_invalid_rows(raw_data, quarantine_path)
+            # Clean data, keeping the fitted statistics so serving can impute and cap the same way
+            cleaned_data, stats = clean_data_with_stats(raw_data)
+            build_row_hash_store(raw_data, get_row_hash_store_path(output_filepath))
+    
+    if cleaned_data is not None:
+        save_cleaning_stats(stats, models_dir, source_path=source_path)
         
-        # Engineer features
-        processed_data = engineer_features(cleaned_data)
+        # Engineer features and profile the result in one pass, as it will be saved
+        processed_data = engineer_features(cleaned_data, explore=False)
+        profiler = DataProfiler().update(round_float_columns(processed_data, 3))
+        profile = profiler.to_dict()
+        explore_numeric_features(processed_data, target_column='Price', profile=profile)
         
-        # Save processed data
-        save_processed_data(processed_data, output_filepath)
+        # Save processed data: columnar store for the pipeline, CSV as a portable export.
+        # The profiler's state is kept with the profile so appends can merge into it
+        for filepath in [get_columnar_path(output_filepath), output_filepath]:
+            save_processed_data(processed_data, filepath)
+            save_profile(profile, filepath, profiler)
         
         print("Preprocessing completed successfully!")
         
@@ -203,4 +917,4 @@ def main():
     return None
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
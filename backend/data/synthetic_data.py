@@ -0,0 +1,314 @@
+"""
+Synthetic listing generator for Lisbon housing data.
+This module fits the marginal and per-parish distributions of the raw listings and
+samples any number of synthetic listings with the same columns, reproducibly, so
+the pipeline can be exercised at sizes the real file does not reach.
+"""
+import os
+import sys
+import json
+import numpy as np
+import pandas as pd
+
+# Use relative imports based on the directory structure
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.cache_utils import write_json_atomic
+from utils.validation_utils import LISBON_LATITUDE_RANGE, LISBON_LONGITUDE_RANGE
+
+DEFAULT_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lisbon-houses.csv')
+
+# Weight of the citywide distribution added to each parish's counts, so parishes
+# with few listings borrow strength from the rest of the city
+PARISH_SMOOTHING = 2.0
+
+# Ridge penalty on the parish and condition effects of the area and price models
+EFFECT_PENALTY = 1.0
+
+MIN_AREA_NET = 15
+
+def _smoothed_distribution(counts, global_probs, smoothing=PARISH_SMOOTHING):
+    """Per-parish category probabilities shrunk towards the citywide ones."""
+    counts = counts.reindex(global_probs.index, fill_value=0).astype(np.float64)
+    probs = counts + smoothing * global_probs
+    return probs / probs.sum()
+
+def _to_lists(probs):
+    """Split a probability Series into JSON-friendly value and probability lists."""
+    return {'values': [v.item() if isinstance(v, np.generic) else v for v in probs.index],
+            'probs': probs.to_numpy(dtype=np.float64).tolist()}
+
+def _fit_log_linear(design, target, penalized_from):
+    """Least squares with a ridge penalty on the columns from penalized_from on, returning coefficients and residuals."""
+    penalty = np.zeros(design.shape[1])
+    penalty[penalized_from:] = EFFECT_PENALTY
+    coef = np.linalg.solve(design.T @ design + np.diag(penalty), design.T @ target)
+    return coef, target - design @ coef
+
+def fit_listing_distribution(df):
+    """
+    Fit the distribution synthetic listings are sampled from.
+
+    Parishes are drawn with their observed frequencies. Within a parish,
+    coordinates follow a bivariate normal (with the pooled covariance for parishes
+    with few listings), while bedrooms, condition and property type/subtype follow
+    the parish's frequencies smoothed towards the citywide ones. Bathrooms and
+    parking are resampled from real listings with the same number of bedrooms.
+    Net area is log-linear in bedrooms with a parish effect, and the price is
+    log-linear in net area with parish and condition effects; both add residuals
+    resampled from the fits, so skewed tails carry over.
+
+    Args:
+        df (pd.DataFrame): Raw listings with the columns of lisbon-houses.csv
+
+    Returns:
+        dict: JSON-compatible distribution parameters, see generate_listings
+    """
+    df = df.dropna(subset=['Parish', 'Bedrooms', 'AreaNet', 'Price', 'Latitude', 'Longitude']).copy()
+    for col in ['Parish', 'Condition', 'PropertyType', 'PropertySubType']:
+        df[col] = df[col].astype(object)
+    df['PropertyKind'] = df['PropertyType'] + '|' + df['PropertySubType']
+
+    parish_probs = df['Parish'].value_counts(normalize=True).sort_index()
+    global_probs = {col: df[col].value_counts(normalize=True).sort_index()
+                    for col in ['Bedrooms', 'Condition', 'PropertyKind']}
+
+    coordinates = df[['Latitude', 'Longitude']].to_numpy(dtype=np.float64)
+    residuals = coordinates - df.groupby('Parish')[['Latitude', 'Longitude']].transform('mean').to_numpy()
+    pooled_cov = np.cov(residuals, rowvar=False)
+
+    parishes = {}
+    for parish, rows in df.groupby('Parish'):
+        coords = rows[['Latitude', 'Longitude']].to_numpy(dtype=np.float64)
+        cov = np.cov(coords, rowvar=False) if len(rows) >= 5 else pooled_cov
+        parishes[parish] = {
+            'coordinate_mean': coords.mean(axis=0).tolist(),
+            'coordinate_cov': np.asarray(cov).tolist(),
+            'price_m2': float(rows['Price M2'].median()) if 'Price M2' in rows.columns else None,
+            **{col: _to_lists(_smoothed_distribution(rows[col].value_counts(), global_probs[col]))
+               for col in ['Bedrooms', 'Condition', 'PropertyKind']}
+        }
+
+    parish_names = parish_probs.index.tolist()
+    condition_names = global_probs['Condition'].index.tolist()
+    parish_dummies = (df['Parish'].to_numpy()[:, None] == np.array(parish_names, dtype=object)).astype(np.float64)
+    condition_dummies = (df['Condition'].to_numpy()[:, None] == np.array(condition_names, dtype=object)).astype(np.float64)
+    ones = np.ones(len(df))
+
+    # log(AreaNet) = intercept + slope * Bedrooms + parish effect + residual
+    log_area = np.log(df['AreaNet'].to_numpy(dtype=np.float64))
+    area_coef, area_residuals = _fit_log_linear(
+        np.column_stack([ones, df['Bedrooms'].to_numpy(dtype=np.float64), parish_dummies]), log_area, 2
+    )
+
+    # log(Price) = intercept + elasticity * log(AreaNet) + parish effect + condition effect + residual
+    price_coef, price_residuals = _fit_log_linear(
+        np.column_stack([ones, log_area, parish_dummies, condition_dummies]),
+        np.log(df['Price'].to_numpy(dtype=np.float64)), 2
+    )
+
+    return {
+        'columns': [col for col in df.columns if col != 'PropertyKind'],
+        'constants': {col: df[col].iloc[0] for col in ['Country', 'District', 'Municipality'] if col in df.columns},
+        'parish_probs': _to_lists(parish_probs),
+        'parishes': parishes,
+        'room_profiles': {
+            str(int(count)): rows[['Bathrooms', 'Parking']].to_numpy(dtype=np.int64).tolist()
+            for count, rows in df.groupby('Bedrooms')
+        },
+        'area': {
+            'intercept': float(area_coef[0]),
+            'bedroom_slope': float(area_coef[1]),
+            'parish_effects': dict(zip(parish_names, area_coef[2:].tolist())),
+            'residuals': area_residuals.tolist(),
+            'gross_ratio': float((df['AreaGross'] / df['AreaNet']).median())
+        },
+        'price': {
+            'intercept': float(price_coef[0]),
+            'area_elasticity': float(price_coef[1]),
+            'parish_effects': dict(zip(parish_names, price_coef[2:2 + len(parish_names)].tolist())),
+            'condition_effects': dict(zip(condition_names, price_coef[2 + len(parish_names):].tolist())),
+            'residuals': price_residuals.tolist()
+        }
+    }
+
+def _sample_categories(rng, n, groups, group_distributions):
+    """Sample one category per row from the distribution of the row's group."""
+    result = np.empty(n, dtype=object)
+    for group, indices in groups.items():
+        distribution = group_distributions[group]
+        result[indices] = rng.choice(np.array(distribution['values'], dtype=object), size=len(indices),
+                                     p=distribution['probs'])
+    return result
+
+def generate_listings(n, distribution=None, random_state=42, start_id=1):
+    """
+    Sample synthetic raw listings.
+
+    Args:
+        n (int): Number of listings
+        distribution (dict, optional): Output of fit_listing_distribution; fitted on
+            lisbon-houses.csv when not given
+        random_state (int): Seed, the same seed gives the same listings
+        start_id (int): Id of the first listing
+
+    Returns:
+        pd.DataFrame: Listings with the columns of the raw data
+    """
+    if distribution is None:
+        distribution = fit_listing_distribution(pd.read_csv(DEFAULT_SOURCE))
+    rng = np.random.default_rng(random_state)
+    parishes = distribution['parishes']
+
+    parish = rng.choice(np.array(distribution['parish_probs']['values'], dtype=object), size=n,
+                        p=distribution['parish_probs']['probs'])
+    groups = {name: np.flatnonzero(parish == name) for name in parishes}
+
+    bedrooms, condition, kind = (
+        _sample_categories(rng, n, groups, {name: params[col] for name, params in parishes.items()})
+        for col in ['Bedrooms', 'Condition', 'PropertyKind']
+    )
+    bedrooms = bedrooms.astype(np.int64)
+    kind = pd.Series(kind, dtype=object).str.split('|', n=1, expand=True)
+
+    latitude = np.empty(n)
+    longitude = np.empty(n)
+    for name, indices in groups.items():
+        coords = rng.multivariate_normal(parishes[name]['coordinate_mean'], parishes[name]['coordinate_cov'],
+                                         size=len(indices))
+        latitude[indices] = np.clip(coords[:, 0], *LISBON_LATITUDE_RANGE)
+        longitude[indices] = np.clip(coords[:, 1], *LISBON_LONGITUDE_RANGE)
+
+    # Bathrooms and parking come together from a real listing with the same (or closest) bedroom count
+    room_counts = np.array(sorted(int(count) for count in distribution['room_profiles']))
+    nearest = room_counts[np.abs(bedrooms[:, None] - room_counts[None, :]).argmin(axis=1)]
+    bathrooms = np.empty(n, dtype=np.int64)
+    parking = np.empty(n, dtype=np.int64)
+    for count in np.unique(nearest):
+        indices = np.flatnonzero(nearest == count)
+        profiles = np.asarray(distribution['room_profiles'][str(count)], dtype=np.int64)
+        picked = profiles[rng.integers(0, len(profiles), size=len(indices))]
+        bathrooms[indices] = picked[:, 0]
+        parking[indices] = picked[:, 1]
+
+    parish_series = pd.Series(parish, dtype=object)
+    area = distribution['area']
+    log_area = (
+        area['intercept'] + area['bedroom_slope'] * bedrooms
+        + parish_series.map(area['parish_effects']).to_numpy(dtype=np.float64)
+        + rng.choice(np.asarray(area['residuals']), size=n)
+    )
+    area_net = np.maximum(np.round(np.exp(log_area)), MIN_AREA_NET).astype(np.int64)
+
+    price_model = distribution['price']
+    log_price = (
+        price_model['intercept']
+        + price_model['area_elasticity'] * np.log(area_net)
+        + parish_series.map(price_model['parish_effects']).to_numpy(dtype=np.float64)
+        + pd.Series(condition, dtype=object).map(price_model['condition_effects']).fillna(0.0).to_numpy(dtype=np.float64)
+        + rng.choice(np.asarray(price_model['residuals']), size=n)
+    )
+    price = (np.round(np.exp(log_price) / 1000) * 1000).astype(np.int64)
+
+    values = {
+        'Id': np.arange(start_id, start_id + n, dtype=np.int64),
+        'Condition': condition,
+        'PropertyType': kind[0].to_numpy(dtype=object) if n else np.empty(0, dtype=object),
+        'PropertySubType': kind[1].to_numpy(dtype=object) if n else np.empty(0, dtype=object),
+        'Bedrooms': bedrooms,
+        'Bathrooms': bathrooms,
+        'AreaNet': area_net,
+        'AreaGross': np.round(area_net * area['gross_ratio']).astype(np.int64),
+        'Parking': parking,
+        'Latitude': np.round(latitude, 4),
+        'Longitude': np.round(longitude, 4),
+        'Parish': parish,
+        'Price M2': np.round(parish_series.map(
+            {name: params['price_m2'] for name, params in parishes.items()}
+        ).to_numpy(dtype=np.float64)).astype(np.int64),
+        'Price': price
+    }
+    for col, value in distribution['constants'].items():
+        values[col] = np.full(n, value, dtype=object)
+
+    return pd.DataFrame({col: values[col] for col in distribution['columns'] if col in values})
+
+def write_synthetic_listings(n, filepath, distribution=None, random_state=42, chunksize=500000):
+    """
+    Write synthetic listings to a CSV file, holding one chunk in memory at a time.
+
+    Each chunk is sampled with its own seed derived from random_state, so a file is
+    reproducible for the same seed and chunk size.
+
+    Args:
+        n (int): Number of listings
+        filepath (str): Path of the CSV file to write
+        distribution (dict, optional): Output of fit_listing_distribution
+        random_state (int): Seed
+        chunksize (int): Number of listings sampled at once
+
+    Returns:
+        bool: True if written successfully, False otherwise
+    """
+    try:
+        if distribution is None:
+            distribution = fit_listing_distribution(pd.read_csv(DEFAULT_SOURCE))
+        os.makedirs(os.path.dirname(os.path.abspath(filepath)), exist_ok=True)
+
+        seeds = np.random.SeedSequence(random_state).spawn(max(1, -(-n // chunksize)))
+        for index, start in enumerate(range(0, max(n, 1), chunksize)):
+            chunk = generate_listings(min(chunksize, n - start), distribution, seeds[index], start_id=start + 1)
+            chunk.to_csv(filepath, mode='w' if index == 0 else 'a', header=index == 0, index=False)
+
+        print(f"{n} synthetic listings saved to {filepath}")
+        return True
+    except Exception as e:
+        print(f"Error writing synthetic listings: {e}")
+        return False
+
+def save_listing_distribution(distribution, filepath):
+    """
+    Save a fitted distribution as JSON.
+
+    Args:
+        distribution (dict): Output of fit_listing_distribution
+        filepath (str): Path of the JSON file
+
+    Returns:
+        bool: True if saved successfully, False otherwise
+    """
+    try:
+        write_json_atomic(distribution, filepath, indent=2)
+        return True
+    except Exception as e:
+        print(f"Error saving listing distribution: {e}")
+        return False
+
+def load_listing_distribution(filepath):
+    """
+    Load a distribution saved by save_listing_distribution.
+
+    Args:
+        filepath (str): Path of the JSON file
+
+    Returns:
+        dict or None: Distribution parameters or None if the file cannot be read
+    """
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error loading listing distribution: {e}")
+        return None
+
+def main():
+    """
+    Write synthetic listings: python synthetic_data.py <rows> <output.csv> [seed]
+    """
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    data_dir = os.path.dirname(os.path.abspath(__file__))
+    filepath = sys.argv[2] if len(sys.argv) > 2 else os.path.join(data_dir, 'synthetic', f'lisbon_houses_synthetic_{n}.csv')
+    random_state = int(sys.argv[3]) if len(sys.argv) > 3 else 42
+    return write_synthetic_listings(n, filepath, random_state=random_state)
+
+if __name__ == "__main__":
+    main()
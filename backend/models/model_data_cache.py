@@ -0,0 +1,255 @@
+"""
+Design matrix cache for the Lisbon house price models.
+Stores the encoded train/test matrices, their targets and feature list, and the
+cross-validation folds as memory-mapped .npy files in a directory named after a
+hash of the processed data and the encoding configuration. Training, evaluation
+and the search comparison load the matrices as zero-copy views instead of
+re-parsing the processed data and re-encoding it on every run.
+"""
+import os
+import sys
+import json
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import KFold
+from model_training import (
+    CONDITION_MAPPING, PROPERTY_TYPE_MAPPING, load_processed_data, prepare_data_for_modeling, split_data
+)
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.cache_utils import get_path_checksum
+from utils.data_utils import find_processed_data_file
+
+DESIGN_CACHE_DIR = './backend/data/processed/design_cache/'
+DESIGN_SCHEMA_FILE = 'schema.json'
+
+# Bump when the layout of the cache or the encoding code changes, invalidating every entry
+DESIGN_CACHE_VERSION = 1
+
+ARRAY_FILES = ['X_train', 'X_test', 'y_train', 'y_test', 'train_index', 'test_index', 'cv_folds']
+
+def get_encoding_config(target_column='Price', test_size=0.2, random_state=42, cv_folds=5):
+    """
+    Args:
+        target_column (str): Name of the target variable column
+        test_size (float): Proportion of data to use for testing
+        random_state (int): Seed of the train/test split and of the cross-validation folds
+        cv_folds (int): Cross-validation folds of the training rows
+
+    Returns:
+        dict: Everything besides the data that the cached matrices depend on
+    """
+    return {
+        'version': DESIGN_CACHE_VERSION,
+        'condition_mapping': CONDITION_MAPPING,
+        'property_type_mapping': PROPERTY_TYPE_MAPPING,
+        'one_hot_drop_first': True,
+        'target_column': target_column,
+        'test_size': test_size,
+        'random_state': random_state,
+        'cv_folds': cv_folds
+    }
+
+def get_design_cache_key(data_path, config):
+    """
+    Hash the processed data's contents together with the encoding configuration.
+
+    Args:
+        data_path (str): Path to the processed data (CSV or columnar store)
+        config (dict): Encoding configuration from get_encoding_config
+
+    Returns:
+        str or None: Hex digest, or None if the data cannot be read
+    """
+    data_checksum = get_path_checksum(data_path)
+    if data_checksum is None:
+        return None
+    digest = hashlib.sha256(data_checksum.encode('ascii'))
+    digest.update(json.dumps(config, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+def get_design_cache_path(cache_key, cache_dir=DESIGN_CACHE_DIR):
+    """
+    Args:
+        cache_key (str): Key from get_design_cache_key
+        cache_dir (str): Root directory of the cache
+
+    Returns:
+        str: Directory holding the entry's .npy files
+    """
+    return os.path.join(cache_dir, cache_key[:32])
+
+def assign_cv_folds(n_rows, cv_folds=5, random_state=42):
+    """
+    Number each training row by the cross-validation fold it is held out in.
+
+    Args:
+        n_rows (int): Training rows
+        cv_folds (int): Number of folds
+        random_state (int): Seed of the shuffled KFold the evaluation uses
+
+    Returns:
+        np.ndarray: Fold of every row
+    """
+    folds = np.empty(n_rows, dtype=np.int16)
+    for fold, (_, test) in enumerate(KFold(n_splits=cv_folds, shuffle=True, random_state=random_state).split(np.empty(n_rows))):
+        folds[test] = fold
+    return folds
+
+def get_cv_splits(folds):
+    """
+    Turn fold numbers into the (train, test) index arrays scikit-learn takes as cv.
+
+    Args:
+        folds (np.ndarray): Fold of every training row, see assign_cv_folds
+
+    Returns:
+        list: (train indices, test indices) per fold
+    """
+    return [(np.flatnonzero(folds != fold), np.flatnonzero(folds == fold)) for fold in range(int(folds.max()) + 1)]
+
+def build_design_matrices(df, config):
+    """
+    Encode and split the processed data as training does.
+
+    Args:
+        df (pandas.DataFrame): Processed data
+        config (dict): Encoding configuration from get_encoding_config
+
+    Returns:
+        dict: float64 feature matrices, targets and index labels by name in ARRAY_FILES, plus the features
+    """
+    X_train, X_test, y_train, y_test = split_data(
+        prepare_data_for_modeling(df), target_column=config['target_column'],
+        test_size=config['test_size'], random_state=config['random_state']
+    )
+    return {
+        'X_train': X_train.to_numpy(dtype=np.float64),
+        'X_test': X_test.to_numpy(dtype=np.float64),
+        'y_train': y_train.to_numpy(dtype=np.float64),
+        'y_test': y_test.to_numpy(dtype=np.float64),
+        'train_index': X_train.index.to_numpy(),
+        'test_index': X_test.index.to_numpy(),
+        'cv_folds': assign_cv_folds(len(X_train), config['cv_folds'], config['random_state']),
+        'features': [str(col) for col in X_train.columns]
+    }
+
+def save_design_matrices(matrices, entry_dir, config=None):
+    """
+    Write the matrices of a cache entry, moving the finished directory into place at once.
+
+    Args:
+        matrices (dict): Output of build_design_matrices
+        entry_dir (str): Directory of the entry, see get_design_cache_path
+        config (dict, optional): Encoding configuration, recorded in the schema
+
+    Returns:
+        bool: True if saved successfully, False otherwise
+    """
+    parent_dir = os.path.dirname(os.path.abspath(entry_dir))
+    try:
+        os.makedirs(parent_dir, exist_ok=True)
+        temp_dir = tempfile.mkdtemp(prefix='.tmp_', dir=parent_dir)
+        try:
+            for name in ARRAY_FILES:
+                np.save(os.path.join(temp_dir, f'{name}.npy'), np.ascontiguousarray(matrices[name]), allow_pickle=False)
+            with open(os.path.join(temp_dir, DESIGN_SCHEMA_FILE), 'w', encoding='utf-8') as f:
+                json.dump({'features': matrices['features'], 'target_column': (config or {}).get('target_column', 'Price'),
+                           'config': config}, f)
+            # Entries are content-addressed, so one written concurrently is the same
+            if os.path.isdir(entry_dir):
+                shutil.rmtree(temp_dir, ignore_errors=True)
+            else:
+                os.rename(temp_dir, entry_dir)
+        except BaseException:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise
+        return True
+    except Exception as e:
+        print(f"Error saving design matrices: {e}")
+        return False
+
+def load_design_matrices(entry_dir):
+    """
+    Map a cache entry's arrays into memory and wrap them without copying.
+
+    Args:
+        entry_dir (str): Directory of the entry
+
+    Returns:
+        tuple or None: (X_train, X_test, y_train, y_test, cv_splits) with the feature frames and
+                       targets backed by read-only memory maps, or None if the entry is missing
+    """
+    schema_path = os.path.join(entry_dir, DESIGN_SCHEMA_FILE)
+    if not os.path.isfile(schema_path):
+        return None
+    try:
+        with open(schema_path, 'r', encoding='utf-8') as f:
+            schema = json.load(f)
+        arrays = {name: np.load(os.path.join(entry_dir, f'{name}.npy'), mmap_mode='r', allow_pickle=False)
+                  for name in ARRAY_FILES}
+        target = schema['target_column']
+
+        frames = []
+        for split in ['train', 'test']:
+            index = pd.Index(np.asarray(arrays[f'{split}_index']))
+            frames.append(pd.DataFrame(arrays[f'X_{split}'], columns=schema['features'], index=index, copy=False))
+            frames.append(pd.Series(arrays[f'y_{split}'], index=index, name=target, copy=False))
+        X_train, y_train, X_test, y_test = frames
+        return X_train, X_test, y_train, y_test, get_cv_splits(np.asarray(arrays['cv_folds']))
+    except Exception as e:
+        print(f"Error loading design matrices from {entry_dir}: {e}")
+        return None
+
+def load_modeling_data(data_path=None, cache_dir=DESIGN_CACHE_DIR, target_column='Price', test_size=0.2,
+                       random_state=42, cv_folds=5, use_cache=True):
+    """
+    Load the encoded train/test split of the processed data, from the design matrix cache when current.
+
+    Args:
+        data_path (str, optional): Path to the processed data; the default processed data file by default
+        cache_dir (str): Root directory of the cache
+        target_column (str): Name of the target variable column
+        test_size (float): Proportion of data to use for testing
+        random_state (int): Seed of the train/test split and of the cross-validation folds
+        cv_folds (int): Cross-validation folds of the training rows
+        use_cache (bool): Read and write the cache; when False the data is always re-encoded
+
+    Returns:
+        tuple or None: (X_train, X_test, y_train, y_test, cv_splits), or None if the data cannot be loaded
+    """
+    if data_path is None:
+        data_path = find_processed_data_file('./backend/data/processed/')
+    config = get_encoding_config(target_column, test_size, random_state, cv_folds)
+    cache_key = get_design_cache_key(data_path, config) if use_cache else None
+
+    if cache_key is not None:
+        entry_dir = get_design_cache_path(cache_key, cache_dir)
+        cached = load_design_matrices(entry_dir)
+        if cached is not None:
+            print(f"Design matrices loaded from cache {entry_dir}")
+            return cached
+
+    df = load_processed_data(data_path)
+    if df is None:
+        return None
+    matrices = build_design_matrices(df, config)
+
+    if cache_key is not None and save_design_matrices(matrices, entry_dir, config):
+        print(f"Design matrices cached in {entry_dir}")
+        cached = load_design_matrices(entry_dir)
+        if cached is not None:
+            return cached
+
+    # Without a cache entry, wrap the freshly encoded arrays the same way
+    index = {split: pd.Index(matrices[f'{split}_index']) for split in ['train', 'test']}
+    return (
+        pd.DataFrame(matrices['X_train'], columns=matrices['features'], index=index['train']),
+        pd.DataFrame(matrices['X_test'], columns=matrices['features'], index=index['test']),
+        pd.Series(matrices['y_train'], index=index['train'], name=target_column),
+        pd.Series(matrices['y_test'], index=index['test'], name=target_column),
+        get_cv_splits(matrices['cv_folds'])
+    )
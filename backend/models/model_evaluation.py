@@ -1,4 +1,8 @@
 import os
+import sys
+import json
+import hashlib
+import datetime
 import joblib
 import numpy as np
 import pandas as pd
@@ -6,22 +10,45 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
 from sklearn.model_selection import cross_val_score, KFold
-from model_training import load_processed_data, prepare_data_for_modeling, split_data
+from model_data_cache import load_modeling_data
 from model_logging import log_model_operation
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.manifest_utils import load_manifest
+from utils.cache_utils import get_file_checksum, write_json_atomic
+from utils.data_utils import to_sparse_matrix
+
 # Set non-interactive backend to prevent plots from being displayed
 plt.switch_backend('Agg')
 
+PERFORMANCE_FILENAME = 'model_performance.json'
+
+# Metrics persisted per model in the performance file
+PERFORMANCE_METRICS = [
+    'rmse', 'mae', 'mape', 'r2',
+    'cv_r2_mean', 'cv_r2_std', 'cv_rmse_mean', 'cv_rmse_std', 'cv_mae_mean', 'cv_mae_std'
+]
+
+def count_cv_folds(cv):
+    """
+    Args:
+        cv (int or list): Number of folds, or (train, test) index arrays per fold
+
+    Returns:
+        int: Number of folds
+    """
+    return cv if isinstance(cv, int) else len(cv)
+
 def evaluate_model(model, X_test, y_test, X_train=None, y_train=None, model_name="Model", cv=5, models_dir='./backend/models/saved_models/'):
     """
     Args:
         model: Trained scikit-learn model object to evaluate
-        X_test (pandas.DataFrame): Test feature set
+        X_test (pandas.DataFrame or scipy.sparse matrix): Test feature set, in the format the model was trained on
         y_test (pandas.Series): Test target values
-        X_train (pandas.DataFrame, optional): Training feature set for cross-validation
+        X_train (pandas.DataFrame or scipy.sparse matrix, optional): Training feature set for cross-validation
         y_train (pandas.Series, optional): Training target values for cross-validation
         model_name (str): Name of the model for display purposes
-        cv (int): Number of cross-validation folds
+        cv (int or list): Number of shuffled cross-validation folds, or (train, test) index arrays per fold
         models_dir (str): Directory containing saved models
     
     Returns:
@@ -47,10 +74,10 @@ def evaluate_model(model, X_test, y_test, X_train=None, y_train=None, model_name
     # Perform cross-validation if training data is provided
     cv_results = {}
     if X_train is not None and y_train is not None:
-        print(f"\n{model_name} Cross-Validation Results ({cv} folds):")
+        print(f"\n{model_name} Cross-Validation Results ({count_cv_folds(cv)} folds):")
         
-        # Define cross-validation strategy
-        kf = KFold(n_splits=cv, shuffle=True, random_state=42)
+        # Define cross-validation strategy, unless the folds are given as index arrays
+        kf = KFold(n_splits=cv, shuffle=True, random_state=42) if isinstance(cv, int) else cv
         
         # Cross-validation for R²
         cv_r2 = cross_val_score(model, X_train, y_train, cv=kf, scoring='r2')
@@ -311,7 +338,131 @@ def compare_models(evaluation_results, save_path=None, metrics=None):
     
     return df
 
-def load_models_and_evaluate(X_test, y_test, X_train=None, y_train=None, models_dir='./backend/models/saved_models/', save_path='./backend/models/visuals/', cv=5):
+def compute_dataset_hash(X_test, y_test, X_train=None, y_train=None, cv=None):
+    """
+    Args:
+        X_test (pandas.DataFrame): Test feature set
+        y_test (pandas.Series): Test target values
+        X_train (pandas.DataFrame, optional): Training feature set
+        y_train (pandas.Series, optional): Training target values
+        cv (int or list, optional): Cross-validation folds; given as (train, test) index
+            arrays, the rows of every fold are part of the hash
+    
+    Returns:
+        str: SHA-256 hex digest identifying the evaluation data, including column names and folds
+    """
+    digest = hashlib.sha256()
+    
+    for data in (X_train, y_train, X_test, y_test):
+        if data is None:
+            digest.update(b'none')
+        elif isinstance(data, (pd.DataFrame, pd.Series)):
+            if isinstance(data, pd.DataFrame):
+                digest.update(json.dumps([str(col) for col in data.columns]).encode('utf-8'))
+            digest.update(pd.util.hash_pandas_object(data, index=False).values.tobytes())
+        else:
+            digest.update(np.ascontiguousarray(data).tobytes())
+    
+    if cv is not None and not isinstance(cv, int):
+        for _, test in cv:
+            digest.update(b'fold')
+            digest.update(np.ascontiguousarray(test, dtype=np.int64).tobytes())
+    
+    return digest.hexdigest()
+
+def _json_number(value):
+    """Convert a metric to a JSON-safe float, mapping NaN and infinity to None."""
+    if value is None:
+        return None
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+def load_performance_records(models_dir='./backend/models/saved_models/'):
+    """
+    Args:
+        models_dir (str): Directory containing the performance file
+    
+    Returns:
+        dict: Stored performance records keyed by model name (empty if none are stored)
+    """
+    try:
+        with open(os.path.join(models_dir, PERFORMANCE_FILENAME), 'r', encoding='utf-8') as f:
+            performance_data = json.load(f)
+        return {record['model_name']: record for record in performance_data.get('models', [])}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return {}
+
+def build_performance_record(model_name, results, model_checksum, dataset_hash, cv_folds):
+    """
+    Args:
+        model_name (str): Name of the model as saved (e.g. 'random_forest')
+        results (dict): Evaluation results returned by evaluate_model
+        model_checksum (str): Checksum of the evaluated model artifact
+        dataset_hash (str): Hash of the evaluation data (see compute_dataset_hash)
+        cv_folds (int or None): Number of cross-validation folds, None if CV was skipped
+    
+    Returns:
+        dict: JSON-serializable performance record
+    """
+    record = {'model_name': model_name}
+    for metric in PERFORMANCE_METRICS:
+        if metric in results:
+            record[metric] = _json_number(results[metric])
+    
+    record.update({
+        'model_checksum': model_checksum,
+        'dataset_hash': dataset_hash,
+        'cv_folds': cv_folds,
+        'evaluated_at': datetime.datetime.now().isoformat(timespec='seconds')
+    })
+    return record
+
+def save_performance_records(records, dataset_hash, models_dir='./backend/models/saved_models/'):
+    """
+    Args:
+        records (list): Performance records built by build_performance_record
+        dataset_hash (str): Hash of the evaluation data
+        models_dir (str): Directory to write the performance file to
+    
+    Returns:
+        str: Path of the written performance file
+    """
+    scored = [record for record in records if record.get('r2') is not None]
+    best_model = max(scored, key=lambda record: record['r2'])['model_name'] if scored else None
+    
+    performance_data = {
+        'models': records,
+        'best_model': best_model,
+        'dataset_hash': dataset_hash,
+        'metrics_available': True,
+        'updated_at': datetime.datetime.now().isoformat(timespec='seconds')
+    }
+    
+    performance_path = os.path.join(models_dir, PERFORMANCE_FILENAME)
+    write_json_atomic(performance_data, performance_path, indent=2)
+    print(f"Model performance saved to {performance_path}")
+    return performance_path
+
+def is_performance_record_current(record, model_checksum, dataset_hash, cv_folds):
+    """
+    Args:
+        record (dict or None): Stored performance record
+        model_checksum (str): Checksum of the current model artifact
+        dataset_hash (str): Hash of the current evaluation data and folds, see compute_dataset_hash
+        cv_folds (int or None): Number of cross-validation folds requested
+    
+    Returns:
+        bool: True if the record was computed for the same model, data and folds
+    """
+    return (
+        record is not None
+        and model_checksum is not None
+        and record.get('model_checksum') == model_checksum
+        and record.get('dataset_hash') == dataset_hash
+        and record.get('cv_folds') == cv_folds
+    )
+
+def load_models_and_evaluate(X_test, y_test, X_train=None, y_train=None, models_dir='./backend/models/saved_models/', save_path='./backend/models/visuals/', cv=5, force=False):
     """
     Args:
         X_test (pandas.DataFrame): Test feature set
@@ -320,7 +471,8 @@ def load_models_and_evaluate(X_test, y_test, X_train=None, y_train=None, models_
         y_train (pandas.Series, optional): Training target values for cross-validation
         models_dir (str): Directory containing the trained models
         save_path (str): Directory to save evaluation results and plots
-        cv (int): Number of cross-validation folds
+        cv (int or list): Number of shuffled cross-validation folds, or (train, test) index arrays per fold
+        force (bool): Re-evaluate every model even if its stored metrics are current
         
     Returns:
         list: List of evaluation result dictionaries for each model
@@ -328,34 +480,73 @@ def load_models_and_evaluate(X_test, y_test, X_train=None, y_train=None, models_
     if save_path:
         os.makedirs(save_path, exist_ok=True)
     
-    model_files = [f for f in os.listdir(models_dir) if f.startswith('lhp_') and f.endswith('.pkl') 
-                   and not f.endswith('_features.pkl')]
+    # Prefer the manifest written at save time over scanning the directory
+    manifest = load_manifest(models_dir)
+    if manifest is not None:
+        model_files = [entry['artifact'] for entry in manifest['models'].values()]
+    else:
+        model_files = [f for f in os.listdir(models_dir) if f.startswith('lhp_') and f.endswith('.pkl') 
+                       and not f.endswith('_features.pkl')]
     
     if not model_files:
         print("No models found in the specified directory.")
         return []
     
     evaluation_results = []
+    performance_records = []
+    # CSR forms of the data, built on first use for the models trained on sparse design matrices
+    sparse_data = None
+    
+    # Stored metrics are reused for models whose artifact and evaluation data are unchanged
+    previous_records = {} if force else load_performance_records(models_dir)
+    cv_folds = count_cv_folds(cv) if X_train is not None and y_train is not None else None
+    # Cached folds change with the data split, so their rows are hashed along with the data
+    dataset_hash = compute_dataset_hash(X_test, y_test, X_train, y_train, cv=cv if cv_folds is not None else None)
     
     for model_file in model_files:
         model_name = model_file.replace('lhp_', '').replace('.pkl', '')
-        print(f"\nEvaluating {model_name} model...")
-        
         model_path = os.path.join(models_dir, model_file)
+        
+        entry = manifest['models'].get(model_name) if manifest is not None else None
+        model_checksum = entry.get('checksum') if entry else None
+        if model_checksum is None:
+            model_checksum = get_file_checksum(model_path)
+        
+        record = previous_records.get(model_name)
+        plot_file = f"{save_path}/{model_name.lower()}_predictions.png" if save_path else None
+        if (is_performance_record_current(record, model_checksum, dataset_hash, cv_folds)
+                and (plot_file is None or os.path.exists(plot_file))):
+            print(f"\nReusing stored evaluation for {model_name} model (model and data unchanged)")
+            results = {'model_name': model_name.capitalize()}
+            results.update({metric: record[metric] for metric in PERFORMANCE_METRICS if metric in record})
+            evaluation_results.append(results)
+            performance_records.append(record)
+            continue
+        
+        print(f"\nEvaluating {model_name} model...")
         model = joblib.load(model_path)
         
+        X_test_model, X_train_model = X_test, X_train
+        if entry is not None and entry.get('sparse_input'):
+            if sparse_data is None:
+                sparse_data = (to_sparse_matrix(X_test), to_sparse_matrix(X_train) if X_train is not None else None)
+            X_test_model, X_train_model = sparse_data
+        
         # Evaluate model (with cross-validation if training data is provided)
         results = evaluate_model(
             model, 
-            X_test, 
+            X_test_model, 
             y_test, 
-            X_train=X_train, 
+            X_train=X_train_model, 
             y_train=y_train, 
             model_name=model_name.capitalize(),
             cv=cv,
             models_dir=models_dir
         )
         evaluation_results.append(results)
+        performance_records.append(
+            build_performance_record(model_name, results, model_checksum, dataset_hash, cv_folds)
+        )
         
         # Plot predictions and residuals
         plot_predictions(y_test, results['predictions'], model_name=model_name.capitalize(), save_path=save_path)
@@ -364,6 +555,8 @@ def load_models_and_evaluate(X_test, y_test, X_train=None, y_train=None, models_
         if hasattr(model, 'feature_importances_'):
             plot_feature_importance(model, X_test.columns, model_name=model_name.capitalize(), save_path=save_path)
     
+    save_performance_records(performance_records, dataset_hash, models_dir)
+    
     # Compare all models
     compare_models(evaluation_results, save_path=save_path, metrics=['rmse', 'mae', 'mape', 'r2'])
     
@@ -418,19 +611,15 @@ def main():
         os.makedirs('./backend/models/saved_models', exist_ok=True)
         os.makedirs('./backend/models/visuals', exist_ok=True)
         
-        df = load_processed_data('./backend/data/processed/lisbon_houses_processed.csv')
-        if df is None:
+        # Matrices and folds cached by training are reused as memory-mapped views
+        modeling_data = load_modeling_data(cv_folds=5)
+        if modeling_data is None:
             return
-        
-        model_df = prepare_data_for_modeling(df)
-        X_train, X_test, y_train, y_test = split_data(model_df)
+        X_train, X_test, y_train, y_test, cv_folds = modeling_data
         
         models_dir = './backend/models/saved_models/'
         results_dir = './backend/models/visuals/'
         
-        # Number of cross-validation folds
-        cv_folds = 5
-        
         # Evaluate all models with cross-validation
         evaluation_results = load_models_and_evaluate(
             X_test, 
@@ -2,8 +2,16 @@ import joblib
 import pandas as pd
 import numpy as np
 import os
+import sys
 from model_logging import log_model_operation
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.manifest_utils import list_manifest_models, get_manifest_entry
+from utils.feature_utils import add_serving_features
+from utils.stats_utils import load_cleaning_stats, apply_serving_stats
+from utils.data_utils import encode_sparse_rows
+from utils.encoding_utils import load_category_encodings, apply_category_encodings, get_encoded_columns
+
 def list_available_models(models_dir='./backend/models/saved_models/'):
     """
     Args:
@@ -13,13 +21,17 @@ def list_available_models(models_dir='./backend/models/saved_models/'):
         list: List of available model names without the 'lhp_' prefix and '.pkl' extension
     """
     try:
-        # Filter out feature files
-        model_files = [f for f in os.listdir(models_dir) 
-                     if f.startswith('lhp_') and f.endswith('.pkl')
-                     and not f.endswith('_features.pkl')]
+        # Prefer the manifest written at save time over scanning the directory
+        model_names = list_manifest_models(models_dir)
         
-        # Extract model names from filenames
-        model_names = [f.replace('lhp_', '').replace('.pkl', '') for f in model_files]
+        if model_names is None:
+            # Filter out feature files
+            model_files = [f for f in os.listdir(models_dir) 
+                         if f.startswith('lhp_') and f.endswith('.pkl')
+                         and not f.endswith('_features.pkl')]
+            
+            # Extract model names from filenames
+            model_names = [f.replace('lhp_', '').replace('.pkl', '') for f in model_files]
         
         if model_names:
             print("Available models:")
@@ -61,6 +73,11 @@ def load_feature_names(model_name, models_dir='./backend/models/saved_models/'):
         list or None: List of feature names used by the model or None if loading fails
     """
     try:
+        # Feature lists are recorded in the manifest, so no unpickling is needed
+        entry = get_manifest_entry(models_dir, model_name)
+        if entry is not None:
+            return list(entry['features'])
+        
         # First try model-specific features
         features_path = f"{models_dir}/lhp_{model_name}_features.pkl"
         
@@ -75,16 +92,41 @@ def load_feature_names(model_name, models_dir='./backend/models/saved_models/'):
         print(f"Error loading feature names: {e}")
         return None
 
-def preprocess_input(input_data, feature_names):
+def is_sparse_input_model(model_name, models_dir='./backend/models/saved_models/'):
     """
     Args:
-        input_data (dict): Dictionary containing house features
+        model_name (str): Name of the model
+        models_dir (str): Directory containing the saved models
+    
+    Returns:
+        bool: Whether the manifest records the model as trained on a sparse (CSR) design matrix
+    """
+    entry = get_manifest_entry(models_dir, model_name)
+    return bool(entry and entry.get('sparse_input'))
+
+def preprocess_input(input_data, feature_names, stats=None, sparse=False, encodings=None):
+    """
+    Args:
+        input_data (dict or list): Dictionary containing house features, or a list of them for a batch
         feature_names (list): List of feature names expected by the model
+        stats (dict, optional): Cleaning statistics fitted at training time (see utils.stats_utils).
+                                Without them missing features are filled with 0 and nothing is capped.
+        sparse (bool): Encode straight into a CSR matrix, for models trained on sparse design matrices
+        encodings (dict, optional): Compact category encodings fitted at training time (see
+            utils.encoding_utils), applied to the categorical columns the model takes encoded
         
     Returns:
-        pandas.DataFrame: Preprocessed data ready for prediction with columns matching model features
+        pandas.DataFrame or scipy.sparse.csr_matrix: Preprocessed data ready for prediction with
+            columns matching model features
     """
-    input_df = pd.DataFrame([input_data])
+    input_df = pd.DataFrame(input_data if isinstance(input_data, list) else [input_data])
+    
+    # Impute and cap like the training data was
+    if stats is not None:
+        input_df = apply_serving_stats(input_df, stats)
+    
+    # Engineered features the model was trained on, except those derived from the target
+    input_df = add_serving_features(input_df, feature_names)
     
     # Handle condition encoding
     if 'Condition' in input_df.columns:
@@ -96,6 +138,15 @@ def preprocess_input(input_data, feature_names):
         property_type_mapping = {'Homes': 1, 'Single Habitation': 2}
         input_df['PropertyType'] = input_df['PropertyType'].map(property_type_mapping)
     
+    # Replace the compactly encoded categories with their learned values, not dummies
+    encoded_columns = get_encoded_columns(encodings, feature_names)
+    if encoded_columns:
+        input_df = apply_category_encodings(input_df, encodings, encoded_columns)
+    
+    # Sparse models get only the non-zero entries, without a dense row of every dummy
+    if sparse:
+        return encode_sparse_rows(input_df, feature_names)
+    
     # One-hot encode categorical columns that were one-hot encoded during training
     categorical_cols = [col for col in input_df.columns if input_df[col].dtype == 'object']
     
@@ -112,7 +163,8 @@ def preprocess_input(input_data, feature_names):
     
     return input_df
 
-def predict_price(model, input_data, feature_names, model_name=None, models_dir='./backend/models/saved_models/'):
+def predict_price(model, input_data, feature_names, model_name=None, models_dir='./backend/models/saved_models/',
+                  stats=None, sparse=None, encodings=None):
     """
     Args:
         model: Trained scikit-learn model object
@@ -120,11 +172,21 @@ def predict_price(model, input_data, feature_names, model_name=None, models_dir=
         feature_names (list): List of feature names expected by the model
         model_name (str, optional): Name of the model for logging purposes
         models_dir (str): Directory containing models
+        stats (dict, optional): Cleaning statistics, loaded from models_dir when not given
+        sparse (bool, optional): Encode the input sparse; looked up in the manifest by model_name when not given
+        encodings (dict, optional): Compact category encodings, loaded from models_dir when not given
         
     Returns:
         float: Predicted house price
     """
-    processed_input = preprocess_input(input_data, feature_names)
+    if stats is None:
+        stats = load_cleaning_stats(models_dir)
+    if sparse is None:
+        sparse = model_name is not None and is_sparse_input_model(model_name, models_dir)
+    if encodings is None:
+        encodings = load_category_encodings(models_dir)
+    
+    processed_input = preprocess_input(input_data, feature_names, stats, sparse=sparse, encodings=encodings)
     
     prediction = model.predict(processed_input)[0]
     return prediction
@@ -140,6 +202,8 @@ def predict_with_all_models(input_data, models_dir='./backend/models/saved_model
               includes 'ensemble_average' key with the average of valid predictions
     """
     model_names = list_available_models(models_dir)
+    stats = load_cleaning_stats(models_dir)
+    encodings = load_category_encodings(models_dir)
     predictions = {}
     valid_predictions = []
     excluded_models = []
@@ -150,7 +214,8 @@ def predict_with_all_models(input_data, models_dir='./backend/models/saved_model
         
         if model is not None and feature_names is not None:
             try:
-                pred = predict_price(model, input_data, feature_names, model_name, models_dir)
+                pred = predict_price(model, input_data, feature_names, model_name, models_dir, stats,
+                                     sparse=is_sparse_input_model(model_name, models_dir), encodings=encodings)
                 predictions[model_name] = pred
                 
                 # Check if prediction is above 1 million euros
@@ -199,13 +264,17 @@ def predict_batch(model_name, batch_data, models_dir='./backend/models/saved_mod
     if model is None or feature_names is None:
         return None
     
-    predictions = []
+    if not batch_data:
+        return []
     
-    for input_data in batch_data:
-        prediction = predict_price(model, input_data, feature_names, model_name, models_dir)
-        predictions.append(prediction)
+    # Load the cleaning statistics, the input format and the category encodings once for the whole batch
+    stats = load_cleaning_stats(models_dir)
+    sparse = is_sparse_input_model(model_name, models_dir)
+    encodings = load_category_encodings(models_dir)
     
-    return predictions
+    # Impute, encode and predict the whole batch as one matrix instead of row by row
+    processed_input = preprocess_input(batch_data, feature_names, stats, sparse=sparse, encodings=encodings)
+    return model.predict(processed_input).tolist()
 
 def main():
     @log_model_operation
@@ -0,0 +1,340 @@
+"""
+Concurrent training scheduler for the Lisbon house price models.
+Runs the model searches side by side in worker processes under one core budget:
+jobs are started longest-estimated first, the cores are shared out so the
+slowest job gets the most, and each job's cores are split between grid search
+workers and the threads of the estimators. The fitted models come back to the
+parent, which saves them and reports per-model wall time and core utilization.
+"""
+import os
+import io
+import sys
+import time
+import json
+import contextlib
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from joblib import parallel_config
+from joblib.externals.loky import get_reusable_executor
+from threadpoolctl import threadpool_limits
+from model_training import (
+    MODEL_FITTERS, SPARSE_MODELS, SVR_EXACT_MAX_ROWS, NYSTROEM_COMPONENTS, save_model_and_features, densify_features
+)
+from model_search import SEARCH_SPACES, CV_FOLDS, count_search_fits, count_parallel_fits
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.cache_utils import write_json_atomic
+from utils.data_utils import to_sparse_matrix
+
+SCHEDULE_REPORT_FILENAME = 'training_schedule.json'
+
+# Estimators that build in parallel themselves and take the inner cores as n_jobs;
+# for the others the inner cores cap the BLAS and OpenMP threads
+THREADED_ESTIMATORS = {'random_forest'}
+
+# Seconds on one core of a single fit, from timings on synthetic listings
+TREE_COST = 1.2e-8
+FIT_OVERHEAD = 0.002
+FIT_COST_MODELS = {
+    'random_forest': lambda n, p: TREE_COST * np.mean(SEARCH_SPACES['random_forest']['n_estimators'].grid) * n * np.log2(n) * p,
+    'decision_tree': lambda n, p: TREE_COST * n * np.log2(n) * p,
+    'ridge': lambda n, p: 1e-9 * n * p ** 2,
+    'lasso': lambda n, p: 1e-6 * n * p,
+    'linear': lambda n, p: 1e-9 * n * p ** 2,
+    # Above SVR_EXACT_MAX_ROWS the kernel approximation costs the rows times its components
+    'svr': lambda n, p: 6e-10 * n * (n if n <= SVR_EXACT_MAX_ROWS else NYSTROEM_COMPONENTS) * p
+}
+
+def count_fits(model_name, search='grid', max_fits=None):
+    """
+    Count the fits a model's search runs, in fits on the whole training set, plus the final refit.
+
+    Args:
+        model_name (str): Name of the model
+        search (str): Hyperparameter search strategy
+        max_fits (int, optional): Fit budget of the budgeted search strategies
+
+    Returns:
+        int: Number of fits
+    """
+    if model_name not in SEARCH_SPACES:
+        return 1
+    return count_search_fits(model_name, search, max_fits) + 1
+
+def estimate_training_costs(n_rows, n_features, model_names=None, previous_report=None, search='grid', max_fits=None):
+    """
+    Estimate the core-seconds each model's search needs.
+
+    Costs measured by a previous schedule are scaled to the new number of rows;
+    otherwise they come from the per-fit cost models.
+
+    Args:
+        n_rows (int): Training rows
+        n_features (int): Training features
+        model_names (list, optional): Models to estimate, all of MODEL_FITTERS by default
+        previous_report (dict, optional): Report of an earlier train_models_concurrently run
+        search (str): Hyperparameter search strategy
+        max_fits (int, optional): Fit budget of the budgeted search strategies
+
+    Returns:
+        dict: Estimated core-seconds by model name
+    """
+    model_names = list(MODEL_FITTERS) if model_names is None else model_names
+    n_rows = max(int(n_rows), 2)
+    measured = (previous_report or {}).get('models', {})
+
+    costs = {}
+    for name in model_names:
+        cost_model = FIT_COST_MODELS.get(name, lambda n, p: FIT_OVERHEAD)
+        previous = measured.get(name)
+        if previous and previous.get('status') == 'ok' and previous.get('cpu_seconds') and previous.get('rows') \
+                and previous.get('search', 'grid') == search:
+            # Scale the measured cost as the cost model scales between the two sizes
+            ratio = cost_model(n_rows, n_features) / max(cost_model(max(previous['rows'], 2), n_features), 1e-12)
+            costs[name] = previous['cpu_seconds'] * ratio
+        else:
+            folds = CV_FOLDS.get(name)
+            fold_rows = n_rows * (folds - 1) // folds if folds else n_rows
+            fit_cost = cost_model(fold_rows, n_features) + FIT_OVERHEAD
+            costs[name] = fit_cost * (count_fits(name, search, max_fits) - 1) + cost_model(n_rows, n_features) + FIT_OVERHEAD
+    return costs
+
+def resolve_core_budget(n_jobs=-1):
+    """
+    Turn an n_jobs value into a number of cores, joblib style: -1 is all cores, -2 all but one.
+
+    Args:
+        n_jobs (int): Requested cores
+
+    Returns:
+        int: Cores to use, at least 1
+    """
+    n_cpus = os.cpu_count() or 1
+    if n_jobs is None:
+        return n_cpus
+    return max(1, n_cpus + 1 + n_jobs if n_jobs < 0 else n_jobs)
+
+def plan_training_schedule(costs, n_cores, search='grid', max_fits=None):
+    """
+    Order the jobs longest first and share the core budget out between them.
+
+    With fewer cores than jobs each job gets one core and the jobs queue in that
+    order. Otherwise the spare cores go one at a time to the job with the longest
+    estimated time per core, up to the number of fits it can run in parallel.
+    Each job's cores run its search workers first, and whatever is left
+    over per worker becomes estimator threads.
+
+    Args:
+        costs (dict): Estimated core-seconds by model name
+        n_cores (int): Core budget
+        search (str): Hyperparameter search strategy
+        max_fits (int, optional): Fit budget of the budgeted search strategies
+
+    Returns:
+        dict: 'order' (model names, longest first), 'slots' (jobs running at once) and
+              'jobs' (cores, grid_jobs, inner_threads and estimated_cost by model name)
+    """
+    order = sorted(costs, key=lambda name: costs[name], reverse=True)
+    cores = {name: 1 for name in order}
+
+    def parallel_fits(name):
+        return count_parallel_fits(name, search, max_fits) if name in SEARCH_SPACES else 1
+
+    def max_cores(name):
+        cores = parallel_fits(name)
+        if name in THREADED_ESTIMATORS:
+            cores *= int(SEARCH_SPACES[name]['n_estimators'].high)
+        return cores
+
+    for _ in range(max(n_cores - len(order), 0)):
+        candidates = [name for name in order if cores[name] < max_cores(name)]
+        if not candidates:
+            break
+        busiest = max(candidates, key=lambda name: costs[name] / cores[name])
+        cores[busiest] += 1
+
+    jobs = {}
+    for name in order:
+        grid_jobs = min(cores[name], parallel_fits(name))
+        jobs[name] = {
+            'cores': cores[name],
+            'grid_jobs': grid_jobs,
+            'inner_threads': max(1, cores[name] // grid_jobs),
+            'estimated_cost': float(costs[name])
+        }
+    return {'order': order, 'slots': min(n_cores, len(order)), 'jobs': jobs}
+
+def _run_training_job(model_name, X_train, y_train, grid_jobs, inner_threads, search='grid', max_fits=None,
+                      cv_splits=None):
+    """
+    Fit one model's search within its share of the cores, in a worker process.
+
+    Returns:
+        dict: The model, its training time, metrics and CV results, the captured output and the timings
+    """
+    kwargs = {'n_jobs': grid_jobs, 'search': search, 'max_fits': max_fits, 'cv_splits': cv_splits}
+    if model_name in THREADED_ESTIMATORS:
+        kwargs['estimator_n_jobs'] = inner_threads
+
+    started_at = time.time()
+    start = time.perf_counter()
+    cpu_start = os.times()
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output), threadpool_limits(limits=inner_threads), \
+            parallel_config(backend='loky', inner_max_num_threads=inner_threads):
+        model, training_time, metrics, cv_results = MODEL_FITTERS[model_name](X_train, y_train, **kwargs)
+    if grid_jobs > 1:
+        # Stop the search's worker processes so their CPU time is counted below
+        get_reusable_executor(reuse=True).shutdown(wait=True)
+    cpu_end = os.times()
+
+    cpu_seconds = sum(end - begin for end, begin in zip(cpu_end[:4], cpu_start[:4]))
+    return {
+        'model': model, 'training_time': training_time, 'metrics': metrics, 'cv_results': cv_results,
+        'output': output.getvalue(),
+        'started_at': started_at, 'wall_seconds': time.perf_counter() - start, 'cpu_seconds': cpu_seconds
+    }
+
+def print_schedule_report(report):
+    """
+    Print per-model wall time and core utilization of a training schedule.
+
+    Args:
+        report (dict): Report returned by train_models_concurrently
+    """
+    print(f"\n{'Model':<15} {'Cores':>5} {'Grid x Threads':>14} {'Est. (s)':>9} "
+          f"{'Start (s)':>9} {'Wall (s)':>9} {'CPU (s)':>9} {'Utilization':>11}")
+    for name, job in report['models'].items():
+        if job['status'] != 'ok':
+            print(f"{name:<15} {job['cores']:>5} {job['status']}")
+            continue
+        print(f"{name:<15} {job['cores']:>5} {job['grid_jobs']:>7} x {job['inner_threads']:<4} "
+              f"{job['estimated_cost']:>9.2f} {job['start_offset']:>9.2f} {job['wall_seconds']:>9.2f} "
+              f"{job['cpu_seconds']:>9.2f} {job['utilization']:>10.0%}")
+    print(f"Training stage: {report['wall_seconds']:.2f}s on {report['core_budget']} cores "
+          f"(slowest model {report['slowest_model_seconds']:.2f}s), utilization {report['utilization']:.0%}")
+
+def train_models_concurrently(X_train, y_train, save_dir=None, n_jobs=-1, model_names=None, costs=None,
+                              search='grid', max_fits=None, sparse=False, cv_splits=None):
+    """
+    Train the models concurrently under a shared core budget and save them from this process.
+
+    Each job gets its own copy of the training data; the data sets here are small
+    next to the cost of the searches.
+
+    Args:
+        X_train (pandas.DataFrame): Training features
+        y_train (pandas.Series): Training target values
+        save_dir (str, optional): Directory to save models, features and the schedule report
+        n_jobs (int): Core budget, -1 for all cores
+        model_names (list, optional): Models to train, all of MODEL_FITTERS by default
+        costs (dict, optional): Estimated core-seconds by model name; estimated from the
+            previous report in save_dir or the cost models when omitted
+        search (str): Hyperparameter search strategy, see model_search.SEARCH_STRATEGIES
+        max_fits (int, optional): Fit budget of the budgeted search strategies
+        sparse (bool): Fit the SPARSE_MODELS on the CSR form of X_train; the others get it dense
+        cv_splits (list, optional): Cached (train, test) folds of X_train, see model_search.select_cv
+
+    Returns:
+        tuple: (dict of trained models by name, schedule report)
+    """
+    model_names = list(MODEL_FITTERS) if model_names is None else model_names
+    n_cores = resolve_core_budget(n_jobs)
+    if costs is None:
+        previous_report = load_schedule_report(save_dir) if save_dir else None
+        costs = estimate_training_costs(len(X_train), X_train.shape[1], model_names, previous_report, search, max_fits)
+    plan = plan_training_schedule(costs, n_cores, search, max_fits)
+    print(f"Training {len(model_names)} models on {n_cores} cores, {plan['slots']} at a time: {', '.join(plan['order'])}")
+
+    # Each format is built once and shared by the jobs fitting on it
+    X_dense = densify_features(X_train)
+    X_sparse = to_sparse_matrix(X_train) if sparse and any(name in SPARSE_MODELS for name in model_names) else None
+
+    def is_sparse_job(name):
+        return X_sparse is not None and name in SPARSE_MODELS
+
+    stage_started_at = time.time()
+    stage_start = time.perf_counter()
+    results = {}
+    executor = ProcessPoolExecutor(max_workers=plan['slots']) if plan['slots'] > 1 else None
+    try:
+        # Jobs are submitted longest first and the pool starts them in that order
+        futures = {}
+        for name in plan['order']:
+            job = plan['jobs'][name]
+            args = (name, X_sparse if is_sparse_job(name) else X_dense, y_train, job['grid_jobs'], job['inner_threads'],
+                    search, max_fits, cv_splits)
+            futures[name] = executor.submit(_run_training_job, *args) if executor is not None else args
+        for name in plan['order']:
+            try:
+                future = futures[name]
+                results[name] = future.result() if executor is not None else _run_training_job(*future)
+                print(f"\nTraining {name} model...\n{results[name]['output']}", end='')
+            except Exception as e:
+                print(f"Error training {name}: {e}")
+                results[name] = {'error': str(e)}
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    stage_seconds = time.perf_counter() - stage_start
+
+    models = {}
+    job_reports = {}
+    for name in model_names:
+        result, job = results[name], plan['jobs'][name]
+        job_report = {'rows': len(X_train), 'search': search, 'sparse': is_sparse_job(name), **job}
+        if 'error' in result:
+            job_report['status'] = f"error: {result['error']}"
+        else:
+            models[name] = result['model']
+            if save_dir:
+                save_model_and_features(result['model'], X_train, name, save_dir,
+                                        training_time=result['training_time'], metrics=result['metrics'],
+                                        cv_results=result['cv_results'], sparse_input=is_sparse_job(name))
+            job_report.update({
+                'status': 'ok',
+                'start_offset': result['started_at'] - stage_started_at,
+                'wall_seconds': result['wall_seconds'],
+                'cpu_seconds': result['cpu_seconds'],
+                'utilization': result['cpu_seconds'] / (result['wall_seconds'] * job['cores']) if result['wall_seconds'] > 0 else 0.0
+            })
+        job_reports[name] = job_report
+
+    measured = [job for job in job_reports.values() if job['status'] == 'ok']
+    total_cpu = sum(job['cpu_seconds'] for job in measured)
+    report = {
+        'search': search,
+        'core_budget': n_cores,
+        'slots': plan['slots'],
+        'order': plan['order'],
+        'wall_seconds': stage_seconds,
+        'slowest_model_seconds': max((job['wall_seconds'] for job in measured), default=0.0),
+        'cpu_seconds': total_cpu,
+        'utilization': total_cpu / (stage_seconds * n_cores) if stage_seconds > 0 else 0.0,
+        'models': job_reports
+    }
+    print_schedule_report(report)
+
+    if save_dir:
+        write_json_atomic(report, os.path.join(save_dir, SCHEDULE_REPORT_FILENAME), indent=2)
+    return models, report
+
+def load_schedule_report(save_dir):
+    """
+    Load the report of the last concurrent training run saved in a models directory.
+
+    Args:
+        save_dir (str): Directory the models were saved to
+
+    Returns:
+        dict or None: The schedule report, or None if there is none
+    """
+    report_path = os.path.join(save_dir, SCHEDULE_REPORT_FILENAME)
+    if not os.path.isfile(report_path):
+        return None
+    try:
+        with open(report_path, 'r') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Error loading schedule report: {e}")
+        return None
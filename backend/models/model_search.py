@@ -0,0 +1,1452 @@
+"""
+Hyperparameter search strategies for the Lisbon house price models.
+Declares each model's search space once and builds the search for any strategy
+from it: the exhaustive grid, a warm-started grid that grows each forest once
+for all its tree counts and computes each SVR kernel matrix once per fold,
+regularization and pruning paths that score every alpha from one fit per fold,
+randomized search within a fit budget, successive halving over grid or random
+candidates, and a Gaussian-process Bayesian optimizer. The paths and kernel
+matrices are also computed from sparse design matrices without densifying them.
+Comparisons run every strategy, every SVR training mode, the dense and sparse
+design matrices, or the one-hot and compact category encodings, and report the
+best score each finds against the fit time it spends.
+"""
+import os
+import sys
+import time
+import json
+import math
+import numbers
+import warnings
+import copy
+import pickle
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.stats import norm, rankdata
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.base import BaseEstimator, RegressorMixin, clone
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.linear_model import Lasso, lasso_path
+from sklearn.metrics import check_scoring
+from sklearn.model_selection import (
+    GridSearchCV, RandomizedSearchCV, HalvingGridSearchCV, HalvingRandomSearchCV, ParameterGrid, check_cv
+)
+from sklearn.model_selection._search import BaseSearchCV
+from sklearn.gaussian_process import GaussianProcessRegressor
+from sklearn.metrics.pairwise import rbf_kernel
+from sklearn.preprocessing import StandardScaler
+from sklearn.gaussian_process.kernels import ConstantKernel, Matern, WhiteKernel
+from sklearn.utils import check_random_state, _safe_indexing
+from sklearn.utils.parallel import Parallel, delayed
+from sklearn.utils._param_validation import Interval
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.cache_utils import write_json_atomic
+from utils.data_utils import to_sparse_matrix, get_design_matrix_bytes
+from utils.encoding_utils import ENCODING_METHODS
+
+SEARCH_COMPARISON_FILENAME = 'search_comparison.json'
+SVR_MODE_COMPARISON_FILENAME = 'svr_mode_comparison.json'
+DESIGN_FORMAT_COMPARISON_FILENAME = 'design_format_comparison.json'
+CATEGORY_ENCODING_COMPARISON_FILENAME = 'category_encoding_comparison.json'
+
+# SVR training modes compared by compare_svr_modes, as '<mode>:<search>', the baseline first
+SVR_MODE_SEARCHES = ['exact:grid', 'exact:warm_start', 'nystroem:grid']
+
+class Categorical:
+    """A hyperparameter taking one of a few values."""
+
+    def __init__(self, values):
+        """
+        Args:
+            values (list): Possible values, all of them searched by the grid
+        """
+        self.values = list(values)
+        self.grid = self.values
+
+    def rvs(self, size=None, random_state=None):
+        rng = check_random_state(random_state)
+        if size is None:
+            return self.values[rng.randint(len(self.values))]
+        return [self.values[i] for i in rng.randint(len(self.values), size=size)]
+
+    def to_unit(self, value):
+        """Position of a value in [0, 1], in the order the values are declared."""
+        return self.values.index(value) / max(len(self.values) - 1, 1)
+
+    def from_unit(self, u):
+        return self.values[int(round(float(np.clip(u, 0, 1)) * (len(self.values) - 1)))]
+
+class Real:
+    """A continuous hyperparameter between two bounds."""
+
+    def __init__(self, low, high, log=False, grid=None):
+        """
+        Args:
+            low (float): Lower bound
+            high (float): Upper bound
+            log (bool): Search on a log scale
+            grid (list, optional): Values the exhaustive grid tries; the bounds by default
+        """
+        self.low = low
+        self.high = high
+        self.log = log
+        self.grid = list(grid) if grid is not None else [low, high]
+
+    def _scale(self, value):
+        return np.log(value) if self.log else value
+
+    def to_unit(self, value):
+        return float((self._scale(value) - self._scale(self.low)) / (self._scale(self.high) - self._scale(self.low)))
+
+    def from_unit(self, u):
+        scaled = self._scale(self.low) + float(np.clip(u, 0, 1)) * (self._scale(self.high) - self._scale(self.low))
+        return float(np.exp(scaled) if self.log else scaled)
+
+    def rvs(self, size=None, random_state=None):
+        rng = check_random_state(random_state)
+        u = rng.uniform(size=size)
+        return self.from_unit(u) if size is None else [self.from_unit(x) for x in u]
+
+class Integer(Real):
+    """An integer hyperparameter between two bounds, inclusive."""
+
+    def from_unit(self, u):
+        return int(np.clip(round(super().from_unit(u)), self.low, self.high))
+
+# Search space of every searched model; the grids are what the exhaustive search tries
+SEARCH_SPACES = {
+    'random_forest': {
+        'n_estimators': Integer(50, 200, grid=[50, 100, 200]),
+        'max_depth': Categorical([None, 10, 20, 30]),
+        'min_samples_split': Integer(2, 10, grid=[2, 5, 10])
+    },
+    'decision_tree': {
+        'max_depth': Categorical([3, 5, 7, 10, None]),
+        'min_samples_split': Integer(2, 10, grid=[2, 5, 10])
+    },
+    'ridge': {
+        'alpha': Real(1e-3, 1e3, log=True, grid=np.logspace(-3, 3, 10))
+    },
+    'lasso': {
+        'alpha': Real(1e-3, 1e3, log=True, grid=np.logspace(-3, 3, 10))
+    },
+    'svr': {
+        'C': Real(1.0, 100.0, log=True, grid=[1.0, 10.0, 100.0]),
+        'gamma': Categorical(['scale', 0.1]),
+        'kernel': Categorical(['rbf', 'linear']),
+        'epsilon': Real(0.01, 0.1, log=True, grid=[0.01, 0.1])
+    },
+    # The SVR's kernel approximation: Nystroem's default gamma (None) is 1 / n_features,
+    # which is what 'scale' resolves to on standardized features
+    'svr_nystroem': {
+        'svr__C': Real(1.0, 100.0, log=True, grid=[1.0, 10.0, 100.0]),
+        'nystroem__gamma': Categorical([None, 0.1]),
+        'nystroem__kernel': Categorical(['rbf', 'linear']),
+        'svr__epsilon': Real(0.01, 0.1, log=True, grid=[0.01, 0.1])
+    }
+}
+
+# Prefix of the searched parameters in estimators that wrap the tuned model in a pipeline
+PARAM_PREFIXES = {'svr': 'regressor__svr__', 'svr_nystroem': 'regressor__'}
+
+# Cross-validation folds of each search
+CV_FOLDS = {'random_forest': 5, 'decision_tree': 5, 'ridge': 5, 'lasso': 5, 'svr': 2, 'svr_nystroem': 2}
+
+# Budgeted strategies get a third of the exhaustive grid's fits by default,
+# and never fewer than this many candidates
+DEFAULT_BUDGET_FRACTION = 1 / 3
+MIN_CANDIDATES = 5
+
+# Each successive halving iteration keeps a third of the candidates on three times the rows
+HALVING_FACTOR = 3
+
+SEARCH_STRATEGIES = ['grid', 'warm_start', 'path', 'random', 'halving', 'halving_random', 'bayesian']
+
+# Parameter the warm-started search grows forests along
+TREE_COUNT_PARAM = 'n_estimators'
+
+# Parameter each model is tuned along by the path strategy; the forest's path is its warm-started
+# tree counts, and the decision tree's pruning path replaces its depth grid
+PATH_PARAMS = {'random_forest': TREE_COUNT_PARAM, 'decision_tree': 'ccp_alpha', 'ridge': 'alpha', 'lasso': 'alpha'}
+PATH_REPLACED_PARAMS = {'decision_tree': ['max_depth']}
+
+# Points scored along each regularization path, and the ratio of the smallest Lasso alpha
+# to the one zeroing every coefficient (the LassoCV defaults)
+PATH_LENGTH = 100
+LASSO_PATH_EPS = 1e-3
+
+# Pruning strengths scored along each tree's pruning path; scoring a tree costs more
+# than pruning it, and neighbouring strengths prune nearly the same tree
+PRUNING_PATH_LENGTH = 20
+
+# Prune copies of one fitted tree with scikit-learn's private _prune_tree where the tree
+# has it (up to at least the 1.6 pinned in requirements.txt), instead of refitting
+PRUNE_FITTED_TREES = True
+
+def get_param_grid(model_name):
+    """
+    Args:
+        model_name (str): Name of the model
+
+    Returns:
+        dict: Values the exhaustive grid search tries, by parameter
+    """
+    return {param: dimension.grid for param, dimension in SEARCH_SPACES[model_name].items()}
+
+def get_path_param_grid(model_name):
+    """
+    Args:
+        model_name (str): Name of a model in PATH_PARAMS
+
+    Returns:
+        dict: Values of the parameters the path strategy searches alongside the path, by parameter
+    """
+    skipped = {PATH_PARAMS[model_name], *PATH_REPLACED_PARAMS.get(model_name, [])}
+    return {param: values for param, values in get_param_grid(model_name).items() if param not in skipped}
+
+def get_param_distributions(model_name):
+    """
+    Args:
+        model_name (str): Name of the model
+
+    Returns:
+        dict: Lists and samplers randomized searches draw candidates from, by parameter
+    """
+    return {
+        param: dimension.values if isinstance(dimension, Categorical) else dimension
+        for param, dimension in SEARCH_SPACES[model_name].items()
+    }
+
+def count_grid_candidates(model_name):
+    """
+    Args:
+        model_name (str): Name of the model
+
+    Returns:
+        int: Number of candidates in the exhaustive grid
+    """
+    return int(np.prod([len(values) for values in get_param_grid(model_name).values()]))
+
+def count_path_combinations(model_name):
+    """
+    Args:
+        model_name (str): Name of a model in PATH_PARAMS
+
+    Returns:
+        int: Number of paths the path strategy computes per fold
+    """
+    return int(np.prod([len(values) for values in get_path_param_grid(model_name).values()]))
+
+def count_kernel_matrices(model_name):
+    """
+    Args:
+        model_name (str): Name of the model
+
+    Returns:
+        int: Kernel matrices per fold of an SVR grid (one per kernel and gamma, one for the
+             linear kernel), 0 for models without a kernel parameter
+    """
+    grid = get_param_grid(model_name)
+    if 'kernel' not in grid:
+        return 0
+    return sum(1 if kernel == 'linear' else len(grid['gamma']) for kernel in grid['kernel'])
+
+def get_candidate_budget(model_name, max_fits=None):
+    """
+    Turn a fit budget into the number of candidates a budgeted strategy evaluates.
+
+    Args:
+        model_name (str): Name of the model
+        max_fits (int, optional): Cross-validation fits to spend; a third of the grid's by default
+
+    Returns:
+        int: Candidates to evaluate, each costing one fit per fold
+    """
+    folds = CV_FOLDS[model_name]
+    if max_fits is None:
+        max_fits = count_grid_candidates(model_name) * folds * DEFAULT_BUDGET_FRACTION
+        return max(MIN_CANDIDATES, int(max_fits // folds))
+    return max(1, int(max_fits // folds))
+
+def count_search_fits(model_name, search='grid', max_fits=None):
+    """
+    Estimate the cross-validation work of a search, in fits on the whole training set.
+
+    A warm-started forest costs as much as a fit of its largest tree count, a
+    regularization or pruning path about as much as one fit, and successive halving runs about one whole-data fit per fold in every iteration,
+    since each iteration has a third of the candidates on three times the rows.
+
+    Args:
+        model_name (str): Name of the model
+        search (str): Search strategy
+        max_fits (int, optional): Fit budget of the budgeted strategies
+
+    Returns:
+        int: Fits, excluding the final refit
+    """
+    folds = CV_FOLDS[model_name]
+    tree_counts = get_param_grid(model_name).get(TREE_COUNT_PARAM)
+    if search in ('warm_start', 'path') and tree_counts:
+        # One forest per fold and other combination, as costly as its largest tree count
+        forests = count_grid_candidates(model_name) // len(tree_counts) * folds
+        return int(math.ceil(forests * max(tree_counts) / np.mean(tree_counts)))
+    if search == 'path' and model_name in PATH_PARAMS:
+        return count_path_combinations(model_name) * folds
+    if search in ('grid', 'warm_start', 'path'):
+        return count_grid_candidates(model_name) * folds
+    if search in ('random', 'bayesian'):
+        return get_candidate_budget(model_name, max_fits) * folds
+    candidates = count_grid_candidates(model_name) if search == 'halving' else get_candidate_budget(model_name, max_fits)
+    return folds * (math.ceil(math.log(max(candidates, 1), HALVING_FACTOR)) + 1)
+
+def count_parallel_fits(model_name, search='grid', max_fits=None):
+    """
+    Largest number of fits a search hands out at once, which bounds the workers it can use.
+
+    Args:
+        model_name (str): Name of the model
+        search (str): Search strategy
+        max_fits (int, optional): Fit budget of the budgeted strategies
+
+    Returns:
+        int: Fits dispatched together
+    """
+    folds = CV_FOLDS[model_name]
+    tree_counts = get_param_grid(model_name).get(TREE_COUNT_PARAM)
+    if search in ('warm_start', 'path') and tree_counts:
+        return count_grid_candidates(model_name) // len(tree_counts) * folds
+    if search == 'path' and model_name in PATH_PARAMS:
+        return count_path_combinations(model_name) * folds
+    if search in ('warm_start', 'path') and count_kernel_matrices(model_name):
+        # The candidates sharing a kernel matrix are fitted one after another
+        return count_kernel_matrices(model_name) * folds
+    if search in ('grid', 'warm_start', 'path', 'halving'):
+        return count_grid_candidates(model_name) * folds
+    if search == 'bayesian':
+        # After the initial points the candidates are proposed one at a time
+        return folds
+    return get_candidate_budget(model_name, max_fits) * folds
+
+class GaussianProcessSearchCV(BaseSearchCV):
+    """
+    Bayesian optimization of cross-validated scores with a Gaussian process.
+
+    Starts from a few random candidates, then repeatedly fits a Gaussian process to
+    the scores so far and evaluates the sampled candidate with the highest expected
+    improvement. Parameters are mapped to [0, 1]: continuous ones by their (log) range,
+    categorical ones by their position in the declared order.
+    """
+
+    _parameter_constraints = {
+        **BaseSearchCV._parameter_constraints,
+        'search_space': [dict],
+        'n_iter': [Interval(numbers.Integral, 1, None, closed='left')],
+        'n_initial_points': [Interval(numbers.Integral, 1, None, closed='left')],
+        'n_candidates': [Interval(numbers.Integral, 1, None, closed='left')],
+        'random_state': ['random_state']
+    }
+
+    def __init__(self, estimator, search_space, *, n_iter=10, n_initial_points=5, n_candidates=1000,
+                 scoring=None, n_jobs=None, refit=True, cv=None, verbose=0, pre_dispatch='2*n_jobs',
+                 random_state=None, error_score=np.nan, return_train_score=False):
+        """
+        Args:
+            estimator: Estimator to tune
+            search_space (dict): Categorical, Real or Integer dimension by parameter
+            n_iter (int): Candidates to evaluate in total
+            n_initial_points (int): Random candidates evaluated before the Gaussian process guides the search
+            n_candidates (int): Random points the expected improvement is maximized over
+            Other arguments as for GridSearchCV
+        """
+        super().__init__(
+            estimator=estimator, scoring=scoring, n_jobs=n_jobs, refit=refit, cv=cv, verbose=verbose,
+            pre_dispatch=pre_dispatch, error_score=error_score, return_train_score=return_train_score
+        )
+        self.search_space = search_space
+        self.n_iter = n_iter
+        self.n_initial_points = n_initial_points
+        self.n_candidates = n_candidates
+        self.random_state = random_state
+
+    def _sample(self, rng, size):
+        """Draw random candidates from the search space."""
+        columns = {param: dimension.rvs(size=size, random_state=rng) for param, dimension in self.search_space.items()}
+        return [{param: columns[param][i] for param in self.search_space} for i in range(size)]
+
+    def _encode(self, candidates):
+        """Map candidates to points of the unit cube."""
+        return np.array([[dimension.to_unit(params[param]) for param, dimension in self.search_space.items()]
+                         for params in candidates])
+
+    def _run_search(self, evaluate_candidates):
+        rng = check_random_state(self.random_state)
+        evaluated = set()
+
+        def evaluate(candidates):
+            evaluated.update(repr(sorted(params.items(), key=str)) for params in candidates)
+            return evaluate_candidates(candidates)
+
+        results = evaluate(self._sample(rng, min(self.n_initial_points, self.n_iter)))
+        kernel = ConstantKernel(1.0) * Matern(length_scale=np.ones(len(self.search_space)), length_scale_bounds=(1e-2, 1e2), nu=2.5) \
+            + WhiteKernel(noise_level=1e-3, noise_level_bounds=(1e-8, 1e-1))
+
+        while len(evaluated) < self.n_iter:
+            scores = np.asarray(results['mean_test_score'], dtype=np.float64)
+            # Failed fits score as the worst candidate so the process steers away from them
+            finite = np.isfinite(scores)
+            scores = np.where(finite, scores, scores[finite].min() if finite.any() else 0.0)
+
+            gp = GaussianProcessRegressor(kernel=kernel, normalize_y=True, n_restarts_optimizer=2, random_state=rng)
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                gp.fit(self._encode(results['params']), scores)
+
+            pool = [params for params in self._sample(rng, self.n_candidates)
+                    if repr(sorted(params.items(), key=str)) not in evaluated]
+            if not pool:
+                break
+            mean, std = gp.predict(self._encode(pool), return_std=True)
+            improvement = mean - scores.max() - 0.01 * scores.std()
+            z = improvement / np.maximum(std, 1e-12)
+            expected_improvement = np.where(std > 0, improvement * norm.cdf(z) + std * norm.pdf(z), 0.0)
+            results = evaluate([pool[int(np.argmax(expected_improvement))]])
+
+class _Predictions(RegressorMixin, BaseEstimator):
+    """Stand-in estimator returning predictions already computed along a path, so any scorer can score them."""
+
+    def __init__(self, predictions):
+        self.predictions = predictions
+
+    def fit(self, X, y):
+        return self
+
+    def predict(self, X):
+        return self.predictions
+
+def _fold_features(X, train, test):
+    """Split a fold's features as float64 arrays, or as CSR matrices when X is sparse."""
+    X_train, X_test = _safe_indexing(X, train), _safe_indexing(X, test)
+    if sp.issparse(X):
+        return sp.csr_matrix(X_train, dtype=np.float64), sp.csr_matrix(X_test, dtype=np.float64)
+    return np.asarray(X_train, dtype=np.float64), np.asarray(X_test, dtype=np.float64)
+
+def _standardize_fold(X, y, train, test):
+    """
+    Standardize a fold's features with the training rows' statistics and center its target.
+
+    Sparse features are only scaled, since centering would fill in their zeros; the
+    path functions center them implicitly instead.
+
+    Returns:
+        tuple: (scaled training features, centered training target, scaled test features,
+                test target, mean of the training target)
+    """
+    X_train, X_test = _fold_features(X, train, test)
+    y_train, y_test = np.asarray(_safe_indexing(y, train), dtype=np.float64), _safe_indexing(y, test)
+    scaler = StandardScaler(with_mean=not sp.issparse(X_train)).fit(X_train)
+    return scaler.transform(X_train), y_train - y_train.mean(), scaler.transform(X_test), y_test, y_train.mean()
+
+def fit_standardized_linear_model(estimator, X, y):
+    """
+    Fit a linear model on standardized features, then express it on the original features.
+
+    Coordinate descent and the Ridge solvers converge much faster when the features
+    share a scale; folding the scaling into the coefficients keeps the fitted model a
+    plain estimator that predicts from the raw features served to it.
+
+    Args:
+        estimator: Unfitted linear model with coef_ and intercept_ once fitted
+        X (pandas.DataFrame or scipy.sparse matrix): Training features
+        y (pandas.Series): Training target values
+
+    Returns:
+        The fitted estimator, its alpha applying to the standardized features
+    """
+    sparse = sp.issparse(X)
+    # Sparse features are scaled but not centered, so the fitted intercept already absorbs their means
+    scaler = StandardScaler(with_mean=not sparse).fit(X)
+    scaled = pd.DataFrame(scaler.transform(X), columns=X.columns, index=X.index) if hasattr(X, 'columns') else scaler.transform(X)
+    model = clone(estimator).fit(scaled, y)
+    model.coef_ = model.coef_ / scaler.scale_
+    if not sparse:
+        model.intercept_ = model.intercept_ - float(np.dot(model.coef_, scaler.mean_))
+    return model
+
+class _CVResultsSearch(BaseEstimator):
+    """
+    Base of the searches that score several candidates from one fit per fold.
+
+    Subclasses score the candidates fold by fold and hand the scores to _set_results,
+    which lays them out like GridSearchCV's cv_results_ and refits the best candidate.
+    """
+
+    def _set_results(self, X, y, candidates, fit_times, score_times, test_scores, scorer):
+        """
+        Args:
+            X (pandas.DataFrame): Training features
+            y (pandas.Series): Training target values
+            candidates (list): Parameters of every candidate
+            fit_times (np.ndarray): Fit seconds by candidate and fold
+            score_times (np.ndarray): Scoring seconds by candidate and fold
+            test_scores (np.ndarray): Scores by candidate and fold
+            scorer (callable): Scorer the candidates were scored with
+        """
+        results = {'params': candidates}
+        for key in dict.fromkeys(key for params in candidates for key in params):
+            results[f'param_{key}'] = np.array([params.get(key) for params in candidates], dtype=object)
+        for name, values in [('fit_time', fit_times), ('score_time', score_times)]:
+            results[f'mean_{name}'] = values.mean(axis=1)
+            results[f'std_{name}'] = values.std(axis=1)
+        for fold in range(test_scores.shape[1]):
+            results[f'split{fold}_test_score'] = test_scores[:, fold]
+        results['mean_test_score'] = test_scores.mean(axis=1)
+        results['std_test_score'] = test_scores.std(axis=1)
+        results['rank_test_score'] = rankdata(-results['mean_test_score'], method='min').astype(np.int32)
+
+        self.cv_results_ = results
+        self.n_splits_ = test_scores.shape[1]
+        self.scorer_ = scorer
+        self.best_index_ = int(results['rank_test_score'].argmin())
+        self.best_params_ = candidates[self.best_index_]
+        self.best_score_ = float(results['mean_test_score'][self.best_index_])
+
+        if self.refit:
+            start = time.perf_counter()
+            self.best_estimator_ = self._refit_best(X, y)
+            self.refit_time_ = time.perf_counter() - start
+
+    def _refit_best(self, X, y):
+        return clone(self.estimator).set_params(**self.best_params_).fit(X, y)
+
+    def predict(self, X):
+        return self.best_estimator_.predict(X)
+
+def _grow_and_score_forest(estimator, X, y, train, test, params, tree_counts, scorer):
+    """
+    Grow one forest on a training fold through increasing tree counts, scoring it at each.
+
+    Returns:
+        tuple: (seconds spent growing to each tree count, seconds scoring each, scores)
+    """
+    forest = clone(estimator).set_params(**params, warm_start=True)
+    X_train, y_train = _safe_indexing(X, train), _safe_indexing(y, train)
+    X_test, y_test = _safe_indexing(X, test), _safe_indexing(y, test)
+
+    fit_times, score_times, scores = [], [], []
+    for n_trees in tree_counts:
+        start = time.perf_counter()
+        forest.set_params(**{TREE_COUNT_PARAM: n_trees}).fit(X_train, y_train)
+        fit_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        scores.append(scorer(forest, X_test, y_test))
+        score_times.append(time.perf_counter() - start)
+    return fit_times, score_times, scores
+
+class WarmStartForestSearchCV(_CVResultsSearch):
+    """
+    Exhaustive grid search over a forest that grows each forest once for all its tree counts.
+
+    For every fold and every combination of the other parameters, one forest is grown
+    with warm_start through the tree counts in increasing order and scored after each.
+    A warm-started forest draws its tree seeds exactly as a fresh fit does, so its first
+    n trees are the forest a separate fit with n trees would build, and the scores, the
+    chosen parameters and the refitted model match GridSearchCV's. The fit time recorded
+    for a tree count is the time spent growing the forest to it from the previous count.
+    """
+
+    def __init__(self, estimator, param_grid, *, scoring=None, cv=None, n_jobs=None, refit=True, verbose=0):
+        """
+        Args:
+            estimator: Forest estimator supporting warm_start
+            param_grid (dict): Values to search by parameter, including TREE_COUNT_PARAM
+            Other arguments as for GridSearchCV
+        """
+        self.estimator = estimator
+        self.param_grid = param_grid
+        self.scoring = scoring
+        self.cv = cv
+        self.n_jobs = n_jobs
+        self.refit = refit
+        self.verbose = verbose
+
+    def fit(self, X, y):
+        """
+        Run the search and refit the best candidate on all the data.
+
+        Args:
+            X (pandas.DataFrame): Training features
+            y (pandas.Series): Training target values
+
+        Returns:
+            WarmStartForestSearchCV: The fitted search
+        """
+        splits = list(check_cv(self.cv, y, classifier=False).split(X, y))
+        scorer = check_scoring(self.estimator, scoring=self.scoring)
+        tree_counts = sorted(set(self.param_grid[TREE_COUNT_PARAM]))
+        other_grid = list(ParameterGrid({key: values for key, values in self.param_grid.items() if key != TREE_COUNT_PARAM}))
+
+        fold_results = Parallel(n_jobs=self.n_jobs, verbose=self.verbose)(
+            delayed(_grow_and_score_forest)(self.estimator, X, y, train, test, params, tree_counts, scorer)
+            for params in other_grid for train, test in splits
+        )
+        # Axes: other combination, fold, tree count
+        fit_times, score_times, scores = (
+            np.array([result[i] for result in fold_results]).reshape(len(other_grid), len(splits), len(tree_counts))
+            for i in range(3)
+        )
+
+        # List the candidates in GridSearchCV's order
+        candidates = list(ParameterGrid(self.param_grid))
+        positions = [(other_grid.index({key: value for key, value in params.items() if key != TREE_COUNT_PARAM}),
+                      tree_counts.index(params[TREE_COUNT_PARAM])) for params in candidates]
+        rows, columns = np.array(positions).T
+
+        self._set_results(X, y, candidates, fit_times[rows, :, columns], score_times[rows, :, columns],
+                          scores[rows, :, columns], scorer)
+        return self
+
+def _sparse_ridge_path(X_train, y_train, alphas):
+    """
+    Ridge coefficients at every alpha for sparse training rows, centering them implicitly.
+
+    Decomposes whichever of the centered covariance (features by features) and Gram
+    (rows by rows) matrices is smaller; both follow from the sparse products and the
+    column means, so the centered matrix is never built.
+
+    Args:
+        X_train (scipy.sparse.csr_matrix): Scaled, uncentered training features
+        y_train (np.ndarray): Centered training target
+        alphas (np.ndarray): Penalties
+
+    Returns:
+        tuple: (coefficients for each alpha, column means of X_train)
+    """
+    n_rows, n_features = X_train.shape
+    means = np.asarray(X_train.mean(axis=0)).ravel()
+    if n_features <= n_rows:
+        covariance = (X_train.T @ X_train).toarray() - n_rows * np.outer(means, means)
+        eigenvalues, V = np.linalg.eigh(covariance)
+        # The target is centered, so the centered features' products with it are X'y
+        projected = V.T @ (X_train.T @ y_train)
+        eigenvalues = np.maximum(eigenvalues, 0.0)
+        return [V @ (projected / (eigenvalues + alpha)) for alpha in alphas], means
+    offsets = X_train @ means
+    gram = (X_train @ X_train.T).toarray() - offsets[:, None] - offsets[None, :] + means @ means
+    eigenvalues, Q = np.linalg.eigh(gram)
+    projected = Q.T @ y_train
+    eigenvalues = np.maximum(eigenvalues, 0.0)
+    duals = [Q @ (projected / (eigenvalues + alpha)) for alpha in alphas]
+    return [X_train.T @ dual - means * dual.sum() for dual in duals], means
+
+def _score_ridge_path(X, y, train, test, alphas, scorer):
+    """
+    Score Ridge at every alpha on one fold from a single SVD of its standardized training rows.
+
+    With X = U diag(s) V', the Ridge coefficients are V diag(s / (s^2 + alpha)) U'y for
+    every alpha, so the whole path costs one decomposition. Sparse folds decompose the
+    covariance or Gram matrix instead, see _sparse_ridge_path.
+
+    Returns:
+        tuple: (seconds of the path, seconds scoring each alpha, scores)
+    """
+    start = time.perf_counter()
+    X_train, y_train, X_test, y_test, intercept = _standardize_fold(X, y, train, test)
+    if sp.issparse(X_train):
+        coefs, means = _sparse_ridge_path(X_train, y_train, alphas)
+        predictions = [X_test @ coef - means @ coef + intercept for coef in coefs]
+    else:
+        U, s, Vt = np.linalg.svd(X_train, full_matrices=False)
+        projected = U.T @ y_train
+        predictions = [X_test @ (Vt.T @ (s / (s ** 2 + alpha) * projected)) + intercept for alpha in alphas]
+    path_seconds = time.perf_counter() - start
+    return path_seconds, *_score_predictions(predictions, X_test, y_test, scorer)
+
+def _score_lasso_path(estimator, X, y, train, test, alphas, scorer):
+    """
+    Score Lasso at every alpha on one fold along a warm-started coordinate descent path.
+
+    Sparse folds walk the path with a warm-started Lasso instead of lasso_path, since
+    only the estimator centers sparse features implicitly through its intercept.
+
+    Returns:
+        tuple: (seconds of the path, seconds scoring each alpha, scores)
+    """
+    start = time.perf_counter()
+    X_train, y_train, X_test, y_test, intercept = _standardize_fold(X, y, train, test)
+    params = estimator.get_params()
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', ConvergenceWarning)
+        if sp.issparse(X_train):
+            model = clone(estimator).set_params(warm_start=True)
+            predictions = [model.set_params(alpha=alpha).fit(X_train, y_train).predict(X_test) + intercept
+                           for alpha in alphas]
+        else:
+            _, coefs, _ = lasso_path(X_train, y_train, alphas=alphas, max_iter=params['max_iter'], tol=params['tol'],
+                                     selection=params['selection'], random_state=params['random_state'])
+            predictions = [X_test @ coefs[:, i] + intercept for i in range(len(alphas))]
+    path_seconds = time.perf_counter() - start
+    return path_seconds, *_score_predictions(predictions, X_test, y_test, scorer)
+
+def _score_predictions(predictions, X_test, y_test, scorer):
+    """Score predictions made along a path, returning the seconds scoring each and the scores."""
+    score_times, scores = [], []
+    for prediction in predictions:
+        start = time.perf_counter()
+        scores.append(scorer(_Predictions(prediction), X_test, y_test))
+        score_times.append(time.perf_counter() - start)
+    return score_times, scores
+
+def _score_pruning_path(estimator, X, y, train, test, params, ccp_alphas, scorer):
+    """
+    Score a decision tree at every pruning strength on one fold from a single unpruned tree.
+
+    Fitting with ccp_alpha grows the full tree and then prunes it, so pruning copies of
+    one full tree gives the trees separate fits would build. The pruning step is
+    scikit-learn's private _prune_tree; a tree without it, or with PRUNE_FITTED_TREES
+    off, is fitted separately for every ccp_alpha.
+
+    Returns:
+        tuple: (seconds growing and pruning for each ccp_alpha, seconds scoring each, scores)
+    """
+    X_train, y_train = _safe_indexing(X, train), _safe_indexing(y, train)
+    X_test, y_test = _safe_indexing(X, test), _safe_indexing(y, test)
+    start = time.perf_counter()
+    full_tree = clone(estimator).set_params(**params, ccp_alpha=0.0).fit(X_train, y_train)
+    grow_seconds = time.perf_counter() - start
+    can_prune = PRUNE_FITTED_TREES and hasattr(full_tree, '_prune_tree')
+
+    fit_times, score_times, scores = [], [], []
+    for ccp_alpha in ccp_alphas:
+        start = time.perf_counter()
+        if can_prune:
+            tree = copy.deepcopy(full_tree).set_params(ccp_alpha=ccp_alpha)
+            tree._prune_tree()
+            fit_times.append(time.perf_counter() - start + grow_seconds / len(ccp_alphas))
+        else:
+            tree = clone(estimator).set_params(**params, ccp_alpha=ccp_alpha).fit(X_train, y_train)
+            fit_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        scores.append(scorer(tree, X_test, y_test))
+        score_times.append(time.perf_counter() - start)
+    return fit_times, score_times, scores
+
+def get_ridge_path_alphas(model_name='ridge', n_alphas=PATH_LENGTH):
+    """
+    Args:
+        model_name (str): Name of the model whose alpha bounds to span
+        n_alphas (int): Number of alphas
+
+    Returns:
+        np.ndarray: Log-spaced alphas between the bounds of the search space, increasing
+    """
+    dimension = SEARCH_SPACES[model_name]['alpha']
+    return np.logspace(np.log10(dimension.low), np.log10(dimension.high), n_alphas)
+
+def get_lasso_path_alphas(X, y, n_alphas=PATH_LENGTH, eps=LASSO_PATH_EPS):
+    """
+    Alphas from the smallest that zeroes every standardized coefficient down to eps times it, as LassoCV picks them.
+
+    Args:
+        X (pandas.DataFrame or scipy.sparse matrix): Training features
+        y (pandas.Series): Training target values
+        n_alphas (int): Number of alphas
+        eps (float): Ratio of the smallest alpha to the largest
+
+    Returns:
+        np.ndarray: Log-spaced alphas, decreasing
+    """
+    # With the target centered, centering the features does not change their products with it
+    sparse = sp.issparse(X)
+    X_scaled = StandardScaler(with_mean=not sparse).fit_transform(X if sparse else np.asarray(X, dtype=np.float64))
+    y_centered = np.asarray(y, dtype=np.float64) - np.mean(y)
+    alpha_max = np.max(np.abs(X_scaled.T @ y_centered)) / len(y_centered)
+    return np.logspace(np.log10(alpha_max), np.log10(alpha_max * eps), n_alphas)
+
+class RegularizationPathSearchCV(_CVResultsSearch):
+    """
+    Cross-validated search of a Ridge or Lasso alpha along its regularization path.
+
+    Each fold standardizes its training rows and computes the whole path at once: one
+    SVD for Ridge, one warm-started coordinate descent run for Lasso, as RidgeCV and
+    LassoCV do. The fit time recorded for an alpha is its share of the fold's path.
+    The best alpha is refitted on the standardized training set, see
+    fit_standardized_linear_model, so it applies to standardized features.
+    """
+
+    def __init__(self, estimator, alphas=None, *, scoring=None, cv=None, n_jobs=None, refit=True, verbose=0):
+        """
+        Args:
+            estimator: Ridge or Lasso estimator
+            alphas (list, optional): Alphas to score; for Lasso, the LassoCV-style path by default
+            Other arguments as for GridSearchCV
+        """
+        self.estimator = estimator
+        self.alphas = alphas
+        self.scoring = scoring
+        self.cv = cv
+        self.n_jobs = n_jobs
+        self.refit = refit
+        self.verbose = verbose
+
+    def fit(self, X, y):
+        """
+        Run the search and refit the best alpha on all the data.
+
+        Args:
+            X (pandas.DataFrame): Training features
+            y (pandas.Series): Training target values
+
+        Returns:
+            RegularizationPathSearchCV: The fitted search
+        """
+        splits = list(check_cv(self.cv, y, classifier=False).split(X, y))
+        scorer = check_scoring(self.estimator, scoring=self.scoring)
+        lasso = isinstance(self.estimator, Lasso)
+        if self.alphas is not None:
+            alphas = np.asarray(self.alphas, dtype=np.float64)
+        else:
+            alphas = get_lasso_path_alphas(X, y) if lasso else get_ridge_path_alphas()
+        # Coordinate descent warm-starts from the strongest penalty
+        alphas = np.sort(alphas)[::-1] if lasso else np.sort(alphas)
+
+        fold_results = Parallel(n_jobs=self.n_jobs, verbose=self.verbose)(
+            delayed(_score_lasso_path)(self.estimator, X, y, train, test, alphas, scorer) if lasso
+            else delayed(_score_ridge_path)(X, y, train, test, alphas, scorer)
+            for train, test in splits
+        )
+        fit_times = np.array([[path_seconds / len(alphas)] * len(alphas) for path_seconds, _, _ in fold_results]).T
+        score_times = np.array([times for _, times, _ in fold_results]).T
+        scores = np.array([fold_scores for _, _, fold_scores in fold_results]).T
+
+        candidates = [{'alpha': float(alpha)} for alpha in alphas]
+        self._set_results(X, y, candidates, fit_times, score_times, scores, scorer)
+        return self
+
+    def _refit_best(self, X, y):
+        return fit_standardized_linear_model(clone(self.estimator).set_params(**self.best_params_), X, y)
+
+class PruningPathSearchCV(_CVResultsSearch):
+    """
+    Cross-validated search of a decision tree's cost-complexity pruning strength.
+
+    Instead of capping the depth, every combination of the other parameters grows one
+    unpruned tree per fold and scores it pruned at each ccp_alpha of the pruning path
+    of the whole training set. The fit time recorded for a ccp_alpha is the pruning
+    plus its share of growing the fold's tree.
+    """
+
+    def __init__(self, estimator, param_grid=None, *, max_alphas=PRUNING_PATH_LENGTH, scoring=None, cv=None, n_jobs=None,
+                 refit=True, verbose=0):
+        """
+        Args:
+            estimator: Decision tree estimator
+            param_grid (dict, optional): Values of the other parameters to search, by parameter
+            max_alphas (int): Most ccp_alphas of the pruning path to score, evenly picked along it
+            Other arguments as for GridSearchCV
+        """
+        self.estimator = estimator
+        self.param_grid = param_grid
+        self.max_alphas = max_alphas
+        self.scoring = scoring
+        self.cv = cv
+        self.n_jobs = n_jobs
+        self.refit = refit
+        self.verbose = verbose
+
+    def _path_alphas(self, X, y, params):
+        """Pruning strengths of the unpruned tree grown on the whole training set."""
+        path = clone(self.estimator).set_params(**params, ccp_alpha=0.0).cost_complexity_pruning_path(X, y)
+        alphas = np.unique(np.maximum(path.ccp_alphas, 0.0))
+        if len(alphas) > self.max_alphas:
+            alphas = np.unique(alphas[np.linspace(0, len(alphas) - 1, self.max_alphas).round().astype(int)])
+        return [float(alpha) for alpha in alphas]
+
+    def fit(self, X, y):
+        """
+        Run the search and refit the best candidate on all the data.
+
+        Args:
+            X (pandas.DataFrame): Training features
+            y (pandas.Series): Training target values
+
+        Returns:
+            PruningPathSearchCV: The fitted search
+        """
+        splits = list(check_cv(self.cv, y, classifier=False).split(X, y))
+        scorer = check_scoring(self.estimator, scoring=self.scoring)
+        other_grid = list(ParameterGrid(self.param_grid or {}))
+        path_alphas = [self._path_alphas(X, y, params) for params in other_grid]
+
+        fold_results = Parallel(n_jobs=self.n_jobs, verbose=self.verbose)(
+            delayed(_score_pruning_path)(self.estimator, X, y, train, test, params, alphas, scorer)
+            for params, alphas in zip(other_grid, path_alphas) for train, test in splits
+        )
+
+        candidates, fit_times, score_times, scores = [], [], [], []
+        for i, (params, alphas) in enumerate(zip(other_grid, path_alphas)):
+            folds = fold_results[i * len(splits):(i + 1) * len(splits)]
+            candidates.extend({**params, 'ccp_alpha': alpha} for alpha in alphas)
+            for values, position in [(fit_times, 0), (score_times, 1), (scores, 2)]:
+                values.append(np.array([fold[position] for fold in folds]).T)
+        self._set_results(X, y, candidates, np.vstack(fit_times), np.vstack(score_times), np.vstack(scores), scorer)
+        return self
+
+def _gram_matrices(X_train, X_test, kernel, gamma):
+    """Kernel matrices of a fold's training rows with themselves and of its test rows with them."""
+    if kernel == 'linear':
+        if sp.issparse(X_train):
+            return (X_train @ X_train.T).toarray(), (X_test @ X_train.T).toarray()
+        return X_train @ X_train.T, X_test @ X_train.T
+    if gamma == 'scale':
+        # As SVR resolves it from the features it is fitted on
+        variance = X_train.multiply(X_train).mean() - X_train.mean() ** 2 if sp.issparse(X_train) else X_train.var()
+        gamma = 1.0 / (X_train.shape[1] * variance)
+    return rbf_kernel(X_train, gamma=gamma), rbf_kernel(X_test, X_train, gamma=gamma)
+
+def _score_kernel_candidates(svr, x_scaler, X, y, train, test, kernel_params, candidates, scorer):
+    """
+    Score SVR candidates sharing a kernel on one fold from a single pair of Gram matrices.
+
+    The fold's features and target are standardized with its training rows' statistics,
+    the features by the pipeline's own scaler, as the standardized SVR pipeline does
+    before fitting.
+
+    Returns:
+        tuple: (seconds fitting each candidate, seconds scoring each, scores)
+    """
+    start = time.perf_counter()
+    X_train, X_test = _fold_features(X, train, test)
+    y_train, y_test = np.asarray(_safe_indexing(y, train), dtype=np.float64), _safe_indexing(y, test)
+    x_scaler = clone(x_scaler).fit(X_train)
+    X_train, X_test = x_scaler.transform(X_train), x_scaler.transform(X_test)
+    y_mean, y_scale = y_train.mean(), y_train.std() or 1.0
+    K_train, K_test = _gram_matrices(X_train, X_test, **kernel_params)
+    gram_seconds = time.perf_counter() - start
+
+    fit_times, score_times, scores = [], [], []
+    for params in candidates:
+        start = time.perf_counter()
+        model = clone(svr).set_params(**params, kernel='precomputed').fit(K_train, (y_train - y_mean) / y_scale)
+        prediction = model.predict(K_test) * y_scale + y_mean
+        fit_times.append(time.perf_counter() - start + gram_seconds / len(candidates))
+        start = time.perf_counter()
+        scores.append(scorer(_Predictions(prediction), X_test, y_test))
+        score_times.append(time.perf_counter() - start)
+    return fit_times, score_times, scores
+
+class PrecomputedKernelSVRSearchCV(_CVResultsSearch):
+    """
+    Exhaustive grid search of a standardized SVR that computes each kernel matrix once per fold.
+
+    The candidates differing only in C and epsilon share a kernel, so every fold builds
+    the Gram matrix of each kernel and gamma once and fits those candidates on it with a
+    precomputed kernel; linear candidates differing only in the unused gamma share a fit. The estimator is the standardized SVR pipeline (see
+    model_training.build_svr_pipeline), which the best candidate is refitted as. The
+    fit time recorded for a candidate includes its share of the Gram matrices.
+    """
+
+    def __init__(self, estimator, param_grid, *, param_prefix='', scoring=None, cv=None, n_jobs=None, refit=True, verbose=0):
+        """
+        Args:
+            estimator: Pipeline standardizing the features and the target around an SVR
+            param_grid (dict): Values of C, epsilon, kernel and gamma to search
+            param_prefix (str): Prefix of the SVR's parameters in the estimator
+            Other arguments as for GridSearchCV
+        """
+        self.estimator = estimator
+        self.param_grid = param_grid
+        self.param_prefix = param_prefix
+        self.scoring = scoring
+        self.cv = cv
+        self.n_jobs = n_jobs
+        self.refit = refit
+        self.verbose = verbose
+
+    def fit(self, X, y):
+        """
+        Run the search and refit the best candidate on all the data.
+
+        Args:
+            X (pandas.DataFrame): Training features
+            y (pandas.Series): Training target values
+
+        Returns:
+            PrecomputedKernelSVRSearchCV: The fitted search
+        """
+        splits = list(check_cv(self.cv, y, classifier=False).split(X, y))
+        scorer = check_scoring(self.estimator, scoring=self.scoring)
+        params = self.estimator.get_params()
+        svr = params[self.param_prefix.rstrip('_')] if self.param_prefix else self.estimator
+        # The pipeline's feature scaler sits next to the SVR; a bare SVR gets the features standardized
+        scaler_key = self.param_prefix.rstrip('_').rsplit('__', 1)[0] + '__scaler' if self.param_prefix else None
+        x_scaler = params.get(scaler_key, StandardScaler())
+
+        # Group the candidates by the kernel matrix they need; gamma does not change a linear
+        # kernel, so the linear candidates differing only in gamma are fitted once
+        candidates = list(ParameterGrid(self.param_grid))
+        kernels = {}
+        for index, params in enumerate(candidates):
+            kernel = (params['kernel'], params['gamma'] if params['kernel'] != 'linear' else None)
+            kernels.setdefault(kernel, {}).setdefault((params['C'], params['epsilon']), []).append(index)
+
+        fold_results = Parallel(n_jobs=self.n_jobs, verbose=self.verbose)(
+            delayed(_score_kernel_candidates)(
+                svr, x_scaler, X, y, train, test, {'kernel': kernel, 'gamma': gamma},
+                [{'C': C, 'epsilon': epsilon} for C, epsilon in fits], scorer
+            )
+            for (kernel, gamma), fits in kernels.items() for train, test in splits
+        )
+
+        fit_times, score_times, scores = (np.zeros((len(candidates), len(splits))) for _ in range(3))
+        for k, fits in enumerate(kernels.values()):
+            for fold in range(len(splits)):
+                result = fold_results[k * len(splits) + fold]
+                for fit, indices in enumerate(fits.values()):
+                    # Candidates sharing a fit share its time
+                    fit_times[indices, fold] = result[0][fit] / len(indices)
+                    score_times[indices, fold] = result[1][fit] / len(indices)
+                    scores[indices, fold] = result[2][fit]
+
+        candidates = [{self.param_prefix + key: value for key, value in params.items()} for params in candidates]
+        self._set_results(X, y, candidates, fit_times, score_times, scores, scorer)
+        return self
+
+def select_cv(model_name, cv_splits=None):
+    """
+    Choose the folds a model's search cross-validates on.
+
+    The cached folds of the training rows are used when there are as many as the
+    model's CV_FOLDS, so every search and the evaluation score the same folds. A
+    model searched on fewer folds to bound its cost (the SVR) keeps its own.
+
+    Args:
+        model_name (str): Name of the model
+        cv_splits (list, optional): (train, test) index arrays per fold, from load_modeling_data
+
+    Returns:
+        int or list: cv_splits, or the model's number of folds
+    """
+    if cv_splits is not None and len(cv_splits) == CV_FOLDS[model_name]:
+        return cv_splits
+    return CV_FOLDS[model_name]
+
+def build_search(search, estimator, model_name, scoring='neg_mean_squared_error', n_jobs=-1, max_fits=None,
+                 random_state=42, verbose=0, cv_splits=None):
+    """
+    Build the hyperparameter search of a model for a strategy.
+
+    Args:
+        search (str): 'grid', 'warm_start', 'path', 'random', 'halving', 'halving_random' or 'bayesian';
+            'warm_start' shares the fits of a forest's tree counts and the SVR's kernel matrices and
+            is the exhaustive grid for other models, and 'path' also searches PATH_PARAMS along their paths
+        estimator: Estimator to tune, with the search space's parameters under PARAM_PREFIXES[model_name]
+        model_name (str): Name of the model, selecting its search space and folds
+        scoring (str): Scoring of the candidates
+        n_jobs (int): Parallel fits
+        max_fits (int, optional): Cross-validation fit budget of the random and Bayesian searches,
+            and the candidate budget (in fits) of halving over random candidates
+        random_state (int): Seed of the sampled candidates
+        verbose (int): Verbosity of the search
+        cv_splits (list, optional): Cached (train, test) folds to search on, see select_cv
+
+    Returns:
+        Unfitted search with the BaseSearchCV attributes; fitting it refits the best candidate on all the data
+    """
+    common = {'scoring': scoring, 'cv': select_cv(model_name, cv_splits), 'n_jobs': n_jobs, 'verbose': verbose}
+    prefix = PARAM_PREFIXES.get(model_name, '')
+    param_grid = {prefix + param: values for param, values in get_param_grid(model_name).items()}
+    param_distributions = {prefix + param: values for param, values in get_param_distributions(model_name).items()}
+    if search in ('warm_start', 'path') and TREE_COUNT_PARAM in param_grid:
+        return WarmStartForestSearchCV(estimator, param_grid=param_grid, **common)
+    if search in ('warm_start', 'path') and count_kernel_matrices(model_name):
+        return PrecomputedKernelSVRSearchCV(estimator, param_grid=get_param_grid(model_name), param_prefix=prefix, **common)
+    if search == 'path' and PATH_PARAMS.get(model_name) == 'ccp_alpha':
+        return PruningPathSearchCV(estimator, param_grid=get_path_param_grid(model_name), **common)
+    if search == 'path' and PATH_PARAMS.get(model_name) == 'alpha':
+        alphas = None if isinstance(estimator, Lasso) else get_ridge_path_alphas(model_name)
+        return RegularizationPathSearchCV(estimator, alphas=alphas, **common)
+    if search in ('grid', 'warm_start', 'path'):
+        return GridSearchCV(estimator, param_grid=param_grid, **common)
+    if search == 'random':
+        return RandomizedSearchCV(estimator, param_distributions=param_distributions,
+                                  n_iter=get_candidate_budget(model_name, max_fits), random_state=random_state, **common)
+    if search == 'halving':
+        return HalvingGridSearchCV(estimator, param_grid=param_grid, factor=HALVING_FACTOR,
+                                   random_state=random_state, **common)
+    if search == 'halving_random':
+        return HalvingRandomSearchCV(estimator, param_distributions=param_distributions,
+                                     n_candidates=get_candidate_budget(model_name, max_fits), factor=HALVING_FACTOR,
+                                     random_state=random_state, **common)
+    if search == 'bayesian':
+        n_iter = get_candidate_budget(model_name, max_fits)
+        search_space = {prefix + param: dimension for param, dimension in SEARCH_SPACES[model_name].items()}
+        # Leave most of the budget to the candidates the Gaussian process proposes
+        return GaussianProcessSearchCV(estimator, search_space, n_iter=n_iter,
+                                       n_initial_points=max(2, n_iter // 3), random_state=random_state, **common)
+    raise ValueError(f"Unknown search strategy {search!r}; expected one of {SEARCH_STRATEGIES}")
+
+def summarize_search_cost(cv_results):
+    """
+    Total the fits and fit time a search spent, from its CV results summary.
+
+    Args:
+        cv_results (dict): Output of summarize_cv_results
+
+    Returns:
+        dict: candidates, fits and fit_seconds (cross-validation fits plus the refit)
+    """
+    n_splits = cv_results['n_splits']
+    fit_seconds = float(np.sum(cv_results['mean_fit_time']) * n_splits) + (cv_results.get('refit_time') or 0.0)
+    return {
+        'candidates': len(cv_results['params']),
+        'fits': len(cv_results['params']) * n_splits,
+        'fit_seconds': fit_seconds
+    }
+
+def compare_search_strategies(X_train, y_train, model_names=None, strategies=None, max_fits=None,
+                              X_test=None, y_test=None, save_dir=None, cv_splits=None):
+    """
+    Run every search strategy on the same data and compare what each finds against what it costs.
+
+    Args:
+        X_train (pandas.DataFrame): Training features
+        y_train (pandas.Series): Training target values
+        model_names (list, optional): Models to search, all the searched ones by default
+        strategies (list, optional): Strategies to compare, all of SEARCH_STRATEGIES by default
+        max_fits (int, optional): Fit budget of the budgeted strategies
+        X_test (pandas.DataFrame, optional): Held-out features to score the best models on
+        y_test (pandas.Series, optional): Held-out target values
+        save_dir (str, optional): Directory to save the comparison to
+        cv_splits (list, optional): Cached (train, test) folds of X_train, see select_cv
+
+    Returns:
+        list: One dict per model and strategy with the best score, best parameters,
+              candidates, fits, fit time, wall time and held-out RMSE
+    """
+    from model_training import MODEL_FITTERS
+
+    model_names = [name for name in MODEL_FITTERS if name in SEARCH_SPACES] if model_names is None else model_names
+    strategies = SEARCH_STRATEGIES if strategies is None else strategies
+    comparison = []
+    for model_name in model_names:
+        for search in strategies:
+            row = _run_compared_search(
+                model_name, search,
+                lambda: MODEL_FITTERS[model_name](X_train, y_train, search=search, max_fits=max_fits, cv_splits=cv_splits),
+                X_test, y_test
+            )
+            if search in ('warm_start', 'path') and 'error' not in row:
+                # These score several candidates from each fit
+                row['fits'] = count_search_fits(model_name, search, max_fits)
+            comparison.append(row)
+
+    print_search_comparison(comparison)
+    _save_comparison(comparison, save_dir, SEARCH_COMPARISON_FILENAME)
+    return comparison
+
+def _run_compared_search(model_name, search, fit, X_test=None, y_test=None):
+    """
+    Run one search of a comparison, recording its best score, cost and held-out RMSE.
+
+    Args:
+        model_name (str): Name of the model
+        search (str): Label of the search
+        fit (callable): Runs the search, returning (model, training time, metrics, CV results)
+        X_test (pandas.DataFrame, optional): Held-out features to score the best model on
+        y_test (pandas.Series, optional): Held-out target values
+
+    Returns:
+        dict: Comparison row, with the error instead when the search fails
+    """
+    row = {'model_name': model_name, 'search': search}
+    try:
+        start = time.perf_counter()
+        model, _, metrics, cv_results = fit()
+        row['wall_seconds'] = time.perf_counter() - start
+        row['best_score'] = float(metrics['cv_best_score'])
+        row['best_params'] = cv_results['params'][cv_results['best_index']]
+        row.update(summarize_search_cost(cv_results))
+        if X_test is not None and y_test is not None:
+            row['test_rmse'] = float(np.sqrt(np.mean((np.asarray(y_test) - model.predict(X_test)) ** 2)))
+    except Exception as e:
+        print(f"Error searching {model_name} with {search}: {e}")
+        row['error'] = str(e)
+    return row
+
+def _save_comparison(comparison, save_dir, filename):
+    """Save a comparison as JSON in save_dir, when given."""
+    if save_dir:
+        os.makedirs(save_dir, exist_ok=True)
+        write_json_atomic(comparison, os.path.join(save_dir, filename), indent=2)
+        print(f"Search comparison saved to {os.path.join(save_dir, filename)}")
+
+def compare_svr_modes(X_train, y_train, X_test=None, y_test=None, modes=None, save_dir=None):
+    """
+    Compare the SVR's training modes: training time against cross-validated and held-out accuracy.
+
+    Each mode is labelled '<mode>:<search>'. 'exact:grid' fits every candidate of the
+    standardized SVR, 'exact:warm_start' shares each fold's kernel matrices between the
+    candidates, and 'nystroem:grid' searches the kernel approximation.
+
+    Args:
+        X_train (pandas.DataFrame): Training features
+        y_train (pandas.Series): Training target values
+        X_test (pandas.DataFrame, optional): Held-out features to score the best models on
+        y_test (pandas.Series, optional): Held-out target values
+        modes (list, optional): Labels to compare, all of SVR_MODE_SEARCHES by default
+        save_dir (str, optional): Directory to save the comparison to
+
+    Returns:
+        list: One dict per mode, as compare_search_strategies returns
+    """
+    from model_training import fit_svr
+
+    modes = SVR_MODE_SEARCHES if modes is None else modes
+    comparison = []
+    for label in modes:
+        mode, search = label.split(':')
+        comparison.append(_run_compared_search(
+            'svr', label, lambda: fit_svr(X_train, y_train, search=search, mode=mode), X_test, y_test
+        ))
+
+    print_search_comparison(comparison, baseline=SVR_MODE_SEARCHES[0])
+    _save_comparison(comparison, save_dir, SVR_MODE_COMPARISON_FILENAME)
+    return comparison
+
+def compare_design_formats(X_train, y_train, X_test=None, y_test=None, model_names=None, search='path', save_dir=None):
+    """
+    Compare training the sparse-capable models on the dense design matrix and on its CSR form.
+
+    Args:
+        X_train (pandas.DataFrame): Training features
+        y_train (pandas.Series): Training target values
+        X_test (pandas.DataFrame, optional): Held-out features to score and time prediction on
+        y_test (pandas.Series, optional): Held-out target values
+        model_names (list, optional): Models to train, all of model_training.SPARSE_MODELS by default
+        search (str): Hyperparameter search strategy of both formats
+        save_dir (str, optional): Directory to save the comparison to
+
+    Returns:
+        list: One dict per model and format with the bytes of the training matrix, the
+              training time, the best cross-validated score, the held-out RMSE and prediction time
+    """
+    from model_training import MODEL_FITTERS, SPARSE_MODELS, densify_features
+
+    model_names = SPARSE_MODELS if model_names is None else model_names
+    matrices = {'dense': (densify_features(X_train), densify_features(X_test) if X_test is not None else None)}
+    matrices['sparse'] = (to_sparse_matrix(X_train), to_sparse_matrix(X_test) if X_test is not None else None)
+    comparison = []
+    for model_name in model_names:
+        for design_format, (X_fit, X_held_out) in matrices.items():
+            row = {'model_name': model_name, 'format': design_format, 'search': search,
+                   'design_bytes': get_design_matrix_bytes(X_fit)}
+            try:
+                model, row['training_seconds'], metrics, _ = MODEL_FITTERS[model_name](X_fit, y_train, search=search)
+                row['best_score'] = float(metrics['cv_best_score']) if metrics else None
+                if X_held_out is not None and y_test is not None:
+                    start = time.perf_counter()
+                    predictions = model.predict(X_held_out)
+                    row['predict_seconds'] = time.perf_counter() - start
+                    row['test_rmse'] = float(np.sqrt(np.mean((np.asarray(y_test) - predictions) ** 2)))
+            except Exception as e:
+                print(f"Error training {model_name} on the {design_format} design matrix: {e}")
+                row['error'] = str(e)
+            comparison.append(row)
+
+    print_design_format_comparison(comparison)
+    _save_comparison(comparison, save_dir, DESIGN_FORMAT_COMPARISON_FILENAME)
+    return comparison
+
+def print_design_format_comparison(comparison):
+    """
+    Print memory and training time per model on the sparse design matrix against the dense one.
+
+    Args:
+        comparison (list): Output of compare_design_formats
+    """
+    dense_rows = {row['model_name']: row for row in comparison if row['format'] == 'dense' and 'error' not in row}
+    print(f"\n{'Model':<15} {'Format':<8} {'Matrix (KB)':>12} {'vs dense':>8} {'Train (s)':>10} {'vs dense':>8} "
+          f"{'Best score':>14} {'Test RMSE':>11}")
+    for row in comparison:
+        if 'error' in row:
+            print(f"{row['model_name']:<15} {row['format']:<8} error: {row['error']}")
+            continue
+        dense = dense_rows.get(row['model_name'])
+        memory_ratio = f"{row['design_bytes'] / dense['design_bytes']:>8.2f}" if dense and dense['design_bytes'] else f"{'':>8}"
+        time_ratio = (f"{row['training_seconds'] / dense['training_seconds']:>8.2f}"
+                      if dense and dense['training_seconds'] else f"{'':>8}")
+        best_score = f"{row['best_score']:>14.4g}" if row['best_score'] is not None else f"{'':>14}"
+        test_rmse = f"{row['test_rmse']:>11.0f}" if 'test_rmse' in row else ''
+        print(f"{row['model_name']:<15} {row['format']:<8} {row['design_bytes'] / 1024:>12.1f} {memory_ratio} "
+              f"{row['training_seconds']:>10.2f} {time_ratio} {best_score} {test_rmse}")
+
+def _single_row_latency(model, X, n_rows):
+    """Median seconds the model takes to predict one row, over the first n_rows rows of X."""
+    latencies = []
+    for i in range(min(n_rows, X.shape[0])):
+        row = X.iloc[[i]]
+        start = time.perf_counter()
+        model.predict(row)
+        latencies.append(time.perf_counter() - start)
+    return float(np.median(latencies)) if latencies else None
+
+def compare_category_encodings(df, model_names=None, methods=None, search='path', target_column='Price',
+                               test_size=0.2, random_state=42, latency_rows=100, save_dir=None):
+    """
+    Compare one-hot encoding the high-cardinality categoricals with the compact encodings.
+
+    Every encoding is trained and scored on the same train/test split; the compact ones
+    replace model_training.COMPACT_ENCODED_COLUMNS with one learned number each.
+
+    Args:
+        df (pandas.DataFrame): Processed data
+        model_names (list, optional): Models to train, the random forest and the SVR by default
+        methods (list, optional): Compact encodings to compare, all of utils.encoding_utils.ENCODING_METHODS by default
+        search (str): Hyperparameter search strategy of every encoding
+        target_column (str): Name of the target variable column
+        test_size (float): Proportion of data to use for testing
+        random_state (int): Seed of the train/test split and of the out-of-fold encoding
+        latency_rows (int): Held-out rows predicted one at a time to measure the inference latency
+        save_dir (str, optional): Directory to save the comparison to
+
+    Returns:
+        list: One dict per model and encoding with the number of features, the training time,
+              the pickled model's size, the lookup table's size, the single-row latency,
+              the best cross-validated score and the held-out RMSE
+    """
+    from model_training import (
+        MODEL_FITTERS, COMPACT_ENCODED_COLUMNS, prepare_data_for_modeling, split_data, encode_compact_categories
+    )
+
+    model_names = ['random_forest', 'svr'] if model_names is None else model_names
+    methods = ENCODING_METHODS if methods is None else methods
+    split_options = {'target_column': target_column, 'test_size': test_size, 'random_state': random_state}
+
+    X_train, X_test, y_train, y_test = split_data(prepare_data_for_modeling(df), **split_options)
+    designs = {'one_hot': (X_train, X_test, None)}
+    X_train, X_test, _, _ = split_data(prepare_data_for_modeling(df, compact_columns=COMPACT_ENCODED_COLUMNS),
+                                       **split_options)
+    for method in methods:
+        designs[method] = encode_compact_categories(X_train, y_train, X_test, method=method, random_state=random_state)
+
+    comparison = []
+    for model_name in model_names:
+        for encoding, (X_fit, X_held_out, encodings) in designs.items():
+            row = {'model_name': model_name, 'encoding': encoding, 'search': search, 'features': X_fit.shape[1],
+                   'lookup_bytes': len(json.dumps(encodings).encode('utf-8')) if encodings is not None else 0}
+            try:
+                model, row['training_seconds'], metrics, _ = MODEL_FITTERS[model_name](X_fit, y_train, search=search)
+                row['best_score'] = float(metrics['cv_best_score']) if metrics else None
+                row['model_bytes'] = len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+                row['latency_seconds'] = _single_row_latency(model, X_held_out, latency_rows)
+                predictions = model.predict(X_held_out)
+                row['test_rmse'] = float(np.sqrt(np.mean((np.asarray(y_test) - predictions) ** 2)))
+            except Exception as e:
+                print(f"Error training {model_name} with the {encoding} encoding: {e}")
+                row['error'] = str(e)
+            comparison.append(row)
+
+    print_category_encoding_comparison(comparison)
+    _save_comparison(comparison, save_dir, CATEGORY_ENCODING_COMPARISON_FILENAME)
+    return comparison
+
+def print_category_encoding_comparison(comparison):
+    """
+    Print features, training time, model size and latency per model and encoding against one-hot.
+
+    Args:
+        comparison (list): Output of compare_category_encodings
+    """
+    one_hot_rows = {row['model_name']: row for row in comparison if row['encoding'] == 'one_hot' and 'error' not in row}
+
+    def ratio(row, key):
+        base = one_hot_rows.get(row['model_name'])
+        return f"{row[key] / base[key]:>8.2f}" if base and base[key] else f"{'':>8}"
+
+    print(f"\n{'Model':<15} {'Encoding':<10} {'Features':>8} {'Train (s)':>10} {'vs 1-hot':>8} {'Model (KB)':>11} "
+          f"{'vs 1-hot':>8} {'Latency (ms)':>13} {'vs 1-hot':>8} {'Test RMSE':>11}")
+    for row in comparison:
+        if 'error' in row:
+            print(f"{row['model_name']:<15} {row['encoding']:<10} error: {row['error']}")
+            continue
+        print(f"{row['model_name']:<15} {row['encoding']:<10} {row['features']:>8} {row['training_seconds']:>10.2f} "
+              f"{ratio(row, 'training_seconds')} {row['model_bytes'] / 1024:>11.1f} {ratio(row, 'model_bytes')} "
+              f"{row['latency_seconds'] * 1000:>13.3f} {ratio(row, 'latency_seconds')} {row['test_rmse']:>11.0f}")
+
+def print_search_comparison(comparison, baseline='grid'):
+    """
+    Print best score against fit time per model and strategy, relative to a baseline search.
+
+    Args:
+        comparison (list): Output of compare_search_strategies or compare_svr_modes
+        baseline (str): Search the others are compared with, the exhaustive grid by default
+    """
+    grid_rows = {row['model_name']: row for row in comparison if row['search'] == baseline and 'error' not in row}
+    versus = 'vs grid' if baseline == 'grid' else 'vs base'
+    print(f"\n{'Model':<15} {'Search':<17} {'Best score':>14} {versus:>8} {'Fits':>6} {'Fit (s)':>9} {versus:>8} {'Test RMSE':>11}")
+    for row in comparison:
+        if 'error' in row:
+            print(f"{row['model_name']:<15} {row['search']:<17} error: {row['error']}")
+            continue
+        grid = grid_rows.get(row['model_name'])
+        # Scores are negative errors, so the ratio is above 1 when the strategy does worse
+        score_ratio = f"{row['best_score'] / grid['best_score']:>8.3f}" if grid and grid['best_score'] else f"{'':>8}"
+        time_ratio = f"{row['fit_seconds'] / grid['fit_seconds']:>8.2f}" if grid and grid['fit_seconds'] else f"{'':>8}"
+        test_rmse = f"{row['test_rmse']:>11.0f}" if 'test_rmse' in row else ''
+        print(f"{row['model_name']:<15} {row['search']:<17} {row['best_score']:>14.4g} {score_ratio} "
+              f"{row['fits']:>6} {row['fit_seconds']:>9.2f} {time_ratio} {test_rmse}")
+
+def load_search_comparison(save_dir, filename=SEARCH_COMPARISON_FILENAME):
+    """
+    Args:
+        save_dir (str): Directory the comparison was saved to
+        filename (str): SEARCH_COMPARISON_FILENAME, SVR_MODE_COMPARISON_FILENAME for the SVR modes,
+            DESIGN_FORMAT_COMPARISON_FILENAME for the design matrix formats or
+            CATEGORY_ENCODING_COMPARISON_FILENAME for the category encodings
+
+    Returns:
+        list or None: The saved comparison, or None if there is none
+    """
+    comparison_path = os.path.join(save_dir, filename)
+    if not os.path.isfile(comparison_path):
+        return None
+    try:
+        with open(comparison_path, 'r') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Error loading search comparison: {e}")
+        return None
+
+def main():
+    """
+    Compare the search strategies named on the command line (all by default) on the processed data,
+    the SVR's training modes when the argument is 'svr_modes', the dense and sparse design
+    matrices when it is 'design_formats', or the one-hot and compact category encodings when
+    it is 'category_encodings'.
+    """
+    from model_data_cache import load_modeling_data
+
+    if sys.argv[1:] == ['category_encodings']:
+        from model_training import load_processed_data
+        df = load_processed_data()
+        if df is None:
+            return None
+        return compare_category_encodings(df, save_dir='./backend/models/saved_models/')
+
+    modeling_data = load_modeling_data()
+    if modeling_data is None:
+        return None
+    X_train, X_test, y_train, y_test, cv_splits = modeling_data
+    if sys.argv[1:] == ['svr_modes']:
+        return compare_svr_modes(X_train, y_train, X_test=X_test, y_test=y_test, save_dir='./backend/models/saved_models/')
+    if sys.argv[1:] == ['design_formats']:
+        return compare_design_formats(X_train, y_train, X_test=X_test, y_test=y_test,
+                                      save_dir='./backend/models/saved_models/')
+    strategies = sys.argv[1:] or SEARCH_STRATEGIES
+    return compare_search_strategies(X_train, y_train, strategies=strategies, X_test=X_test, y_test=y_test,
+                                     save_dir='./backend/models/saved_models/', cv_splits=cv_splits)
+
+if __name__ == "__main__":
+    main()
@@ -2,59 +2,162 @@ import pandas as pd
 import numpy as np
 import joblib
 import os
-from sklearn.model_selection import train_test_split, GridSearchCV
+import sys
+import json
+import time
+import scipy.sparse as sp
+from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.linear_model import LinearRegression, Ridge, Lasso
 from sklearn.tree import DecisionTreeRegressor
-from sklearn.svm import SVR
+from sklearn.svm import SVR, LinearSVR
+from sklearn.compose import TransformedTargetRegressor, ColumnTransformer
+from sklearn.kernel_approximation import Nystroem
+from sklearn.pipeline import Pipeline, make_pipeline
+from sklearn.preprocessing import StandardScaler, FunctionTransformer
 from model_logging import log_model_operation
+from model_search import build_search, fit_standardized_linear_model
 
-def load_processed_data(filepath='./backend/data/processed/lisbon_houses_processed.csv'):
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.manifest_utils import build_manifest_entry, update_manifest
+from utils.data_utils import read_table, find_processed_data_file, to_sparse_matrix, to_dense_array
+from utils.cache_utils import write_json_atomic
+from utils.encoding_utils import fit_category_encodings, apply_category_encodings, save_category_encodings
+
+# Ordinal and binary encodings of the labelled categorical features
+CONDITION_MAPPING = {'For Refurbishment': 1, 'Used': 2, 'As New': 3, 'New': 4}
+PROPERTY_TYPE_MAPPING = {'Homes': 1, 'Single Habitation': 2}
+
+# Categorical features with too many values to one-hot encode cheaply, which
+# encode_compact_categories replaces with one learned number each
+COMPACT_ENCODED_COLUMNS = ['Parish', 'PropertyCategory']
+
+# Models whose estimators fit scipy.sparse CSR design matrices without densifying them
+SPARSE_MODELS = ['ridge', 'lasso', 'linear', 'svr']
+
+# Columns of a sparse design matrix non-zero in at least this fraction of the rows are
+# centered when standardizing it, which at most doubles their stored entries
+CENTERED_COLUMN_DENSITY = 0.5
+
+# Ridge's sparse solvers are iterative; on the unscaled features they stop far from the
+# exact (Cholesky) solution of the dense fit at the default tolerance
+SPARSE_RIDGE_TOL = 1e-10
+
+def load_processed_data(filepath=None):
     """
     Args:
-        filepath (str): Path to the processed CSV file
+        filepath (str, optional): Path to the processed data (CSV or columnar store);
+            defaults to the columnar store in ./backend/data/processed/ if present, else the CSV
     
     Returns:
         pandas.DataFrame or None: The loaded dataset or None if loading fails
     """
     try:
-        df = pd.read_csv(filepath)
+        if filepath is None:
+            filepath = find_processed_data_file('./backend/data/processed/')
+        df = read_table(filepath, typed=True)
         print(f"Data loaded successfully with {df.shape[0]} rows and {df.shape[1]} columns.")
         return df
     except Exception as e:
         print(f"Error loading data: {e}")
         return None
 
-def prepare_data_for_modeling(df):
+def prepare_data_for_modeling(df, sparse=False, compact_columns=None):
     """
     Args:
         df (pandas.DataFrame): Input dataframe with raw features
+        sparse (bool): Store the one-hot columns as pandas sparse columns, so the dense
+            dummies are never built; see to_sparse_matrix for the CSR design matrix
+        compact_columns (list, optional): Categorical columns left as text instead of one-hot
+            encoded, for encode_compact_categories to encode once the data is split
     
     Returns:
         pandas.DataFrame: Processed dataframe with encoded categorical features
     """
     model_df = df.copy()
     
-    # Get categorical columns
-    categorical_cols = model_df.select_dtypes(include=['object']).columns.tolist()
+    # Get categorical columns (columnar stores load text columns as 'category')
+    categorical_cols = model_df.select_dtypes(include=['object', 'category']).columns.tolist()
     
     # For Condition, create ordinal encoding
     if 'Condition' in categorical_cols:
-        condition_mapping = {'For Refurbishment': 1, 'Used': 2, 'As New': 3, 'New': 4}
-        model_df['Condition'] = model_df['Condition'].map(condition_mapping)
+        model_df['Condition'] = model_df['Condition'].astype(object).map(CONDITION_MAPPING)
     
     # For PropertyType, create binary encoding
     if 'PropertyType' in categorical_cols:
-        property_type_mapping = {'Homes': 1, 'Single Habitation': 2}
-        model_df['PropertyType'] = model_df['PropertyType'].map(property_type_mapping)
+        model_df['PropertyType'] = model_df['PropertyType'].astype(object).map(PROPERTY_TYPE_MAPPING)
+    
+    # Compact columns stay text until the data is split and their encodings learned
+    compact_columns = [col for col in categorical_cols if col in (compact_columns or [])]
+    for col in compact_columns:
+        model_df[col] = model_df[col].astype(object)
     
     # For other categorical columns, use one-hot encoding
     remaining_cat_cols = [col for col in categorical_cols 
-                          if col not in ['Condition', 'PropertyType']]
-    model_df = pd.get_dummies(model_df, columns=remaining_cat_cols, drop_first=True)
+                          if col not in ['Condition', 'PropertyType'] + compact_columns]
+    model_df = pd.get_dummies(model_df, columns=remaining_cat_cols, drop_first=True, sparse=sparse)
     
     return model_df
 
+def encode_compact_categories(X_train, y_train, X_test=None, method='target', columns=COMPACT_ENCODED_COLUMNS,
+                              random_state=42):
+    """
+    Replace the high-cardinality categorical columns with one learned number each.
+
+    The encodings are learned on the training rows only, out of fold for the target
+    encoding, and applied to the held-out rows with the lookup table kept for serving.
+
+    Args:
+        X_train (pandas.DataFrame): Training features from prepare_data_for_modeling with compact_columns
+        y_train (pandas.Series): Training target values
+        X_test (pandas.DataFrame, optional): Held-out features encoded the same way
+        method (str): 'target' or 'frequency', see utils.encoding_utils.ENCODING_METHODS
+        columns (list): Categorical columns to encode
+        random_state (int): Seed of the out-of-fold target encoding's folds
+
+    Returns:
+        tuple: (encoded X_train, encoded X_test or None, lookup table for save_category_encodings)
+    """
+    encodings, X_train = fit_category_encodings(X_train, y_train, columns, method=method, random_state=random_state)
+    if X_test is not None:
+        X_test = apply_category_encodings(X_test, encodings)
+    return X_train, X_test, encodings
+
+def build_sparse_scaler(X, min_density=CENTERED_COLUMN_DENSITY):
+    """
+    Standardize a sparse design matrix without densifying it.
+
+    The mostly non-zero columns (the numeric features) are densified and centered, so
+    large offsets such as the latitude's do not swamp a kernel; the one-hot columns are
+    only scaled, keeping their zeros. The output stays CSR, the centered columns first.
+
+    Args:
+        X (scipy.sparse matrix): Training features
+        min_density (float): Fraction of non-zero rows from which a column is centered
+
+    Returns:
+        ColumnTransformer: Unfitted scaler made of scikit-learn parts and utils functions, so it unpickles
+            wherever the serving code runs; it also takes dense rows
+    """
+    density = sp.csr_matrix(X).getnnz(axis=0) / max(X.shape[0], 1)
+    centered = np.flatnonzero(density >= min_density).tolist()
+    scaled = np.flatnonzero(density < min_density).tolist()
+    return ColumnTransformer([
+        ('centered', make_pipeline(FunctionTransformer(to_dense_array, accept_sparse=True), StandardScaler()), centered),
+        ('scaled', StandardScaler(with_mean=False), scaled)
+    ], sparse_threshold=1.0)
+
+def densify_features(X):
+    """
+    Args:
+        X (pandas.DataFrame): Features, possibly with sparse one-hot columns
+    
+    Returns:
+        pandas.DataFrame: The features with every sparse column stored densely, for the models that need dense input
+    """
+    sparse_columns = {col: dtype.subtype for col, dtype in X.dtypes.items() if isinstance(dtype, pd.SparseDtype)}
+    return X.astype(sparse_columns) if sparse_columns else X
+
 def split_data(df, target_column='Price', test_size=0.2, random_state=42):
     """
     Args:
@@ -78,16 +181,92 @@ def split_data(df, target_column='Price', test_size=0.2, random_state=42):
     
     return X_train, X_test, y_train, y_test
 
-def save_model_and_features(model, X_train, model_name, save_dir='./backend/models/saved_models/'):
+def get_search_metrics(search):
+    """
+    Args:
+        search: Fitted GridSearchCV (or other scikit-learn search)
+    
+    Returns:
+        dict: Best cross-validated score, its scoring and the time of the final refit
+    """
+    return {
+        'cv_best_score': search.best_score_,
+        'cv_scoring': search.scoring,
+        'refit_time': getattr(search, 'refit_time_', None)
+    }
+
+def summarize_cv_results(search):
+    """
+    Args:
+        search: Fitted GridSearchCV (or other scikit-learn search)
+    
+    Returns:
+        dict: Per-candidate parameters, fit and score times and test scores from cv_results_,
+              as JSON-serializable lists
+    """
+    results = search.cv_results_
+    summary = {
+        'scoring': search.scoring,
+        'n_splits': search.n_splits_,
+        'refit_time': getattr(search, 'refit_time_', None),
+        'best_index': int(search.best_index_),
+        'params': [
+            {key: value.item() if isinstance(value, np.generic) else value for key, value in params.items()}
+            for params in results['params']
+        ]
+    }
+    for key in ['mean_fit_time', 'std_fit_time', 'mean_score_time', 'std_score_time',
+                'mean_test_score', 'std_test_score', 'rank_test_score', 'n_resources', 'iter']:
+        if key in results:
+            summary[key] = np.asarray(results[key]).tolist()
+    return summary
+
+def get_cv_results_path(model_name, save_dir):
+    """
+    Args:
+        model_name (str): Name of the model
+        save_dir (str): Directory the model is saved in
+    
+    Returns:
+        str: Path of the model's saved CV results
+    """
+    return f'{save_dir}/lhp_{model_name}_cv_results.json'
+
+def load_cv_results(model_name, save_dir='./backend/models/saved_models/'):
+    """
+    Args:
+        model_name (str): Name of the model
+        save_dir (str): Directory the model is saved in
+    
+    Returns:
+        dict or None: CV results saved with the model, or None if there are none
+    """
+    cv_results_path = get_cv_results_path(model_name, save_dir)
+    if not os.path.isfile(cv_results_path):
+        return None
+    try:
+        with open(cv_results_path, 'r') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Error loading CV results for {model_name}: {e}")
+        return None
+
+def save_model_and_features(model, X_train, model_name, save_dir='./backend/models/saved_models/',
+                            training_time=None, metrics=None, cv_results=None, sparse_input=False):
     """
     Args:
         model: Trained scikit-learn model
         X_train (pandas.DataFrame): Training features dataframe
         model_name (str): Name to use for saving the model
         save_dir (str): Directory path to save model and feature files
+        training_time (float, optional): Training time in seconds, recorded in the manifest
+        metrics (dict, optional): Training metrics, recorded in the manifest
+        cv_results (dict, optional): Search results from summarize_cv_results, saved next to the model
+        sparse_input (bool): Whether the model was fitted on the CSR form of X_train, recorded in the
+            manifest so serving encodes its input sparse too
     
     Returns:
-        None: Saves model and feature files to disk
+        None: Saves model and feature files to disk and updates the model manifest
     """
     os.makedirs(save_dir, exist_ok=True)
     
@@ -106,267 +285,505 @@ def save_model_and_features(model, X_train, model_name, save_dir='./backend/mode
     common_feature_filename = f'{save_dir}/feature_list.pkl'
     joblib.dump(feature_list, common_feature_filename)
     print(f"Common feature list saved to {common_feature_filename}")
+    
+    # Keep the per-candidate fit and score times of the search
+    if cv_results is not None:
+        cv_results_filename = get_cv_results_path(model_name, save_dir)
+        write_json_atomic(cv_results, cv_results_filename, indent=2)
+        print(f"CV results for {model_name} saved to {cv_results_filename}")
+    
+    # Index the model in the manifest used by listing and metadata lookups
+    entry = build_manifest_entry(
+        model, model_name, model_filename, feature_list,
+        features_path=feature_filename,
+        training_time=training_time,
+        metrics=metrics,
+        sparse_input=sparse_input
+    )
+    update_manifest(save_dir, entry)
+    print(f"Manifest entry for {model_name} updated")
 
-def train_random_forest(X_train, y_train, save_dir=None):
+def fit_random_forest(X_train, y_train, n_jobs=-1, estimator_n_jobs=None, search='grid', max_fits=None, cv_splits=None):
     """
     Args:
         X_train (pandas.DataFrame): Training features
         y_train (pandas.Series): Training target values
-        save_dir (str, optional): Directory to save model and features
+        n_jobs (int): Parallel grid search workers
+        estimator_n_jobs (int, optional): Threads each forest builds its trees with
+        search (str): Hyperparameter search strategy, see model_search.SEARCH_STRATEGIES
+        max_fits (int, optional): Fit budget of the budgeted search strategies
+        cv_splits (list, optional): Cached (train, test) folds to search on, see model_search.select_cv
     
     Returns:
-        RandomForestRegressor: Trained Random Forest model with optimized hyperparameters
+        tuple: (RandomForestRegressor with optimized hyperparameters, training time in seconds, metrics, CV results)
     """
-    # Define the parameter grid for GridSearchCV
-    param_grid = {
-        'n_estimators': [50, 100, 200],
-        'max_depth': [None, 10, 20, 30],
-        'min_samples_split': [2, 5, 10]
-    }
-    
-    # Perform grid search with cross-validation
-    rf_cv = GridSearchCV(
-        RandomForestRegressor(random_state=42), 
-        param_grid=param_grid,
-        cv=5, 
-        scoring='neg_mean_squared_error',
-        n_jobs=-1
+    # Perform the hyperparameter search with cross-validation
+    rf_cv = build_search(
+        search,
+        RandomForestRegressor(random_state=42, n_jobs=estimator_n_jobs),
+        'random_forest', n_jobs=n_jobs, max_fits=max_fits, cv_splits=cv_splits
     )
     
+    start_time = time.time()
     rf_cv.fit(X_train, y_train)
     
     print(f"Best parameters for Random Forest: {rf_cv.best_params_}")
+    training_time = time.time() - start_time
     
-    # Train the model with the best parameters
-    best_model = RandomForestRegressor(**rf_cv.best_params_, random_state=42)
-    best_model.fit(X_train, y_train)
+    # The search has already refitted the best parameters on the whole training set
+    return rf_cv.best_estimator_, training_time, get_search_metrics(rf_cv), summarize_cv_results(rf_cv)
+
+def train_random_forest(X_train, y_train, save_dir=None, n_jobs=-1, search='grid', max_fits=None, cv_splits=None):
+    """
+    Args:
+        X_train (pandas.DataFrame): Training features
+        y_train (pandas.Series): Training target values
+        save_dir (str, optional): Directory to save model and features
+        n_jobs (int): Parallel grid search workers
+        search (str): Hyperparameter search strategy, see model_search.SEARCH_STRATEGIES
+        max_fits (int, optional): Fit budget of the budgeted search strategies
+        cv_splits (list, optional): Cached (train, test) folds to search on, see model_search.select_cv
+    
+    Returns:
+        RandomForestRegressor: Trained Random Forest model with optimized hyperparameters
+    """
+    best_model, training_time, metrics, cv_results = fit_random_forest(
+        X_train, y_train, n_jobs=n_jobs, search=search, max_fits=max_fits, cv_splits=cv_splits
+    )
     
     # Save the model if a path is provided
     if save_dir:
-        save_model_and_features(best_model, X_train, "random_forest", save_dir)
+        save_model_and_features(
+            best_model, X_train, "random_forest", save_dir,
+            training_time=training_time, metrics=metrics, cv_results=cv_results
+        )
     
     return best_model
 
-def train_decision_tree(X_train, y_train, save_dir=None):
+def fit_decision_tree(X_train, y_train, n_jobs=-1, search='grid', max_fits=None, cv_splits=None):
     """
     Args:
         X_train (pandas.DataFrame): Training features
         y_train (pandas.Series): Training target values
-        save_dir (str, optional): Directory to save model and features
+        n_jobs (int): Parallel grid search workers
+        search (str): Hyperparameter search strategy, see model_search.SEARCH_STRATEGIES
+        max_fits (int, optional): Fit budget of the budgeted search strategies
+        cv_splits (list, optional): Cached (train, test) folds to search on, see model_search.select_cv
     
     Returns:
-        DecisionTreeRegressor: Trained Decision Tree model with optimized hyperparameters
+        tuple: (DecisionTreeRegressor with optimized hyperparameters, training time in seconds, metrics, CV results)
     """
-    param_grid = {
-        'max_depth': [3, 5, 7, 10, None],
-        'min_samples_split': [2, 5, 10]
-    }
-    
-    dt_cv = GridSearchCV(
+    dt_cv = build_search(
+        search,
         DecisionTreeRegressor(random_state=42),
-        param_grid=param_grid,
-        cv=5,
-        scoring='neg_mean_squared_error',
-        n_jobs=-1
+        'decision_tree', n_jobs=n_jobs, max_fits=max_fits, cv_splits=cv_splits
     )
     
+    start_time = time.time()
     dt_cv.fit(X_train, y_train)
     print(f"Best parameters for Decision Tree: {dt_cv.best_params_}")
+    training_time = time.time() - start_time
     
-    best_model = DecisionTreeRegressor(**dt_cv.best_params_, random_state=42)
-    best_model.fit(X_train, y_train)
+    # The search has already refitted the best parameters on the whole training set
+    return dt_cv.best_estimator_, training_time, get_search_metrics(dt_cv), summarize_cv_results(dt_cv)
+
+def train_decision_tree(X_train, y_train, save_dir=None, n_jobs=-1, search='grid', max_fits=None, cv_splits=None):
+    """
+    Args:
+        X_train (pandas.DataFrame): Training features
+        y_train (pandas.Series): Training target values
+        save_dir (str, optional): Directory to save model and features
+        n_jobs (int): Parallel grid search workers
+        search (str): Hyperparameter search strategy, see model_search.SEARCH_STRATEGIES
+        max_fits (int, optional): Fit budget of the budgeted search strategies
+        cv_splits (list, optional): Cached (train, test) folds to search on, see model_search.select_cv
+    
+    Returns:
+        DecisionTreeRegressor: Trained Decision Tree model with optimized hyperparameters
+    """
+    best_model, training_time, metrics, cv_results = fit_decision_tree(
+        X_train, y_train, n_jobs=n_jobs, search=search, max_fits=max_fits, cv_splits=cv_splits
+    )
     
     if save_dir:
-        save_model_and_features(best_model, X_train, "decision_tree", save_dir)
+        save_model_and_features(
+            best_model, X_train, "decision_tree", save_dir,
+            training_time=training_time, metrics=metrics, cv_results=cv_results
+        )
     
     return best_model
 
-def train_ridge(X_train, y_train, save_dir=None):
+def fit_ridge(X_train, y_train, n_jobs=-1, search='grid', max_fits=None, cv_splits=None):
     """
     Args:
-        X_train (pandas.DataFrame): Training features
+        X_train (pandas.DataFrame or scipy.sparse.csr_matrix): Training features
         y_train (pandas.Series): Training target values
-        save_dir (str, optional): Directory to save model and features
+        n_jobs (int): Parallel grid search workers
+        search (str): Hyperparameter search strategy, see model_search.SEARCH_STRATEGIES
+        max_fits (int, optional): Fit budget of the budgeted search strategies
+        cv_splits (list, optional): Cached (train, test) folds to search on, see model_search.select_cv
     
     Returns:
-        Ridge: Trained Ridge Regression model with optimized alpha parameter
+        tuple: (Ridge with optimized alpha parameter, training time in seconds, metrics, CV results)
     """
-    param_grid = {
-        'alpha': np.logspace(-3, 3, 10)
-    }
-    
-    ridge_cv = GridSearchCV(
-        Ridge(random_state=42),
-        param_grid=param_grid,
-        cv=5,
-        scoring='neg_mean_squared_error',
-        n_jobs=-1
+    ridge_cv = build_search(
+        search,
+        Ridge(random_state=42, tol=SPARSE_RIDGE_TOL) if sp.issparse(X_train) else Ridge(random_state=42),
+        'ridge', n_jobs=n_jobs, max_fits=max_fits, cv_splits=cv_splits
     )
     
+    start_time = time.time()
     ridge_cv.fit(X_train, y_train)
     print(f"Best parameters for Ridge: {ridge_cv.best_params_}")
+    training_time = time.time() - start_time
+    
+    # The search has already refitted the best parameters on the whole training set
+    return ridge_cv.best_estimator_, training_time, get_search_metrics(ridge_cv), summarize_cv_results(ridge_cv)
+
+def train_ridge(X_train, y_train, save_dir=None, n_jobs=-1, search='grid', max_fits=None, cv_splits=None, sparse=False):
+    """
+    Args:
+        X_train (pandas.DataFrame): Training features
+        y_train (pandas.Series): Training target values
+        save_dir (str, optional): Directory to save model and features
+        n_jobs (int): Parallel grid search workers
+        search (str): Hyperparameter search strategy, see model_search.SEARCH_STRATEGIES
+        max_fits (int, optional): Fit budget of the budgeted search strategies
+        cv_splits (list, optional): Cached (train, test) folds to search on, see model_search.select_cv
+        sparse (bool): Fit on the CSR form of X_train instead of the dense features
     
-    # Train final model with best parameters
-    best_model = Ridge(alpha=ridge_cv.best_params_['alpha'], random_state=42)
-    best_model.fit(X_train, y_train)
+    Returns:
+        Ridge: Trained Ridge Regression model with optimized alpha parameter
+    """
+    best_model, training_time, metrics, cv_results = fit_ridge(
+        to_sparse_matrix(X_train) if sparse else X_train, y_train,
+        n_jobs=n_jobs, search=search, max_fits=max_fits, cv_splits=cv_splits
+    )
     
     if save_dir:
-        save_model_and_features(best_model, X_train, "ridge", save_dir)
+        save_model_and_features(
+            best_model, X_train, "ridge", save_dir,
+            training_time=training_time, metrics=metrics, cv_results=cv_results,
+            sparse_input=sparse
+        )
     
     return best_model
 
-def train_lasso(X_train, y_train, save_dir=None):
+def fit_lasso(X_train, y_train, n_jobs=-1, search='grid', max_fits=None, cv_splits=None):
     """
     Args:
-        X_train (pandas.DataFrame): Training features
+        X_train (pandas.DataFrame or scipy.sparse.csr_matrix): Training features
         y_train (pandas.Series): Training target values
-        save_dir (str, optional): Directory to save model and features
+        n_jobs (int): Parallel grid search workers
+        search (str): Hyperparameter search strategy, see model_search.SEARCH_STRATEGIES
+        max_fits (int, optional): Fit budget of the budgeted search strategies
+        cv_splits (list, optional): Cached (train, test) folds to search on, see model_search.select_cv
     
     Returns:
-        Lasso: Trained Lasso Regression model with optimized alpha parameter
+        tuple: (Lasso with optimized alpha parameter, training time in seconds, metrics, CV results)
     """
-    param_grid = {
-        'alpha': np.logspace(-3, 3, 10) 
-    }
-    
     # Convergence settings
-    lasso_cv = GridSearchCV(
+    lasso_cv = build_search(
+        search,
         Lasso(
             max_iter=50000,  
             tol=0.01,        
             selection='random',
             random_state=42
         ),
-        param_grid=param_grid,
-        cv=5,
-        scoring='neg_mean_squared_error',
-        n_jobs=-1
+        'lasso', n_jobs=n_jobs, max_fits=max_fits, cv_splits=cv_splits
     )
     
+    start_time = time.time()
     lasso_cv.fit(X_train, y_train)
     print(f"Best parameters for Lasso: {lasso_cv.best_params_}")
+    training_time = time.time() - start_time
+    
+    # The search has already refitted the best parameters on the whole training set
+    return lasso_cv.best_estimator_, training_time, get_search_metrics(lasso_cv), summarize_cv_results(lasso_cv)
+
+def train_lasso(X_train, y_train, save_dir=None, n_jobs=-1, search='grid', max_fits=None, cv_splits=None, sparse=False):
+    """
+    Args:
+        X_train (pandas.DataFrame): Training features
+        y_train (pandas.Series): Training target values
+        save_dir (str, optional): Directory to save model and features
+        n_jobs (int): Parallel grid search workers
+        search (str): Hyperparameter search strategy, see model_search.SEARCH_STRATEGIES
+        max_fits (int, optional): Fit budget of the budgeted search strategies
+        cv_splits (list, optional): Cached (train, test) folds to search on, see model_search.select_cv
+        sparse (bool): Fit on the CSR form of X_train instead of the dense features
     
-    best_model = Lasso(
-        alpha=lasso_cv.best_params_['alpha'],
-        max_iter=100000,  
-        tol=0.01,
-        selection='random',
-        random_state=42
+    Returns:
+        Lasso: Trained Lasso Regression model with optimized alpha parameter
+    """
+    best_model, training_time, metrics, cv_results = fit_lasso(
+        to_sparse_matrix(X_train) if sparse else X_train, y_train,
+        n_jobs=n_jobs, search=search, max_fits=max_fits, cv_splits=cv_splits
     )
-    best_model.fit(X_train, y_train)
     
     if save_dir:
-        save_model_and_features(best_model, X_train, "lasso", save_dir)
+        save_model_and_features(
+            best_model, X_train, "lasso", save_dir,
+            training_time=training_time, metrics=metrics, cv_results=cv_results,
+            sparse_input=sparse
+        )
     
     return best_model
 
-def train_linear(X_train, y_train, save_dir=None):
+def fit_linear(X_train, y_train, n_jobs=-1, search='grid', max_fits=None, cv_splits=None):
     """
     Args:
-        X_train (pandas.DataFrame): Training features
+        X_train (pandas.DataFrame or scipy.sparse.csr_matrix): Training features
         y_train (pandas.Series): Training target values
-        save_dir (str, optional): Directory to save model and features
+        n_jobs (int): Parallel jobs of the fit
+        search (str): Unused, the linear model has no hyperparameters to search
+        max_fits (int, optional): Unused
+        cv_splits (list, optional): Unused
     
     Returns:
-        LinearRegression: Trained Linear Regression model
+        tuple: (LinearRegression, training time in seconds, metrics, CV results)
     """
     
     model = LinearRegression(
         fit_intercept=True,  
-        n_jobs=-1             
+        n_jobs=n_jobs             
     )
     
     print("Training simple Linear Regression model...")
-    model.fit(X_train, y_train)
+    start_time = time.time()
+    if sp.issparse(X_train):
+        # The sparse least-squares solver is iterative and converges on standardized features
+        model = fit_standardized_linear_model(model, X_train, y_train)
+    else:
+        model.fit(X_train, y_train)
+    training_time = time.time() - start_time
+    
+    return model, training_time, None, None
+
+def train_linear(X_train, y_train, save_dir=None, n_jobs=-1, search='grid', max_fits=None, cv_splits=None, sparse=False):
+    """
+    Args:
+        X_train (pandas.DataFrame): Training features
+        y_train (pandas.Series): Training target values
+        save_dir (str, optional): Directory to save model and features
+        n_jobs (int): Parallel jobs of the fit
+        search (str): Unused, the linear model has no hyperparameters to search
+        max_fits (int, optional): Unused
+        cv_splits (list, optional): Unused
+        sparse (bool): Fit on the CSR form of X_train instead of the dense features
+    
+    Returns:
+        LinearRegression: Trained Linear Regression model
+    """
+    model, training_time, metrics, cv_results = fit_linear(
+        to_sparse_matrix(X_train) if sparse else X_train, y_train,
+        n_jobs=n_jobs, search=search, max_fits=max_fits, cv_splits=cv_splits
+    )
     
     if save_dir:
-        save_model_and_features(model, X_train, "linear", save_dir)
+        save_model_and_features(
+            model, X_train, "linear", save_dir,
+            training_time=training_time, metrics=metrics, cv_results=cv_results,
+            sparse_input=sparse
+        )
     
     return model
 
-def train_svr(X_train, y_train, save_dir=None):
+# The exact SVR's kernel matrix grows with the square of the rows; above this many
+# it is approximated with Nystroem components and a linear solver
+SVR_EXACT_MAX_ROWS = 20000
+NYSTROEM_COMPONENTS = 1000
+SVR_MODES = ['exact', 'nystroem']
+
+def get_svr_mode(n_rows, mode='auto'):
     """
     Args:
-        X_train (pandas.DataFrame): Training features
+        n_rows (int): Training rows
+        mode (str): 'exact', 'nystroem', or 'auto' to pick by the number of rows
+
+    Returns:
+        str: 'exact' or 'nystroem'
+    """
+    if mode == 'auto':
+        return 'exact' if n_rows <= SVR_EXACT_MAX_ROWS else 'nystroem'
+    if mode not in SVR_MODES:
+        raise ValueError(f"Unknown SVR mode {mode!r}; expected 'auto' or one of {SVR_MODES}")
+    return mode
+
+def build_svr_pipeline(mode='exact', n_components=NYSTROEM_COMPONENTS, random_state=42, X_sparse=None):
+    """
+    Build the SVR with its scaling built in.
+
+    Both the features and the target are standardized, so the kernel sees comparable
+    features and C and epsilon apply to prices in standard deviations; the prediction
+    is transformed back to euros.
+
+    Args:
+        mode (str): 'exact' for a kernel SVR, 'nystroem' for Nystroem components and a LinearSVR
+        n_components (int): Nystroem components of the approximation
+        random_state (int): Seed of the approximation
+        X_sparse (scipy.sparse matrix, optional): Sparse training features, standardized with
+            build_sparse_scaler instead so they stay sparse
+
+    Returns:
+        TransformedTargetRegressor: Unfitted pipeline, its SVR parameters under 'regressor__'
+    """
+    scaler = StandardScaler() if X_sparse is None else build_sparse_scaler(X_sparse)
+    if mode == 'nystroem':
+        steps = [
+            ('scaler', scaler),
+            ('nystroem', Nystroem(n_components=n_components, random_state=random_state)),
+            # The primal Newton solver of the squared loss keeps its cost flat in C, where the
+            # dual solver of the plain epsilon-insensitive loss slows down tenfold at C=100
+            ('svr', LinearSVR(loss='squared_epsilon_insensitive', dual=False, random_state=random_state))
+        ]
+    else:
+        steps = [('scaler', scaler), ('svr', SVR())]
+    return TransformedTargetRegressor(regressor=Pipeline(steps), transformer=StandardScaler())
+
+def fit_svr(X_train, y_train, n_jobs=-1, search='grid', max_fits=None, cv_splits=None, mode='auto'):
+    """
+    Args:
+        X_train (pandas.DataFrame or scipy.sparse.csr_matrix): Training features
         y_train (pandas.Series): Training target values
-        save_dir (str, optional): Directory to save model and features
+        n_jobs (int): Parallel grid search workers
+        search (str): Hyperparameter search strategy, see model_search.SEARCH_STRATEGIES
+        max_fits (int, optional): Fit budget of the budgeted search strategies
+        cv_splits (list, optional): Cached (train, test) folds to search on, see model_search.select_cv
+        mode (str): 'exact', 'nystroem', or 'auto' for the kernel approximation above SVR_EXACT_MAX_ROWS rows
     
     Returns:
-        SVR: Trained Support Vector Regression model with optimized hyperparameters
-    """
-    # Simple parameter set
-    param_grid = {
-        'C': [1.0, 10.0, 100.0],
-        'gamma': ['scale', 0.1],
-        'kernel': ['rbf', 'linear'],
-        'epsilon': [0.01, 0.1]
-    }
-    
-    svr_cv = GridSearchCV(
-        SVR(),
-        param_grid=param_grid,
-        cv=2,                    
-        scoring='neg_mean_squared_error',
-        n_jobs=-1,
-        verbose=1               
+        tuple: (Standardized SVR pipeline with optimized hyperparameters, training time in seconds, metrics, CV results)
+    """
+    mode = get_svr_mode(X_train.shape[0], mode)
+    svr_cv = build_search(
+        search,
+        build_svr_pipeline(mode, X_sparse=X_train if sp.issparse(X_train) else None),
+        'svr' if mode == 'exact' else 'svr_nystroem', n_jobs=n_jobs, max_fits=max_fits, cv_splits=cv_splits, verbose=1
     )
     
-    print("Starting SVR grid search. This may take a few minutes...")
+    print(f"Starting {mode} SVR {search} search. This may take a few minutes...")
+    start_time = time.time()
     svr_cv.fit(X_train, y_train)
     print(f"Best parameters for SVR: {svr_cv.best_params_}")
+    training_time = time.time() - start_time
     
-    best_model = SVR(**svr_cv.best_params_)
-    best_model.fit(X_train, y_train)
+    metrics = get_search_metrics(svr_cv)
+    metrics['svr_mode'] = mode
+    # The search has already refitted the best parameters on the whole training set
+    return svr_cv.best_estimator_, training_time, metrics, summarize_cv_results(svr_cv)
+
+def train_svr(X_train, y_train, save_dir=None, n_jobs=-1, search='grid', max_fits=None, cv_splits=None, mode='auto', sparse=False):
+    """
+    Args:
+        X_train (pandas.DataFrame): Training features
+        y_train (pandas.Series): Training target values
+        save_dir (str, optional): Directory to save model and features
+        n_jobs (int): Parallel grid search workers
+        search (str): Hyperparameter search strategy, see model_search.SEARCH_STRATEGIES
+        max_fits (int, optional): Fit budget of the budgeted search strategies
+        cv_splits (list, optional): Cached (train, test) folds to search on, see model_search.select_cv
+        mode (str): 'exact', 'nystroem', or 'auto' for the kernel approximation above SVR_EXACT_MAX_ROWS rows
+        sparse (bool): Fit on the CSR form of X_train instead of the dense features
+    
+    Returns:
+        TransformedTargetRegressor: Trained standardized Support Vector Regression pipeline with optimized hyperparameters
+    """
+    best_model, training_time, metrics, cv_results = fit_svr(
+        to_sparse_matrix(X_train) if sparse else X_train, y_train,
+        n_jobs=n_jobs, search=search, max_fits=max_fits, cv_splits=cv_splits, mode=mode
+    )
     
     if save_dir:
-        save_model_and_features(best_model, X_train, "svr", save_dir)
+        save_model_and_features(
+            best_model, X_train, "svr", save_dir,
+            training_time=training_time, metrics=metrics, cv_results=cv_results,
+            sparse_input=sparse
+        )
     
     return best_model
 
-def train_all_models(X_train, y_train, save_dir=None):
+# Search functions by model name, in training order; each returns (model, training time, metrics, CV results)
+MODEL_FITTERS = {
+    'random_forest': fit_random_forest,
+    'decision_tree': fit_decision_tree,
+    'ridge': fit_ridge,
+    'lasso': fit_lasso,
+    'linear': fit_linear,
+    'svr': fit_svr
+}
+
+def train_all_models(X_train, y_train, save_dir=None, n_jobs=None, search='grid', max_fits=None, sparse=False,
+                     encodings=None, cv_splits=None):
     """
     Args:
         X_train (pandas.DataFrame): Training features
         y_train (pandas.Series): Training target values
         save_dir (str, optional): Directory to save models and features
+        n_jobs (int, optional): Core budget for training the models concurrently with
+            the scheduler in model_scheduler (-1 for all cores); when None the models are
+            trained one after another, each search using every core
+        search (str): Hyperparameter search strategy, see model_search.SEARCH_STRATEGIES
+        max_fits (int, optional): Fit budget of the budgeted search strategies
+        sparse (bool): Fit the SPARSE_MODELS on the CSR form of X_train; the trees get it dense
+        encodings (dict, optional): Lookup table X_train's compact columns were encoded with (see
+            encode_compact_categories), saved next to the models for serving
+        cv_splits (list, optional): Cached (train, test) folds of X_train from load_modeling_data; the
+            searches of the models cross-validated on as many folds use them, see model_search.select_cv
     
     Returns:
         dict: Dictionary of trained models with model names as keys
     """
+    if encodings is not None and save_dir:
+        save_category_encodings(encodings, save_dir)
+    
+    if n_jobs is not None:
+        from model_scheduler import train_models_concurrently
+        models, _ = train_models_concurrently(X_train, y_train, save_dir, n_jobs=n_jobs, search=search, max_fits=max_fits,
+                                              sparse=sparse, cv_splits=cv_splits)
+        return models
+    
+    search_options = {'search': search, 'max_fits': max_fits, 'cv_splits': cv_splits}
+    sparse_options = {**search_options, 'sparse': sparse}
+    # The trees need dense features; the sparse-capable models convert X_train to CSR themselves
+    X_dense = densify_features(X_train)
+    X_linear = X_train if sparse else X_dense
+    
     models = {}
     
     print("\nTraining Random Forest model...")
-    models['random_forest'] = train_random_forest(X_train, y_train, save_dir)
+    models['random_forest'] = train_random_forest(X_dense, y_train, save_dir, **search_options)
     
     print("\nTraining Decision Tree model...")
-    models['decision_tree'] = train_decision_tree(X_train, y_train, save_dir)
+    models['decision_tree'] = train_decision_tree(X_dense, y_train, save_dir, **search_options)
     
     print("\nTraining Ridge Regression model...")
-    models['ridge'] = train_ridge(X_train, y_train, save_dir)
+    models['ridge'] = train_ridge(X_linear, y_train, save_dir, **sparse_options)
     
     print("\nTraining Lasso Regression model...")
-    models['lasso'] = train_lasso(X_train, y_train, save_dir)
+    models['lasso'] = train_lasso(X_linear, y_train, save_dir, **sparse_options)
     
     print("\nTraining Linear Regression model...")
-    models['linear'] = train_linear(X_train, y_train, save_dir)
+    models['linear'] = train_linear(X_linear, y_train, save_dir, **sparse_options)
     
     print("\nTraining SVR model...")
-    models['svr'] = train_svr(X_train, y_train, save_dir)
+    models['svr'] = train_svr(X_linear, y_train, save_dir, **sparse_options)
     
     return models
 
 def main():
     @log_model_operation
     def run_training():
-        df = load_processed_data()
-        if df is None:
-            return
+        from model_data_cache import load_modeling_data
         
-        model_df = prepare_data_for_modeling(df)
-        X_train, X_test, y_train, y_test = split_data(model_df)
+        modeling_data = load_modeling_data()
+        if modeling_data is None:
+            return
+        X_train, X_test, y_train, y_test, cv_splits = modeling_data
         
         save_dir = './backend/models/saved_models/'
-        models = train_all_models(X_train, y_train, save_dir)
+        models = train_all_models(X_train, y_train, save_dir, n_jobs=-1, search='path', cv_splits=cv_splits)
         
         print("All models trained and saved successfully!")
         return models, X_train, X_test, y_train, y_test
@@ -2,6 +2,14 @@ from flask import Blueprint, jsonify, request
 import os
 import pandas as pd
 import json
+import joblib
+from utils.cache_utils import VersionedCache, get_file_version
+from utils.data_utils import (
+    compute_data_summary, load_data_summary, read_table, find_processed_data_file, summary_from_profile
+)
+from utils.profile_utils import load_profile
+from utils.manifest_utils import get_manifest_version, list_manifest_models, get_manifest_entry
+from .http_cache import etag_cached
 
 # Create a blueprint for data routes
 data_bp = Blueprint('data', __name__)
@@ -16,7 +24,74 @@ os.makedirs(DATA_DIR, exist_ok=True)
 os.makedirs(MODELS_DIR, exist_ok=True)
 os.makedirs(VISUALS_DIR, exist_ok=True)
 
+# Data summaries kept in memory until the processed data file changes
+_summary_cache = VersionedCache()
+
+def get_cached_data_summary(data_file):
+    """
+    Get the summary of a processed data file, parsing the file only when needed.
+    
+    The summary is taken from the in-memory cache while the file's mtime and size
+    are unchanged, then from the JSON sidecar written by save_processed_data or the
+    profile written by the preprocessing pipeline, and only as a last resort
+    computed from the data file itself. Per-column profiles are attached when a
+    profile exists.
+    """
+    def compute():
+        profile = load_profile(data_file)
+        summary = load_data_summary(data_file)
+        if summary is None and profile is not None:
+            summary = summary_from_profile(profile)
+        if summary is None:
+            summary = compute_data_summary(read_table(data_file, typed=True))
+        
+        column_profiles = None
+        if profile is not None:
+            column_profiles = {
+                col: {key: value for key, value in column_profile.items() if key != 'value_counts'}
+                for col, column_profile in profile['columns'].items()
+            }
+        return dict(summary, column_profiles=column_profiles)
+    
+    return _summary_cache.get_or_compute(data_file, get_file_version(data_file), compute)
+
+def get_data_file():
+    """Path of the processed data, preferring the columnar store over the CSV export."""
+    return find_processed_data_file(DATA_DIR)
+
+def get_data_version():
+    """Version of the processed data file, used to validate cached responses."""
+    return get_file_version(get_data_file())
+
+def get_models_version():
+    """Version of the model manifest, or of the directory listing for models saved without one."""
+    manifest_version = get_manifest_version(MODELS_DIR)
+    if manifest_version is not None:
+        return manifest_version
+    return get_file_version(MODELS_DIR)
+
+def get_features_version(model_name):
+    """Version of the manifest or feature files a model's feature list may be read from."""
+    manifest_version = get_manifest_version(MODELS_DIR)
+    if manifest_version is not None:
+        return manifest_version
+    
+    specific_version = get_file_version(os.path.join(MODELS_DIR, f'lhp_{model_name}_features.pkl'))
+    common_version = get_file_version(os.path.join(MODELS_DIR, 'feature_list.pkl'))
+    if specific_version is None and common_version is None:
+        return None
+    return (specific_version, common_version)
+
+def get_performance_version():
+    """Version of the performance metrics file and the visuals it falls back to."""
+    performance_version = get_file_version(os.path.join(MODELS_DIR, 'model_performance.json'))
+    visuals_version = get_file_version(VISUALS_DIR)
+    if performance_version is None and visuals_version is None:
+        return None
+    return (performance_version, visuals_version)
+
 @data_bp.route('/model-list', methods=['GET'])
+@etag_cached(get_models_version)
 def get_model_list():
     """Endpoint to get list of available models."""
     try:
@@ -27,12 +102,16 @@ def get_model_list():
                 'status': 'No models directory found'
             })
             
-        # Filter model files (exclude feature files)
-        model_files = [
-            f.replace('lhp_', '').replace('.pkl', '') 
-            for f in os.listdir(MODELS_DIR) 
-            if f.startswith('lhp_') and f.endswith('.pkl') and not f.endswith('_features.pkl')
-        ]
+        # Prefer the manifest written at save time over scanning the directory
+        model_files = list_manifest_models(MODELS_DIR)
+        
+        # Without a manifest, filter model files (exclude feature files)
+        if model_files is None:
+            model_files = [
+                f.replace('lhp_', '').replace('.pkl', '') 
+                for f in os.listdir(MODELS_DIR) 
+                if f.startswith('lhp_') and f.endswith('.pkl') and not f.endswith('_features.pkl')
+            ]
         
         if not model_files:
             return jsonify({
@@ -55,6 +134,7 @@ def get_model_list():
         }), 500
 
 @data_bp.route('/model-features/<model_name>', methods=['GET'])
+@etag_cached(get_features_version)
 def get_model_features(model_name):
     """Endpoint to get features used by a specific model."""
     try:
@@ -65,6 +145,16 @@ def get_model_features(model_name):
                 'feature_count': 0,
                 'status': 'no_models_directory'
             }), 404
+        
+        # Feature lists are recorded in the manifest, so no unpickling is needed
+        entry = get_manifest_entry(MODELS_DIR, model_name)
+        if entry is not None:
+            return jsonify({
+                'model': model_name,
+                'features': entry['features'],
+                'feature_count': len(entry['features']),
+                'status': 'success'
+            })
             
         # First try model-specific features
         features_path = os.path.join(MODELS_DIR, f'lhp_{model_name}_features.pkl')
@@ -88,7 +178,6 @@ def get_model_features(model_name):
                 'status': 'fallback_features'
             })
             
-        import joblib
         feature_names = joblib.load(features_path)
         
         return jsonify({
@@ -106,10 +195,11 @@ def get_model_features(model_name):
         }), 500
 
 @data_bp.route('/data-summary', methods=['GET'])
+@etag_cached(get_data_version)
 def get_data_summary():
     """Endpoint to get summary statistics of the training data."""
     try:
-        data_file = os.path.join(DATA_DIR, 'lisbon_houses_processed.csv')
+        data_file = get_data_file()
         
         if not os.path.exists(data_file):
             return jsonify({
@@ -130,27 +220,15 @@ def get_data_summary():
                            'Parish', 'PropertyType', 'PropertySubType', 'Condition', 'Parking']
             })
             
-        df = pd.read_csv(data_file)
-        
-        # Generate basic statistics
-        numeric_cols = df.select_dtypes(include=['number']).columns
-        stats = df[numeric_cols].describe().to_dict()
-        
-        # Count categorical values for important columns
-        categorical_summary = {}
-        categorical_cols = ['Parish', 'PropertyType', 'PropertySubType', 'Condition']
-        
-        for col in categorical_cols:
-            if col in df.columns:
-                value_counts = df[col].value_counts().to_dict()
-                categorical_summary[col] = value_counts
+        summary = get_cached_data_summary(data_file)
             
         return jsonify({
             'status': 'success',
-            'records_count': len(df),
-            'numeric_statistics': stats,
-            'categorical_summary': categorical_summary,
-            'columns': df.columns.tolist()
+            'records_count': summary['records_count'],
+            'numeric_statistics': summary['numeric_statistics'],
+            'categorical_summary': summary['categorical_summary'],
+            'columns': summary['columns'],
+            'column_profiles': summary.get('column_profiles')
         })
     except Exception as e:
         return jsonify({
@@ -160,10 +238,11 @@ def get_data_summary():
         }), 500
 
 @data_bp.route('/parish-list', methods=['GET'])
+@etag_cached(get_data_version)
 def get_parish_list():
     """Endpoint to get list of parishes in Lisbon with property counts."""
     try:
-        data_file = os.path.join(DATA_DIR, 'lisbon_houses_processed.csv')
+        data_file = get_data_file()
         
         if not os.path.exists(data_file):
             # Provide a list of common Lisbon parishes for frontend development
@@ -187,9 +266,9 @@ def get_parish_list():
                 'message': 'Using mock data since processed data file not found'
             })
             
-        df = pd.read_csv(data_file)
+        summary = get_cached_data_summary(data_file)
         
-        if 'Parish' not in df.columns:
+        if 'Parish' not in summary['columns']:
             return jsonify({
                 'error': 'Parish column not found in data',
                 'parishes': [],
@@ -198,7 +277,7 @@ def get_parish_list():
             }), 500
             
         # Get parish counts
-        parish_counts = df['Parish'].value_counts().to_dict()
+        parish_counts = summary['categorical_summary'].get('Parish', {})
         parishes = [{'name': parish, 'count': count} for parish, count in parish_counts.items()]
         
         return jsonify({
@@ -215,6 +294,7 @@ def get_parish_list():
         }), 500
 
 @data_bp.route('/model-performance', methods=['GET'])
+@etag_cached(get_performance_version)
 def get_model_performance():
     """Endpoint to get performance metrics for models."""
     try:
@@ -0,0 +1,64 @@
+"""
+HTTP caching helpers for the Lisbon House Price Prediction API.
+Adds strong ETags, conditional GET handling and Cache-Control headers to
+endpoints whose responses only change when their underlying files change.
+"""
+import hashlib
+import json
+from functools import wraps
+from flask import request, make_response
+
+# Let clients and proxies reuse responses briefly, then revalidate with the ETag
+CACHE_CONTROL = 'public, max-age=60, must-revalidate'
+
+def make_etag(*parts):
+    """
+    Build a strong ETag value from the parts identifying a response version.
+
+    Args:
+        *parts: JSON-serializable values such as the request path and file versions
+
+    Returns:
+        str: Hex digest usable as an ETag
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+def etag_cached(version_getter):
+    """
+    Decorator adding conditional GET support to an endpoint.
+
+    The version getter is called with the view's keyword arguments and must return
+    a fingerprint of everything the response depends on, or None when it cannot be
+    determined (in which case the view runs normally without caching headers).
+    When the client's If-None-Match matches, a 304 is returned without calling the view.
+
+    Args:
+        version_getter (callable): Function returning the response version
+
+    Example:
+        @data_bp.route('/parish-list')
+        @etag_cached(lambda: get_file_version(DATA_FILE))
+        def get_parish_list():
+            ...
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            version = version_getter(**kwargs)
+            if version is None:
+                return view(*args, **kwargs)
+
+            etag = make_etag(request.path, version)
+            if request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = CACHE_CONTROL
+            return response
+        return wrapper
+    return decorator
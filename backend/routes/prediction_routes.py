@@ -1,8 +1,11 @@
 from flask import Blueprint, request, jsonify
 import os
 import joblib
-import numpy as np
 import sys
+from utils.manifest_utils import load_manifest, get_manifest_entry
+from utils.stats_utils import load_cleaning_stats
+from utils.data_utils import preprocess_input
+from utils.encoding_utils import load_category_encodings
 
 # Create a blueprint for prediction routes
 prediction_bp = Blueprint('prediction', __name__)
@@ -41,34 +44,53 @@ except ImportError:
             return ['Bedrooms', 'Bathrooms', 'AreaNet', 'AreaGross', 'Parking', 
                     'Condition', 'PropertyType', 'PropertySubType', 'Parish']
                     
-    def predict_price(model, data, feature_names):
+    def predict_price(model, data, feature_names, model_name=None, models_dir=MODELS_DIR):
         """Fallback function to make predictions."""
         if model is None:
             # Return mock prediction
             return 350000 + (data.get('AreaNet', 80) * 1000) + (data.get('Bedrooms', 2) * 25000)
-            
-        # Very simple preprocessing
-        input_data = np.zeros(len(feature_names))
         
-        for i, feature in enumerate(feature_names):
-            if feature in data:
-                # Handle categorical features
-                if feature == 'Condition':
-                    condition_mapping = {'For Refurbishment': 1, 'Used': 2, 'As New': 3, 'New': 4}
-                    input_data[i] = condition_mapping.get(data[feature], 2)
-                elif feature == 'PropertyType':
-                    type_mapping = {'Homes': 1, 'Single Habitation': 2}
-                    input_data[i] = type_mapping.get(data[feature], 1)
-                else:
-                    input_data[i] = data[feature]
-                    
-        # Make prediction
-        return model.predict(input_data.reshape(1, -1))[0]
+        return predict_prices(model, [data], feature_names, model_name, models_dir)[0]
+
+def predict_prices(model, data, feature_names, model_name=None, models_dir=MODELS_DIR):
+    """
+    Predict the prices of several houses with one model call.
+    
+    The houses are imputed and capped with the training statistics and encoded
+    like training (sparse for models trained on sparse design matrices, with the
+    learned values of the compactly encoded categories) as one matrix.
+    
+    Args:
+        model: Trained model
+        data (list): Dictionaries of house features
+        feature_names (list): Feature names expected by the model
+        model_name (str, optional): Name of the model, to look up its input format in the manifest
+        models_dir (str): Directory containing the saved models
+        
+    Returns:
+        list: Predicted price of each house
+    """
+    entry = get_manifest_entry(models_dir, model_name) if model_name else None
+    input_data = preprocess_input(
+        data, feature_names, load_cleaning_stats(models_dir),
+        sparse=bool(entry and entry.get('sparse_input')), encodings=load_category_encodings(models_dir)
+    )
+    return [float(price) for price in model.predict(input_data)]
+
+def get_model_name(model_path):
+    """Name of a saved model, as recorded in the manifest, from its artifact path."""
+    return os.path.basename(model_path).replace('lhp_', '').replace('.pkl', '')
 
 # Find available model
 def find_model_file():
     """Find the first available model file in the models directory."""
     try:
+        # Prefer the manifest written at save time over scanning the directory
+        manifest = load_manifest(MODELS_DIR)
+        if manifest is not None and manifest['models']:
+            entry = manifest['models'].get('random_forest') or next(iter(manifest['models'].values()))
+            return os.path.join(MODELS_DIR, entry['artifact'])
+        
         if os.path.exists(DEFAULT_MODEL_PATH):
             return DEFAULT_MODEL_PATH
             
@@ -85,7 +107,7 @@ def find_features_file(model_path):
     """Find feature file corresponding to the model."""
     try:
         # Try model-specific features first
-        model_name = os.path.basename(model_path).replace('lhp_', '').replace('.pkl', '')
+        model_name = get_model_name(model_path)
         features_path = os.path.join(MODELS_DIR, f'lhp_{model_name}_features.pkl')
         
         if os.path.exists(features_path):
@@ -107,18 +129,21 @@ try:
         model = load_model(model_path)
         features_path = find_features_file(model_path)
         feature_names = load_feature_names(features_path)
+        model_name = get_model_name(model_path)
     else:
         model = None
         feature_names = None
+        model_name = None
 except Exception as e:
     print(f"Error initializing model: {e}")
     model = None
     feature_names = None
+    model_name = None
 
 @prediction_bp.route('/predict', methods=['POST'])
 def predict():
     """Endpoint to predict house price based on input features."""
-    global model, feature_names
+    global model, feature_names, model_name
     
     # Check if model is loaded
     if model is None or feature_names is None:
@@ -129,6 +154,7 @@ def predict():
                 model = load_model(model_path)
                 features_path = find_features_file(model_path)
                 feature_names = load_feature_names(features_path)
+                model_name = get_model_name(model_path)
         except Exception:
             pass
             
@@ -166,7 +192,7 @@ def predict():
     
     try:
         # Process the input data and make prediction
-        predicted_price = predict_price(model, data, feature_names)
+        predicted_price = predict_price(model, data, feature_names, model_name=model_name, models_dir=MODELS_DIR)
         
         # Return the prediction
         return jsonify({
@@ -183,7 +209,7 @@ def predict():
 @prediction_bp.route('/batch-predict', methods=['POST'])
 def batch_predict():
     """Endpoint to predict house prices for multiple inputs."""
-    global model, feature_names
+    global model, feature_names, model_name
     
     # Check if model is loaded
     if model is None or feature_names is None:
@@ -194,6 +220,7 @@ def batch_predict():
                 model = load_model(model_path)
                 features_path = find_features_file(model_path)
                 feature_names = load_feature_names(features_path)
+                model_name = get_model_name(model_path)
         except Exception:
             pass
     
@@ -230,13 +257,13 @@ def batch_predict():
                 'message': 'Model not available, using mock predictions'
             })
         
-        # Use actual model for predictions
-        for i, house_data in enumerate(data):
-            predicted_price = predict_price(model, house_data, feature_names)
+        # Preprocess and predict every house as one matrix
+        predicted_prices = predict_prices(model, data, feature_names, model_name=model_name, models_dir=MODELS_DIR)
+        for i, (house_data, predicted_price) in enumerate(zip(data, predicted_prices)):
             predictions.append({
                 'index': i,
                 'input': house_data,
-                'predicted_price': float(predicted_price),
+                'predicted_price': predicted_price,
                 'currency': 'EUR'
             })
         
@@ -253,7 +280,7 @@ def batch_predict():
 @prediction_bp.route('/model-info', methods=['GET'])
 def model_info():
     """Endpoint to get information about the model."""
-    global model, feature_names, model_module_imported
+    global model, feature_names, model_name, model_module_imported
     
     # If model is not loaded, try again
     if model is None:
@@ -263,6 +290,7 @@ def model_info():
                 model = load_model(model_path)
                 features_path = find_features_file(model_path)
                 feature_names = load_feature_names(features_path)
+                model_name = get_model_name(model_path)
         except Exception:
             pass
     
@@ -110,6 +110,23 @@ def sample_feature_names():
         'Parish_Benfica', 'PropertySubType_Apartment', 'PropertySubType_House'
     ]
 
+@pytest.fixture
+def training_rows():
+    """Rows of the training_data fixture; override this fixture in a test module to resize it."""
+    return 100
+
+@pytest.fixture
+def training_data(training_rows):
+    """Create a small linear training set of training_rows listings."""
+    rng = np.random.RandomState(0)
+    X = pd.DataFrame({
+        'AreaNet': rng.uniform(40, 200, size=training_rows),
+        'Bedrooms': rng.randint(0, 5, size=training_rows),
+        'Parking': rng.randint(0, 3, size=training_rows)
+    })
+    y = pd.Series(X['AreaNet'] * 4000 + X['Bedrooms'] * 20000 + rng.normal(0, 10000, size=training_rows), name='Price')
+    return X, y
+
 @pytest.fixture
 def temp_csv_file(sample_dataframe):
     """Create a temporary CSV file with sample data."""
@@ -119,6 +119,58 @@ class TestModelFeatures:
         assert len(data['features']) > 0
         assert 'Bedrooms' in data['features']
 
+class TestManifestLookups:
+    """Test that model listing and features are served from the manifest."""
+    
+    @pytest.fixture
+    def models_dir(self, temp_directory):
+        """Create a models directory with a manifest."""
+        manifest = {
+            'manifest_version': 1,
+            'models': {
+                'random_forest': {'name': 'random_forest', 'artifact': 'lhp_random_forest.pkl',
+                                  'features': ['Bedrooms', 'AreaNet']},
+                'ridge': {'name': 'ridge', 'artifact': 'lhp_ridge.pkl',
+                          'features': ['Bedrooms', 'AreaNet', 'Parking']}
+            }
+        }
+        with open(os.path.join(temp_directory, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f)
+        with patch('routes.data_routes.MODELS_DIR', temp_directory):
+            yield temp_directory
+    
+    @patch('routes.data_routes.os.listdir')
+    def test_model_list_from_manifest(self, mock_listdir, client, models_dir):
+        """Test that the model list does not scan the directory."""
+        response = client.get('/api/data/model-list')
+        data = json.loads(response.data)
+        
+        assert data['status'] == 'success'
+        assert data['models'] == ['random_forest', 'ridge']
+        mock_listdir.assert_not_called()
+    
+    @patch('routes.data_routes.joblib.load')
+    def test_model_features_from_manifest(self, mock_joblib, client, models_dir):
+        """Test that model features are read without unpickling."""
+        response = client.get('/api/data/model-features/ridge')
+        data = json.loads(response.data)
+        
+        assert data['status'] == 'success'
+        assert data['features'] == ['Bedrooms', 'AreaNet', 'Parking']
+        assert data['feature_count'] == 3
+        mock_joblib.assert_not_called()
+    
+    def test_model_list_etag_follows_manifest(self, client, models_dir):
+        """Test that the model list ETag changes when the manifest changes."""
+        etag = client.get('/api/data/model-list').headers['ETag']
+        
+        with open(os.path.join(models_dir, 'manifest.json'), 'w') as f:
+            json.dump({'models': {'svr': {'name': 'svr', 'artifact': 'lhp_svr.pkl', 'features': []}}}, f)
+        response = client.get('/api/data/model-list', headers={'If-None-Match': etag})
+        
+        assert response.status_code == 200
+        assert json.loads(response.data)['models'] == ['svr']
+
 class TestDataSummary:
     """Test the /data-summary endpoint."""
     
@@ -150,6 +202,70 @@ class TestDataSummary:
         assert data['status'] == 'mock_data'
         assert 'Using mock data' in data['message']
 
+@pytest.fixture
+def data_dir(sample_dataframe):
+    """Create a processed data file in a temporary data directory."""
+    from routes.data_routes import _summary_cache
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        sample_dataframe.to_csv(os.path.join(temp_dir, 'lisbon_houses_processed.csv'), index=False)
+        _summary_cache.clear()
+        with patch('routes.data_routes.DATA_DIR', temp_dir):
+            yield temp_dir
+        _summary_cache.clear()
+
+class TestSummaryCaching:
+    """Test that data summaries are computed once per data file version."""
+    
+    def test_summary_parsed_once(self, client, data_dir):
+        """Test that repeated requests reuse the cached summary."""
+        with patch('routes.data_routes.pd.read_csv', wraps=pd.read_csv) as mock_read_csv:
+            first = json.loads(client.get('/api/data/data-summary').data)
+            second = json.loads(client.get('/api/data/data-summary').data)
+            parishes = json.loads(client.get('/api/data/parish-list').data)
+        
+        assert mock_read_csv.call_count == 1
+        assert first == second
+        assert first['records_count'] == 3
+        assert parishes['total_count'] == 2
+    
+    def test_summary_invalidated_on_change(self, client, data_dir, sample_dataframe):
+        """Test that the cache is refreshed when the data file changes."""
+        client.get('/api/data/data-summary')
+        
+        sample_dataframe.iloc[:1].to_csv(os.path.join(data_dir, 'lisbon_houses_processed.csv'), index=False)
+        data = json.loads(client.get('/api/data/data-summary').data)
+        
+        assert data['records_count'] == 1
+    
+    def test_summary_served_from_sidecar(self, client, data_dir, sample_dataframe):
+        """Test that a fresh worker serves the sidecar without parsing the CSV."""
+        from utils.data_utils import save_processed_data
+        save_processed_data(sample_dataframe, os.path.join(data_dir, 'lisbon_houses_processed.csv'))
+        
+        with patch('routes.data_routes.pd.read_csv') as mock_read_csv:
+            data = json.loads(client.get('/api/data/data-summary').data)
+        
+        mock_read_csv.assert_not_called()
+        assert data['status'] == 'success'
+        assert data['records_count'] == 3
+    
+    def test_summary_served_from_profile(self, client, data_dir, sample_dataframe):
+        """Test that the summary and column profiles come from the profile without parsing the CSV."""
+        from utils.data_utils import compute_data_summary
+        from utils.profile_utils import profile_dataframe, save_profile
+        save_profile(profile_dataframe(sample_dataframe), os.path.join(data_dir, 'lisbon_houses_processed.csv'))
+        
+        with patch('routes.data_routes.pd.read_csv') as mock_read_csv:
+            data = json.loads(client.get('/api/data/data-summary').data)
+        
+        mock_read_csv.assert_not_called()
+        expected = compute_data_summary(sample_dataframe)
+        assert data['records_count'] == expected['records_count']
+        assert data['categorical_summary'] == expected['categorical_summary']
+        assert data['numeric_statistics']['Price']['mean'] == pytest.approx(expected['numeric_statistics']['Price']['mean'])
+        assert data['column_profiles']['Price']['nulls'] == 0
+
 class TestParishList:
     """Test the /parish-list endpoint."""
     
@@ -208,6 +324,56 @@ class TestModelPerformance:
         assert data['status'] == 'mock_data'
         assert len(data['models']) > 0
 
+class TestConditionalRequests:
+    """Test ETag and If-None-Match handling."""
+    
+    def test_etag_and_cache_headers(self, client, data_dir):
+        """Test that cacheable responses carry an ETag and Cache-Control."""
+        response = client.get('/api/data/data-summary')
+        
+        assert response.status_code == 200
+        assert response.headers.get('ETag')
+        assert 'max-age' in response.headers.get('Cache-Control')
+    
+    def test_not_modified_skips_body(self, client, data_dir):
+        """Test that a matching If-None-Match returns 304 without computing the body."""
+        etag = client.get('/api/data/parish-list').headers['ETag']
+        
+        with patch('routes.data_routes.get_cached_data_summary') as mock_summary:
+            response = client.get('/api/data/parish-list', headers={'If-None-Match': etag})
+        
+        assert response.status_code == 304
+        assert response.data == b''
+        assert response.headers['ETag'] == etag
+        mock_summary.assert_not_called()
+    
+    def test_etag_changes_with_data(self, client, data_dir, sample_dataframe):
+        """Test that a stale ETag gets a full response once the data changes."""
+        etag = client.get('/api/data/data-summary').headers['ETag']
+        
+        sample_dataframe.iloc[:1].to_csv(os.path.join(data_dir, 'lisbon_houses_processed.csv'), index=False)
+        response = client.get('/api/data/data-summary', headers={'If-None-Match': etag})
+        
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+    
+    def test_etags_differ_per_endpoint(self, client, data_dir):
+        """Test that endpoints backed by the same file get distinct ETags."""
+        summary_etag = client.get('/api/data/data-summary').headers['ETag']
+        parish_etag = client.get('/api/data/parish-list').headers['ETag']
+        
+        assert summary_etag != parish_etag
+    
+    @patch('routes.data_routes.pd.read_csv')
+    def test_error_response_not_cached(self, mock_read_csv, client, data_dir):
+        """Test that error responses carry no ETag."""
+        mock_read_csv.side_effect = Exception("Test error")
+        
+        response = client.get('/api/data/data-summary')
+        
+        assert response.status_code == 500
+        assert 'ETag' not in response.headers
+
 class TestErrorHandling:
     """Test error handling across all endpoints."""
     
@@ -8,7 +8,10 @@ import sys
 sys.path.append('..')
 from utils.data_utils import (
     load_data, save_processed_data, check_missing_values,
-    explore_numeric_features, preprocess_input
+    explore_numeric_features, preprocess_input,
+    compute_data_summary, save_data_summary, load_data_summary, get_summary_path,
+    read_table, find_processed_data_file, append_table,
+    compute_summary_aggregates, merge_summary_aggregates, summary_from_aggregates, list_data_shards
 )
 
 @pytest.fixture
@@ -50,7 +53,8 @@ class TestLoadData:
         assert result is not None
         assert len(result) == 4
         assert 'Price' in result.columns
-        mock_read_csv.assert_called_once_with('test_file.csv')
+        mock_read_csv.assert_called_once()
+        assert mock_read_csv.call_args[0][0] == 'test_file.csv'
     
     @patch('utils.data_utils.pd.read_csv')
     def test_load_data_file_not_found(self, mock_read_csv):
@@ -78,6 +82,30 @@ class TestLoadData:
         
         # Should return None if file doesn't exist
         assert result is None
+    
+    def test_load_data_typed_schema(self, sample_dataframe, temp_directory):
+        """Test that text columns load as categorical, integers are downcast and constant columns skipped."""
+        data_path = os.path.join(temp_directory, 'raw.csv')
+        sample_dataframe.assign(Country='Portugal', District='Lisboa').to_csv(data_path, index=False)
+        
+        result = load_data(data_path)
+        
+        assert 'Country' not in result.columns
+        assert 'District' not in result.columns
+        assert isinstance(result['Parish'].dtype, pd.CategoricalDtype)
+        assert result['Bedrooms'].dtype == np.int8
+        assert result['Price'].dtype == np.int32
+        assert result['AreaNet'].dtype == np.float64
+    
+    def test_load_data_untyped(self, sample_dataframe, temp_directory):
+        """Test that typed loading can be turned off."""
+        data_path = os.path.join(temp_directory, 'raw.csv')
+        sample_dataframe.to_csv(data_path, index=False)
+        
+        result = load_data(data_path, typed=False)
+        
+        assert result['Parish'].dtype == object
+        assert result['Price'].dtype == np.int64
 
 class TestSaveProcessedData:
     """Test the save_processed_data function."""
@@ -140,6 +168,193 @@ class TestSaveProcessedData:
         
         assert result is False
 
+class TestDataSummary:
+    """Test the data summary computation and its JSON sidecar."""
+    
+    def test_compute_data_summary(self, sample_dataframe):
+        """Test that the summary contains statistics and value counts."""
+        summary = compute_data_summary(sample_dataframe)
+        
+        assert summary['records_count'] == 4
+        assert summary['numeric_statistics']['Price']['max'] == 600000
+        assert summary['categorical_summary']['Parish'] == {'Alvalade': 2, 'Areeiro': 1, 'Benfica': 1}
+        assert summary['columns'] == sample_dataframe.columns.tolist()
+    
+    def test_save_writes_summary_sidecar(self, sample_dataframe, temp_directory):
+        """Test that saving processed data also writes a matching summary sidecar."""
+        data_path = os.path.join(temp_directory, 'processed.csv')
+        
+        assert save_processed_data(sample_dataframe, data_path) is True
+        assert os.path.exists(get_summary_path(data_path))
+        
+        summary = load_data_summary(data_path)
+        assert summary == compute_data_summary(pd.read_csv(data_path))
+    
+    def test_failed_write_keeps_sidecar(self, sample_dataframe, temp_directory):
+        """Test that a sidecar write failing halfway leaves the previous sidecar intact."""
+        data_path = os.path.join(temp_directory, 'processed.csv')
+        save_processed_data(sample_dataframe, data_path)
+        summary = load_data_summary(data_path)
+        
+        with patch('json.dump', side_effect=OSError('disk full')):
+            assert save_data_summary(sample_dataframe, data_path) is False
+        
+        assert load_data_summary(data_path) == summary
+        assert not [f for f in os.listdir(temp_directory) if f.startswith('.tmp_')]
+    
+    def test_load_data_summary_stale_sidecar(self, sample_dataframe, temp_directory):
+        """Test that a sidecar is ignored once the data file has changed."""
+        data_path = os.path.join(temp_directory, 'processed.csv')
+        save_processed_data(sample_dataframe, data_path)
+        
+        sample_dataframe.iloc[:2].to_csv(data_path, index=False)
+        
+        assert load_data_summary(data_path) is None
+    
+    def test_load_data_summary_missing_sidecar(self, temp_directory):
+        """Test loading a summary when no sidecar exists."""
+        assert load_data_summary(os.path.join(temp_directory, 'missing.csv')) is None
+
+class TestColumnarStorage:
+    """Test saving and loading processed data in the NumPy columnar format."""
+    
+    def test_round_trip_keeps_values(self, sample_dataframe, temp_directory):
+        """Test that a saved store loads back with the same values and categorical text columns."""
+        store_path = os.path.join(temp_directory, 'processed.npcols')
+        
+        assert save_processed_data(sample_dataframe, store_path) is True
+        loaded = read_table(store_path)
+        
+        assert list(loaded.columns) == list(sample_dataframe.columns)
+        assert isinstance(loaded['Parish'].dtype, pd.CategoricalDtype)
+        text_columns = {col: object for col in ['Parish', 'PropertyType', 'Condition']}
+        pd.testing.assert_frame_equal(loaded.astype(text_columns), sample_dataframe.round(3))
+    
+    def test_nullable_columns_stored_as_numbers(self, sample_dataframe, temp_directory):
+        """Test that pandas nullable columns are stored as NumPy numbers, with NaN for missing values."""
+        store_path = os.path.join(temp_directory, 'processed.npcols')
+        df = sample_dataframe[['Price']].assign(
+            Bedrooms=pd.array([2, 3, None, 1], dtype='Int64'),
+            Bathrooms=pd.array([1, 2, 2, 1], dtype='Int64'),
+            AreaNet=pd.array([80.5, None, 150.3, 70.1], dtype='Float64'),
+            HasParking=pd.array([True, False, True, False], dtype='boolean')
+        )
+        
+        save_processed_data(df, store_path)
+        loaded = read_table(store_path)
+        
+        assert loaded['Bedrooms'].dtype == np.float64
+        assert loaded['Bedrooms'].isna().tolist() == [False, False, True, False]
+        assert loaded['Bathrooms'].dtype == np.int64
+        assert loaded['AreaNet'].tolist()[2:] == [150.3, 70.1]
+        assert np.isnan(loaded['AreaNet'].iloc[1])
+        assert loaded['HasParking'].dtype == bool
+    
+    def test_read_column_subset(self, sample_dataframe, temp_directory):
+        """Test that only the requested columns are loaded."""
+        store_path = os.path.join(temp_directory, 'processed.npcols')
+        save_processed_data(sample_dataframe, store_path)
+        
+        loaded = read_table(store_path, columns=['Price', 'Parish'], mmap=True)
+        
+        assert list(loaded.columns) == ['Price', 'Parish']
+        assert loaded['Price'].tolist() == sample_dataframe['Price'].tolist()
+    
+    def test_store_summary_sidecar(self, sample_dataframe, temp_directory):
+        """Test that the store gets its own summary sidecar matching the CSV one."""
+        store_path = os.path.join(temp_directory, 'processed.npcols')
+        csv_path = os.path.join(temp_directory, 'processed.csv')
+        save_processed_data(sample_dataframe, store_path)
+        save_processed_data(sample_dataframe, csv_path)
+        
+        assert get_summary_path(store_path) != get_summary_path(csv_path)
+        assert load_data_summary(store_path) == load_data_summary(csv_path)
+    
+    def test_find_processed_data_file(self, sample_dataframe, temp_directory):
+        """Test that the columnar store is preferred over the CSV export."""
+        csv_path = os.path.join(temp_directory, 'lisbon_houses_processed.csv')
+        store_path = os.path.join(temp_directory, 'lisbon_houses_processed.npcols')
+        
+        assert find_processed_data_file(temp_directory) == csv_path
+        
+        save_processed_data(sample_dataframe, store_path)
+        
+        assert find_processed_data_file(temp_directory) == store_path
+
+class TestAppendTable:
+    """Test appending rows to saved data and merging summary aggregates."""
+    
+    @pytest.mark.parametrize('filename', ['processed.csv', 'processed.npcols'])
+    def test_append_matches_full_write(self, sample_dataframe, temp_directory, filename):
+        """Test that appending rows with a new category loads like the concatenated data."""
+        filepath = os.path.join(temp_directory, filename)
+        save_processed_data(sample_dataframe.iloc[:2], filepath)
+        new_rows = sample_dataframe.iloc[2:].assign(Parish=['Lumiar', 'Alvalade'])
+        
+        append_table(new_rows[list(reversed(new_rows.columns))], filepath, decimal_places=3)
+        
+        loaded = read_table(filepath)
+        expected = pd.concat([sample_dataframe.iloc[:2], new_rows], ignore_index=True).round(3)
+        text_columns = {col: object for col in ['Parish', 'PropertyType', 'Condition']}
+        pd.testing.assert_frame_equal(loaded.astype(text_columns), expected)
+    
+    def test_npcols_append_in_place(self, sample_dataframe, temp_directory):
+        """Test that column files are extended in place and unfinished appends stay invisible."""
+        filepath = os.path.join(temp_directory, 'processed.npcols')
+        save_processed_data(sample_dataframe.iloc[:2], filepath)
+        price_path = os.path.join(filepath, '0000.npy')
+        inode = os.stat(price_path).st_ino
+        
+        append_table(sample_dataframe.iloc[2:3], filepath)
+        
+        assert os.stat(price_path).st_ino == inode
+        # Bytes of an interrupted append past the stored rows are not read
+        with open(price_path, 'ab') as f:
+            f.write(np.zeros(3, dtype=sample_dataframe['Price'].dtype).tobytes())
+        append_table(sample_dataframe.iloc[3:], filepath)
+        
+        loaded = read_table(filepath)
+        assert loaded['Price'].tolist() == sample_dataframe['Price'].tolist()
+        assert loaded['Parish'].astype(object).tolist() == sample_dataframe['Parish'].tolist()
+    
+    def test_append_creates_missing_file(self, sample_dataframe, temp_directory):
+        """Test that appending to a missing file writes it."""
+        filepath = os.path.join(temp_directory, 'new.csv')
+        
+        append_table(sample_dataframe, filepath)
+        
+        assert len(pd.read_csv(filepath)) == len(sample_dataframe)
+    
+    def test_merged_aggregates_match_summary(self, sample_dataframe):
+        """Test that merging the aggregates of two parts gives the summary of the whole."""
+        merged = merge_summary_aggregates(
+            compute_summary_aggregates(sample_dataframe.iloc[:3]),
+            compute_summary_aggregates(sample_dataframe.iloc[3:])
+        )
+        
+        summary = summary_from_aggregates(merged)
+        expected = compute_data_summary(sample_dataframe)
+        
+        assert summary['records_count'] == expected['records_count']
+        assert summary['columns'] == expected['columns']
+        assert summary['categorical_summary'] == expected['categorical_summary']
+        for col, statistics in expected['numeric_statistics'].items():
+            assert summary['numeric_statistics'][col] == pytest.approx(statistics, rel=1e-12)
+
+class TestListDataShards:
+    """Test resolving shard sources to data files."""
+    
+    def test_directory_glob_and_file(self, sample_dataframe, temp_directory):
+        """Test that directories list their data files, globs match and single files pass through."""
+        for name in ['b.csv', 'a.csv', 'c.npcols']:
+            save_processed_data(sample_dataframe, os.path.join(temp_directory, name))
+        
+        shards = list_data_shards(temp_directory)
+        
+        assert [os.path.basename(path) for path in shards] == ['a.csv', 'b.csv', 'c.npcols']
+        assert list_data_shards(os.path.join(temp_directory, '*.csv')) == shards[:2]
+        assert list_data_shards(shards[0]) == [shards[0]]
+
 class TestCheckMissingValues:
     """Test the check_missing_values function."""
     
@@ -334,6 +549,23 @@ class TestPreprocessInput:
         assert len(result.columns) == 0
         assert len(result) == 1
 
+    def test_preprocess_input_sparse_matches_dense(self):
+        """Test that sparse encoding gives the dense rows, for unseen and reference categories too."""
+        batch = [
+            {'Bedrooms': 3, 'AreaNet': 120, 'Condition': 'New', 'Parish': 'Belem'},
+            {'Bedrooms': 0, 'AreaNet': 80, 'Condition': 'Used', 'Parish': 'Alvalade'},
+            {'Bedrooms': 2, 'Condition': 'Unknown', 'Parish': 'Nowhere'}
+        ]
+        feature_names = ['Bedrooms', 'AreaNet', 'Condition', 'Parish_Belem', 'Parish_Estrela']
+        
+        dense = preprocess_input(batch, feature_names)
+        sparse = preprocess_input(batch, feature_names, sparse=True)
+        
+        assert sparse.shape == (3, 5)
+        np.testing.assert_array_equal(sparse.toarray(), dense.to_numpy(dtype=np.float64))
+        # Only the non-zero entries and the unknown condition's missing value are stored
+        assert sparse.nnz == 9
+
 class TestConditionPropertyTypeMapping:
     """Test specific encoding mappings."""
     
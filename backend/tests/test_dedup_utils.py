@@ -0,0 +1,142 @@
+import pytest
+import json
+import os
+import numpy as np
+import pandas as pd
+import sys
+sys.path.append('..')
+from utils.dedup_utils import (
+    hash_rows, RowHashSet, find_near_duplicates, deduplicate, save_dedup_report
+)
+
+@pytest.fixture
+def listings():
+    """Create listings with one reposted flat and one flat in the same building."""
+    return pd.DataFrame({
+        'Latitude': [38.7500, 38.75001, 38.7500, 38.7200],
+        'Longitude': [-9.1400, -9.14001, -9.1400, -9.1600],
+        'Bedrooms': [2, 2, 3, 2],
+        'AreaNet': [80.0, 81.0, 80.0, 80.0],
+        'Price': [300000, 295000, 350000, 300000]
+    }, index=[10, 11, 12, 13])
+
+class TestHashRows:
+    """Test the hash_rows function."""
+
+    def test_equal_rows_equal_hashes(self):
+        """Test that equal rows hash equally and different rows do not."""
+        df = pd.DataFrame({'Parish': ['Alvalade', 'Alvalade', 'Areeiro'], 'Price': [1, 1, 2]})
+
+        hashes = hash_rows(df)
+
+        assert hashes[0] == hashes[1]
+        assert hashes[0] != hashes[2]
+
+    def test_independent_of_dtypes(self):
+        """Test that int, float and categorical columns hash like their object or float versions."""
+        plain = pd.DataFrame({'Parish': ['Alvalade', None], 'Bedrooms': [2.0, np.nan]})
+        typed = pd.DataFrame({'Parish': pd.Categorical(['Alvalade', None]), 'Bedrooms': [2, 3]})
+
+        assert hash_rows(plain)[0] == hash_rows(typed)[0]
+        assert hash_rows(plain)[1] != hash_rows(typed)[1]
+
+    def test_normalized_text(self):
+        """Test that case and whitespace edits only matter without normalization."""
+        df = pd.DataFrame({'Parish': ['Campo de Ourique', ' campo  de ourique']})
+
+        assert hash_rows(df)[0] == hash_rows(df)[1]
+        assert hash_rows(df, normalize=False)[0] != hash_rows(df, normalize=False)[1]
+
+class TestRowHashSet:
+    """Test the in-memory and on-disk row hash sets."""
+
+    @pytest.mark.parametrize('on_disk', [False, True])
+    def test_add_across_batches(self, temp_directory, on_disk):
+        """Test that repeats within and across batches are reported as seen."""
+        path = os.path.join(temp_directory, 'hashes.sqlite') if on_disk else None
+        hashes = np.array([1, 2, 2, 2 ** 63 + 5], dtype=np.uint64)
+
+        with RowHashSet(path) as seen:
+            first = seen.add(hashes)
+            second = seen.add(np.array([2 ** 63 + 5, 7], dtype=np.uint64))
+
+            assert first.tolist() == [True, True, False, True]
+            assert second.tolist() == [False, True]
+            assert len(seen) == 4
+
+    def test_on_disk_hashes_persist(self, temp_directory):
+        """Test that hashes stored on disk are seen again after reopening."""
+        path = os.path.join(temp_directory, 'hashes.sqlite')
+        with RowHashSet(path) as seen:
+            seen.add(np.array([42], dtype=np.uint64))
+
+        with RowHashSet(path) as seen:
+            assert seen.add(np.array([42, 43], dtype=np.uint64)).tolist() == [False, True]
+
+    @pytest.mark.parametrize('on_disk', [False, True])
+    def test_find_new_does_not_store(self, temp_directory, on_disk):
+        """Test that find_new reports unseen hashes without adding them."""
+        path = os.path.join(temp_directory, 'hashes.sqlite') if on_disk else None
+        with RowHashSet(path) as seen:
+            seen.add(np.array([1], dtype=np.uint64))
+
+            assert seen.find_new(np.array([1, 2, 2], dtype=np.uint64)).tolist() == [False, True, False]
+            assert len(seen) == 1
+
+class TestNearDuplicates:
+    """Test the near-duplicate search."""
+
+    def test_reposted_listing_found(self, listings):
+        """Test that only the nearby listing with a similar area and the same bedrooms is reported."""
+        pairs = find_near_duplicates(listings)
+
+        assert pairs['kept'].tolist() == [10]
+        assert pairs['removed'].tolist() == [11]
+        assert pairs['distance_m'].iloc[0] < 2
+
+    def test_tolerances(self, listings):
+        """Test that the area and bedroom tolerances are respected."""
+        assert find_near_duplicates(listings, area_tolerance=0.001).empty
+        assert sorted(find_near_duplicates(listings, bedroom_tolerance=1)['removed']) == [11, 12]
+
+    def test_chain_keeps_first_listing(self):
+        """Test that transitive matches are grouped under the earliest listing."""
+        chain = pd.DataFrame({
+            'Latitude': [38.75, 38.75015, 38.7503],
+            'Longitude': [-9.14, -9.14, -9.14],
+            'Bedrooms': [2, 2, 2],
+            'AreaNet': [80.0, 80.0, 80.0]
+        })
+
+        pairs = find_near_duplicates(chain, radius_m=20)
+
+        assert pairs['removed'].tolist() == [1, 2]
+        assert pairs['kept'].tolist() == [0, 0]
+        assert pairs['matched'].tolist() == [0, 1]
+
+    def test_missing_columns(self):
+        """Test that data without coordinates has no near-duplicates."""
+        assert find_near_duplicates(pd.DataFrame({'Bedrooms': [2, 2]})).empty
+
+class TestDeduplicate:
+    """Test the deduplicate function and its report."""
+
+    def test_exact_only_by_default(self, listings):
+        """Test that near-duplicates are kept unless requested."""
+        data = pd.concat([listings, listings.iloc[[0]]])
+
+        deduped, report = deduplicate(data)
+
+        assert deduped.index.tolist() == [10, 11, 12, 13]
+        assert report['exact_duplicates_removed'] == 1
+        assert report['near_duplicates_removed'] == 0
+
+    def test_near_duplicates_removed(self, listings, temp_directory):
+        """Test that near-duplicates are removed and reported."""
+        deduped, report = deduplicate(listings, near_duplicates=True)
+        report_path = os.path.join(temp_directory, 'dedup_report.json')
+
+        assert deduped.index.tolist() == [10, 12, 13]
+        assert save_dedup_report(report, report_path) is True
+        with open(report_path) as f:
+            assert json.load(f)['near_duplicates'][0]['removed'] == 11
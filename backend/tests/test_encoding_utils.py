@@ -0,0 +1,100 @@
+import pytest
+import json
+import numpy as np
+import pandas as pd
+import sys
+sys.path.append('..')
+from utils.encoding_utils import (
+    ENCODINGS_VERSION, get_encodings_path, fit_category_encodings, apply_category_encodings,
+    get_encoded_columns, save_category_encodings, load_category_encodings
+)
+
+@pytest.fixture
+def listings():
+    """Create training listings with a categorical column and prices."""
+    X = pd.DataFrame({
+        'Parish': ['Belem'] * 6 + ['Estrela'] * 3 + ['Marvila'],
+        'AreaNet': np.arange(10, 110, 10, dtype=np.float64)
+    })
+    y = pd.Series([400000.0] * 6 + [300000.0] * 3 + [100000.0])
+    return X, y
+
+class TestFitCategoryEncodings:
+    """Test learning the compact encodings."""
+
+    def test_smoothed_target_encoding(self, listings):
+        """Test that the lookup table holds the mean log-price shrunk towards the overall mean."""
+        X, y = listings
+        encodings, _ = fit_category_encodings(X, y, ['Parish'], method='target', smoothing=2.0)
+
+        prior = np.log(y).mean()
+        encoding = encodings['columns']['Parish']
+        assert encoding['default'] == pytest.approx(prior)
+        assert encoding['mapping']['Belem'] == pytest.approx((6 * np.log(400000) + 2 * prior) / 8)
+        assert encoding['mapping']['Marvila'] == pytest.approx((np.log(100000) + 2 * prior) / 3)
+
+    def test_training_rows_encoded_out_of_fold(self, listings):
+        """Test that each training row is encoded without its own price."""
+        X, y = listings
+        encodings, encoded = fit_category_encodings(X, y, ['Parish'], method='target', cv_folds=5)
+
+        # The only Marvila listing is in its own held-out fold, so it gets the prior of the other rows
+        marvila = encoded['Parish'].iloc[9]
+        assert marvila != pytest.approx(encodings['columns']['Parish']['mapping']['Marvila'])
+        assert encoded['Parish'].dtype == np.float64
+        pd.testing.assert_series_equal(encoded['AreaNet'], X['AreaNet'])
+
+    def test_frequency_encoding(self, listings):
+        """Test that frequency encodings are the share of training rows."""
+        X, y = listings
+        encodings, encoded = fit_category_encodings(X, y, ['Parish'], method='frequency')
+
+        assert encodings['columns']['Parish'] == {'mapping': {'Belem': 0.6, 'Estrela': 0.3, 'Marvila': 0.1},
+                                                  'default': 0.0}
+        assert encoded['Parish'].tolist() == [0.6] * 6 + [0.3] * 3 + [0.1]
+
+    def test_unknown_method(self, listings):
+        """Test that an unknown method is rejected."""
+        with pytest.raises(ValueError):
+            fit_category_encodings(*listings, ['Parish'], method='ordinal')
+
+class TestApplyCategoryEncodings:
+    """Test encoding serving rows with the lookup table."""
+
+    def test_unseen_and_missing_categories(self, listings):
+        """Test that unseen and missing categories get the default and other columns are untouched."""
+        encodings, _ = fit_category_encodings(*listings, ['Parish'], method='frequency')
+        rows = pd.DataFrame({'Parish': ['Estrela', 'Nowhere', None], 'Bedrooms': [1, 2, 3]})
+
+        result = apply_category_encodings(rows, encodings)
+
+        assert result['Parish'].tolist() == [0.3, 0.0, 0.0]
+        assert result['Bedrooms'].tolist() == [1, 2, 3]
+        assert rows['Parish'].tolist() == ['Estrela', 'Nowhere', None]
+
+    def test_encoded_columns_follow_features(self, listings):
+        """Test that only models taking the column itself as a feature use the encoding."""
+        encodings, _ = fit_category_encodings(*listings, ['Parish'])
+
+        assert get_encoded_columns(encodings, ['AreaNet', 'Parish']) == ['Parish']
+        assert get_encoded_columns(encodings, ['AreaNet', 'Parish_Estrela']) == []
+        assert get_encoded_columns(None, ['Parish']) == []
+
+class TestSaveAndLoad:
+    """Test persisting the lookup table."""
+
+    def test_round_trip(self, temp_directory, listings):
+        """Test that a saved lookup table loads back unchanged."""
+        encodings, _ = fit_category_encodings(*listings, ['Parish'])
+        assert save_category_encodings(encodings, temp_directory) is True
+
+        loaded = load_category_encodings(temp_directory)
+
+        assert loaded['method'] == 'target'
+        assert loaded['columns'] == encodings['columns']
+        with open(get_encodings_path(temp_directory)) as f:
+            assert json.load(f)['encodings_version'] == ENCODINGS_VERSION
+
+    def test_missing_file(self, temp_directory):
+        """Test that a directory without encodings returns None."""
+        assert load_category_encodings(temp_directory) is None
@@ -0,0 +1,107 @@
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+sys.path.append('..')
+from utils.feature_utils import (
+    FEATURE_REGISTRY, safe_divide, get_feature_definitions, compute_features,
+    compute_feature_array, add_serving_features
+)
+
+@pytest.fixture
+def listings():
+    """Create listings including a studio, a missing bedroom count and a missing gross area."""
+    return pd.DataFrame({
+        'Price': [300000, 150000, 420000, 250000],
+        'Bedrooms': [3, 0, np.nan, 2],
+        'Bathrooms': [2, 1, 2, 1],
+        'AreaNet': [90.0, 35.0, 110.0, 70.0],
+        'AreaGross': [100.0, 40.0, 0.0, np.nan],
+        'PropertyType': ['Homes', 'Homes', 'Single Habitation', 'Homes'],
+        'PropertySubType': ['Apartment', 'Apartment', 'House', 'Duplex']
+    })
+
+def row_wise_reference(df):
+    """Engineered features computed one row at a time, as the pipeline used to."""
+    return pd.DataFrame({
+        'PricePerBedroom': df.apply(
+            lambda row: row['Price'] / row['Bedrooms'] if row['Bedrooms'] > 0 else row['Price'], axis=1),
+        'BathroomToBedroom': df.apply(
+            lambda row: row['Bathrooms'] / row['Bedrooms'] if row['Bedrooms'] > 0 else row['Bathrooms'], axis=1),
+        'AreaUtilizationRatio': df.apply(
+            lambda row: row['AreaNet'] / row['AreaGross'] if row['AreaGross'] > 0 else 0, axis=1).astype(float)
+    })
+
+class TestSafeDivide:
+    """Test the safe_divide function."""
+
+    def test_fallback_for_zero_negative_and_missing(self):
+        """Test that non-positive and missing denominators use the fallback."""
+        result = safe_divide([6.0, 6.0, 6.0, 6.0], [3.0, 0.0, -1.0, np.nan], fallback=[1.0, 2.0, 3.0, 4.0])
+
+        assert result.tolist() == [2.0, 2.0, 3.0, 4.0]
+
+    def test_scalar_fallback(self):
+        """Test that a scalar fallback is broadcast."""
+        assert safe_divide([1.0, 1.0], [0.0, 4.0], fallback=0.0).tolist() == [0.0, 0.25]
+
+class TestRegistry:
+    """Test the feature definitions and their lookup."""
+
+    def test_serving_excludes_target_features(self):
+        """Test that features derived from the target are not available for serving."""
+        assert FEATURE_REGISTRY['PricePerBedroom'].requires_target
+        names = [definition.name for definition in get_feature_definitions(serving=True)]
+
+        assert 'PricePerBedroom' not in names
+        assert 'BathroomToBedroom' in names
+
+    def test_unknown_names_ignored(self):
+        """Test that names outside the registry are ignored."""
+        assert [d.name for d in get_feature_definitions(['AreaUtilizationRatio', 'Unknown'])] == ['AreaUtilizationRatio']
+
+class TestComputeFeatures:
+    """Test computing features on DataFrames and arrays."""
+
+    def test_matches_row_wise_computation(self, listings):
+        """Test that the vectorized features equal the former row-wise results exactly."""
+        result = compute_features(listings)
+
+        expected = row_wise_reference(listings)
+        for column in expected.columns:
+            np.testing.assert_array_equal(result[column].to_numpy(), expected[column].to_numpy())
+        assert result['PropertyCategory'].tolist()[:3] == ['Homes_Apartment', 'Homes_Apartment', 'Single Habitation_House']
+
+    def test_input_not_modified(self, listings):
+        """Test that the input DataFrame is left unchanged."""
+        columns = list(listings.columns)
+
+        compute_features(listings)
+
+        assert list(listings.columns) == columns
+
+    def test_missing_inputs_skipped(self):
+        """Test that features without their input columns are skipped."""
+        result = compute_features(pd.DataFrame({'Bathrooms': [1], 'Bedrooms': [2]}))
+
+        assert list(result.columns) == ['Bathrooms', 'Bedrooms', 'BathroomToBedroom']
+
+    def test_array_matches_dataframe(self, listings):
+        """Test that features computed on an encoded array equal the DataFrame ones."""
+        columns = ['Bedrooms', 'Bathrooms', 'AreaNet', 'AreaGross', 'Price']
+        X = listings[columns].to_numpy(dtype=float)
+
+        result, result_columns = compute_feature_array(X, columns)
+
+        assert result_columns == columns + ['BathroomToBedroom', 'AreaUtilizationRatio']
+        expected = compute_features(listings)
+        np.testing.assert_array_equal(result[:, 5], expected['BathroomToBedroom'])
+        np.testing.assert_array_equal(result[:, 6], expected['AreaUtilizationRatio'])
+
+    def test_add_serving_features_only_expected(self, listings):
+        """Test that serving only adds features the model expects."""
+        result = add_serving_features(listings.drop(columns='Price'), ['Bedrooms', 'AreaUtilizationRatio', 'PricePerBedroom'])
+
+        assert 'AreaUtilizationRatio' in result.columns
+        assert 'BathroomToBedroom' not in result.columns
+        assert 'PricePerBedroom' not in result.columns
@@ -0,0 +1,97 @@
+import pytest
+import json
+import os
+import numpy as np
+from sklearn.linear_model import Ridge
+import sys
+sys.path.append('..')
+from utils.manifest_utils import (
+    build_manifest_entry, update_manifest, load_manifest,
+    list_manifest_models, get_manifest_entry, get_manifest_path
+)
+
+@pytest.fixture
+def saved_model_file(temp_directory):
+    """Create a fake model artifact in a temporary models directory."""
+    model_path = os.path.join(temp_directory, 'lhp_ridge.pkl')
+    with open(model_path, 'wb') as f:
+        f.write(b'model bytes')
+    return model_path
+
+@pytest.fixture
+def ridge_entry(saved_model_file):
+    """Build a manifest entry for a Ridge model."""
+    return build_manifest_entry(
+        Ridge(alpha=np.float64(0.5)), 'ridge', saved_model_file,
+        ['Bedrooms', 'AreaNet'],
+        training_time=1.5,
+        metrics={'cv_best_score': np.float64(-100.0)}
+    )
+
+class TestBuildManifestEntry:
+    """Test the build_manifest_entry function."""
+
+    def test_entry_fields(self, ridge_entry):
+        """Test that the entry records the artifact and model metadata."""
+        assert ridge_entry['name'] == 'ridge'
+        assert ridge_entry['model_type'] == 'Ridge'
+        assert ridge_entry['artifact'] == 'lhp_ridge.pkl'
+        assert ridge_entry['size'] == len(b'model bytes')
+        assert len(ridge_entry['checksum']) == 64
+        assert ridge_entry['features'] == ['Bedrooms', 'AreaNet']
+        assert ridge_entry['sparse_input'] is False
+        assert ridge_entry['training_time'] == 1.5
+        assert ridge_entry['hyperparameters']['alpha'] == 0.5
+        assert ridge_entry['metrics']['cv_best_score'] == -100.0
+
+    def test_entry_is_json_serializable(self, ridge_entry):
+        """Test that numpy values are converted for JSON."""
+        json.dumps(ridge_entry)
+
+class TestManifest:
+    """Test reading and updating the manifest."""
+
+    def test_update_and_load(self, temp_directory, ridge_entry):
+        """Test that an updated manifest can be loaded back."""
+        update_manifest(temp_directory, ridge_entry)
+
+        manifest = load_manifest(temp_directory)
+
+        assert manifest['models']['ridge']['checksum'] == ridge_entry['checksum']
+        assert list_manifest_models(temp_directory) == ['ridge']
+        assert get_manifest_entry(temp_directory, 'ridge')['features'] == ['Bedrooms', 'AreaNet']
+        assert get_manifest_entry(temp_directory, 'svr') is None
+
+    def test_update_keeps_other_models(self, temp_directory, ridge_entry):
+        """Test that updating one model keeps the entries of the others."""
+        update_manifest(temp_directory, ridge_entry)
+        update_manifest(temp_directory, dict(ridge_entry, name='lasso', artifact='lhp_lasso.pkl'))
+
+        assert sorted(list_manifest_models(temp_directory)) == ['lasso', 'ridge']
+
+    def test_no_temporary_files_left(self, temp_directory, ridge_entry):
+        """Test that the atomic write leaves only the manifest behind."""
+        update_manifest(temp_directory, ridge_entry)
+
+        assert sorted(os.listdir(temp_directory)) == ['lhp_ridge.pkl', 'manifest.json']
+
+    def test_missing_manifest(self, temp_directory):
+        """Test that a missing manifest is reported as None."""
+        assert load_manifest(temp_directory) is None
+        assert list_manifest_models(temp_directory) is None
+
+    def test_invalid_manifest(self, temp_directory):
+        """Test that a corrupt manifest is ignored."""
+        with open(get_manifest_path(temp_directory), 'w') as f:
+            f.write('{not json')
+
+        assert load_manifest(temp_directory) is None
+
+    def test_manifest_reloaded_after_change(self, temp_directory, ridge_entry):
+        """Test that the cached manifest is refreshed when the file changes."""
+        update_manifest(temp_directory, ridge_entry)
+        assert list_manifest_models(temp_directory) == ['ridge']
+
+        update_manifest(temp_directory, dict(ridge_entry, name='svr_model', artifact='lhp_svr_model.pkl'))
+
+        assert 'svr_model' in list_manifest_models(temp_directory)
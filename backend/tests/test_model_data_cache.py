@@ -0,0 +1,102 @@
+import pytest
+import pandas as pd
+import numpy as np
+import os
+import sys
+sys.path.append('..')
+from unittest.mock import patch
+from sklearn.model_selection import KFold
+from models.model_training import prepare_data_for_modeling, split_data
+from models.model_data_cache import (
+    get_encoding_config, get_design_cache_key, get_design_cache_path, assign_cv_folds, get_cv_splits,
+    load_modeling_data
+)
+
+@pytest.fixture
+def processed_csv(temp_directory):
+    """Write a small processed dataset with categorical columns to encode."""
+    rng = np.random.RandomState(0)
+    n = 60
+    df = pd.DataFrame({
+        'Condition': rng.choice(['Used', 'New', 'As New'], size=n),
+        'PropertyType': rng.choice(['Homes', 'Single Habitation'], size=n),
+        'Parish': rng.choice(['Alvalade', 'Belem', 'Estrela'], size=n),
+        'AreaNet': rng.uniform(40, 200, size=n).round(1),
+        'Bedrooms': rng.randint(0, 5, size=n),
+        'Price': rng.uniform(1e5, 1e6, size=n).round()
+    })
+    path = os.path.join(temp_directory, 'lisbon_houses_processed.csv')
+    df.to_csv(path, index=False)
+    return path
+
+class TestCacheKey:
+    """Test the content-addressed cache key."""
+
+    def test_key_follows_data_and_config(self, processed_csv):
+        """Test that the key changes with the data and the encoding, not with the file's name."""
+        config = get_encoding_config()
+        key = get_design_cache_key(processed_csv, config)
+
+        assert get_design_cache_key(processed_csv, get_encoding_config(test_size=0.3)) != key
+        copy_path = processed_csv.replace('.csv', '_copy.csv')
+        pd.read_csv(processed_csv).to_csv(copy_path, index=False)
+        assert get_design_cache_key(copy_path, config) == key
+
+        df = pd.read_csv(processed_csv)
+        df.loc[0, 'Price'] += 1
+        df.to_csv(processed_csv, index=False)
+        assert get_design_cache_key(processed_csv, config) != key
+
+    def test_missing_data(self, temp_directory):
+        """Test that unreadable data has no key."""
+        assert get_design_cache_key(os.path.join(temp_directory, 'missing.csv'), get_encoding_config()) is None
+
+class TestCvFolds:
+    """Test the folds stored as index arrays."""
+
+    def test_folds_match_evaluation_kfold(self):
+        """Test that the stored folds are the shuffled KFold the evaluation uses."""
+        splits = get_cv_splits(assign_cv_folds(53, cv_folds=5, random_state=42))
+        expected = KFold(n_splits=5, shuffle=True, random_state=42).split(np.empty(53))
+
+        for (train, test), (expected_train, expected_test) in zip(splits, expected):
+            np.testing.assert_array_equal(train, expected_train)
+            np.testing.assert_array_equal(test, np.sort(expected_test))
+
+class TestLoadModelingData:
+    """Test loading the design matrices through the cache."""
+
+    def test_matches_uncached_encoding(self, processed_csv, temp_directory):
+        """Test that the cached matrices equal encoding and splitting the data directly."""
+        cache_dir = os.path.join(temp_directory, 'cache')
+        X_train, X_test, y_train, y_test, cv_splits = load_modeling_data(processed_csv, cache_dir)
+        expected = split_data(prepare_data_for_modeling(pd.read_csv(processed_csv)))
+
+        pd.testing.assert_frame_equal(X_train, expected[0].astype(np.float64))
+        pd.testing.assert_frame_equal(X_test, expected[1].astype(np.float64))
+        pd.testing.assert_series_equal(y_train, expected[2].astype(np.float64))
+        pd.testing.assert_series_equal(y_test, expected[3].astype(np.float64))
+        assert len(cv_splits) == 5
+
+    def test_second_load_reuses_memory_maps(self, processed_csv, temp_directory):
+        """Test that a current entry is mapped without re-encoding, as read-only views."""
+        cache_dir = os.path.join(temp_directory, 'cache')
+        load_modeling_data(processed_csv, cache_dir)
+        entry_dir = get_design_cache_path(get_design_cache_key(processed_csv, get_encoding_config()), cache_dir)
+        assert os.path.isfile(os.path.join(entry_dir, 'X_train.npy'))
+
+        with patch('models.model_data_cache.prepare_data_for_modeling') as prepare:
+            X_train, X_test, y_train, _, _ = load_modeling_data(processed_csv, cache_dir)
+        prepare.assert_not_called()
+
+        mapped = np.load(os.path.join(entry_dir, 'X_train.npy'), mmap_mode='r')
+        assert not X_train.values.flags.writeable
+        np.testing.assert_array_equal(X_train.to_numpy(), mapped)
+
+    def test_without_cache(self, processed_csv, temp_directory):
+        """Test that the data can still be encoded without writing the cache."""
+        cache_dir = os.path.join(temp_directory, 'cache')
+        X_train, _, y_train, _, cv_splits = load_modeling_data(processed_csv, cache_dir, use_cache=False)
+
+        assert not os.path.exists(cache_dir)
+        assert len(X_train) == len(y_train) == sum(len(test) for _, test in cv_splits)
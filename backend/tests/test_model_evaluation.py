@@ -0,0 +1,163 @@
+import pytest
+import json
+import os
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+from sklearn.linear_model import LinearRegression, Ridge
+import sys
+sys.path.append('..')
+from models.model_evaluation import (
+    load_models_and_evaluate, compute_dataset_hash, load_performance_records
+)
+
+@pytest.fixture
+def regression_data():
+    """Create a small regression problem split into train and test sets."""
+    rng = np.random.RandomState(0)
+    X = pd.DataFrame({'AreaNet': rng.uniform(40, 200, 60), 'Bedrooms': rng.randint(1, 5, 60)})
+    y = pd.Series(3000 * X['AreaNet'] + 10000 * X['Bedrooms'] + rng.normal(0, 5000, 60))
+    return X.iloc[:45], X.iloc[45:], y.iloc[:45], y.iloc[45:]
+
+@pytest.fixture
+def models_dir(temp_directory, regression_data, mock_external_dependencies):
+    """Create a models directory whose artifacts load as fitted models."""
+    X_train, _, y_train, _ = regression_data
+    fitted = {
+        'linear': LinearRegression().fit(X_train, y_train),
+        'ridge': Ridge().fit(X_train, y_train)
+    }
+    for name in fitted:
+        with open(os.path.join(temp_directory, f'lhp_{name}.pkl'), 'wb') as f:
+            f.write(name.encode())
+
+    mock_external_dependencies['joblib_load'].side_effect = (
+        lambda path: fitted[os.path.basename(path).replace('lhp_', '').replace('.pkl', '')]
+    )
+    return temp_directory
+
+def evaluate(models_dir, regression_data, **kwargs):
+    """Run the evaluation on the fixture data without saving plots."""
+    X_train, X_test, y_train, y_test = regression_data
+    return load_models_and_evaluate(
+        X_test, y_test, X_train=X_train, y_train=y_train,
+        models_dir=models_dir, save_path=None, cv=3, **kwargs
+    )
+
+class TestPerformanceFile:
+    """Test that evaluation metrics are persisted."""
+
+    def test_performance_file_written(self, models_dir, regression_data):
+        """Test that every evaluated model is stored with its keys."""
+        evaluate(models_dir, regression_data)
+
+        with open(os.path.join(models_dir, 'model_performance.json')) as f:
+            performance = json.load(f)
+
+        names = sorted(record['model_name'] for record in performance['models'])
+        assert names == ['linear', 'ridge']
+        assert performance['best_model'] in names
+        for record in performance['models']:
+            assert len(record['model_checksum']) == 64
+            assert record['dataset_hash'] == performance['dataset_hash']
+            assert record['cv_folds'] == 3
+            assert 'rmse' in record and 'cv_r2_mean' in record
+
+    def test_no_temporary_files_left(self, models_dir, regression_data):
+        """Test that the atomic write leaves no temporary files."""
+        evaluate(models_dir, regression_data)
+
+        assert not [f for f in os.listdir(models_dir) if f.startswith('.tmp_')]
+
+@pytest.fixture
+def evaluated_models():
+    """Record the names of models passed to evaluate_model while still evaluating them."""
+    from models import model_evaluation
+    real_evaluate = model_evaluation.evaluate_model
+    evaluated = []
+
+    def tracking_evaluate(model, *args, **kwargs):
+        evaluated.append(kwargs['model_name'])
+        return real_evaluate(model, *args, **kwargs)
+
+    with patch('models.model_evaluation.evaluate_model', side_effect=tracking_evaluate):
+        yield evaluated
+
+class TestIncrementalEvaluation:
+    """Test that only changed models or data are re-evaluated."""
+
+    def test_unchanged_models_reused(self, models_dir, regression_data):
+        """Test that a second run reuses all stored metrics."""
+        first = evaluate(models_dir, regression_data)
+
+        with patch('models.model_evaluation.evaluate_model') as mock_evaluate:
+            second = evaluate(models_dir, regression_data)
+
+        mock_evaluate.assert_not_called()
+        assert {r['model_name']: r['rmse'] for r in first} == {r['model_name']: r['rmse'] for r in second}
+
+    def test_changed_model_reevaluated(self, models_dir, regression_data, evaluated_models):
+        """Test that only the model whose artifact changed is evaluated again."""
+        evaluate(models_dir, regression_data)
+        evaluated_models.clear()
+        with open(os.path.join(models_dir, 'lhp_ridge.pkl'), 'wb') as f:
+            f.write(b'retrained ridge')
+
+        evaluate(models_dir, regression_data)
+
+        assert evaluated_models == ['Ridge']
+
+    def test_changed_data_reevaluated(self, models_dir, regression_data, evaluated_models):
+        """Test that all models are evaluated again when the data changes."""
+        evaluate(models_dir, regression_data)
+        evaluated_models.clear()
+        X_train, X_test, y_train, y_test = regression_data
+
+        evaluate(models_dir, (X_train, X_test, y_train * 1.1, y_test))
+
+        assert sorted(evaluated_models) == ['Linear', 'Ridge']
+
+    def test_force_reevaluates(self, models_dir, regression_data, evaluated_models):
+        """Test that force ignores stored metrics."""
+        evaluate(models_dir, regression_data)
+        evaluated_models.clear()
+
+        evaluate(models_dir, regression_data, force=True)
+
+        assert sorted(evaluated_models) == ['Linear', 'Ridge']
+
+class TestDatasetHash:
+    """Test the compute_dataset_hash function."""
+
+    def test_hash_is_stable(self, regression_data):
+        """Test that identical data gives identical hashes."""
+        X_train, X_test, y_train, y_test = regression_data
+
+        assert compute_dataset_hash(X_test, y_test, X_train, y_train) == \
+            compute_dataset_hash(X_test.copy(), y_test.copy(), X_train.copy(), y_train.copy())
+
+    def test_hash_depends_on_columns(self, regression_data):
+        """Test that renaming a column changes the hash."""
+        _, X_test, _, y_test = regression_data
+
+        renamed = X_test.rename(columns={'AreaNet': 'AreaGross'})
+
+        assert compute_dataset_hash(X_test, y_test) != compute_dataset_hash(renamed, y_test)
+
+    def test_hash_depends_on_folds(self, regression_data):
+        """Test that the same number of folds over other rows changes the hash."""
+        X_train, X_test, y_train, y_test = regression_data
+        rows = np.arange(len(X_train))
+        folds = [(rows[rows % 2 != fold], rows[rows % 2 == fold]) for fold in range(2)]
+        shifted = [(rows[rows < 5], rows[rows >= 5]), (rows[rows >= 5], rows[rows < 5])]
+
+        assert compute_dataset_hash(X_test, y_test, X_train, y_train, cv=folds) == \
+            compute_dataset_hash(X_test, y_test, X_train, y_train, cv=[(train.copy(), test.copy()) for train, test in folds])
+        assert compute_dataset_hash(X_test, y_test, X_train, y_train, cv=folds) != \
+            compute_dataset_hash(X_test, y_test, X_train, y_train, cv=shifted)
+        assert compute_dataset_hash(X_test, y_test, X_train, y_train, cv=2) == \
+            compute_dataset_hash(X_test, y_test, X_train, y_train)
+
+    def test_missing_performance_file(self, temp_directory):
+        """Test that no stored records are returned without a performance file."""
+        assert load_performance_records(temp_directory) == {}
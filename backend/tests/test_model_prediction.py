@@ -3,13 +3,16 @@ import pandas as pd
 import numpy as np
 from unittest.mock import patch, MagicMock, mock_open
 import os
+import json
 import sys
 sys.path.append('..')
+import scipy.sparse as sp
 from models.model_prediction import (
     list_available_models, load_model, load_feature_names,
     preprocess_input, predict_price, predict_with_all_models,
-    predict_batch
+    predict_batch, is_sparse_input_model
 )
+from utils.encoding_utils import save_category_encodings
 
 @pytest.fixture
 def mock_model():
@@ -80,6 +83,87 @@ class TestListAvailableModels:
         
         assert models == []
 
+class TestCompactEncodedInput:
+    """Test serving models trained on compact category encodings."""
+    
+    @pytest.fixture
+    def encodings(self):
+        """Create a lookup table for the Parish column."""
+        return {'method': 'target', 'smoothing': 10.0,
+                'columns': {'Parish': {'mapping': {'Alvalade': 12.9, 'Belem': 13.1}, 'default': 12.5}}}
+    
+    def test_encoded_parish(self, sample_input_data, encodings):
+        """Test that a model taking Parish itself gets its learned value, unseen parishes the default."""
+        features = ['Bedrooms', 'AreaNet', 'Parish']
+        batch = [sample_input_data, {**sample_input_data, 'Parish': 'Nowhere'}]
+        
+        dense = preprocess_input(batch, features, encodings=encodings)
+        sparse = preprocess_input(batch, features, sparse=True, encodings=encodings)
+        
+        assert dense['Parish'].tolist() == [12.9, 12.5]
+        np.testing.assert_array_equal(sparse.toarray(), dense.to_numpy(dtype=np.float64))
+    
+    def test_one_hot_model_unaffected(self, sample_input_data, sample_features, encodings):
+        """Test that models trained on Parish dummies still get the dummies."""
+        result = preprocess_input(sample_input_data, sample_features, encodings=encodings)
+        
+        assert result['Parish_Alvalade'].iloc[0] == 1
+    
+    def test_encodings_loaded_from_models_dir(self, temp_directory, mock_model, sample_input_data, encodings):
+        """Test that prediction reads the lookup table saved next to the models."""
+        save_category_encodings(encodings, temp_directory)
+        
+        predict_price(mock_model, sample_input_data, ['AreaNet', 'Parish'], models_dir=temp_directory)
+        
+        assert mock_model.predict.call_args[0][0]['Parish'].iloc[0] == 12.9
+
+class TestManifestLookups:
+    """Test model listing and feature loading through the manifest."""
+    
+    @pytest.fixture
+    def models_dir(self, temp_directory, sample_features):
+        """Create a models directory with a manifest."""
+        manifest = {
+            'models': {
+                'random_forest': {'name': 'random_forest', 'artifact': 'lhp_random_forest.pkl',
+                                  'features': sample_features},
+                'ridge': {'name': 'ridge', 'artifact': 'lhp_ridge.pkl', 'features': sample_features,
+                          'sparse_input': True}
+            }
+        }
+        with open(os.path.join(temp_directory, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f)
+        return temp_directory
+    
+    @patch('models.model_prediction.os.listdir')
+    def test_list_models_from_manifest(self, mock_listdir, models_dir):
+        """Test that models are listed without scanning the directory."""
+        models = list_available_models(models_dir)
+        
+        assert models == ['random_forest', 'ridge']
+        mock_listdir.assert_not_called()
+    
+    @patch('models.model_prediction.joblib.load')
+    def test_load_features_from_manifest(self, mock_joblib_load, models_dir, sample_features):
+        """Test that feature names are read without unpickling."""
+        features = load_feature_names('random_forest', models_dir)
+        
+        assert features == sample_features
+        mock_joblib_load.assert_not_called()
+    
+    def test_sparse_model_gets_sparse_input(self, models_dir, mock_model, sample_input_data, sample_features):
+        """Test that a model trained on a sparse design matrix is served a CSR row."""
+        assert is_sparse_input_model('ridge', models_dir)
+        assert not is_sparse_input_model('random_forest', models_dir)
+        
+        predict_price(mock_model, sample_input_data, sample_features, 'ridge', models_dir, stats=None)
+        row = mock_model.predict.call_args[0][0]
+        
+        assert sp.isspmatrix_csr(row)
+        np.testing.assert_array_equal(
+            row.toarray(), preprocess_input(sample_input_data, sample_features).to_numpy(dtype=np.float64)
+        )
+
 class TestLoadModel:
     """Test the load_model function."""
     
@@ -191,6 +275,39 @@ class TestPreprocessInput:
         assert 'NewFeature1' in result.columns
         assert 'NewFeature2' in result.columns
 
+    def test_preprocess_engineered_features(self, sample_input_data):
+        """Test that engineered features are computed, except those derived from the price."""
+        features = ['Bedrooms', 'AreaUtilizationRatio', 'BathroomToBedroom', 'PricePerBedroom']
+
+        result = preprocess_input(sample_input_data, features)
+
+        assert result['AreaUtilizationRatio'].iloc[0] == 120 / 150
+        assert result['BathroomToBedroom'].iloc[0] == 2 / 3
+        assert result['PricePerBedroom'].iloc[0] == 0
+
+    def test_preprocess_batch_input(self, sample_input_data, sample_features):
+        """Test that a list of inputs is preprocessed into one row each."""
+        other = dict(sample_input_data, Parish='Areeiro', Condition='Used')
+
+        result = preprocess_input([sample_input_data, other], sample_features)
+
+        assert len(result) == 2
+        assert result['Parish_Areeiro'].tolist() == [0, 1]
+        assert result['Condition'].tolist() == [4, 2]
+
+    def test_preprocess_with_cleaning_stats(self, sample_features):
+        """Test that fitted statistics impute missing features and cap extreme areas."""
+        stats = {
+            'fill_values': {'Bathrooms': 2.0, 'Parish': 'Alvalade'},
+            'outlier_bounds': {'AreaNet': (0.0, 250.0)}
+        }
+
+        result = preprocess_input({'Bedrooms': 2, 'AreaNet': 900}, sample_features, stats)
+
+        assert result['Bathrooms'].iloc[0] == 2.0
+        assert result['AreaNet'].iloc[0] == 250.0
+        assert result['Parish_Alvalade'].iloc[0] == 1
+
 class TestPredictPrice:
     """Test the predict_price function."""
     
@@ -297,10 +414,10 @@ class TestPredictBatch:
     @patch('models.model_prediction.predict_price')
     def test_predict_batch_success(self, mock_predict, mock_load_features, 
                                   mock_load_model, sample_features, mock_model):
-        """Test successful batch prediction."""
+        """Test successful batch prediction, predicting the whole batch at once."""
         mock_load_model.return_value = mock_model
         mock_load_features.return_value = sample_features
-        mock_predict.side_effect = [450000.0, 480000.0, 520000.0]
+        mock_model.predict.return_value = np.array([450000.0, 480000.0, 520000.0])
         
         batch_data = [
             {'Bedrooms': 2, 'AreaNet': 80},
@@ -314,6 +431,35 @@ class TestPredictBatch:
         assert predictions[0] == 450000.0
         assert predictions[1] == 480000.0
         assert predictions[2] == 520000.0
+        mock_predict.assert_not_called()
+        batch_matrix = mock_model.predict.call_args[0][0]
+        assert batch_matrix.shape == (3, len(sample_features))
+        assert batch_matrix['AreaNet'].tolist() == [80, 120, 160]
+    
+    @patch('models.model_prediction.load_cleaning_stats')
+    @patch('models.model_prediction.load_model')
+    @patch('models.model_prediction.load_feature_names')
+    def test_predict_batch_matches_single_predictions(self, mock_load_features, mock_load_model, mock_load_stats,
+                                                      sample_features, sample_input_data):
+        """Test that the vectorized batch gives the row-by-row predictions, imputation and capping included."""
+        from sklearn.linear_model import LinearRegression
+        rng = np.random.RandomState(0)
+        model = LinearRegression().fit(pd.DataFrame(rng.uniform(0, 5, size=(20, len(sample_features))),
+                                                    columns=sample_features), rng.uniform(1e5, 1e6, size=20))
+        stats = {'fill_values': {'AreaNet': 90.0, 'Parish': 'Areeiro'}, 'outlier_bounds': {'AreaNet': (20.0, 250.0)}}
+        mock_load_model.return_value = model
+        mock_load_features.return_value = sample_features
+        mock_load_stats.return_value = stats
+        batch_data = [
+            sample_input_data,
+            {**sample_input_data, 'AreaNet': None, 'Parish': None},
+            {**sample_input_data, 'AreaNet': 900, 'Condition': 'Used'}
+        ]
+        
+        predictions = predict_batch('linear', batch_data)
+        
+        expected = [predict_price(model, row, sample_features, stats=stats, sparse=False) for row in batch_data]
+        np.testing.assert_allclose(predictions, expected)
     
     @patch('models.model_prediction.load_model')
     @patch('models.model_prediction.load_feature_names')
@@ -0,0 +1,121 @@
+import pytest
+from unittest.mock import patch
+import sys
+sys.path.append('..')
+from models.model_scheduler import (
+    count_fits, estimate_training_costs, resolve_core_budget, plan_training_schedule,
+    train_models_concurrently, load_schedule_report
+)
+
+@pytest.fixture
+def training_rows():
+    """Resize the shared training_data fixture."""
+    return 120
+
+class TestCostEstimates:
+    """Test the estimates the schedule is ordered by."""
+
+    def test_count_fits(self):
+        """Test that a search runs every candidate on every fold plus the refit."""
+        assert count_fits('random_forest') == 36 * 5 + 1
+        assert count_fits('svr') == 24 * 2 + 1
+        assert count_fits('linear') == 1
+        assert count_fits('random_forest', search='random', max_fits=50) == 51
+
+    def test_relative_costs(self):
+        """Test that the forest search is estimated longest and SVR grows fastest with rows."""
+        small = estimate_training_costs(1000, 50)
+        large = estimate_training_costs(10000, 50)
+
+        assert max(small, key=small.get) == 'random_forest'
+        assert min(small, key=small.get) == 'linear'
+        assert large['svr'] / small['svr'] > large['random_forest'] / small['random_forest']
+
+    def test_budgeted_search_cheaper(self):
+        """Test that a budgeted strategy is estimated cheaper than the exhaustive grid."""
+        grid = estimate_training_costs(1000, 50, ['random_forest'])
+        random = estimate_training_costs(1000, 50, ['random_forest'], search='random', max_fits=60)
+
+        assert random['random_forest'] == pytest.approx(grid['random_forest'] * 61 / 181, rel=0.05)
+
+    def test_previous_report_scaled(self):
+        """Test that measured costs of an earlier run are scaled to the new size."""
+        previous = {'models': {'decision_tree': {'status': 'ok', 'rows': 1000, 'cpu_seconds': 10.0}}}
+
+        costs = estimate_training_costs(1000, 50, ['decision_tree', 'ridge'], previous_report=previous)
+
+        assert costs['decision_tree'] == pytest.approx(10.0)
+        assert costs['ridge'] == estimate_training_costs(1000, 50, ['ridge'])['ridge']
+
+class TestPlanTrainingSchedule:
+    """Test sharing the core budget between jobs."""
+
+    def test_resolve_core_budget(self):
+        """Test joblib-style core counts."""
+        with patch('os.cpu_count', return_value=8):
+            assert resolve_core_budget(-1) == 8
+            assert resolve_core_budget(-2) == 7
+            assert resolve_core_budget(3) == 3
+            assert resolve_core_budget(-20) == 1
+
+    def test_fewer_cores_than_jobs(self):
+        """Test that jobs queue longest first on one core each."""
+        plan = plan_training_schedule({'ridge': 1.0, 'random_forest': 50.0, 'svr': 10.0}, 2)
+
+        assert plan['order'] == ['random_forest', 'svr', 'ridge']
+        assert plan['slots'] == 2
+        assert all(job['cores'] == 1 for job in plan['jobs'].values())
+
+    def test_spare_cores_go_to_longest_jobs(self):
+        """Test that spare cores balance time per core and stay within the budget."""
+        plan = plan_training_schedule({'random_forest': 60.0, 'svr': 20.0, 'ridge': 1.0, 'linear': 0.1}, 16)
+
+        cores = {name: job['cores'] for name, job in plan['jobs'].items()}
+        assert sum(cores.values()) == 16
+        assert cores['random_forest'] > cores['svr'] > cores['ridge']
+        # A single fit cannot use more than one core
+        assert cores['linear'] == 1
+
+    def test_bayesian_search_limited_to_folds(self):
+        """Test that a sequential Bayesian search gets no more search workers than folds."""
+        plan = plan_training_schedule({'ridge': 10.0}, 8, search='bayesian')
+
+        assert plan['jobs']['ridge']['cores'] == 5
+        assert plan['jobs']['ridge']['grid_jobs'] == 5
+
+    def test_cores_beyond_grid_become_estimator_threads(self):
+        """Test that a forest given more cores than fits runs threaded estimators."""
+        plan = plan_training_schedule({'random_forest': 60.0}, 400)
+
+        job = plan['jobs']['random_forest']
+        assert job['grid_jobs'] == count_fits('random_forest') - 1
+        assert job['inner_threads'] == 400 // job['grid_jobs']
+
+class TestTrainModelsConcurrently:
+    """Test running the searches under the scheduler."""
+
+    @pytest.mark.parametrize("n_jobs", [1, 2])
+    def test_trains_and_saves_in_parent(self, training_data, temp_directory, n_jobs):
+        """Test that every model is trained, saved from this process and reported."""
+        X, y = training_data
+        with patch('models.model_scheduler.save_model_and_features') as mock_save:
+            models, report = train_models_concurrently(X, y, temp_directory, n_jobs=n_jobs, model_names=['ridge', 'linear'])
+
+        assert sorted(models) == ['linear', 'ridge']
+        assert models['ridge'].predict(X.iloc[:2]).shape == (2,)
+        assert sorted(call.args[2] for call in mock_save.call_args_list) == ['linear', 'ridge']
+        assert report['order'] == ['ridge', 'linear']
+        for job in report['models'].values():
+            assert job['status'] == 'ok'
+            assert job['wall_seconds'] > 0
+            assert job['cpu_seconds'] >= 0
+        assert load_schedule_report(temp_directory)['core_budget'] == n_jobs
+
+    def test_failed_job_reported(self, training_data):
+        """Test that a failing search is reported without stopping the others."""
+        X, y = training_data
+        with patch.dict('models.model_scheduler.MODEL_FITTERS', {'ridge': lambda *args, **kwargs: 1 / 0}):
+            models, report = train_models_concurrently(X, y, n_jobs=1, model_names=['ridge', 'linear'])
+
+        assert list(models) == ['linear']
+        assert report['models']['ridge']['status'].startswith('error')
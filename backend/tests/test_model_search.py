@@ -0,0 +1,313 @@
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+sys.path.append('..')
+import scipy.sparse as sp
+from sklearn.linear_model import Ridge, Lasso
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.model_selection import GridSearchCV, cross_val_score
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeRegressor
+import models.model_search as model_search
+from models.model_search import (
+    Categorical, Real, Integer, SEARCH_SPACES, CV_FOLDS, get_param_grid, count_grid_candidates,
+    get_candidate_budget, count_search_fits, count_parallel_fits, build_search, GaussianProcessSearchCV,
+    WarmStartForestSearchCV, RegularizationPathSearchCV, PruningPathSearchCV, fit_standardized_linear_model, compare_search_strategies,
+    load_search_comparison, PrecomputedKernelSVRSearchCV, get_lasso_path_alphas, compare_design_formats,
+    DESIGN_FORMAT_COMPARISON_FILENAME, compare_category_encodings, CATEGORY_ENCODING_COMPARISON_FILENAME, select_cv
+)
+from models.model_training import build_svr_pipeline
+from models.model_data_cache import assign_cv_folds, get_cv_splits
+
+@pytest.fixture
+def training_data():
+    """Create a training set with a nonlinear area effect, in place of the shared linear one."""
+    rng = np.random.RandomState(0)
+    X = pd.DataFrame({
+        'AreaNet': rng.uniform(40, 200, size=150),
+        'Bedrooms': rng.randint(0, 5, size=150),
+        'Parking': rng.randint(0, 3, size=150)
+    })
+    y = pd.Series(X['AreaNet'] ** 1.5 * 300 + X['Bedrooms'] * 20000 + rng.normal(0, 10000, size=150), name='Price')
+    return X, y
+
+class TestSearchSpaces:
+    """Test the search space declarations."""
+
+    def test_grids_match_exhaustive_search(self):
+        """Test that the declared grids are the ones the exhaustive search always used."""
+        assert get_param_grid('random_forest') == {
+            'n_estimators': [50, 100, 200], 'max_depth': [None, 10, 20, 30], 'min_samples_split': [2, 5, 10]
+        }
+        np.testing.assert_allclose(get_param_grid('ridge')['alpha'], np.logspace(-3, 3, 10))
+        assert count_grid_candidates('svr') == 24
+
+    def test_dimensions_sample_within_bounds(self):
+        """Test that sampled values stay in range and map back from the unit interval."""
+        rng = np.random.RandomState(0)
+        alpha = Real(1e-3, 1e3, log=True)
+        depth = Integer(2, 10)
+        kernel = Categorical(['rbf', 'linear'])
+
+        alphas = alpha.rvs(size=500, random_state=rng)
+        assert min(alphas) >= 1e-3 and max(alphas) <= 1e3
+        # Log scale: about half the samples fall below the geometric midpoint
+        assert 0.4 < np.mean(np.array(alphas) < 1) < 0.6
+        assert set(depth.rvs(size=500, random_state=rng)) == set(range(2, 11))
+        assert alpha.from_unit(alpha.to_unit(3.5)) == pytest.approx(3.5)
+        assert kernel.from_unit(kernel.to_unit('linear')) == 'linear'
+
+    def test_fit_budgets(self):
+        """Test translating fit budgets into candidates and estimated fits."""
+        assert get_candidate_budget('random_forest') == 12
+        assert get_candidate_budget('random_forest', max_fits=25) == 5
+        assert get_candidate_budget('ridge') == 5
+        assert count_search_fits('random_forest', 'grid') == 180
+        assert count_search_fits('random_forest', 'random', max_fits=25) == 25
+        # 36 candidates take four halving iterations: 36, 12, 4, then 2
+        assert count_search_fits('random_forest', 'halving') == 5 * 5
+        # 12 forests per fold, each as costly as 200 of the mean 116.7 trees
+        assert count_search_fits('random_forest', 'warm_start') == 103
+        assert count_parallel_fits('random_forest', 'warm_start') == 12 * 5
+        assert count_search_fits('ridge', 'warm_start') == count_search_fits('ridge', 'grid')
+        # One path per fold, and one unpruned tree per fold and min_samples_split
+        assert count_search_fits('lasso', 'path') == 5
+        assert count_search_fits('decision_tree', 'path') == 3 * 5
+        assert count_search_fits('svr', 'path') == count_search_fits('svr', 'grid')
+        # Two rbf gammas and the linear kernel, each one job per fold
+        assert count_parallel_fits('svr', 'warm_start') == 3 * 2
+        assert count_grid_candidates('svr_nystroem') == count_grid_candidates('svr')
+
+class TestBuildSearch:
+    """Test building and running each strategy."""
+
+    @pytest.mark.parametrize("search", ['grid', 'warm_start', 'path', 'random', 'halving', 'halving_random', 'bayesian'])
+    def test_strategies_fit(self, training_data, search):
+        """Test that every strategy searches the declared space and refits its best candidate."""
+        X, y = training_data
+        cv_search = build_search(search, DecisionTreeRegressor(random_state=42), 'decision_tree', n_jobs=1, max_fits=30)
+
+        cv_search.fit(X, y)
+
+        assert cv_search.best_estimator_.predict(X.iloc[:3]).shape == (3,)
+        # The path strategy prunes unlimited trees instead of capping their depth
+        assert cv_search.best_params_.get('max_depth') in SEARCH_SPACES['decision_tree']['max_depth'].values
+        assert 2 <= cv_search.best_params_['min_samples_split'] <= 10
+        if search in ('random', 'bayesian'):
+            assert len(cv_search.cv_results_['params']) == 30 // CV_FOLDS['decision_tree']
+
+    def test_warm_start_matches_grid(self, training_data):
+        """Test that growing each forest once scores and picks the candidates the exhaustive grid does."""
+        X, y = training_data
+        param_grid = {'n_estimators': [20, 5, 10], 'max_depth': [None, 3]}
+        forest = RandomForestRegressor(random_state=42)
+        grid = GridSearchCV(forest, param_grid, scoring='neg_mean_squared_error', cv=3).fit(X, y)
+        warm = WarmStartForestSearchCV(forest, param_grid, scoring='neg_mean_squared_error', cv=3).fit(X, y)
+
+        assert warm.cv_results_['params'] == grid.cv_results_['params']
+        np.testing.assert_allclose(warm.cv_results_['mean_test_score'], grid.cv_results_['mean_test_score'])
+        np.testing.assert_array_equal(warm.cv_results_['rank_test_score'], grid.cv_results_['rank_test_score'])
+        assert warm.best_params_ == grid.best_params_
+        np.testing.assert_allclose(warm.predict(X.iloc[:5]), grid.predict(X.iloc[:5]))
+        assert warm.n_splits_ == 3 and warm.refit_time_ > 0
+
+    def test_warm_start_falls_back_to_grid(self):
+        """Test that models without a tree count get the exhaustive grid."""
+        assert isinstance(build_search('warm_start', RandomForestRegressor(), 'random_forest'), WarmStartForestSearchCV)
+        assert isinstance(build_search('warm_start', Ridge(), 'ridge'), GridSearchCV)
+
+    def test_ridge_path_matches_standardized_grid(self, training_data):
+        """Test that the SVD path scores each alpha as a standardized Ridge grid search does."""
+        X, y = training_data
+        alphas = [0.01, 1.0, 30.0, 500.0]
+        grid = GridSearchCV(make_pipeline(StandardScaler(), Ridge()), {'ridge__alpha': alphas},
+                            scoring='neg_mean_squared_error', cv=5).fit(X, y)
+        path = RegularizationPathSearchCV(Ridge(), alphas=alphas, scoring='neg_mean_squared_error', cv=5).fit(X, y)
+
+        np.testing.assert_allclose(path.cv_results_['mean_test_score'], grid.cv_results_['mean_test_score'])
+        assert path.best_params_['alpha'] == grid.best_params_['ridge__alpha']
+        # The refitted model is a plain Ridge predicting from the raw features
+        assert isinstance(path.best_estimator_, Ridge)
+        np.testing.assert_allclose(path.predict(X), grid.predict(X))
+
+    def test_lasso_path_matches_standardized_grid(self, training_data):
+        """Test that the warm-started coordinate descent path scores each alpha as separate fits do."""
+        X, y = training_data
+        lasso = Lasso(tol=1e-10, max_iter=100000)
+        path = RegularizationPathSearchCV(lasso, scoring='neg_mean_squared_error', cv=5).fit(X, y)
+        alphas = [params['alpha'] for params in path.cv_results_['params']]
+        grid = GridSearchCV(make_pipeline(StandardScaler(), lasso), {'lasso__alpha': alphas},
+                            scoring='neg_mean_squared_error', cv=5).fit(X, y)
+
+        assert len(alphas) == 100 and alphas == sorted(alphas, reverse=True)
+        np.testing.assert_allclose(path.cv_results_['mean_test_score'], grid.cv_results_['mean_test_score'], rtol=1e-6)
+        np.testing.assert_allclose(path.predict(X), grid.predict(X), rtol=1e-6)
+
+    @pytest.mark.parametrize('prune_fitted_trees', [True, False])
+    def test_pruning_path_scores_match_fresh_fits(self, training_data, monkeypatch, prune_fitted_trees):
+        """Test that the pruning path scores each ccp_alpha as a tree fitted with it, with and without pruning copies."""
+        monkeypatch.setattr(model_search, 'PRUNE_FITTED_TREES', prune_fitted_trees)
+        X, y = training_data
+        tree = DecisionTreeRegressor(random_state=42)
+        path = PruningPathSearchCV(tree, {'min_samples_split': [2, 10]}, max_alphas=8,
+                                   scoring='neg_mean_squared_error', cv=5).fit(X, y)
+
+        assert len(path.cv_results_['params']) <= 2 * 8
+        for index in [0, path.best_index_, len(path.cv_results_['params']) - 1]:
+            params = path.cv_results_['params'][index]
+            fresh = cross_val_score(DecisionTreeRegressor(random_state=42, **params), X, y, cv=5,
+                                    scoring='neg_mean_squared_error')
+            assert path.cv_results_['mean_test_score'][index] == pytest.approx(fresh.mean())
+        assert path.best_estimator_.ccp_alpha == path.best_params_['ccp_alpha']
+
+    def test_standardized_linear_model(self, training_data):
+        """Test folding the feature scaling into the coefficients."""
+        X, y = training_data
+        model = fit_standardized_linear_model(Ridge(alpha=5.0), X, y)
+        pipeline = make_pipeline(StandardScaler(), Ridge(alpha=5.0)).fit(X, y)
+
+        np.testing.assert_allclose(model.predict(X), pipeline.predict(X))
+        assert list(model.feature_names_in_) == list(X.columns)
+
+    @pytest.mark.parametrize('search', ['grid', 'path', 'random'])
+    def test_cached_folds(self, training_data, search):
+        """Test that searches score their candidates on the cached folds."""
+        X, y = training_data
+        cv_splits = get_cv_splits(assign_cv_folds(len(X), 5))
+
+        cv_search = build_search(search, Ridge(), 'ridge', n_jobs=1, max_fits=15, cv_splits=cv_splits).fit(X, y)
+
+        best = cross_val_score(Ridge(**cv_search.best_params_), X, y, cv=cv_splits, scoring='neg_mean_squared_error')
+        assert cv_search.best_score_ == pytest.approx(best.mean(), rel=1e-4)
+        assert select_cv('svr', cv_splits) == CV_FOLDS['svr']
+
+    def test_unknown_strategy(self):
+        """Test that an unknown strategy name is rejected."""
+        with pytest.raises(ValueError):
+            build_search('annealing', Ridge(), 'ridge')
+
+    def test_bayesian_improves_on_initial_points(self, training_data):
+        """Test that the Gaussian process finds a Ridge alpha as good as the exhaustive grid's."""
+        X, y = training_data
+        grid = build_search('grid', Ridge(), 'ridge', n_jobs=1).fit(X, y)
+        bayesian = GaussianProcessSearchCV(
+            Ridge(), SEARCH_SPACES['ridge'], n_iter=8, n_initial_points=3, cv=5,
+            scoring='neg_mean_squared_error', random_state=0
+        ).fit(X, y)
+
+        initial_best = max(bayesian.cv_results_['mean_test_score'][:3])
+        assert bayesian.best_score_ >= initial_best
+        assert bayesian.best_score_ >= grid.best_score_ * 1.01
+        assert len({params['alpha'] for params in bayesian.cv_results_['params']}) == 8
+
+class TestCompareSearchStrategies:
+    """Test the strategy comparison report."""
+
+    def test_comparison(self, training_data, temp_directory):
+        """Test that each strategy reports its best score against its fits and fit time."""
+        X, y = training_data
+        comparison = compare_search_strategies(
+            X.iloc[:120], y.iloc[:120], model_names=['decision_tree'], strategies=['grid', 'random'],
+            max_fits=20, X_test=X.iloc[120:], y_test=y.iloc[120:], save_dir=temp_directory
+        )
+
+        grid, random = comparison
+        assert grid['fits'] == count_grid_candidates('decision_tree') * CV_FOLDS['decision_tree']
+        assert random['fits'] == 20
+        assert random['fit_seconds'] < grid['fit_seconds']
+        for row in comparison:
+            assert row['best_score'] < 0 and row['test_rmse'] > 0
+        assert load_search_comparison(temp_directory) == comparison
+
+class TestSparseSearches:
+    """Test the path and kernel searches on sparse design matrices."""
+
+    @pytest.fixture
+    def sparse_data(self, training_data):
+        """Add one-hot columns of a wide categorical to the training set."""
+        X, y = training_data
+        rng = np.random.RandomState(1)
+        parish = pd.Series(rng.randint(25, size=len(X)), index=X.index)
+        dummies = pd.get_dummies(parish, prefix='Parish', drop_first=True).astype(np.float64)
+        X = pd.concat([X, dummies], axis=1)
+        return X, y + parish * 4000
+
+    @pytest.mark.parametrize("n_rows", [150, 20])
+    def test_ridge_path_matches_dense(self, sparse_data, n_rows):
+        """Test that the implicitly centered path scores as the dense SVD path, through either decomposition."""
+        X, y = sparse_data
+        X, y = X.iloc[:n_rows], y.iloc[:n_rows]
+        alphas = [0.01, 1.0, 30.0, 500.0]
+        dense = RegularizationPathSearchCV(Ridge(), alphas=alphas, scoring='neg_mean_squared_error', cv=4).fit(X, y)
+        sparse = RegularizationPathSearchCV(Ridge(tol=1e-10), alphas=alphas, scoring='neg_mean_squared_error',
+                                            cv=4).fit(sp.csr_matrix(X.to_numpy()), y)
+
+        np.testing.assert_allclose(sparse.cv_results_['mean_test_score'], dense.cv_results_['mean_test_score'])
+        np.testing.assert_allclose(sparse.predict(sp.csr_matrix(X.to_numpy())), dense.predict(X), rtol=1e-6)
+
+    def test_lasso_path_matches_dense(self, sparse_data):
+        """Test that the warm-started sparse Lasso path scores as lasso_path on the dense features."""
+        X, y = sparse_data
+        lasso = Lasso(tol=1e-10, max_iter=100000)
+        dense = RegularizationPathSearchCV(lasso, scoring='neg_mean_squared_error', cv=5).fit(X, y)
+        sparse = RegularizationPathSearchCV(lasso, scoring='neg_mean_squared_error', cv=5).fit(sp.csr_matrix(X.to_numpy()), y)
+
+        np.testing.assert_allclose(get_lasso_path_alphas(sp.csr_matrix(X.to_numpy()), y), get_lasso_path_alphas(X, y))
+        np.testing.assert_allclose(sparse.cv_results_['mean_test_score'], dense.cv_results_['mean_test_score'], rtol=1e-6)
+
+    def test_standardized_linear_model(self, sparse_data):
+        """Test that scaling without centering gives the centered fit's model."""
+        X, y = sparse_data
+        dense = fit_standardized_linear_model(Ridge(alpha=5.0), X, y)
+        sparse = fit_standardized_linear_model(Ridge(alpha=5.0, tol=1e-10), sp.csr_matrix(X.to_numpy()), y)
+
+        np.testing.assert_allclose(sparse.predict(X.to_numpy()), dense.predict(X), rtol=1e-6)
+
+    def test_kernel_search_uses_pipeline_scaler(self, sparse_data):
+        """Test that the shared kernel matrices score sparse candidates as the sparse pipeline's grid does."""
+        X, y = sparse_data
+        X = sp.csr_matrix(X.to_numpy())
+        param_grid = {'C': [1.0, 10.0], 'epsilon': [0.1], 'kernel': ['rbf', 'linear'], 'gamma': ['scale']}
+        estimator = build_svr_pipeline(X_sparse=X)
+        search = PrecomputedKernelSVRSearchCV(estimator, param_grid, param_prefix='regressor__svr__',
+                                              scoring='neg_mean_squared_error', cv=2).fit(X, y)
+        grid = GridSearchCV(estimator, {f'regressor__svr__{key}': values for key, values in param_grid.items()},
+                            scoring='neg_mean_squared_error', cv=2).fit(X, y)
+
+        np.testing.assert_allclose(search.cv_results_['mean_test_score'], grid.cv_results_['mean_test_score'], rtol=1e-4)
+
+    def test_design_format_comparison(self, sparse_data, temp_directory):
+        """Test that both formats report their matrix size, with the sparse one smaller."""
+        X, y = sparse_data
+        comparison = compare_design_formats(X.iloc[:120], y.iloc[:120], X.iloc[120:], y.iloc[120:],
+                                            model_names=['ridge', 'linear'], save_dir=temp_directory)
+
+        assert [(row['model_name'], row['format']) for row in comparison] == [
+            ('ridge', 'dense'), ('ridge', 'sparse'), ('linear', 'dense'), ('linear', 'sparse')
+        ]
+        assert comparison[1]['design_bytes'] < comparison[0]['design_bytes']
+        assert comparison[1]['test_rmse'] == pytest.approx(comparison[0]['test_rmse'], rel=1e-4)
+        assert load_search_comparison(temp_directory, DESIGN_FORMAT_COMPARISON_FILENAME) == comparison
+
+class TestCategoryEncodingComparison:
+    """Test comparing the one-hot and compact category encodings."""
+
+    def test_comparison_rows(self, temp_directory):
+        """Test that every encoding is trained and the compact ones are narrower."""
+        rng = np.random.RandomState(0)
+        df = pd.DataFrame({
+            'Parish': rng.choice([f'Parish{i}' for i in range(15)], size=80),
+            'AreaNet': rng.uniform(40, 200, size=80)
+        })
+        df['Price'] = df['AreaNet'] * 4000 + df['Parish'].str[6:].astype(int) * 5000 + 100000
+
+        comparison = compare_category_encodings(df, model_names=['decision_tree'], latency_rows=5,
+                                                save_dir=temp_directory)
+
+        assert [row['encoding'] for row in comparison] == ['one_hot', 'target', 'frequency']
+        assert [row['features'] for row in comparison] == [15, 2, 2]
+        assert comparison[0]['lookup_bytes'] == 0 and comparison[1]['lookup_bytes'] > 0
+        assert all(row['model_bytes'] > 0 and row['latency_seconds'] > 0 for row in comparison)
+        assert load_search_comparison(temp_directory, CATEGORY_ENCODING_COMPARISON_FILENAME) == comparison
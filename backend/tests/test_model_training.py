@@ -0,0 +1,205 @@
+import pytest
+import pandas as pd
+import numpy as np
+from unittest.mock import patch
+import os
+import sys
+sys.path.append('..')
+import scipy.sparse as sp
+from sklearn.linear_model import Ridge
+from models.model_training import (
+    fit_ridge, fit_decision_tree, fit_linear, fit_svr, build_svr_pipeline, get_svr_mode, SVR_EXACT_MAX_ROWS,
+    save_model_and_features, load_cv_results, get_cv_results_path, prepare_data_for_modeling, densify_features,
+    build_sparse_scaler, train_ridge, split_data, encode_compact_categories
+)
+from models.model_search import CV_FOLDS, count_grid_candidates
+from utils.data_utils import to_sparse_matrix
+
+class CountingRidge(Ridge):
+    """Ridge counting every fit across its clones."""
+    fits = 0
+
+    def fit(self, X, y, sample_weight=None):
+        CountingRidge.fits += 1
+        return super().fit(X, y, sample_weight)
+
+class TestFitFunctions:
+    """Test that searches return their refitted best estimator."""
+
+    def test_best_model_fitted_once(self, training_data):
+        """Test that the best parameters are fitted once, by the search's refit."""
+        X, y = training_data
+        CountingRidge.fits = 0
+        with patch('models.model_training.Ridge', CountingRidge):
+            model, training_time, metrics, cv_results = fit_ridge(X, y, n_jobs=1)
+
+        assert CountingRidge.fits == count_grid_candidates('ridge') * CV_FOLDS['ridge'] + 1
+        assert model.alpha == cv_results['params'][cv_results['best_index']]['alpha']
+        assert metrics['refit_time'] > 0
+        assert training_time >= metrics['refit_time']
+
+    def test_cv_results_summary(self, training_data):
+        """Test that every candidate's times and scores are kept."""
+        X, y = training_data
+        _, _, metrics, cv_results = fit_decision_tree(X, y, n_jobs=1)
+
+        candidates = count_grid_candidates('decision_tree')
+        assert len(cv_results['params']) == candidates
+        for key in ['mean_fit_time', 'mean_score_time', 'mean_test_score', 'rank_test_score']:
+            assert len(cv_results[key]) == candidates
+        assert cv_results['n_splits'] == CV_FOLDS['decision_tree']
+        assert max(cv_results['mean_test_score']) == pytest.approx(metrics['cv_best_score'])
+
+    def test_search_strategy(self, training_data):
+        """Test that a budgeted strategy evaluates only its budget of candidates."""
+        X, y = training_data
+        _, _, _, cv_results = fit_decision_tree(X, y, n_jobs=1, search='random', max_fits=20)
+
+        assert len(cv_results['params']) == 20 // CV_FOLDS['decision_tree']
+
+    def test_linear_has_no_search(self, training_data):
+        """Test that the unsearched linear model has no CV results."""
+        X, y = training_data
+        _, _, metrics, cv_results = fit_linear(X, y)
+
+        assert metrics is None and cv_results is None
+
+class TestSvr:
+    """Test the standardized SVR and its kernel approximation."""
+
+    def test_modes(self):
+        """Test that the approximation takes over above the exact SVR's row limit."""
+        assert get_svr_mode(SVR_EXACT_MAX_ROWS) == 'exact'
+        assert get_svr_mode(SVR_EXACT_MAX_ROWS + 1) == 'nystroem'
+        assert get_svr_mode(50, 'nystroem') == 'nystroem'
+        with pytest.raises(ValueError):
+            get_svr_mode(50, 'sampled')
+
+    @pytest.mark.parametrize("mode", ['exact', 'nystroem'])
+    def test_pipeline_predicts_prices(self, training_data, mode):
+        """Test that the standardized pipeline learns prices that unscaled SVR cannot."""
+        X, y = training_data
+        model = build_svr_pipeline(mode, n_components=50).set_params(regressor__svr__C=10.0).fit(X, y)
+
+        rmse = np.sqrt(np.mean((model.predict(X) - y) ** 2))
+        assert rmse < 0.5 * y.std()
+
+    def test_fit_svr_reuses_kernels(self, training_data):
+        """Test that sharing the kernel matrices picks the candidate the exhaustive grid does."""
+        X, y = training_data
+        _, _, grid_metrics, grid_results = fit_svr(X, y, n_jobs=1, search='grid', mode='exact')
+        model, _, metrics, cv_results = fit_svr(X, y, n_jobs=1, search='warm_start', mode='exact')
+
+        assert cv_results['params'] == grid_results['params']
+        np.testing.assert_allclose(cv_results['mean_test_score'], grid_results['mean_test_score'], rtol=1e-4)
+        assert metrics['svr_mode'] == 'exact'
+        assert model.predict(X.iloc[:3]).shape == (3,)
+
+class TestCvResultsArtifact:
+    """Test saving the search results next to the model."""
+
+    def test_saved_and_loaded(self, training_data, temp_directory):
+        """Test that the CV results are written as JSON and load back."""
+        X, y = training_data
+        model, training_time, metrics, cv_results = fit_ridge(X, y, n_jobs=1)
+
+        with patch('models.model_training.build_manifest_entry'), patch('models.model_training.update_manifest'):
+            save_model_and_features(model, X, 'ridge', temp_directory, training_time, metrics, cv_results=cv_results)
+
+        assert os.path.isfile(get_cv_results_path('ridge', temp_directory))
+        assert load_cv_results('ridge', temp_directory) == cv_results
+        assert load_cv_results('svr', temp_directory) is None
+
+class TestSparseDesignMatrix:
+    """Test training the sparse-capable models on CSR design matrices."""
+
+    @pytest.fixture
+    def listings(self):
+        """Create listings with a wide categorical column."""
+        rng = np.random.RandomState(0)
+        df = pd.DataFrame({
+            'Condition': rng.choice(['Used', 'New'], size=120),
+            'Parish': rng.choice([f'Parish{i}' for i in range(30)], size=120),
+            'AreaNet': rng.uniform(40, 200, size=120),
+            'Latitude': rng.uniform(38.70, 38.80, size=120)
+        })
+        df['Price'] = df['AreaNet'] * 4000 + df['Parish'].str[6:].astype(int) * 5000 + rng.normal(0, 10000, size=120)
+        return df
+
+    def test_sparse_encoding_matches_dense(self, listings):
+        """Test that sparse one-hot columns hold the dense encoding and convert to CSR."""
+        dense = prepare_data_for_modeling(listings)
+        sparse = prepare_data_for_modeling(listings, sparse=True)
+
+        assert isinstance(sparse['Parish_Parish1'].dtype, pd.SparseDtype)
+        pd.testing.assert_frame_equal(densify_features(sparse), dense)
+        matrix = to_sparse_matrix(sparse.drop(columns=['Price']))
+        assert sp.isspmatrix_csr(matrix)
+        np.testing.assert_array_equal(matrix.toarray(), dense.drop(columns=['Price']).to_numpy(dtype=np.float64))
+
+    def test_sparse_scaler_centers_dense_columns_only(self, listings):
+        """Test that the numeric columns are centered while the one-hot columns keep their zeros."""
+        X = to_sparse_matrix(prepare_data_for_modeling(listings).drop(columns=['Price']))
+        scaled = build_sparse_scaler(X).fit_transform(X)
+
+        assert sp.issparse(scaled)
+        # Condition, AreaNet and Latitude are never zero and come first, centered
+        np.testing.assert_allclose(scaled[:, :3].toarray().mean(axis=0), 0, atol=1e-12)
+        assert scaled[:, 3:].nnz == X[:, 3:].nnz
+
+    @pytest.mark.parametrize("fit", [fit_ridge, fit_linear, fit_svr])
+    def test_sparse_fit_matches_dense(self, listings, fit):
+        """Test that fitting on the CSR matrix gives the dense fit's predictions."""
+        df = prepare_data_for_modeling(listings)
+        X, y = df.drop(columns=['Price']), df['Price']
+        dense_model = fit(X, y, n_jobs=1)[0]
+        sparse_model = fit(to_sparse_matrix(X), y, n_jobs=1)[0]
+
+        np.testing.assert_allclose(sparse_model.predict(to_sparse_matrix(X)), dense_model.predict(X), rtol=1e-3)
+
+    def test_manifest_records_sparse_input(self, listings, temp_directory):
+        """Test that a model trained sparse is marked for sparse serving, with the dense feature names."""
+        df = prepare_data_for_modeling(listings, sparse=True)
+        X, y = df.drop(columns=['Price']), df['Price']
+        with patch('models.model_training.build_manifest_entry') as build_entry, \
+                patch('models.model_training.update_manifest'):
+            train_ridge(X, y, temp_directory, n_jobs=1, sparse=True)
+
+        assert build_entry.call_args.kwargs['sparse_input'] is True
+        assert build_entry.call_args.args[3] == list(X.columns)
+
+class TestCompactCategoryEncoding:
+    """Test replacing the high-cardinality categoricals with compact encodings."""
+
+    @pytest.fixture
+    def listings(self):
+        """Create listings with a wide parish column and a narrow subtype column."""
+        rng = np.random.RandomState(0)
+        df = pd.DataFrame({
+            'PropertySubType': rng.choice(['Apartment', 'Duplex'], size=100),
+            'Parish': rng.choice([f'Parish{i}' for i in range(20)], size=100),
+            'AreaNet': rng.uniform(40, 200, size=100)
+        })
+        df['Price'] = df['AreaNet'] * 4000 + df['Parish'].str[6:].astype(int) * 5000 + 100000
+        return df
+
+    def test_compact_columns_kept_as_text(self, listings):
+        """Test that only the compact columns skip one-hot encoding."""
+        df = prepare_data_for_modeling(listings, compact_columns=['Parish', 'PropertyCategory'])
+
+        assert df['Parish'].tolist() == listings['Parish'].tolist()
+        assert not any(col.startswith('Parish_') for col in df.columns)
+        assert 'PropertySubType_Duplex' in df.columns
+
+    def test_encoded_split(self, listings):
+        """Test that the held-out rows are encoded with the lookup table and the training rows out of fold."""
+        X_train, X_test, y_train, _ = split_data(prepare_data_for_modeling(listings, compact_columns=['Parish']))
+        encoded_train, encoded_test, encodings = encode_compact_categories(X_train, y_train, X_test)
+
+        mapping = encodings['columns']['Parish']['mapping']
+        assert encoded_test['Parish'].tolist() == [mapping.get(p, encodings['columns']['Parish']['default'])
+                                                  for p in X_test['Parish']]
+        assert encoded_train.shape == X_train.shape
+        assert encoded_train['Parish'].dtype == np.float64
+        assert not np.allclose(encoded_train['Parish'], X_train['Parish'].map(mapping))
+        assert set(mapping) == set(X_train['Parish'])
@@ -1,11 +1,18 @@
 import pytest
 import json
 import os
+import numpy as np
+import pandas as pd
 from unittest.mock import patch, MagicMock
 from flask import Flask
 import sys
 sys.path.append('..')
+from sklearn.linear_model import LinearRegression
 from routes.prediction_routes import prediction_bp
+from utils.encoding_utils import fit_category_encodings, apply_category_encodings, save_category_encodings
+from utils.manifest_utils import build_manifest_entry, update_manifest
+from utils.data_utils import to_sparse_matrix
+from models.model_training import build_svr_pipeline
 
 @pytest.fixture
 def app():
@@ -159,13 +166,13 @@ class TestBatchPredictEndpoint:
     
     @patch('routes.prediction_routes.model')
     @patch('routes.prediction_routes.feature_names')
-    @patch('routes.prediction_routes.predict_price')
+    @patch('routes.prediction_routes.predict_prices')
     def test_batch_predict_with_model(self, mock_predict, mock_features, mock_model,
                                     client, sample_house_data):
-        """Test batch prediction with actual model."""
+        """Test batch prediction with actual model, predicting the whole batch at once."""
         mock_features.__bool__ = lambda self: True
         mock_model.__bool__ = lambda self: True
-        mock_predict.side_effect = [450000.0, 520000.0]
+        mock_predict.return_value = [450000.0, 520000.0]
         
         batch_data = [sample_house_data, sample_house_data]
         
@@ -179,6 +186,8 @@ class TestBatchPredictEndpoint:
         assert len(data['predictions']) == 2
         assert data['predictions'][0]['predicted_price'] == 450000.0
         assert data['predictions'][1]['predicted_price'] == 520000.0
+        mock_predict.assert_called_once()
+        assert mock_predict.call_args[0][1] == batch_data
 
 class TestModelInfoEndpoint:
     """Test the /model-info endpoint."""
@@ -273,13 +282,13 @@ class TestErrorScenarios:
     
     @patch('routes.prediction_routes.model')
     @patch('routes.prediction_routes.feature_names')
-    @patch('routes.prediction_routes.predict_price')
+    @patch('routes.prediction_routes.predict_prices')
     def test_batch_predict_partial_failure(self, mock_predict, mock_features, mock_model,
                                          client, sample_house_data):
-        """Test batch prediction with some predictions failing."""
+        """Test batch prediction with the batch failing."""
         mock_features.__bool__ = lambda self: True
         mock_model.__bool__ = lambda self: True
-        mock_predict.side_effect = [450000.0, Exception("Error"), 520000.0]
+        mock_predict.side_effect = Exception("Error")
         
         batch_data = [sample_house_data, sample_house_data, sample_house_data]
         
@@ -290,4 +299,67 @@ class TestErrorScenarios:
         
         # Should return error status due to exception
         assert response.status_code == 500
-        assert data['status'] == 'error'
\ No newline at end of file
+        assert data['status'] == 'error'
+
+class TestTrainedModelPreprocessing:
+    """Test that the routes encode inputs like the saved model was trained."""
+    
+    @pytest.fixture
+    def listings(self):
+        """Training listings with a compactly encoded parish."""
+        rng = np.random.RandomState(0)
+        X = pd.DataFrame({
+            'AreaNet': rng.uniform(40, 200, size=60),
+            'Bedrooms': rng.randint(1, 5, size=60).astype(np.float64),
+            'Parish': rng.choice(['Alvalade', 'Belem', 'Marvila'], size=60)
+        })
+        y = pd.Series(X['AreaNet'] * 4000 + X['Bedrooms'] * 20000 + (X['Parish'] == 'Belem') * 150000)
+        return X, y
+    
+    def post(self, client, path, payload, trained_model, features, name, models_dir):
+        """Post a request with the routes serving a trained model from models_dir."""
+        with patch('routes.prediction_routes.model', new=trained_model), \
+             patch('routes.prediction_routes.feature_names', new=features), \
+             patch('routes.prediction_routes.model_name', new=name), \
+             patch('routes.prediction_routes.MODELS_DIR', new=models_dir):
+            response = client.post(path, data=json.dumps(payload), content_type='application/json')
+        return response.status_code, json.loads(response.data)
+    
+    def test_compact_encodings_applied(self, client, temp_directory, listings):
+        """Test that single and batch predictions use the learned parish encodings."""
+        X, y = listings
+        encodings, X_encoded = fit_category_encodings(X, y, ['Parish'], method='frequency')
+        save_category_encodings(encodings, temp_directory)
+        trained_model = LinearRegression().fit(X_encoded, y)
+        features = list(X_encoded.columns)
+        houses = [{'AreaNet': 100.0, 'Bedrooms': 2.0, 'Parish': parish} for parish in ['Belem', 'Marvila']]
+        
+        status, data = self.post(client, '/api/predictions/predict', houses[0], trained_model, features, 'linear',
+                                 temp_directory)
+        batch_status, batch = self.post(client, '/api/predictions/batch-predict', houses, trained_model, features,
+                                        'linear', temp_directory)
+        
+        expected = trained_model.predict(apply_category_encodings(pd.DataFrame(houses), encodings)[features])
+        assert status == 200 and batch_status == 200
+        assert data['predicted_price'] == pytest.approx(expected[0])
+        assert [p['predicted_price'] for p in batch['predictions']] == pytest.approx(expected.tolist())
+    
+    def test_sparse_input_model(self, client, temp_directory, listings):
+        """Test that a model the manifest records as trained on sparse input predicts through the routes."""
+        X = listings[0][['AreaNet', 'Bedrooms']]
+        y = listings[1]
+        X_sparse = to_sparse_matrix(X)
+        trained_model = build_svr_pipeline('exact', X_sparse=X_sparse).fit(X_sparse, y)
+        model_path = os.path.join(temp_directory, 'lhp_svr.pkl')
+        open(model_path, 'wb').close()
+        update_manifest(temp_directory, build_manifest_entry(trained_model, 'svr', model_path, list(X.columns),
+                                                             sparse_input=True))
+        house = {'AreaNet': 100.0, 'Bedrooms': 2.0}
+        
+        status, data = self.post(client, '/api/predictions/predict', house, trained_model, list(X.columns), 'svr',
+                                 temp_directory)
+        
+        assert status == 200
+        assert data['predicted_price'] == pytest.approx(trained_model.predict(to_sparse_matrix(pd.DataFrame([house])))[0])
+        # The scaler also takes dense rows, as served to models without a manifest entry
+        assert trained_model.predict(pd.DataFrame([house]))[0] == pytest.approx(data['predicted_price'])
@@ -4,10 +4,17 @@ import numpy as np
 from unittest.mock import patch, MagicMock
 import os
 import sys
+import warnings
 sys.path.append('..')
 from backend.data.preprocessing import (
-    clean_data, engineer_features, preprocess_data
+    clean_data, engineer_features, preprocess_data,
+    clean_data_with_stats, clean_data_chunked, apply_cleaning_stats, append_listings,
+    build_row_hash_store, get_row_hash_store_path, ingest_shards, cap_outliers
 )
+from utils.data_utils import apply_schema, save_processed_data, load_data_summary, compute_data_summary, read_table
+from utils.stats_utils import save_cleaning_stats
+from utils.profile_utils import DataProfiler, save_profile, load_profile
+from utils.dedup_utils import RowHashSet
 
 @pytest.fixture
 def sample_raw_data():
@@ -100,6 +107,22 @@ class TestCleanData:
         # Max cleaned should be less than the original outlier
         assert max_cleaned < max_original
     
+    def test_cap_integer_column_to_fractional_bound(self):
+        """Test that a small integer column capped to a fractional bound becomes float64 without a warning."""
+        df = pd.DataFrame({'AreaNet': np.array([10, 50, 60, 500], dtype=np.int16),
+                           'Bedrooms': np.array([1, 2, 3, 9], dtype=np.int32)})
+        
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            capped = cap_outliers(df, 'AreaNet', 20.5, 100.25)
+            cap_outliers(df, 'Bedrooms', 1, 4)
+        
+        assert capped == 2
+        assert df['AreaNet'].dtype == np.float64
+        assert df['AreaNet'].tolist() == [20.5, 50.0, 60.0, 100.25]
+        assert df['Bedrooms'].dtype == np.int32
+        assert df['Bedrooms'].tolist() == [1, 2, 3, 4]
+    
     def test_price_m2_removal(self, sample_raw_data):
         """Test that Price M2 column is removed due to correlation considerations."""
         # Modify the sample data to have low correlation
@@ -120,6 +143,245 @@ class TestCleanData:
         # These functions should be called during the cleaning process
         mock_check.assert_called()
 
+class TestCleanDataChunked:
+    """Test the two-pass chunked cleaning against the in-memory clean_data."""
+    
+    @pytest.fixture
+    def raw_csv(self, sample_raw_data, temp_directory):
+        """Write the raw sample with a duplicate split across chunks to a CSV file."""
+        raw_data = pd.concat([sample_raw_data, sample_raw_data.iloc[[0]]], ignore_index=True)
+        raw_path = os.path.join(temp_directory, 'raw.csv')
+        raw_data.to_csv(raw_path, index=False)
+        return raw_path
+    
+    @pytest.mark.parametrize('chunksize', [2, 3, 100])
+    def test_matches_in_memory_output(self, raw_csv, temp_directory, chunksize):
+        """Test that the chunked output equals the in-memory output written the same way."""
+        expected_path = os.path.join(temp_directory, 'expected.csv')
+        chunked_path = os.path.join(temp_directory, 'chunked.csv')
+        expected, expected_stats = clean_data_with_stats(pd.read_csv(raw_csv))
+        save_processed_data(expected, expected_path)
+        
+        stats = clean_data_chunked(raw_csv, chunked_path, chunksize=chunksize, typed=False)
+        
+        with open(expected_path) as f_expected, open(chunked_path) as f_chunked:
+            assert f_chunked.read() == f_expected.read()
+        assert stats['dropped_columns'] == expected_stats['dropped_columns']
+        assert stats['capped_columns'] == expected_stats['capped_columns']
+        assert stats['late_dropped_columns'] == expected_stats['late_dropped_columns']
+        for col, bounds in expected_stats['outlier_bounds'].items():
+            assert stats['outlier_bounds'][col] == pytest.approx(bounds)
+    
+    def test_typed_chunks_match(self, raw_csv, temp_directory):
+        """Test that typed chunks with per-chunk categories give the same output."""
+        untyped_path = os.path.join(temp_directory, 'untyped.csv')
+        typed_path = os.path.join(temp_directory, 'typed.csv')
+        
+        clean_data_chunked(raw_csv, untyped_path, chunksize=2, typed=False, engineer=True)
+        clean_data_chunked(raw_csv, typed_path, chunksize=2, typed=True, engineer=True)
+        
+        pd.testing.assert_frame_equal(pd.read_csv(typed_path), pd.read_csv(untyped_path))
+    
+    def test_invalid_rows_quarantined(self, sample_raw_data, temp_directory):
+        """Test that rows failing validation are quarantined and the rest cleaned as in memory."""
+        raw_path = os.path.join(temp_directory, 'raw.csv')
+        chunked_path = os.path.join(temp_directory, 'chunked.csv')
+        quarantine_path = os.path.join(temp_directory, 'quarantine.csv')
+        invalid_row = sample_raw_data.iloc[[1]].assign(Id=9, AreaNet=-20)
+        pd.concat([sample_raw_data, invalid_row, invalid_row], ignore_index=True).to_csv(raw_path, index=False)
+        expected, _ = clean_data_with_stats(sample_raw_data)
+        
+        clean_data_chunked(raw_path, chunked_path, chunksize=3, typed=False, quarantine_path=quarantine_path)
+        
+        assert len(pd.read_csv(chunked_path)) == len(expected)
+        quarantined = pd.read_csv(quarantine_path)
+        assert quarantined['ValidationReasons'].tolist() == ['non_positive_area', 'non_positive_area']
+    
+    def test_near_duplicates_match_in_memory(self, temp_directory):
+        """Test that chunked near-duplicate removal keeps the same rows as the in-memory path."""
+        raw_data = pd.DataFrame({
+            'Price': [300000, 305000, 450000, 600000, 310000, 250000],
+            'AreaNet': [80.0, 81.0, 120.0, 150.0, 80.0, 70.0],
+            'Bedrooms': [2, 2, 3, 4, 2, 1],
+            'Latitude': [38.75, 38.75001, 38.76, 38.77, 38.75, 38.78],
+            'Longitude': [-9.14, -9.14001, -9.15, -9.16, -9.14, -9.17],
+            'Parish': ['Alvalade', 'Alvalade', 'Areeiro', 'Benfica', 'Alvalade', 'Lumiar']
+        })
+        raw_path = os.path.join(temp_directory, 'raw.csv')
+        raw_data.to_csv(raw_path, index=False)
+        chunked_path = os.path.join(temp_directory, 'chunked.csv')
+        
+        expected, _ = clean_data_with_stats(pd.read_csv(raw_path), near_duplicates=True)
+        clean_data_chunked(
+            raw_path, chunked_path, chunksize=2, typed=False, near_duplicates=True,
+            hash_store_dir=temp_directory
+        )
+        
+        result = pd.read_csv(chunked_path)
+        assert len(result) == 4
+        assert result['Price'].tolist() == expected['Price'].tolist()
+        assert not [f for f in os.listdir(temp_directory) if f.startswith('.row_hashes_')]
+    
+    def test_missing_input(self, temp_directory):
+        """Test that a missing input file is reported as None."""
+        result = clean_data_chunked(
+            os.path.join(temp_directory, 'missing.csv'), os.path.join(temp_directory, 'out.csv')
+        )
+        
+        assert result is None
+    
+    def test_apply_cleaning_stats(self, sample_raw_data):
+        """Test that reapplying the stats to the deduplicated rows reproduces clean_data."""
+        expected, stats = clean_data_with_stats(sample_raw_data)
+        
+        result = apply_cleaning_stats(sample_raw_data.drop_duplicates(), stats)
+        
+        pd.testing.assert_frame_equal(result, expected)
+
+class TestAppendListings:
+    """Test appending new listings to the processed data."""
+    
+    @pytest.fixture
+    def processed_paths(self, sample_raw_data, temp_directory):
+        """Run the full pipeline on the sample, keeping the statistics and row hashes like main."""
+        models_dir = os.path.join(temp_directory, 'models')
+        output_path = os.path.join(temp_directory, 'processed.csv')
+        raw_data = apply_schema(sample_raw_data)
+        cleaned, stats = clean_data_with_stats(raw_data)
+        processed = engineer_features(cleaned, explore=False)
+        save_cleaning_stats(stats, models_dir)
+        build_row_hash_store(raw_data, get_row_hash_store_path(output_path))
+        save_processed_data(processed, os.path.join(temp_directory, 'processed.npcols'))
+        save_processed_data(processed, output_path)
+        return output_path, models_dir
+    
+    @pytest.fixture
+    def new_listings(self, sample_raw_data):
+        """Two listings already processed and two new ones, one with an extreme area."""
+        new_rows = sample_raw_data.iloc[[1, 2]].assign(
+            Id=[6, 7], AreaNet=[95.0, 5000.0], Parish=['Lumiar', 'Alvalade']
+        )
+        return pd.concat([sample_raw_data.iloc[[0, 4]], new_rows], ignore_index=True)
+    
+    def test_only_new_rows_appended(self, processed_paths, new_listings):
+        """Test that known rows are skipped and new rows are cleaned with the saved statistics."""
+        output_path, models_dir = processed_paths
+        before = pd.read_csv(output_path)
+        
+        appended = append_listings(new_listings, output_path, models_dir)
+        
+        after = pd.read_csv(output_path)
+        assert appended == 2
+        assert len(after) == len(before) + 2
+        assert after['Parish'].tolist()[-2:] == ['Lumiar', 'Alvalade']
+        assert after['AreaNet'].iloc[-1] == before['AreaNet'].max()
+        assert append_listings(new_listings, output_path, models_dir) == 0
+    
+    def test_columnar_store_and_summaries_updated(self, processed_paths, new_listings, temp_directory):
+        """Test that both stores grow and their summaries match a full recomputation."""
+        output_path, models_dir = processed_paths
+        
+        append_listings(new_listings, output_path, models_dir)
+        
+        store_path = os.path.join(temp_directory, 'processed.npcols')
+        assert len(read_table(store_path)) == len(pd.read_csv(output_path))
+        for filepath in [output_path, store_path]:
+            summary = load_data_summary(filepath)
+            expected = compute_data_summary(read_table(filepath, typed=True))
+            assert summary['records_count'] == expected['records_count']
+            assert summary['categorical_summary'] == expected['categorical_summary']
+            for col, statistics in expected['numeric_statistics'].items():
+                assert summary['numeric_statistics'][col] == pytest.approx(statistics, rel=1e-9)
+    
+    def test_profile_merged_with_appended_rows(self, processed_paths, new_listings):
+        """Test that the saved profile stays current and matches profiling the whole file."""
+        output_path, models_dir = processed_paths
+        profiler = DataProfiler().update(read_table(output_path, typed=True))
+        save_profile(profiler.to_dict(), output_path, profiler)
+        
+        append_listings(new_listings, output_path, models_dir)
+        
+        profile = load_profile(output_path)
+        expected = DataProfiler().update(read_table(output_path, typed=True)).to_dict()
+        assert profile is not None
+        assert profile['rows'] == expected['rows']
+        assert profile['columns']['Parish'] == expected['columns']['Parish']
+        assert profile['columns']['Price']['mean'] == pytest.approx(expected['columns']['Price']['mean'])
+    
+    def test_invalid_rows_quarantined(self, processed_paths, new_listings, temp_directory):
+        """Test that new listings failing validation are quarantined instead of appended."""
+        output_path, models_dir = processed_paths
+        new_listings.loc[3, 'Price'] = -1
+        
+        appended = append_listings(new_listings, output_path, models_dir)
+        
+        assert appended == 1
+        quarantined = pd.read_csv(os.path.join(temp_directory, 'processed_quarantine.csv'))
+        assert quarantined['ValidationReasons'].tolist() == ['non_positive_price']
+    
+    def test_missing_statistics(self, temp_directory, new_listings):
+        """Test that appending without saved statistics is reported as None."""
+        output_path = os.path.join(temp_directory, 'processed.csv')
+        
+        assert append_listings(new_listings, output_path, os.path.join(temp_directory, 'models')) is None
+        assert not os.path.exists(output_path)
+
+class TestIngestShards:
+    """Test parallel ingestion of raw listing shards."""
+    
+    @pytest.fixture
+    def shard_dir(self, sample_raw_data, temp_directory):
+        """Write the sample as three shards with a listing reposted across shards and a reordered shard."""
+        shard_dir = os.path.join(temp_directory, 'shards')
+        os.makedirs(shard_dir)
+        sample_raw_data.iloc[:3].to_csv(os.path.join(shard_dir, 'day1.csv'), index=False)
+        sample_raw_data.iloc[[3, 4, 5, 0]].to_csv(os.path.join(shard_dir, 'day2.csv'), index=False)
+        sample_raw_data.iloc[[1]][sample_raw_data.columns[::-1]].to_csv(os.path.join(shard_dir, 'day3.csv'), index=False)
+        return shard_dir
+    
+    @pytest.mark.parametrize('max_workers', [1, 2])
+    def test_matches_whole_dataset(self, shard_dir, max_workers, temp_directory):
+        """Test that shards give the rows and statistics of cleaning the concatenated shards at once."""
+        paths = [os.path.join(shard_dir, name) for name in ['day1.csv', 'day2.csv', 'day3.csv']]
+        combined_path = os.path.join(temp_directory, 'combined.csv')
+        pd.concat([pd.read_csv(path) for path in paths], ignore_index=True).to_csv(combined_path, index=False)
+        expected, expected_stats = clean_data_with_stats(read_table(combined_path, typed=True))
+        
+        cleaned, stats, report = ingest_shards(shard_dir, max_workers=max_workers)
+        
+        pd.testing.assert_frame_equal(cleaned, expected)
+        assert stats == expected_stats
+        assert [entry['rows'] for entry in report] == [3, 4, 1]
+        assert [entry['duplicates_removed'] for entry in report] == [0, 2, 1]
+        assert all(entry['rows_per_second'] > 0 for entry in report)
+    
+    def test_glob_and_hash_store(self, shard_dir, temp_directory):
+        """Test that a glob selects shards and the ingested rows are remembered for appends."""
+        store_path = os.path.join(temp_directory, 'row_hashes.sqlite')
+        
+        cleaned, _, report = ingest_shards(os.path.join(shard_dir, 'day[12].csv'), max_workers=1,
+                                           hash_store_path=store_path)
+        
+        assert len(report) == 2
+        assert len(cleaned) == 5
+        with RowHashSet(store_path) as seen_rows:
+            assert len(seen_rows) == 5
+    
+    def test_invalid_rows_quarantined(self, shard_dir, sample_raw_data, temp_directory):
+        """Test that invalid rows of any shard are quarantined and counted per shard."""
+        quarantine_path = os.path.join(temp_directory, 'quarantine.csv')
+        sample_raw_data.iloc[[2]].assign(Id=9, Condition='Ruin').to_csv(os.path.join(shard_dir, 'day4.csv'), index=False)
+        
+        cleaned, _, report = ingest_shards(shard_dir, max_workers=1, quarantine_path=quarantine_path)
+        
+        assert len(cleaned) == 5
+        assert [entry['quarantined'] for entry in report] == [0, 0, 0, 1]
+        assert pd.read_csv(quarantine_path)['ValidationReasons'].tolist() == ['unknown_condition']
+    
+    def test_no_shards(self, temp_directory):
+        """Test that a source without data files is reported as None."""
+        assert ingest_shards(os.path.join(temp_directory, '*.csv')) == (None, None, None)
+
 class TestEngineerFeatures:
     """Test the engineer_features function."""
     
@@ -323,6 +585,17 @@ class TestIntegrationWorkflow:
         
         # Should produce valid results even with minimal data
         assert len(X_train) + len(X_test) == 2
+    
+    def test_typed_data_matches_untyped(self, sample_raw_data):
+        """Test that data loaded with the declared schema is cleaned to the same values."""
+        untyped = engineer_features(clean_data(sample_raw_data))
+        typed = engineer_features(clean_data(apply_schema(sample_raw_data)))
+        
+        text_columns = typed.select_dtypes(include=['category']).columns
+        assert len(text_columns) > 0
+        pd.testing.assert_frame_equal(
+            typed.astype({col: object for col in text_columns}), untyped, check_dtype=False
+        )
 
 class TestErrorHandling:
     """Test error handling in preprocessing functions."""
@@ -0,0 +1,130 @@
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+sys.path.append('..')
+import utils.profile_utils as profile_utils
+from utils.profile_utils import (
+    DataProfiler, profile_dataframe, profile_chunks, save_profile, load_profile, load_profiler, get_profile_path
+)
+
+@pytest.fixture
+def listings():
+    """Create listings with missing values, a constant column and a categorical column."""
+    rng = np.random.RandomState(0)
+    area = rng.uniform(40, 200, size=300)
+    df = pd.DataFrame({
+        'AreaNet': area,
+        'Bedrooms': rng.randint(0, 5, size=300),
+        'Parking': np.where(rng.rand(300) < 0.1, np.nan, rng.randint(0, 3, size=300)),
+        'Parish': rng.choice(['Alvalade', 'Areeiro', 'Benfica', None], size=300),
+        'Country': 'Portugal',
+        'Price': area * 4000 + rng.normal(0, 50000, size=300)
+    })
+    df['Parish'] = df['Parish'].astype('category')
+    return df
+
+class TestProfileDataframe:
+    """Test that a single-pass profile matches the pandas scans it replaces."""
+
+    def test_counts_nulls_and_distinct(self, listings):
+        """Test that counts, missing values and distinct counts equal pandas."""
+        profile = profile_dataframe(listings)
+
+        assert profile['rows'] == 300
+        for col in listings.columns:
+            column_profile = profile['columns'][col]
+            assert column_profile['count'] == listings[col].count()
+            assert column_profile['nulls'] == listings[col].isnull().sum()
+            assert column_profile['distinct'] == listings[col].nunique()
+            assert column_profile['distinct_exact']
+
+    def test_numeric_statistics(self, listings):
+        """Test that moments, quartiles and correlations equal describe and corr."""
+        profile = profile_dataframe(listings)
+
+        for col in ['AreaNet', 'Bedrooms', 'Parking']:
+            described = listings[col].describe()
+            column_profile = profile['columns'][col]
+            for name in ['mean', 'std', 'min', '25%', '50%', '75%', 'max']:
+                assert column_profile[name] == pytest.approx(described[name], rel=1e-12)
+            assert column_profile['corr_with_target'] == pytest.approx(listings[col].corr(listings['Price']), rel=1e-9)
+        assert profile['columns']['Price']['corr_with_target'] == 1.0
+
+    def test_text_value_counts(self, listings):
+        """Test that text columns report their value counts, most frequent first."""
+        profile = profile_dataframe(listings)
+
+        counts = profile['columns']['Parish']['value_counts']
+        assert counts == {str(k): int(v) for k, v in listings['Parish'].value_counts().items()}
+        assert list(counts.values()) == sorted(counts.values(), reverse=True)
+        assert profile['columns']['Parish']['kind'] == 'text'
+
+    def test_chunked_matches_whole(self, listings):
+        """Test that profiling chunk by chunk gives the same profile as one pass."""
+        whole = profile_dataframe(listings)
+        chunked = profile_chunks(listings.iloc[start:start + 43] for start in range(0, 300, 43))
+
+        for col, column_profile in whole['columns'].items():
+            assert chunked['columns'][col] == pytest.approx(column_profile, rel=1e-9) \
+                if column_profile['kind'] == 'numeric' else chunked['columns'][col] == column_profile
+
+    def test_merged_shards(self, listings):
+        """Test that merging the profiles of two shards, one lacking a column, counts it as missing."""
+        first = DataProfiler().update(listings.iloc[:100])
+        second = DataProfiler().update(listings.iloc[100:].drop(columns='Country'))
+
+        merged = first.merge(second).to_dict()
+
+        assert merged['rows'] == 300
+        assert merged['columns']['Country']['nulls'] == 200
+        assert merged['columns']['AreaNet']['mean'] == pytest.approx(listings['AreaNet'].mean(), rel=1e-12)
+
+    def test_many_distinct_values_estimated(self, monkeypatch):
+        """Test that distinct counts switch to the HyperLogLog estimate above the exact limit."""
+        monkeypatch.setattr(profile_utils, 'EXACT_DISTINCT_LIMIT', 100)
+        df = pd.DataFrame({'Id': np.arange(5000)})
+
+        column_profile = profile_dataframe(df)['columns']['Id']
+
+        assert not column_profile['distinct_exact']
+        assert abs(column_profile['distinct'] - 5000) < 5000 * 0.05
+
+class TestProfileArtifact:
+    """Test storing profiles next to data files."""
+
+    def test_round_trip_and_staleness(self, listings, temp_directory):
+        """Test that a saved profile loads back until the data file changes."""
+        filepath = f"{temp_directory}/processed.csv"
+        listings.to_csv(filepath, index=False)
+        profile = profile_dataframe(listings)
+
+        assert save_profile(profile, filepath) is True
+        assert get_profile_path(filepath).endswith('processed_profile.json')
+        assert load_profile(filepath)['rows'] == 300
+
+        listings.iloc[:10].to_csv(filepath, index=False)
+        assert load_profile(filepath) is None
+
+    def test_saved_state_merges_like_whole(self, listings, temp_directory):
+        """Test that a profiler restored from its saved state merges new rows like one pass."""
+        filepath = f"{temp_directory}/processed.csv"
+        listings.to_csv(filepath, index=False)
+        profiler = DataProfiler().update(listings.iloc[:200])
+        save_profile(profiler.to_dict(), filepath, profiler)
+
+        restored = load_profiler(filepath)
+        merged = restored.merge(DataProfiler().update(listings.iloc[200:])).to_dict()
+
+        whole = profile_dataframe(listings)
+        for col, column_profile in whole['columns'].items():
+            assert merged['columns'][col] == pytest.approx(column_profile, rel=1e-9) \
+                if column_profile['kind'] == 'numeric' else merged['columns'][col] == column_profile
+
+    def test_profile_without_state(self, listings, temp_directory):
+        """Test that a profile saved without its state restores no profiler."""
+        filepath = f"{temp_directory}/processed.csv"
+        listings.to_csv(filepath, index=False)
+        save_profile(profile_dataframe(listings), filepath)
+
+        assert load_profiler(filepath) is None
@@ -0,0 +1,131 @@
+import pytest
+import json
+import numpy as np
+import pandas as pd
+import sys
+sys.path.append('..')
+from utils.sketch_utils import KLLSketch, HyperLogLog
+
+@pytest.fixture
+def skewed_values():
+    """Create a large, skewed sample similar to listing prices."""
+    return np.random.RandomState(42).lognormal(mean=12.5, sigma=0.6, size=200000)
+
+def rank_error(values, estimate, q):
+    """Distance between the true rank of an estimate and the requested quantile."""
+    return abs(np.searchsorted(np.sort(values), estimate) / len(values) - q)
+
+class TestExactQuantiles:
+    """Test that uncompacted sketches match numpy exactly."""
+
+    def test_small_sample_is_exact(self):
+        """Test that quantiles of a small sample equal numpy's linear interpolation."""
+        values = np.random.RandomState(0).normal(size=500)
+        sketch = KLLSketch.from_values(values)
+
+        assert sketch.is_exact
+        assert sketch.quantiles([0, 0.25, 0.5, 0.75, 1]) == list(np.quantile(values, [0, 0.25, 0.5, 0.75, 1]))
+
+    def test_repeated_values_are_exact(self):
+        """Test that repeated insertion matches inserting the copies one by one."""
+        values = np.random.RandomState(1).normal(size=300)
+        sketch = KLLSketch.from_values(values)
+
+        sketch.update_repeated(0.5, 5000)
+
+        expected = np.quantile(np.concatenate([values, np.full(5000, 0.5)]), [0.01, 0.25, 0.75])
+        assert sketch.n == 5300
+        assert sketch.quantiles([0.01, 0.25, 0.75]) == list(expected)
+
+    def test_missing_values_ignored(self):
+        """Test that NaN values are not counted."""
+        sketch = KLLSketch.from_values([1.0, np.nan, 3.0])
+
+        assert sketch.n == 2
+        assert sketch.quantile(0.5) == 2.0
+
+    def test_empty_sketch(self):
+        """Test that an empty sketch returns NaN."""
+        assert np.isnan(KLLSketch().quantile(0.5))
+
+    def test_invalid_quantile(self):
+        """Test that quantiles outside [0, 1] are rejected."""
+        with pytest.raises(ValueError):
+            KLLSketch.from_values([1.0, 2.0]).quantile(1.5)
+
+class TestApproximateQuantiles:
+    """Test the accuracy of compacted sketches against exact quantiles."""
+
+    @pytest.mark.parametrize('q', [0.01, 0.25, 0.5, 0.75, 0.99])
+    def test_rank_error_bounded(self, skewed_values, q):
+        """Test that chunk-wise updates keep the rank error within 2% for k=200."""
+        sketch = KLLSketch(k=200)
+        for chunk in np.array_split(skewed_values, 50):
+            sketch.update_many(chunk)
+
+        assert not sketch.is_exact
+        assert rank_error(skewed_values, sketch.quantile(q), q) < 0.02
+
+    def test_memory_bounded(self, skewed_values):
+        """Test that the sketch keeps far fewer items than it has seen."""
+        sketch = KLLSketch.from_values(skewed_values, k=200)
+
+        assert sum(len(items) for items in sketch._levels) < 1000
+        assert sketch.min == skewed_values.min()
+        assert sketch.max == skewed_values.max()
+
+    def test_merged_sketches(self, skewed_values):
+        """Test that sketches built on separate parts merge into an accurate sketch."""
+        parts = np.array_split(skewed_values, 4)
+        sketch = KLLSketch(k=200, seed=0)
+        for seed, part in enumerate(parts[1:], start=1):
+            sketch.merge(KLLSketch.from_values(part, k=200, seed=seed))
+        sketch.merge(KLLSketch.from_values(parts[0], k=200))
+
+        assert sketch.n == len(skewed_values)
+        for q in [0.25, 0.5, 0.75]:
+            assert rank_error(skewed_values, sketch.quantile(q), q) < 0.02
+
+    def test_rank(self, skewed_values):
+        """Test that the estimated rank of the true median is close to 0.5."""
+        sketch = KLLSketch.from_values(skewed_values, k=200)
+
+        assert abs(sketch.rank(np.median(skewed_values)) - 0.5) < 0.02
+
+class TestSerialization:
+    """Test storing sketches as JSON."""
+
+    def test_round_trip(self, skewed_values):
+        """Test that a restored sketch gives the same quantiles and can keep growing."""
+        sketch = KLLSketch.from_values(skewed_values[:100000], k=200)
+
+        restored = KLLSketch.from_dict(json.loads(json.dumps(sketch.to_dict())))
+
+        assert restored.quantiles([0.1, 0.5, 0.9]) == sketch.quantiles([0.1, 0.5, 0.9])
+        restored.update_many(skewed_values[100000:])
+        assert restored.n == len(skewed_values)
+        assert rank_error(skewed_values, restored.quantile(0.5), 0.5) < 0.02
+
+class TestHyperLogLog:
+    """Test distinct counting with HyperLogLog."""
+    
+    def test_estimate_accuracy(self):
+        """Test that small and large cardinalities are estimated within a few percent."""
+        for n in [50, 200000]:
+            sketch = HyperLogLog()
+            sketch.update_hashes(pd.util.hash_array(np.arange(n)))
+            
+            assert abs(sketch.estimate() - n) <= max(2, 0.05 * n)
+    
+    def test_merge_and_round_trip(self):
+        """Test that merged sketches count the union and survive JSON."""
+        hashes = pd.util.hash_array(np.arange(20000))
+        first, second, whole = HyperLogLog(), HyperLogLog(), HyperLogLog()
+        first.update_hashes(hashes[:15000])
+        second.update_hashes(hashes[5000:])
+        whole.update_hashes(hashes)
+        
+        first.merge(second)
+        restored = HyperLogLog.from_dict(json.loads(json.dumps(first.to_dict())))
+        
+        assert restored.estimate() == whole.estimate()
@@ -0,0 +1,105 @@
+import pytest
+import json
+import os
+import numpy as np
+import pandas as pd
+import sys
+sys.path.append('..')
+from utils.stats_utils import (
+    STATS_VERSION, get_stats_path, save_cleaning_stats, load_cleaning_stats, apply_serving_stats
+)
+
+@pytest.fixture
+def fitted_stats():
+    """Create statistics shaped like the output of clean_data_with_stats."""
+    return {
+        'dropped_columns': ['Id'],
+        'fill_values': {
+            'Bedrooms': np.float64(2.0),
+            'AreaNet': np.float64(90.0),
+            'AreaGross': np.float64(180.0),
+            'Price': np.float64(450000.0),
+            'Parish': 'Marvila'
+        },
+        'outlier_bounds': {
+            'Price': (np.float64(-394375.0), np.float64(1380625.0)),
+            'AreaNet': (np.float64(-56.875), np.float64(266.125)),
+            'AreaGross': (np.float64(-113.75), np.float64(532.25))
+        },
+        'capped_columns': ['Price', 'AreaNet'],
+        'late_dropped_columns': ['Price M2']
+    }
+
+class TestSaveAndLoad:
+    """Test persisting the cleaning statistics."""
+
+    def test_round_trip(self, temp_directory, fitted_stats):
+        """Test that saved statistics load back with tuple bounds and plain values."""
+        assert save_cleaning_stats(fitted_stats, temp_directory) is True
+
+        stats = load_cleaning_stats(temp_directory)
+
+        assert stats['fill_values'] == {'Bedrooms': 2.0, 'AreaNet': 90.0, 'AreaGross': 180.0,
+                                        'Price': 450000.0, 'Parish': 'Marvila'}
+        assert stats['outlier_bounds']['AreaNet'] == (-56.875, 266.125)
+        assert stats['capped_columns'] == ['Price', 'AreaNet']
+        with open(get_stats_path(temp_directory)) as f:
+            assert json.load(f)['stats_version'] == STATS_VERSION
+
+    def test_source_checksum_recorded(self, temp_directory, fitted_stats):
+        """Test that the checksum of the raw data file is recorded."""
+        source_path = os.path.join(temp_directory, 'raw.csv')
+        with open(source_path, 'w') as f:
+            f.write('Price\n1\n')
+
+        save_cleaning_stats(fitted_stats, temp_directory, source_path=source_path)
+
+        assert len(load_cleaning_stats(temp_directory)['source_checksum']) == 64
+
+    def test_missing_file(self, temp_directory):
+        """Test that a directory without statistics returns None."""
+        assert load_cleaning_stats(temp_directory) is None
+
+    def test_unsupported_version(self, temp_directory, fitted_stats):
+        """Test that statistics written by another format version are ignored."""
+        save_cleaning_stats(fitted_stats, temp_directory)
+        stats_path = get_stats_path(temp_directory)
+        with open(stats_path) as f:
+            data = json.load(f)
+        data['stats_version'] = STATS_VERSION + 1
+        with open(stats_path, 'w') as f:
+            json.dump(data, f)
+
+        assert load_cleaning_stats(temp_directory) is None
+
+class TestApplyServingStats:
+    """Test imputing and capping serving inputs."""
+
+    def test_fill_and_cap_batch(self, fitted_stats):
+        """Test that missing values are imputed and extreme areas are capped."""
+        batch = pd.DataFrame({
+            'Bedrooms': [3, None],
+            'AreaNet': [120.0, 5000.0],
+            'Parish': [None, 'Alvalade']
+        })
+
+        result = apply_serving_stats(batch, fitted_stats)
+
+        assert result['Bedrooms'].tolist() == [3.0, 2.0]
+        assert result['AreaNet'].tolist() == [120.0, 266.125]
+        assert result['Parish'].tolist() == ['Marvila', 'Alvalade']
+        assert result['AreaGross'].tolist() == [180.0, 180.0]
+
+    def test_target_not_added(self, fitted_stats):
+        """Test that the target is neither imputed nor capped at serving time."""
+        result = apply_serving_stats(pd.DataFrame({'Bedrooms': [2]}), fitted_stats)
+
+        assert 'Price' not in result.columns
+
+    def test_input_not_modified(self, fitted_stats):
+        """Test that the input rows are left unchanged."""
+        batch = pd.DataFrame({'AreaNet': [5000.0]})
+
+        apply_serving_stats(batch, fitted_stats)
+
+        assert batch['AreaNet'].iloc[0] == 5000.0
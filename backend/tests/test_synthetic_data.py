@@ -0,0 +1,119 @@
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+sys.path.append('..')
+from backend.data.synthetic_data import (
+    DEFAULT_SOURCE, fit_listing_distribution, generate_listings, write_synthetic_listings,
+    save_listing_distribution, load_listing_distribution
+)
+from backend.benchmarks.scaling_harness import measure, run_scaling_benchmark, fit_scaling_exponents
+from utils.validation_utils import LISBON_LATITUDE_RANGE, LISBON_LONGITUDE_RANGE
+
+@pytest.fixture(scope="module")
+def raw_listings():
+    """Load the raw Lisbon listings the generator is fitted on."""
+    return pd.read_csv(DEFAULT_SOURCE)
+
+@pytest.fixture(scope="module")
+def distribution(raw_listings):
+    """Fit the listing distribution once for all tests."""
+    return fit_listing_distribution(raw_listings)
+
+class TestGenerateListings:
+    """Test the synthetic listing generator."""
+
+    def test_reproducible(self, distribution):
+        """Test that the same seed gives the same listings and another seed different ones."""
+        first = generate_listings(500, distribution, random_state=7)
+        second = generate_listings(500, distribution, random_state=7)
+        other = generate_listings(500, distribution, random_state=8)
+
+        pd.testing.assert_frame_equal(first, second)
+        assert not first['Price'].equals(other['Price'])
+
+    def test_matches_raw_schema(self, distribution, raw_listings):
+        """Test that the listings have the columns and dtypes of the raw file."""
+        listings = generate_listings(1000, distribution)
+
+        assert list(listings.columns) == list(raw_listings.columns)
+        assert listings.dtypes.to_dict() == raw_listings.dtypes.to_dict()
+        assert listings['Id'].tolist() == list(range(1, 1001))
+
+    def test_follows_raw_distribution(self, distribution, raw_listings):
+        """Test that parish frequencies and price and area medians follow the raw listings."""
+        listings = generate_listings(50000, distribution)
+
+        raw_freq = raw_listings['Parish'].value_counts(normalize=True)
+        synthetic_freq = listings['Parish'].value_counts(normalize=True).reindex(raw_freq.index, fill_value=0)
+        assert np.abs(raw_freq - synthetic_freq).max() < 0.01
+        for col in ['Price', 'AreaNet']:
+            assert listings[col].median() == pytest.approx(raw_listings[col].median(), rel=0.15)
+
+    def test_coordinates_inside_lisbon(self, distribution):
+        """Test that sampled coordinates stay inside the Lisbon bounding box."""
+        listings = generate_listings(5000, distribution)
+
+        assert listings['Latitude'].between(*LISBON_LATITUDE_RANGE).all()
+        assert listings['Longitude'].between(*LISBON_LONGITUDE_RANGE).all()
+
+class TestSyntheticArtifacts:
+    """Test writing synthetic listings and the fitted distribution."""
+
+    def test_distribution_round_trip(self, distribution, temp_directory):
+        """Test that a saved distribution generates the same listings after loading."""
+        filepath = f"{temp_directory}/distribution.json"
+
+        assert save_listing_distribution(distribution, filepath) is True
+        loaded = load_listing_distribution(filepath)
+
+        pd.testing.assert_frame_equal(generate_listings(300, loaded), generate_listings(300, distribution))
+
+    def test_write_in_chunks(self, distribution, temp_directory):
+        """Test that chunked writing produces every row with consecutive ids."""
+        filepath = f"{temp_directory}/synthetic.csv"
+
+        assert write_synthetic_listings(2500, filepath, distribution, chunksize=1000) is True
+        written = pd.read_csv(filepath)
+
+        assert len(written) == 2500
+        assert written['Id'].tolist() == list(range(1, 2501))
+
+class TestScalingHarness:
+    """Test the dataset-size scaling harness."""
+
+    def test_measure(self):
+        """Test that measure returns the result, the time, the resident memory and silences output."""
+        result, seconds, peak_mb, rss_mb = measure(lambda: print('noise') or np.ones(1000).sum())
+
+        assert result == 1000
+        assert seconds >= 0
+        assert peak_mb is None
+        assert rss_mb >= 0
+
+    def test_data_stages(self, capsys):
+        """Test measuring cleaning and feature engineering, with training skipped above the row cap."""
+        results = run_scaling_benchmark([200, 800], max_train_rows=0)
+
+        assert [(r['rows'], r['stage']) for r in results] == [
+            (n, stage) for n in [200, 800] for stage in ['clean', 'engineer', 'train', 'predict']
+        ]
+        measured = [r for r in results if r['stage'] in ('clean', 'engineer')]
+        assert all(r['status'] == 'ok' and r['seconds'] > 0 and r['peak_memory_mb'] > 0 for r in measured)
+        assert all(r['status'].startswith('skipped') for r in results if r['stage'] in ('train', 'predict'))
+
+        exponents = fit_scaling_exponents(results)
+        assert set(exponents) == {'clean', 'engineer'}
+        assert exponents['clean']['time_exponent'] is not None
+
+    def test_exponents(self):
+        """Test that a quadratic stage gets a time exponent of two."""
+        results = [{'rows': n, 'stage': 'train', 'seconds': n ** 2 / 1e6, 'peak_memory_mb': n / 1e3,
+                    'peak_rss_mb': n / 1e2, 'status': 'ok'}
+                   for n in [100, 1000, 10000]]
+
+        exponents = fit_scaling_exponents(results)['train']
+
+        assert exponents['time_exponent'] == pytest.approx(2.0)
+        assert exponents['memory_exponent'] == pytest.approx(1.0)
+        assert exponents['rss_exponent'] == pytest.approx(1.0)
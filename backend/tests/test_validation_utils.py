@@ -0,0 +1,94 @@
+import pytest
+import os
+import numpy as np
+import pandas as pd
+import sys
+sys.path.append('..')
+from utils.validation_utils import (
+    REASON_COLUMN, get_validation_rules, validate_rows, describe_failures, split_invalid_rows,
+    write_quarantine, quarantine_invalid_rows
+)
+
+@pytest.fixture
+def raw_listings():
+    """Create raw listings where rows 1 to 4 break one or more rules."""
+    return pd.DataFrame({
+        'Price': [300000, 450000, 2500000, 500000, 350000],
+        'AreaNet': [80, -10, 60, 100, 90],
+        'AreaGross': [100, 140, 70, 120, 110],
+        'Bedrooms': [2, 3, 0, 2, 1],
+        'Bathrooms': [1, 2, 1, 1, 1],
+        'Latitude': [38.72, 38.75, 38.73, 41.15, np.nan],
+        'Longitude': [-9.14, -9.15, -9.12, -8.61, np.nan],
+        'Condition': ['Used', 'New', 'Used', 'Used', 'Ruin'],
+        'PropertyType': ['Homes', 'Homes', 'Homes', 'Homes', np.nan]
+    })
+
+class TestValidateRows:
+    """Test evaluating the validation rules."""
+
+    def test_reason_codes(self, raw_listings):
+        """Test that every failing rule is reported for its rows and missing values pass."""
+        failures = validate_rows(raw_listings)
+
+        assert describe_failures(failures).tolist() == [
+            '', 'non_positive_area', 'studio_price', 'outside_lisbon', 'unknown_condition'
+        ]
+
+    def test_categorical_labels(self, raw_listings):
+        """Test that categorical columns are checked like text columns."""
+        typed = raw_listings.astype({'Condition': 'category', 'PropertyType': 'category'})
+
+        np.testing.assert_array_equal(validate_rows(typed), validate_rows(raw_listings))
+
+    def test_multiple_reasons(self, raw_listings):
+        """Test that a row failing several rules lists every reason code."""
+        raw_listings.loc[3, 'AreaNet'] = 0
+
+        assert describe_failures(validate_rows(raw_listings))[3] == 'non_positive_area;outside_lisbon'
+
+    def test_missing_columns_skipped(self):
+        """Test that rules whose columns are absent do not fail rows."""
+        failures = validate_rows(pd.DataFrame({'Price': [100000, -1]}))
+
+        assert describe_failures(failures).tolist() == ['', 'non_positive_price']
+        assert validate_rows(pd.DataFrame({'Parish': ['Alvalade']})).tolist() == [0]
+
+    def test_selected_rules(self, raw_listings):
+        """Test that only the selected rules are evaluated."""
+        rules = get_validation_rules(['outside_lisbon'])
+
+        assert describe_failures(validate_rows(raw_listings, rules), rules).tolist() == [
+            '', '', '', 'outside_lisbon', ''
+        ]
+
+class TestQuarantine:
+    """Test separating and storing invalid rows."""
+
+    def test_split(self, raw_listings):
+        """Test that valid rows keep their labels and invalid rows carry their reasons."""
+        valid, invalid = split_invalid_rows(raw_listings)
+
+        assert valid.index.tolist() == [0]
+        assert invalid.index.tolist() == [1, 2, 3, 4]
+        assert invalid[REASON_COLUMN].tolist()[0] == 'non_positive_area'
+
+    def test_quarantine_file(self, raw_listings, temp_directory):
+        """Test that quarantined rows are appended, aligning columns with the existing file."""
+        quarantine_path = os.path.join(temp_directory, 'quarantine.csv')
+
+        valid = quarantine_invalid_rows(raw_listings, quarantine_path)
+        quarantine_invalid_rows(raw_listings[raw_listings.columns[::-1]], quarantine_path)
+
+        quarantined = pd.read_csv(quarantine_path)
+        assert len(valid) == 1
+        assert len(quarantined) == 8
+        assert quarantined['AreaNet'].tolist()[4] == -10
+        assert quarantined[REASON_COLUMN].tolist()[:4] == quarantined[REASON_COLUMN].tolist()[4:]
+
+    def test_nothing_to_quarantine(self, raw_listings, temp_directory):
+        """Test that no file is written when every row is valid."""
+        quarantine_path = os.path.join(temp_directory, 'quarantine.csv')
+
+        assert write_quarantine(split_invalid_rows(raw_listings.iloc[:1])[1], quarantine_path) == 0
+        assert not os.path.exists(quarantine_path)
@@ -4,23 +4,72 @@ Contains helper functions for data processing, visualization, and analysis.
 """
 
 from . import data_utils
+from . import cache_utils
+from . import sketch_utils
+from . import dedup_utils
+from . import feature_utils
+from . import stats_utils
+from . import encoding_utils
+from . import profile_utils
+from . import validation_utils
 
 from .data_utils import (
     load_data,
     save_processed_data,
     check_missing_values,
     explore_numeric_features,
-    preprocess_input
+    preprocess_input,
+    to_sparse_matrix,
+    to_dense_array,
+    encode_sparse_rows,
+    get_design_matrix_bytes,
+    compute_data_summary,
+    load_data_summary,
+    read_table,
+    write_table,
+    apply_schema,
+    append_table
 )
+from .feature_utils import compute_features
+from .stats_utils import save_cleaning_stats, load_cleaning_stats
+from .encoding_utils import save_category_encodings, load_category_encodings
+from .profile_utils import profile_dataframe
+from .validation_utils import validate_rows, quarantine_invalid_rows
 
 __all__ = [
     # Module exports
     'data_utils',
+    'cache_utils',
+    'sketch_utils',
+    'dedup_utils',
+    'feature_utils',
+    'stats_utils',
+    'encoding_utils',
+    'profile_utils',
+    'validation_utils',
     
     # Function exports
     'load_data',
     'save_processed_data',
     'check_missing_values',
     'explore_numeric_features',
-    'preprocess_input'
+    'preprocess_input',
+    'to_sparse_matrix',
+    'to_dense_array',
+    'encode_sparse_rows',
+    'get_design_matrix_bytes',
+    'compute_data_summary',
+    'load_data_summary',
+    'read_table',
+    'write_table',
+    'apply_schema',
+    'append_table',
+    'compute_features',
+    'save_cleaning_stats',
+    'load_cleaning_stats',
+    'save_category_encodings',
+    'load_category_encodings',
+    'profile_dataframe',
+    'validate_rows',
+    'quarantine_invalid_rows'
 ]
\ No newline at end of file
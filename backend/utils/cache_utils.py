@@ -0,0 +1,167 @@
+"""
+Caching helpers for the Lisbon House Price Prediction project.
+Contains file fingerprinting functions and a small in-memory cache that is
+invalidated whenever the file an entry was derived from changes.
+"""
+import os
+import json
+import hashlib
+import tempfile
+import threading
+
+def get_file_version(filepath):
+    """
+    Build a cheap version fingerprint for a file from its modification time and size.
+
+    Args:
+        filepath (str): Path to the file
+
+    Returns:
+        tuple or None: (mtime_ns, size) or None if the file cannot be accessed
+    """
+    try:
+        stat = os.stat(filepath)
+    except (OSError, TypeError, ValueError):
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+def get_file_checksum(filepath, chunk_size=1024 * 1024):
+    """
+    Compute the SHA-256 checksum of a file without loading it into memory at once.
+
+    Args:
+        filepath (str): Path to the file
+        chunk_size (int): Number of bytes read per iteration
+
+    Returns:
+        str or None: Hex digest of the file contents or None if the file cannot be read
+    """
+    try:
+        digest = hashlib.sha256()
+        with open(filepath, 'rb') as f:
+            for block in iter(lambda: f.read(chunk_size), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    except (OSError, TypeError, ValueError):
+        return None
+
+def get_path_checksum(path):
+    """
+    Compute the SHA-256 checksum of a file, or of every file in a directory store.
+
+    For directories the digest covers the relative names and contents of all files,
+    so it changes when any file is added, removed or modified.
+
+    Args:
+        path (str): Path to a file or directory
+
+    Returns:
+        str or None: Hex digest or None if the path cannot be read
+    """
+    if not isinstance(path, str) or not os.path.isdir(path):
+        return get_file_checksum(path)
+
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for filename in sorted(files):
+            file_path = os.path.join(root, filename)
+            file_checksum = get_file_checksum(file_path)
+            if file_checksum is None:
+                return None
+            digest.update(os.path.relpath(file_path, path).encode('utf-8'))
+            digest.update(file_checksum.encode('ascii'))
+    return digest.hexdigest()
+
+class VersionedCache:
+    """In-memory cache whose entries are dropped when their source version changes."""
+
+    def __init__(self):
+        """Initialize an empty cache."""
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        """
+        Get a cached value if it was stored for the same version.
+
+        Args:
+            key: Cache key, usually a file path
+            version: Current version of the source (see get_file_version)
+
+        Returns:
+            object or None: Cached value or None if missing or stale
+        """
+        if version is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            return None
+        return entry[1]
+
+    def set(self, key, version, value):
+        """
+        Store a value for a given source version, replacing any older entry.
+
+        Args:
+            key: Cache key, usually a file path
+            version: Version of the source the value was computed from
+            value: Value to cache
+        """
+        if version is None:
+            return
+        with self._lock:
+            self._entries[key] = (version, value)
+
+    def get_or_compute(self, key, version, compute):
+        """
+        Return the cached value for a version, computing and storing it on a miss.
+
+        Values are never cached when the version is unknown (e.g. the source file
+        could not be accessed), so callers always see fresh results in that case.
+
+        Args:
+            key: Cache key, usually a file path
+            version: Current version of the source
+            compute (callable): Function without arguments that builds the value
+
+        Returns:
+            object: Cached or freshly computed value
+        """
+        value = self.get(key, version)
+        if value is None:
+            value = compute()
+            self.set(key, version, value)
+        return value
+
+    def clear(self):
+        """Remove all cached entries."""
+        with self._lock:
+            self._entries.clear()
+
+def write_json_atomic(data, filepath, **dump_kwargs):
+    """
+    Write JSON to a file atomically so readers never see a partially written file.
+
+    The data is written to a temporary file in the same directory which then
+    replaces the target in a single rename.
+
+    Args:
+        data: JSON-serializable object
+        filepath (str): Destination path
+        **dump_kwargs: Extra keyword arguments for json.dump
+    """
+    directory = os.path.dirname(os.path.abspath(filepath))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix='.tmp_', suffix='.json', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, **dump_kwargs)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, filepath)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
@@ -2,45 +2,535 @@
 Utility functions for data operations in the Lisbon House Price Prediction project.
 Contains functions moved from preprocessing.py for better code organization.
 """
+import io
 import os
+import glob
+import json
+import shutil
+import tempfile
+import numpy as np
 import pandas as pd
+import scipy.sparse as sp
+from .cache_utils import get_path_checksum, write_json_atomic
+from .sketch_utils import KLLSketch
+from .feature_utils import add_serving_features
+from .stats_utils import apply_serving_stats
+from .encoding_utils import apply_category_encodings, get_encoded_columns
+from .profile_utils import profile_dataframe
 
-def load_data(filepath='./lisbon-houses.csv'):
+# Feather and Parquet support is optional and needs pyarrow
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Categorical columns whose value counts are reported in the data summary
+SUMMARY_CATEGORICAL_COLUMNS = ['Parish', 'PropertyType', 'PropertySubType', 'Condition']
+
+# Supported on-disk formats by extension; '.npcols' is a directory with one .npy file per column
+DATA_FORMATS = {'.csv': 'csv', '.feather': 'feather', '.parquet': 'parquet', '.npcols': 'npcols'}
+COLUMNAR_EXTENSIONS = ['.feather', '.parquet', '.npcols']
+NPCOLS_SCHEMA_FILE = 'schema.json'
+
+# Declared schema of the Lisbon listings: low-cardinality text columns load as
+# 'category', integer columns are downcast after parsing, and the columns that
+# hold a single value for the whole dataset are never read
+CATEGORICAL_COLUMNS = [
+    'Condition', 'PropertyType', 'PropertySubType', 'PropertyCategory',
+    'Country', 'District', 'Municipality', 'Parish'
+]
+INTEGER_COLUMNS = ['Id', 'Bedrooms', 'Bathrooms', 'AreaNet', 'AreaGross', 'Parking', 'Price M2', 'Price']
+CONSTANT_COLUMNS = ['Country', 'District', 'Municipality']
+
+def get_data_format(filepath):
     """
-    Load the raw dataset from CSV.
+    Determine the on-disk format of a dataset from its extension.
     
     Args:
-        filepath (str): Path to the CSV file
+        filepath (str): Path to the dataset
         
     Returns:
-        pd.DataFrame: Raw data
+        str: One of 'csv', 'feather', 'parquet' or 'npcols' (unknown extensions are read as CSV)
+    """
+    extension = os.path.splitext(str(filepath).rstrip('/\\'))[1].lower()
+    return DATA_FORMATS.get(extension, 'csv')
+
+def get_columnar_path(filepath):
+    """
+    Get the path of the columnar store for a dataset, next to its CSV export.
+    
+    Feather is used when pyarrow is installed, otherwise a NumPy-per-column directory.
+    
+    Args:
+        filepath (str): Path to the CSV version of the dataset
+        
+    Returns:
+        str: Path to the columnar store
+    """
+    extension = '.feather' if PYARROW_AVAILABLE else '.npcols'
+    return f"{os.path.splitext(filepath)[0]}{extension}"
+
+def find_processed_data_file(data_dir, basename='lisbon_houses_processed'):
+    """
+    Find the processed dataset in a directory, preferring a columnar store over the CSV export.
+    
+    Args:
+        data_dir (str): Directory containing the processed data
+        basename (str): File name of the dataset without extension
+        
+    Returns:
+        str: Path to the columnar store if one exists, otherwise to the CSV file
+    """
+    for extension in COLUMNAR_EXTENSIONS:
+        path = os.path.join(data_dir, f"{basename}{extension}")
+        if os.path.isfile(path) or os.path.isdir(path):
+            return path
+    return os.path.join(data_dir, f"{basename}.csv")
+
+def list_data_shards(source):
+    """
+    List the data files a source refers to, for datasets delivered as many shards.
+    
+    Args:
+        source (str): A data file, a directory of data files or a glob pattern
+        
+    Returns:
+        list: Sorted paths of the .csv, .feather, .parquet files and .npcols stores
+    """
+    if os.path.isdir(source) and get_data_format(source) != 'npcols':
+        paths = [os.path.join(source, name) for name in os.listdir(source)]
+    elif glob.has_magic(source):
+        paths = glob.glob(source)
+    else:
+        return [source]
+    
+    return sorted(
+        path for path in paths
+        if os.path.splitext(path.rstrip('/\\'))[1].lower() in DATA_FORMATS
+    )
+
+def get_path_size(path):
+    """
+    Get the size in bytes of a data file or of all files in a store directory.
+    
+    Args:
+        path (str): Path to the data file or store
+        
+    Returns:
+        int: Size in bytes
     """
+    if not os.path.isdir(path):
+        return os.stat(path).st_size
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+def _column_values(series):
+    """
+    Get a column as a NumPy array of numbers, or None if it is stored as categorical codes.
+    
+    Pandas nullable columns (Int64, Float64, boolean) are converted to their
+    NumPy dtype, or to float64 with NaN for the missing values when they have any.
+    """
+    dtype = series.dtype
+    if isinstance(dtype, np.dtype):
+        return series.to_numpy() if dtype.kind in 'biufcmM' else None
+    numpy_dtype = getattr(dtype, 'numpy_dtype', None)
+    if numpy_dtype is None or numpy_dtype.kind not in 'biuf':
+        return None
+    if series.isna().any():
+        return series.to_numpy(dtype=np.float64, na_value=np.nan)
+    return series.to_numpy(dtype=numpy_dtype)
+
+def _write_npcols(df, dirpath):
+    """Write a dataframe as a directory of .npy column files plus a JSON schema."""
+    parent_dir = os.path.dirname(os.path.abspath(dirpath))
+    os.makedirs(parent_dir, exist_ok=True)
+    temp_dir = tempfile.mkdtemp(prefix='.tmp_', dir=parent_dir)
+    
     try:
+        schema = {'rows': int(len(df)), 'columns': []}
+        for i, col in enumerate(df.columns):
+            series = df[col]
+            column = {'name': col, 'file': f'{i:04d}.npy'}
+            column_path = os.path.join(temp_dir, column['file'])
+            
+            values = _column_values(series)
+            if values is not None:
+                column.update(kind='values', dtype=values.dtype.str)
+                np.save(column_path, values, allow_pickle=False)
+            else:
+                # Text and other non-numeric columns are stored as categorical codes
+                categorical = series.astype('category')
+                column.update(
+                    kind='categorical',
+                    categories=categorical.cat.categories.tolist(),
+                    ordered=bool(categorical.cat.ordered)
+                )
+                np.save(column_path, categorical.cat.codes.to_numpy(), allow_pickle=False)
+            schema['columns'].append(column)
+        
+        with open(os.path.join(temp_dir, NPCOLS_SCHEMA_FILE), 'w', encoding='utf-8') as f:
+            json.dump(schema, f)
+        
+        _swap_npcols(temp_dir, dirpath)
+    except BaseException:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+
+def _swap_npcols(temp_dir, dirpath):
+    """Swap a finished store into place so readers never see a partial directory."""
+    parent_dir = os.path.dirname(os.path.abspath(dirpath))
+    old_dir = None
+    if os.path.exists(dirpath):
+        old_dir = tempfile.mkdtemp(prefix='.old_', dir=parent_dir)
+        os.rename(dirpath, os.path.join(old_dir, 'store'))
+    os.rename(temp_dir, dirpath)
+    if old_dir:
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+def _append_npy(path, values, rows):
+    """
+    Append values to a 1-d .npy file in place, keeping its first rows values.
+    
+    The new values are written after the stored ones first and the header's
+    shape is updated afterwards, so a reader never sees a length it cannot
+    read. Bytes left behind by an interrupted append are cut off.
+    
+    Returns:
+        bool: True if appended, False if the file must be rewritten (other dtype,
+              a header that cannot grow in place or an unknown format version)
+    """
+    with open(path, 'r+b') as f:
+        version = np.lib.format.read_magic(f)
+        if version not in ((1, 0), (2, 0)):
+            return False
+        read_header, write_header = {
+            (1, 0): (np.lib.format.read_array_header_1_0, np.lib.format.write_array_header_1_0),
+            (2, 0): (np.lib.format.read_array_header_2_0, np.lib.format.write_array_header_2_0)
+        }[version]
+        shape, fortran_order, dtype = read_header(f)
+        data_offset = f.tell()
+        if dtype != values.dtype or len(shape) != 1 or shape[0] < rows or dtype.hasobject:
+            return False
+        
+        header = io.BytesIO()
+        write_header(header, {'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': fortran_order,
+                              'shape': (rows + len(values),)})
+        # The header is padded to leave room for a longer shape; beyond it the file is rewritten
+        if len(header.getvalue()) != data_offset:
+            return False
+        
+        f.seek(data_offset + rows * dtype.itemsize)
+        f.truncate()
+        f.write(np.ascontiguousarray(values).tobytes())
+        f.flush()
+        f.seek(0)
+        f.write(header.getvalue())
+    return True
+
+def _rewrite_npy(path, values):
+    """Replace a .npy file with new contents, atomically."""
+    temp_path = f'{path}.tmp'
+    np.save(temp_path, values, allow_pickle=False)
+    os.replace(f'{temp_path}.npy', path)
+
+def _append_npcols(df, dirpath):
+    """
+    Append rows to a store written by _write_npcols.
+    
+    Each column file is extended in place, so an append costs time in the
+    appended rows, not the stored ones. New categories are added after the
+    existing ones, so the codes already stored keep their meaning and only the
+    new rows need encoding. A column whose dtype has to widen is rewritten.
+    The schema, written last, holds the row count readers trust.
+    """
+    with open(os.path.join(dirpath, NPCOLS_SCHEMA_FILE), 'r', encoding='utf-8') as f:
+        schema = json.load(f)
+    
+    rows = schema['rows']
+    new_schema = {'rows': rows + int(len(df)), 'columns': []}
+    for column in schema['columns']:
+        column_path = os.path.join(dirpath, column['file'])
+        stored_dtype = np.dtype(column['dtype']) if column['kind'] == 'values' else None
+        series = df[column['name']] if column['name'] in df.columns else pd.Series(np.nan, index=df.index)
+        column = dict(column)
+        
+        if column['kind'] == 'values':
+            values = _column_values(series)
+            if values is None:
+                raise ValueError(f"Column '{column['name']}' is not numeric in the appended rows")
+            dtype = np.result_type(stored_dtype, values.dtype)
+        else:
+            known = set(column['categories'])
+            added = [value for value in pd.unique(series.dropna().astype(object)) if value not in known]
+            column['categories'] = column['categories'] + added
+            values = pd.Categorical(series.astype(object), categories=column['categories']).codes
+            stored_dtype = np.load(column_path, mmap_mode='r', allow_pickle=False).dtype
+            # Codes keep the stored width while the categories fit in it
+            dtype = stored_dtype if len(column['categories']) < np.iinfo(stored_dtype).max else values.dtype
+        
+        values = values.astype(dtype, copy=False)
+        if dtype != stored_dtype or not _append_npy(column_path, values, rows):
+            existing = np.load(column_path, allow_pickle=False)[:rows]
+            _rewrite_npy(column_path, np.concatenate([existing.astype(dtype), values]))
+        if column['kind'] == 'values':
+            column['dtype'] = dtype.str
+        new_schema['columns'].append(column)
+    
+    write_json_atomic(new_schema, os.path.join(dirpath, NPCOLS_SCHEMA_FILE))
+
+def _read_npcols(dirpath, columns=None, mmap=False):
+    """Read a NumPy-per-column directory written by _write_npcols."""
+    with open(os.path.join(dirpath, NPCOLS_SCHEMA_FILE), 'r', encoding='utf-8') as f:
+        schema = json.load(f)
+    
+    data = {}
+    for column in schema['columns']:
+        if columns is not None and column['name'] not in columns:
+            continue
+        
+        # Column files can hold rows of an append that has not finished yet
+        values = np.load(
+            os.path.join(dirpath, column['file']),
+            mmap_mode='r' if mmap else None,
+            allow_pickle=False
+        )[:schema['rows']]
+        if column['kind'] == 'categorical':
+            data[column['name']] = pd.Categorical.from_codes(
+                np.asarray(values), categories=column['categories'], ordered=column['ordered']
+            )
+        else:
+            data[column['name']] = values
+    
+    return pd.DataFrame(data, index=pd.RangeIndex(schema['rows']), copy=False)
+
+def apply_schema(df):
+    """
+    Convert a dataframe to the declared Lisbon schema.
+    
+    Constant columns are dropped, text columns become categorical and integer
+    columns are downcast to the smallest integer type holding their values.
+    Float columns keep float64 so coordinates and derived ratios are unchanged.
+    
+    Args:
+        df (pd.DataFrame): Loaded data
+        
+    Returns:
+        pd.DataFrame: Data with schema dtypes
+    """
+    df = df.drop(columns=[col for col in CONSTANT_COLUMNS if col in df.columns])
+    
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns and df[col].dtype == object:
+            df[col] = df[col].astype('category')
+    
+    for col in INTEGER_COLUMNS:
+        if col in df.columns and pd.api.types.is_integer_dtype(df[col].dtype):
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+    
+    return df
+
+def _read_typed_csv(filepath, columns=None):
+    """Read a CSV with schema dtypes, skipping the constant columns while parsing."""
+    if columns is None:
+        columns = lambda col: col not in CONSTANT_COLUMNS
+    dtype = {col: 'category' for col in CATEGORICAL_COLUMNS}
+    return apply_schema(pd.read_csv(filepath, usecols=columns, dtype=dtype))
+
+def read_table(filepath, columns=None, mmap=False, typed=False):
+    """
+    Read a dataset, choosing the reader from the file extension.
+    
+    Args:
+        filepath (str): Path to a .csv, .feather, .parquet file or .npcols directory
+        columns (list, optional): Subset of columns to read
+        mmap (bool): Memory-map numeric columns of .npcols stores instead of reading them
+        typed (bool): Apply the declared schema (see apply_schema), pruning constant
+            columns and parsing text columns as categorical while reading CSV files
+        
+    Returns:
+        pd.DataFrame: Loaded data (categorical dtypes are kept by the columnar formats)
+    """
+    data_format = get_data_format(filepath)
+    
+    if data_format == 'feather':
+        df = pd.read_feather(filepath, columns=columns)
+    elif data_format == 'parquet':
+        df = pd.read_parquet(filepath, columns=columns)
+    elif data_format == 'npcols':
+        df = _read_npcols(filepath, columns=columns, mmap=mmap)
+    elif typed:
+        return _read_typed_csv(filepath, columns=columns)
+    elif columns is not None:
+        df = pd.read_csv(filepath, usecols=columns)
+    else:
         df = pd.read_csv(filepath)
+    
+    return apply_schema(df) if typed else df
+
+def write_table(df, filepath, decimal_places=None):
+    """
+    Write a dataset, choosing the writer from the file extension.
+    
+    Args:
+        df (pd.DataFrame): Data to write
+        filepath (str): Path to a .csv, .feather, .parquet file or .npcols directory
+        decimal_places (int, optional): Float precision used for CSV output
+    """
+    data_format = get_data_format(filepath)
+    
+    if data_format == 'feather':
+        df.reset_index(drop=True).to_feather(filepath)
+    elif data_format == 'parquet':
+        df.to_parquet(filepath, index=False)
+    elif data_format == 'npcols':
+        _write_npcols(df, filepath)
+    else:
+        float_format = f'%.{decimal_places}f' if decimal_places is not None else None
+        df.to_csv(filepath, index=False, float_format=float_format)
+
+def _match_existing_dtypes(df, dtypes):
+    """Give appended numeric columns the dtypes the stored columns already have."""
+    conversions = {}
+    for col, dtype in dtypes.items():
+        if col not in df.columns or not isinstance(dtype, np.dtype) or dtype.kind not in 'iuf':
+            continue
+        values = df[col]
+        if not pd.api.types.is_numeric_dtype(values.dtype):
+            continue
+        if dtype.kind == 'f':
+            conversions[col] = dtype
+        elif values.notna().all() and (values == np.round(values)).all():
+            conversions[col] = dtype
+    return df.astype(conversions)
+
+def append_table(df, filepath, decimal_places=None):
+    """
+    Append rows to a dataset, creating it if it does not exist yet.
+    
+    Columns are aligned to the stored ones (missing columns are left empty,
+    extra ones are dropped) and numeric columns keep their stored dtypes.
+    CSV files and .npcols stores are extended without parsing the existing
+    rows; Feather and Parquet files are rewritten.
+    
+    Args:
+        df (pd.DataFrame): Rows to append
+        filepath (str): Path to a .csv, .feather, .parquet file or .npcols directory
+        decimal_places (int, optional): Float precision used for CSV output
+    """
+    if not (os.path.isfile(filepath) or os.path.isdir(filepath)):
+        write_table(df, filepath, decimal_places=decimal_places)
+        return
+    
+    data_format = get_data_format(filepath)
+    
+    if data_format == 'csv':
+        # Floats are always written with decimals, so the first rows reveal every column's dtype
+        existing = pd.read_csv(filepath, nrows=1000)
+        rows = _match_existing_dtypes(df.reindex(columns=existing.columns), existing.dtypes)
+        float_format = f'%.{decimal_places}f' if decimal_places is not None else None
+        rows.to_csv(filepath, mode='a', header=False, index=False, float_format=float_format)
+    elif data_format == 'npcols':
+        with open(os.path.join(filepath, NPCOLS_SCHEMA_FILE), 'r', encoding='utf-8') as f:
+            schema = json.load(f)
+        dtypes = {column['name']: np.dtype(column['dtype']) for column in schema['columns']
+                  if column['kind'] == 'values'}
+        _append_npcols(_match_existing_dtypes(df, dtypes), filepath)
+    else:
+        existing = read_table(filepath)
+        rows = _match_existing_dtypes(df.reindex(columns=existing.columns), existing.dtypes)
+        for col in existing.columns:
+            if isinstance(existing[col].dtype, pd.CategoricalDtype):
+                categories = existing[col].cat.categories
+                added = pd.Index(pd.unique(rows[col].dropna().astype(object))).difference(categories)
+                existing[col] = existing[col].cat.add_categories(added)
+                rows[col] = pd.Categorical(rows[col].astype(object), categories=existing[col].cat.categories)
+        write_table(pd.concat([existing, rows], ignore_index=True), filepath)
+
+def load_data(filepath='./lisbon-houses.csv', typed=True):
+    """
+    Load a dataset from CSV or one of the columnar formats.
+    
+    Args:
+        filepath (str): Path to the data file, the format is chosen from its extension
+        typed (bool): Load with the declared schema (categorical text columns,
+            downcast integers, constant columns skipped)
+        
+    Returns:
+        pd.DataFrame: Raw data
+    """
+    try:
+        df = read_table(filepath, typed=typed)
         print(f"Data loaded successfully with {df.shape[0]} rows and {df.shape[1]} columns.")
         return df
     except Exception as e:
         print(f"Error loading data: {e}")
         return None
 
+def iter_table_chunks(filepath, chunksize, columns=None, typed=False):
+    """
+    Iterate over a dataset in chunks of rows without loading it at once.
+    
+    CSV files are parsed incrementally; columnar stores are memory-mapped and sliced.
+    
+    Args:
+        filepath (str): Path to the dataset
+        chunksize (int): Number of rows per chunk
+        columns (list, optional): Subset of columns to read
+        typed (bool): Apply the declared schema to every chunk (see apply_schema)
+        
+    Yields:
+        pd.DataFrame: Consecutive chunks of rows
+    """
+    if get_data_format(filepath) != 'csv':
+        df = read_table(filepath, columns=columns, mmap=True, typed=typed)
+        for start in range(0, len(df), chunksize):
+            yield df.iloc[start:start + chunksize]
+        return
+    
+    if typed:
+        usecols = columns if columns is not None else (lambda col: col not in CONSTANT_COLUMNS)
+        dtype = {col: 'category' for col in CATEGORICAL_COLUMNS}
+        for chunk in pd.read_csv(filepath, usecols=usecols, dtype=dtype, chunksize=chunksize):
+            yield apply_schema(chunk)
+    else:
+        yield from pd.read_csv(filepath, usecols=columns, chunksize=chunksize)
+
+def round_float_columns(df, decimal_places):
+    """
+    Round the float columns of a dataframe.
+    
+    Args:
+        df (pd.DataFrame): Input dataframe
+        decimal_places (int): Number of decimal places to keep
+        
+    Returns:
+        pd.DataFrame: Shallow copy in which only the rounded float columns are new arrays
+    """
+    df_rounded = df.copy(deep=False)
+    float_cols = df_rounded.select_dtypes(include=['floating']).columns
+    
+    for col in float_cols:
+        df_rounded[col] = df_rounded[col].round(decimal_places)
+    return df_rounded
+
 def save_processed_data(df, filepath=None, decimal_places=3):
     """
-    Save the processed dataframe to CSV with limited decimal places.
+    Save the processed dataframe with limited decimal places.
+    
+    The format is chosen from the extension: CSV for exports, or a columnar
+    format (.feather, .parquet, .npcols) that keeps dtypes and loads quickly.
     
     Args:
         df (pd.DataFrame): Processed dataframe
-        filepath (str): Path to save the CSV file
+        filepath (str): Path to save the data to
         decimal_places (int): Number of decimal places to round numeric values
         
     Returns:
         bool: True if saved successfully, False otherwise
     """
     try:
-        df_rounded = df.copy()
-        float_cols = df_rounded.select_dtypes(include=['float64']).columns
-        
-        if not float_cols.empty:
-            df_rounded[float_cols] = df_rounded[float_cols].round(decimal_places)
+        df_rounded = round_float_columns(df, decimal_places)
         
         if filepath is None:
             script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -48,24 +538,351 @@ def save_processed_data(df, filepath=None, decimal_places=3):
         
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
         
-        df_rounded.to_csv(filepath, index=False, float_format=f'%.{decimal_places}f')
+        write_table(df_rounded, filepath, decimal_places=decimal_places)
         print(f"Processed data saved to {filepath} with {decimal_places} decimal places")
+        
+        save_data_summary(df_rounded, filepath)
         return True
     except Exception as e:
         print(f"Error saving processed data: {e}")
         return False
 
-def check_missing_values(df):
+def get_summary_path(filepath):
+    """
+    Get the path of the JSON summary sidecar stored next to a processed data file.
+    
+    Args:
+        filepath (str): Path to the processed data file or store
+        
+    Returns:
+        str: Path to the summary sidecar file (CSV and columnar stores get separate sidecars)
+    """
+    root, extension = os.path.splitext(str(filepath).rstrip('/\\'))
+    if get_data_format(filepath) == 'csv':
+        return f"{root}_summary.json"
+    return f"{root}_{extension.lstrip('.')}_summary.json"
+
+def compute_data_summary(df):
+    """
+    Compute the aggregates served by the data summary and parish list endpoints.
+    
+    Args:
+        df (pd.DataFrame): Processed dataframe
+        
+    Returns:
+        dict: Records count, numeric statistics, categorical value counts and column names
+    """
+    numeric_statistics = {}
+    for col in df.select_dtypes(include=['number']).columns:
+        values = df[col]
+        # Percentiles come from a quantile sketch, exact for datasets up to the sketch size
+        q25, q50, q75 = KLLSketch.from_values(values.to_numpy(dtype='float64')).quantiles([0.25, 0.5, 0.75])
+        numeric_statistics[col] = {
+            'count': float(values.count()),
+            'mean': float(values.mean()),
+            'std': float(values.std()),
+            'min': float(values.min()),
+            '25%': q25,
+            '50%': q50,
+            '75%': q75,
+            'max': float(values.max())
+        }
+    
+    categorical_summary = {}
+    for col in SUMMARY_CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            value_counts = df[col].value_counts()
+            value_counts = value_counts[value_counts > 0]
+            categorical_summary[col] = {str(value): int(count) for value, count in value_counts.items()}
+    
+    return {
+        'records_count': int(len(df)),
+        'numeric_statistics': numeric_statistics,
+        'categorical_summary': categorical_summary,
+        'columns': df.columns.tolist()
+    }
+
+def compute_summary_aggregates(df):
+    """
+    Compute mergeable aggregates from which the data summary can be rebuilt.
+    
+    Numeric columns keep their count, mean, sum of squared deviations, range and
+    a quantile sketch; categorical columns keep their value counts. Aggregates of
+    separate parts of a dataset combine with merge_summary_aggregates.
+    
+    Args:
+        df (pd.DataFrame): Processed dataframe
+        
+    Returns:
+        dict: JSON-compatible aggregates
+    """
+    numeric = {}
+    for col in df.select_dtypes(include=['number']).columns:
+        values = df[col].to_numpy(dtype='float64')
+        values = values[~np.isnan(values)]
+        mean = float(values.mean()) if len(values) else None
+        numeric[col] = {
+            'count': int(len(values)),
+            'mean': mean,
+            'm2': float(((values - mean) ** 2).sum()) if len(values) else 0.0,
+            'min': float(values.min()) if len(values) else None,
+            'max': float(values.max()) if len(values) else None,
+            'sketch': KLLSketch.from_values(values).to_dict()
+        }
+    
+    categorical = {}
+    for col in SUMMARY_CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            value_counts = df[col].value_counts()
+            categorical[col] = {str(value): int(count) for value, count in value_counts.items() if count > 0}
+    
+    return {
+        'records_count': int(len(df)),
+        'columns': df.columns.tolist(),
+        'numeric': numeric,
+        'categorical': categorical
+    }
+
+def _merge_moments(first, second):
+    """Combine the count, mean, squared deviations and range of two parts (Chan et al.)."""
+    if first['count'] == 0:
+        return dict(second)
+    if second['count'] == 0:
+        return dict(first)
+    count = first['count'] + second['count']
+    delta = second['mean'] - first['mean']
+    return {
+        'count': count,
+        'mean': first['mean'] + delta * second['count'] / count,
+        'm2': first['m2'] + second['m2'] + delta ** 2 * first['count'] * second['count'] / count,
+        'min': min(first['min'], second['min']),
+        'max': max(first['max'], second['max'])
+    }
+
+def merge_summary_aggregates(first, second):
+    """
+    Merge the aggregates of two disjoint parts of a dataset.
+    
+    Args:
+        first (dict): Aggregates of the existing rows
+        second (dict): Aggregates of the added rows
+        
+    Returns:
+        dict: Aggregates of all rows
+    """
+    numeric = {}
+    for col in first['numeric'].keys() | second['numeric'].keys():
+        parts = [part['numeric'][col] for part in (first, second) if col in part['numeric']]
+        merged = parts[0]
+        if len(parts) == 2:
+            merged = _merge_moments(parts[0], parts[1])
+            sketch = KLLSketch.from_dict(parts[0]['sketch']).merge(KLLSketch.from_dict(parts[1]['sketch']))
+            merged['sketch'] = sketch.to_dict()
+        numeric[col] = merged
+    
+    categorical = {}
+    for col in first['categorical'].keys() | second['categorical'].keys():
+        counts = dict(first['categorical'].get(col, {}))
+        for value, count in second['categorical'].get(col, {}).items():
+            counts[value] = counts.get(value, 0) + count
+        categorical[col] = counts
+    
+    columns = first['columns'] + [col for col in second['columns'] if col not in first['columns']]
+    return {
+        'records_count': first['records_count'] + second['records_count'],
+        'columns': columns,
+        'numeric': {col: numeric[col] for col in columns if col in numeric},
+        'categorical': {col: categorical[col] for col in SUMMARY_CATEGORICAL_COLUMNS if col in categorical}
+    }
+
+def summary_from_aggregates(aggregates):
+    """
+    Build the data summary (see compute_data_summary) from mergeable aggregates.
+    
+    Args:
+        aggregates (dict): Aggregates from compute_summary_aggregates or merge_summary_aggregates
+        
+    Returns:
+        dict: Records count, numeric statistics, categorical value counts and column names
+    """
+    numeric_statistics = {}
+    for col, stats in aggregates['numeric'].items():
+        count = stats['count']
+        q25, q50, q75 = KLLSketch.from_dict(stats['sketch']).quantiles([0.25, 0.5, 0.75])
+        numeric_statistics[col] = {
+            'count': float(count),
+            'mean': stats['mean'] if count else float('nan'),
+            'std': float(np.sqrt(stats['m2'] / (count - 1))) if count > 1 else float('nan'),
+            'min': stats['min'] if count else float('nan'),
+            '25%': q25,
+            '50%': q50,
+            '75%': q75,
+            'max': stats['max'] if count else float('nan')
+        }
+    
+    categorical_summary = {
+        col: dict(sorted(counts.items(), key=lambda item: -item[1]))
+        for col, counts in aggregates['categorical'].items()
+    }
+    
+    return {
+        'records_count': aggregates['records_count'],
+        'numeric_statistics': numeric_statistics,
+        'categorical_summary': categorical_summary,
+        'columns': list(aggregates['columns'])
+    }
+
+def summary_from_profile(profile):
+    """
+    Build the data summary (see compute_data_summary) from a data profile.
+    
+    Args:
+        profile (dict): Profile of the processed data (see utils.profile_utils)
+        
+    Returns:
+        dict: Records count, numeric statistics, categorical value counts and column names
+    """
+    statistic_names = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+    numeric_statistics = {}
+    categorical_summary = {}
+    for col, column_profile in profile['columns'].items():
+        if column_profile['kind'] == 'numeric':
+            statistics = {name: column_profile[name] for name in statistic_names}
+            statistics['count'] = float(statistics['count'])
+            numeric_statistics[col] = statistics
+        elif col in SUMMARY_CATEGORICAL_COLUMNS and 'value_counts' in column_profile:
+            categorical_summary[col] = dict(column_profile['value_counts'])
+    
+    return {
+        'records_count': profile['rows'],
+        'numeric_statistics': numeric_statistics,
+        'categorical_summary': {col: categorical_summary[col] for col in SUMMARY_CATEGORICAL_COLUMNS
+                                if col in categorical_summary},
+        'columns': list(profile['columns'])
+    }
+
+def save_data_summary(df, filepath):
+    """
+    Write the summary of a saved data file to its JSON sidecar so that it can be
+    served without parsing the data file again.
+    
+    Args:
+        df (pd.DataFrame): Dataframe exactly as it was written to filepath
+        filepath (str): Path of the saved data file
+        
+    Returns:
+        bool: True if the sidecar was written, False otherwise
+    """
+    try:
+        sidecar = {
+            'source_checksum': get_path_checksum(filepath),
+            'summary': compute_data_summary(df),
+            'aggregates': compute_summary_aggregates(df)
+        }
+        summary_path = get_summary_path(filepath)
+        write_json_atomic(sidecar, summary_path)
+        print(f"Data summary saved to {summary_path}")
+        return True
+    except Exception as e:
+        print(f"Error saving data summary: {e}")
+        return False
+
+def load_data_summary(filepath):
+    """
+    Load the summary sidecar of a data file if it still matches the file contents.
+    
+    Args:
+        filepath (str): Path of the data file the summary was computed from
+        
+    Returns:
+        dict or None: Summary dictionary or None if missing, unreadable or stale
+    """
+    try:
+        with open(get_summary_path(filepath), 'r', encoding='utf-8') as f:
+            sidecar = json.load(f)
+    except (OSError, ValueError):
+        return None
+    
+    checksum = sidecar.get('source_checksum')
+    if checksum is None or checksum != get_path_checksum(filepath):
+        return None
+    return sidecar.get('summary')
+
+def load_summary_aggregates(filepath):
+    """
+    Load the mergeable aggregates from the summary sidecar of a data file if it still matches the file.
+    
+    Args:
+        filepath (str): Path of the data file the aggregates were computed from
+        
+    Returns:
+        dict or None: Aggregates or None if missing, unreadable, stale or written without aggregates
+    """
+    try:
+        with open(get_summary_path(filepath), 'r', encoding='utf-8') as f:
+            sidecar = json.load(f)
+    except (OSError, ValueError):
+        return None
+    
+    checksum = sidecar.get('source_checksum')
+    if checksum is None or checksum != get_path_checksum(filepath):
+        return None
+    return sidecar.get('aggregates')
+
+def update_data_summary(filepath, added_df, previous_aggregates):
+    """
+    Refresh the summary sidecar of a data file after rows were appended to it.
+    
+    The aggregates of the added rows are merged into those of the existing rows,
+    so the existing rows are not read again. Without previous aggregates the
+    summary is recomputed from the whole file.
+    
+    Args:
+        filepath (str): Path of the data file the rows were appended to
+        added_df (pd.DataFrame): Appended rows exactly as they were written
+        previous_aggregates (dict or None): Aggregates of the file before the append,
+                                            see load_summary_aggregates
+        
+    Returns:
+        bool: True if the sidecar was written, False otherwise
+    """
+    if previous_aggregates is None:
+        return save_data_summary(read_table(filepath, typed=True), filepath)
+    
+    try:
+        aggregates = merge_summary_aggregates(previous_aggregates, compute_summary_aggregates(added_df))
+        sidecar = {
+            'source_checksum': get_path_checksum(filepath),
+            'summary': summary_from_aggregates(aggregates),
+            'aggregates': aggregates
+        }
+        write_json_atomic(sidecar, get_summary_path(filepath))
+        print(f"Data summary of {filepath} updated with {len(added_df)} appended rows")
+        return True
+    except Exception as e:
+        print(f"Error updating data summary: {e}")
+        return False
+
+def check_missing_values(df, profile=None):
     """
     Check and report missing values in a dataframe.
     
     Args:
         df (pd.DataFrame): Dataframe to check
+        profile (dict, optional): Profile of the dataframe (see utils.profile_utils);
+                                  its null counts are used instead of scanning the data
         
     Returns:
         pd.Series: Series with count of missing values per column
     """
-    missing = df.isnull().sum()
+    if profile is not None:
+        missing = pd.Series(
+            [profile['columns'][col]['nulls'] if col in profile['columns'] else int(df[col].isnull().sum())
+             for col in df.columns],
+            index=df.columns, dtype=np.int64
+        )
+    else:
+        missing = df.isnull().sum()
     if missing.sum() > 0:
         print("Missing values found:")
         missing = missing[missing > 0]
@@ -80,49 +897,150 @@ def check_missing_values(df):
         print("No missing values found.")
         return missing
 
-def explore_numeric_features(df, target_column=None):
+def explore_numeric_features(df, target_column=None, profile=None):
     """
     Provide basic statistics for numeric features in a dataframe.
     
     Args:
         df (pd.DataFrame): Dataframe to explore
         target_column (str): Optional target column to calculate correlations
+        profile (dict, optional): Profile of the dataframe computed with the same target
+                                  (see utils.profile_utils); computed in one pass when not given
         
     Returns:
         pd.DataFrame: Dataframe with statistics for numeric columns
     """
-    numeric_cols = df.select_dtypes(include=['int64', 'float64']).columns
+    numeric_cols = df.select_dtypes(include=['number']).columns
+    with_target = target_column is not None and target_column in df.columns
     
-    # Basic statistics
-    stats = df[numeric_cols].describe().T
+    if profile is None:
+        profiled_cols = list(numeric_cols)
+        if with_target and target_column not in profiled_cols:
+            profiled_cols.append(target_column)
+        profile = profile_dataframe(df[profiled_cols], target_column=target_column)
     
-    # Add more statistics
-    stats['missing'] = df[numeric_cols].isnull().sum()
-    stats['missing_pct'] = (df[numeric_cols].isnull().sum() / len(df) * 100).round(2)
+    statistic_names = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+    columns = statistic_names + ['missing', 'missing_pct'] + (['corr_with_target'] if with_target else [])
+    rows = {}
+    for col in numeric_cols:
+        column_profile = profile['columns'][col]
+        row = {name: column_profile.get(name) for name in statistic_names}
+        row.update(count=float(column_profile['count']), missing=column_profile['nulls'],
+                   missing_pct=column_profile['null_pct'])
+        if with_target:
+            row['corr_with_target'] = column_profile.get('corr_with_target')
+        rows[col] = row
     
-    # Add correlation with target if provided
-    if target_column is not None and target_column in df.columns:
-        stats['corr_with_target'] = [
-            df[col].corr(df[target_column]) if col != target_column else 1.0
-            for col in numeric_cols
-        ]
+    stats = pd.DataFrame.from_dict(rows, orient='index', columns=columns).astype(
+        {name: np.float64 for name in columns if name != 'missing'}
+    )
     
     print("Numeric feature statistics:")
     print(stats)
     return stats
 
-def preprocess_input(input_data, feature_names):
+def to_sparse_matrix(X):
+    """
+    Convert a design matrix, dense or with sparse one-hot columns, to CSR.
+    
+    Args:
+        X (pandas.DataFrame, numpy.ndarray or scipy.sparse matrix): Design matrix
+        
+    Returns:
+        scipy.sparse.csr_matrix: float64 matrix storing only the non-zero entries
+    """
+    if sp.issparse(X):
+        return sp.csr_matrix(X, dtype=np.float64)
+    if isinstance(X, pd.DataFrame):
+        return X.astype(pd.SparseDtype(np.float64, 0.0)).sparse.to_coo().tocsr()
+    return sp.csr_matrix(np.asarray(X, dtype=np.float64))
+
+def to_dense_array(X):
+    """
+    Convert a design matrix, sparse or dense, to a dense NumPy array.
+    
+    Args:
+        X (pandas.DataFrame, numpy.ndarray or scipy.sparse matrix): Design matrix
+        
+    Returns:
+        numpy.ndarray: The matrix with every entry stored
+    """
+    return X.toarray() if sp.issparse(X) else np.asarray(X)
+
+def get_design_matrix_bytes(X):
+    """
+    Args:
+        X (pandas.DataFrame, numpy.ndarray or scipy.sparse matrix): Design matrix
+        
+    Returns:
+        int: Bytes holding the matrix's values (and, when sparse, their indices)
+    """
+    if sp.issparse(X):
+        X = X.tocsr()
+        return int(X.data.nbytes + X.indices.nbytes + X.indptr.nbytes)
+    if isinstance(X, pd.DataFrame):
+        return int(X.memory_usage(index=False, deep=True).sum())
+    return int(np.asarray(X).nbytes)
+
+def encode_sparse_rows(input_df, feature_names):
+    """
+    One-hot encode rows straight into a CSR matrix over the model's features.
+    
+    Numeric columns land in their feature's column and every text value in its dummy
+    column, named '<column>_<value>' as pd.get_dummies names it. Values without a
+    feature (the dropped reference category, unseen categories) leave the row empty
+    there, so no dense row of every dummy is ever built.
+    
+    Args:
+        input_df (pandas.DataFrame): Rows with ordinal encodings applied and text categoricals
+        feature_names (list): Feature names expected by the model, in order
+        
+    Returns:
+        scipy.sparse.csr_matrix: float64 matrix with one row per input row
+    """
+    column_index = {feature: j for j, feature in enumerate(feature_names)}
+    rows, columns, values = [], [], []
+    for col in input_df.columns:
+        series = input_df[col]
+        if series.dtype == 'object':
+            for i, value in enumerate(series):
+                j = column_index.get(f'{col}_{value}')
+                if j is not None:
+                    rows.append(i)
+                    columns.append(j)
+                    values.append(1.0)
+        elif col in column_index:
+            numeric = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            # Missing values are kept, as the dense encoding keeps them
+            nonzero = np.flatnonzero(numeric != 0)
+            rows.extend(nonzero.tolist())
+            columns.extend([column_index[col]] * len(nonzero))
+            values.extend(numeric[nonzero].tolist())
+    return sp.csr_matrix((values, (rows, columns)), shape=(len(input_df), len(feature_names)), dtype=np.float64)
+
+def preprocess_input(input_data, feature_names, stats=None, sparse=False, encodings=None):
     """
     Preprocess input data to match the format expected by the model.
     
     Args:
-        input_data (dict): Dictionary containing house features
+        input_data (dict or list): Dictionary containing house features, or a list of them for a batch
         feature_names (list): List of feature names expected by the model
+        stats (dict, optional): Cleaning statistics fitted at training time (see utils.stats_utils)
+        sparse (bool): Encode straight into a CSR matrix, for models trained on sparse design matrices
+        encodings (dict, optional): Compact category encodings fitted at training time (see
+            utils.encoding_utils), applied to the categorical columns the model takes encoded
         
     Returns:
-        pd.DataFrame: Preprocessed data ready for prediction
+        pd.DataFrame or scipy.sparse.csr_matrix: Preprocessed data ready for prediction
     """
-    input_df = pd.DataFrame([input_data])
+    input_df = pd.DataFrame(input_data if isinstance(input_data, list) else [input_data])
+    
+    # Impute and cap like the training data was
+    if stats is not None:
+        input_df = apply_serving_stats(input_df, stats)
+    
+    # Engineered features the model was trained on, except those derived from the target
+    input_df = add_serving_features(input_df, feature_names)
     
     # Handle condition encoding
     if 'Condition' in input_df.columns:
@@ -134,6 +1052,14 @@ def preprocess_input(input_data, feature_names):
         property_type_mapping = {'Homes': 1, 'Single Habitation': 2}
         input_df['PropertyType'] = input_df['PropertyType'].map(property_type_mapping)
     
+    # Replace the compactly encoded categories with their learned values, not dummies
+    encoded_columns = get_encoded_columns(encodings, feature_names)
+    if encoded_columns:
+        input_df = apply_category_encodings(input_df, encodings, encoded_columns)
+    
+    if sparse:
+        return encode_sparse_rows(input_df, feature_names)
+    
     # One-hot encode categorical columns that were one-hot encoded during training
     categorical_cols = [col for col in input_df.columns if input_df[col].dtype == 'object']
     
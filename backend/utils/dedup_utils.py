@@ -0,0 +1,337 @@
+"""
+Deduplication helpers for the Lisbon House Price Prediction project.
+Contains row hashing on normalized values, a set of seen row hashes that can
+live in memory or on disk, and near-duplicate detection for listings that were
+reposted with small edits (same spot, similar area and bedroom count).
+"""
+import os
+import sqlite3
+import numpy as np
+import pandas as pd
+from .cache_utils import write_json_atomic
+
+# Constants for combining column hashes into row hashes
+_NULL_HASH = np.uint64(0x9E3779B97F4A7C15)
+_HASH_MULTIPLIER = np.uint64(1000003)
+
+# Near-duplicate defaults: listings within 25 m, 5% net area and the same bedroom count
+NEAR_DUPLICATE_RADIUS_M = 25.0
+NEAR_DUPLICATE_AREA_TOLERANCE = 0.05
+NEAR_DUPLICATE_BEDROOM_TOLERANCE = 0
+
+# Mean Earth radius used for distances between coordinates
+_EARTH_RADIUS_M = 6371000.0
+
+def _is_number_dtype(dtype):
+    """Whether a dtype is selected by select_dtypes(include=['number'])."""
+    return pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+
+def _normalize_text(values):
+    """Trim, collapse whitespace and lowercase text values so trivial edits hash equally."""
+    return values.astype(object).str.strip().str.replace(r'\s+', ' ', regex=True).str.lower()
+
+def hash_rows(df, normalize=True):
+    """
+    Hash every row so that equal rows get equal hashes regardless of the chunk dtypes.
+
+    Numbers are hashed as float64 and every missing value gets the same hash, so a
+    column parsed as int in one chunk and float or object in another still matches.
+
+    Args:
+        df (pd.DataFrame): Rows to hash
+        normalize (bool): Ignore case and surrounding or repeated whitespace in text columns
+
+    Returns:
+        np.ndarray: One uint64 hash per row
+    """
+    row_hashes = np.zeros(len(df), dtype=np.uint64)
+    for col in df.columns:
+        values = df[col]
+        if _is_number_dtype(values.dtype):
+            column_hashes = pd.util.hash_array(values.to_numpy(dtype='float64'))
+        else:
+            text = _normalize_text(values) if normalize else values.astype(object)
+            column_hashes = pd.util.hash_array(text.to_numpy())
+        column_hashes[values.isnull().to_numpy()] = _NULL_HASH
+        row_hashes = (row_hashes * _HASH_MULTIPLIER) ^ column_hashes
+    return row_hashes
+
+class RowHashSet:
+    """
+    Set of row hashes seen so far, kept in memory or in an SQLite file for inputs
+    whose hashes do not fit in memory.
+    """
+
+    # Maximum number of parameters per SQLite lookup query
+    _QUERY_BATCH = 500
+
+    def __init__(self, path=None):
+        """
+        Initialize an empty hash set.
+
+        Args:
+            path (str, optional): SQLite file to store the hashes in; kept in memory when None
+        """
+        self.path = path
+        self._hashes = set() if path is None else None
+        self._connection = None
+        if path is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._connection = sqlite3.connect(path)
+            self._connection.execute('CREATE TABLE IF NOT EXISTS row_hashes (hash INTEGER PRIMARY KEY)')
+
+    def __len__(self):
+        """Number of distinct hashes stored."""
+        if self._connection is None:
+            return len(self._hashes)
+        return self._connection.execute('SELECT COUNT(*) FROM row_hashes').fetchone()[0]
+
+    def __enter__(self):
+        """Use the hash set as a context manager that closes the database."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close the database when leaving the context."""
+        self.close()
+
+    def find_new(self, hashes):
+        """
+        Report which hashes of a batch have not been seen, without storing them.
+
+        Repeated hashes within the batch count as new only on their first occurrence.
+
+        Args:
+            hashes (np.ndarray): uint64 row hashes
+
+        Returns:
+            np.ndarray: Boolean mask, True for rows that would be seen for the first time
+        """
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        is_new = ~pd.Series(hashes).duplicated().to_numpy()
+
+        if self._connection is None:
+            is_new &= np.fromiter((h not in self._hashes for h in hashes.tolist()), dtype=bool, count=len(hashes))
+            return is_new
+
+        # SQLite integers are signed, so store the hashes' bit patterns as int64
+        keys = hashes.view(np.int64)
+        candidates = keys[is_new].tolist()
+        existing = set()
+        for start in range(0, len(candidates), self._QUERY_BATCH):
+            batch = candidates[start:start + self._QUERY_BATCH]
+            placeholders = ','.join('?' * len(batch))
+            existing.update(row[0] for row in self._connection.execute(
+                f'SELECT hash FROM row_hashes WHERE hash IN ({placeholders})', batch
+            ))
+
+        if existing:
+            is_new &= ~np.isin(keys, np.fromiter(existing, dtype=np.int64, count=len(existing)))
+        return is_new
+
+    def add(self, hashes):
+        """
+        Add a batch of hashes and report which ones had not been seen before.
+
+        Repeated hashes within the batch count as new only on their first occurrence.
+
+        Args:
+            hashes (np.ndarray): uint64 row hashes
+
+        Returns:
+            np.ndarray: Boolean mask, True for rows seen for the first time
+        """
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        is_new = self.find_new(hashes)
+
+        if self._connection is None:
+            self._hashes.update(hashes[is_new].tolist())
+            return is_new
+
+        with self._connection:
+            self._connection.executemany(
+                'INSERT OR IGNORE INTO row_hashes (hash) VALUES (?)',
+                ((k,) for k in hashes.view(np.int64)[is_new].tolist())
+            )
+        return is_new
+
+    def close(self):
+        """Close the database connection, if any."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+def _haversine_m(lat1, lon1, lat2, lon2):
+    """Great-circle distance in meters between arrays of coordinates."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * _EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+def _find_near_duplicate_positions(df, radius_m, area_tolerance, bedroom_tolerance, area_column):
+    """Near-duplicate pairs as row positions: (kept, matched, removed, distance_m, area_difference)."""
+    columns = ['kept', 'matched', 'removed', 'distance_m', 'area_difference']
+    required = ['Latitude', 'Longitude', 'Bedrooms', area_column]
+    if any(col not in df.columns for col in required) or len(df) < 2:
+        return pd.DataFrame(columns=columns)
+
+    valid = df[required].notna().all(axis=1).to_numpy()
+    points = pd.DataFrame({
+        'row': np.flatnonzero(valid),
+        'lat': df['Latitude'].to_numpy(dtype='float64')[valid],
+        'lon': df['Longitude'].to_numpy(dtype='float64')[valid],
+        'bedrooms': np.round(df['Bedrooms'].to_numpy(dtype='float64')[valid]).astype('int64'),
+        'area': df[area_column].to_numpy(dtype='float64')[valid]
+    })
+    if len(points) < 2:
+        return pd.DataFrame(columns=columns)
+
+    # Grid cells of radius_m in both directions, using the longitude scale of the mean latitude
+    cell_lat = radius_m / 111320.0
+    cell_lon = cell_lat / max(np.cos(np.radians(points['lat'].mean())), 1e-6)
+    points['cell_y'] = np.floor(points['lat'] / cell_lat).astype('int64')
+    points['cell_x'] = np.floor(points['lon'] / cell_lon).astype('int64')
+
+    candidate_pairs = []
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            for db in range(-bedroom_tolerance, bedroom_tolerance + 1):
+                shifted = points.assign(
+                    cell_y=points['cell_y'] + dy, cell_x=points['cell_x'] + dx, bedrooms=points['bedrooms'] + db
+                )
+                pairs = points.merge(shifted, on=['cell_y', 'cell_x', 'bedrooms'], suffixes=('_a', '_b'))
+                candidate_pairs.append(pairs[pairs['row_a'] < pairs['row_b']])
+
+    pairs = pd.concat(candidate_pairs, ignore_index=True)
+    pairs['distance_m'] = _haversine_m(pairs['lat_a'], pairs['lon_a'], pairs['lat_b'], pairs['lon_b'])
+    pairs['area_difference'] = (pairs['area_a'] - pairs['area_b']).abs()
+    largest_area = np.maximum(pairs['area_a'].abs(), pairs['area_b'].abs())
+    matches = pairs[
+        (pairs['distance_m'] <= radius_m) &
+        (pairs['area_difference'] <= area_tolerance * largest_area)
+    ].sort_values(['row_b', 'row_a'])
+
+    # Group matches transitively with union-find; each group keeps its earliest row
+    parent = {}
+
+    def find(row):
+        root = row
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while parent.get(row, row) != root:
+            parent[row], row = root, parent[row]
+        return root
+
+    for row_a, row_b in zip(matches['row_a'].tolist(), matches['row_b'].tolist()):
+        root_a, root_b = find(row_a), find(row_b)
+        if root_a != root_b:
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    removed = matches.drop_duplicates('row_b')
+    return pd.DataFrame({
+        'kept': [find(row) for row in removed['row_b'].tolist()],
+        'matched': removed['row_a'].to_numpy(),
+        'removed': removed['row_b'].to_numpy(),
+        'distance_m': removed['distance_m'].round(2).to_numpy(),
+        'area_difference': removed['area_difference'].to_numpy()
+    }, columns=columns)
+
+def find_near_duplicates(df, radius_m=NEAR_DUPLICATE_RADIUS_M, area_tolerance=NEAR_DUPLICATE_AREA_TOLERANCE,
+                         bedroom_tolerance=NEAR_DUPLICATE_BEDROOM_TOLERANCE, area_column='AreaNet'):
+    """
+    Find listings that are probably reposts of an earlier listing.
+
+    Coordinates are bucketed into a grid of cells as large as the search radius, so
+    only listings in neighbouring cells with a compatible bedroom count are compared.
+    Two listings are near-duplicates when they are within radius_m of each other,
+    their areas differ by at most area_tolerance (relative) and their bedroom counts
+    by at most bedroom_tolerance. Groups of near-duplicates keep their first row.
+
+    Args:
+        df (pd.DataFrame): Listings with Latitude, Longitude, Bedrooms and the area column
+        radius_m (float): Maximum distance in meters
+        area_tolerance (float): Maximum relative difference of the areas
+        bedroom_tolerance (int): Maximum difference of the bedroom counts
+        area_column (str): Column holding the area to compare
+
+    Returns:
+        pd.DataFrame: One row per removed listing with the index labels of the row
+            kept for its group ('kept'), the row it matched ('matched') and its own
+            ('removed'), plus the distance and area difference to the matched row
+    """
+    pairs = _find_near_duplicate_positions(df, radius_m, area_tolerance, bedroom_tolerance, area_column)
+    for col in ['kept', 'matched', 'removed']:
+        pairs[col] = df.index[pairs[col].to_numpy(dtype='int64')]
+    return pairs
+
+def deduplicate(df, near_duplicates=False, normalize=True, **near_duplicate_options):
+    """
+    Remove exact duplicate rows and, optionally, near-duplicate listings.
+
+    Args:
+        df (pd.DataFrame): Listings
+        near_duplicates (bool): Also remove near-duplicates (see find_near_duplicates)
+        normalize (bool): Compare text case- and whitespace-insensitively
+        **near_duplicate_options: Tolerances passed to find_near_duplicates
+
+    Returns:
+        tuple: (deduplicated dataframe, report dict with the removal counts and the near-duplicate pairs)
+    """
+    keep = ~pd.Series(hash_rows(df, normalize=normalize)).duplicated().to_numpy()
+    deduped_df = df.take(np.flatnonzero(keep))
+
+    near_pairs = find_near_duplicates(deduped_df.iloc[:0])
+    if near_duplicates:
+        near_pairs = find_near_duplicates(deduped_df, **near_duplicate_options)
+        near_mask = np.ones(len(deduped_df), dtype=bool)
+        near_mask[deduped_df.index.get_indexer_for(near_pairs['removed'])] = False
+        deduped_df = deduped_df.take(np.flatnonzero(near_mask))
+
+    return deduped_df, build_dedup_report(int((~keep).sum()), near_pairs)
+
+def _to_python(value):
+    """Convert numpy scalars (e.g. index labels) to plain Python values for JSON."""
+    return value.item() if isinstance(value, np.generic) else value
+
+def build_dedup_report(exact_duplicates, near_pairs):
+    """
+    Build the report of a deduplication run.
+
+    Args:
+        exact_duplicates (int): Number of exact duplicate rows removed
+        near_pairs (pd.DataFrame): Output of find_near_duplicates
+
+    Returns:
+        dict: JSON-serializable report
+    """
+    return {
+        'exact_duplicates_removed': int(exact_duplicates),
+        'near_duplicates_removed': int(len(near_pairs)),
+        'near_duplicates': [
+            {
+                'kept': _to_python(pair.kept),
+                'matched': _to_python(pair.matched),
+                'removed': _to_python(pair.removed),
+                'distance_m': float(pair.distance_m),
+                'area_difference': float(pair.area_difference)
+            }
+            for pair in near_pairs.itertuples(index=False)
+        ]
+    }
+
+def save_dedup_report(report, filepath):
+    """
+    Save a deduplication report as JSON.
+
+    Args:
+        report (dict): Report from deduplicate or clean_data_chunked
+        filepath (str): Destination path
+
+    Returns:
+        bool: True if saved successfully, False otherwise
+    """
+    try:
+        write_json_atomic(report, filepath, indent=2)
+        print(f"Deduplication report saved to {filepath}")
+        return True
+    except Exception as e:
+        print(f"Error saving deduplication report: {e}")
+        return False
@@ -0,0 +1,191 @@
+"""
+Compact encodings of the high-cardinality categorical features.
+Instead of one dummy column per category, each category is replaced by a single
+number learned at training time: its smoothed mean log-price (target encoding)
+or its share of the training listings (frequency encoding). The learned values
+are saved next to the models (category_encodings.json) as a small lookup table,
+so serving encodes inputs exactly like training.
+"""
+import os
+import json
+import datetime
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import KFold
+from .cache_utils import VersionedCache, get_file_version, write_json_atomic
+
+ENCODINGS_FILENAME = 'category_encodings.json'
+ENCODINGS_VERSION = 1
+
+ENCODING_METHODS = ['target', 'frequency']
+
+# Pseudo-listings at the overall mean log-price added to every category, so
+# the encodings of rare parishes shrink towards the overall mean
+TARGET_SMOOTHING = 10.0
+
+# Parsed lookup tables kept in memory until the file changes
+_encodings_cache = VersionedCache()
+
+def get_encodings_path(models_dir):
+    """
+    Get the path of the category encodings file in a models directory.
+
+    Args:
+        models_dir (str): Directory containing the saved models
+
+    Returns:
+        str: Path to category_encodings.json
+    """
+    return os.path.join(models_dir, ENCODINGS_FILENAME)
+
+def _fit_column_encoding(values, log_target, method, smoothing):
+    """Learn the lookup table of one column and the value of unseen categories."""
+    values = values.astype(object)
+    known = values.notna()
+    if method == 'frequency':
+        shares = values[known].value_counts() / len(values)
+        return {str(category): float(share) for category, share in shares.items()}, 0.0
+
+    prior = float(log_target.mean())
+    grouped = log_target[known].groupby(values[known]).agg(['sum', 'count'])
+    smoothed = (grouped['sum'] + smoothing * prior) / (grouped['count'] + smoothing)
+    return {str(category): float(value) for category, value in smoothed.items()}, prior
+
+def _map_column(values, mapping, default):
+    """Replace every category of a column with its encoding, unseen and missing ones with the default."""
+    return values.astype(object).map(lambda value: mapping.get(str(value), default) if pd.notna(value) else default
+                                     ).astype(np.float64)
+
+def fit_category_encodings(X, y, columns, method='target', smoothing=TARGET_SMOOTHING, cv_folds=5, random_state=42):
+    """
+    Learn compact encodings of categorical columns and encode the training rows with them.
+
+    Target encodings of the training rows are computed out of fold: each row gets
+    the encoding learned on the other folds, so a model cannot read its own price
+    back from the feature. The lookup table returned for serving is learned on all
+    the rows. Frequency encodings do not use the target and are fitted on all rows.
+
+    Args:
+        X (pandas.DataFrame): Training features with the columns still as text
+        y (pandas.Series): Training prices
+        columns (list): Categorical columns to encode; columns missing from X are skipped
+        method (str): 'target' for the smoothed mean log-price, 'frequency' for the share of rows
+        smoothing (float): Pseudo-listings at the overall mean added to every category (target only)
+        cv_folds (int): Folds of the out-of-fold target encoding
+        random_state (int): Seed of the folds, the one the cross-validation uses
+
+    Returns:
+        tuple: (encodings, X with every encoded column replaced by its float64 encoding)
+    """
+    if method not in ENCODING_METHODS:
+        raise ValueError(f"Unknown category encoding '{method}', expected one of {ENCODING_METHODS}")
+
+    columns = [col for col in columns if col in X.columns]
+    log_target = pd.Series(np.log(np.asarray(y, dtype=np.float64)), index=X.index)
+    encoded = X.copy()
+    encodings = {'method': method, 'smoothing': float(smoothing) if method == 'target' else None, 'columns': {}}
+
+    for col in columns:
+        mapping, default = _fit_column_encoding(X[col], log_target, method, smoothing)
+        encodings['columns'][col] = {'mapping': mapping, 'default': default}
+
+        if method == 'frequency' or len(X) < cv_folds:
+            encoded[col] = _map_column(X[col], mapping, default)
+            continue
+
+        out_of_fold = np.empty(len(X), dtype=np.float64)
+        for train, test in KFold(n_splits=cv_folds, shuffle=True, random_state=random_state).split(X):
+            fold_mapping, fold_default = _fit_column_encoding(X[col].iloc[train], log_target.iloc[train], method, smoothing)
+            out_of_fold[test] = _map_column(X[col].iloc[test], fold_mapping, fold_default).to_numpy()
+        encoded[col] = out_of_fold
+
+    return encodings, encoded
+
+def apply_category_encodings(input_df, encodings, columns=None):
+    """
+    Encode categorical columns with a fitted lookup table.
+
+    Args:
+        input_df (pandas.DataFrame): Rows with the categorical columns as text
+        encodings (dict): Lookup table from fit_category_encodings or load_category_encodings
+        columns (list, optional): Encoded columns to replace, every column of the table by default
+
+    Returns:
+        pandas.DataFrame: Copy of the rows with the encoded columns replaced by their float64 encoding
+    """
+    result = input_df.copy()
+    for col, encoding in encodings['columns'].items():
+        if col in result.columns and (columns is None or col in columns):
+            result[col] = _map_column(result[col], encoding['mapping'], encoding['default'])
+    return result
+
+def get_encoded_columns(encodings, feature_names):
+    """
+    Args:
+        encodings (dict or None): Lookup table of a models directory
+        feature_names (list): Feature names expected by a model
+
+    Returns:
+        list: Encoded columns the model takes as features, empty for models trained on one-hot dummies
+    """
+    if not encodings:
+        return []
+    return [col for col in encodings['columns'] if col in feature_names]
+
+def save_category_encodings(encodings, models_dir):
+    """
+    Save the lookup table next to the models, writing the file atomically.
+
+    Args:
+        encodings (dict): Lookup table from fit_category_encodings
+        models_dir (str): Directory containing the saved models
+
+    Returns:
+        bool: True if saved successfully, False otherwise
+    """
+    try:
+        encodings_path = get_encodings_path(models_dir)
+        os.makedirs(models_dir, exist_ok=True)
+        write_json_atomic({
+            'encodings_version': ENCODINGS_VERSION,
+            'fitted_at': datetime.datetime.now().isoformat(timespec='seconds'),
+            **encodings
+        }, encodings_path, indent=2)
+        print(f"Category encodings saved to {encodings_path}")
+        return True
+    except Exception as e:
+        print(f"Error saving category encodings: {e}")
+        return False
+
+def _read_encodings(encodings_path):
+    """Read a lookup table file, returning None if it is missing, of another version or malformed."""
+    try:
+        with open(encodings_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or data.get('encodings_version') != ENCODINGS_VERSION:
+            return None
+        return {
+            'method': data['method'],
+            'smoothing': data.get('smoothing'),
+            'columns': {col: {'mapping': dict(encoding['mapping']), 'default': float(encoding['default'])}
+                        for col, encoding in data['columns'].items()},
+            'fitted_at': data.get('fitted_at')
+        }
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+def load_category_encodings(models_dir):
+    """
+    Load the lookup table of a models directory, reusing the parsed copy while the file is unchanged.
+
+    Args:
+        models_dir (str): Directory containing the saved models
+
+    Returns:
+        dict or None: Lookup table or None if no valid file exists
+    """
+    encodings_path = get_encodings_path(models_dir)
+    version = get_file_version(encodings_path)
+    if version is None:
+        return None
+    return _encodings_cache.get_or_compute(encodings_path, version, lambda: _read_encodings(encodings_path))
@@ -0,0 +1,180 @@
+"""
+Feature engineering registry for the Lisbon House Price Prediction project.
+Contains named feature definitions built from vectorized NumPy operations, so
+the same definitions run on training DataFrames and on serving batches.
+"""
+import numpy as np
+import pandas as pd
+
+def safe_divide(numerator, denominator, fallback):
+    """
+    Divide element-wise, using a fallback wherever the denominator is not positive.
+
+    Missing denominators (NaN) also use the fallback.
+
+    Args:
+        numerator (array-like): Dividends
+        denominator (array-like): Divisors
+        fallback (array-like or float): Values used where the denominator is not positive
+
+    Returns:
+        np.ndarray: Quotients as float64
+    """
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.asarray(denominator, dtype=np.float64)
+    valid = denominator > 0
+    result = np.broadcast_to(np.asarray(fallback, dtype=np.float64), valid.shape).copy()
+    np.divide(numerator, denominator, out=result, where=valid)
+    return result
+
+class FeatureDefinition:
+    """A named feature computed from other columns."""
+
+    def __init__(self, name, inputs, compute, requires_target=False, description=''):
+        """
+        Initialize a feature definition.
+
+        Args:
+            name (str): Name of the created column
+            inputs (list): Columns the feature is computed from, in the order passed to compute
+            compute (callable): Function taking one array per input and returning the feature values
+            requires_target (bool): Whether the feature uses the target, so it is unavailable at serving time
+            description (str): Short explanation of the feature
+        """
+        self.name = name
+        self.inputs = list(inputs)
+        self.compute = compute
+        self.requires_target = requires_target
+        self.description = description
+
+    def __repr__(self):
+        return f"FeatureDefinition({self.name!r}, inputs={self.inputs!r})"
+
+FEATURE_REGISTRY = {}
+
+def register_feature(name, inputs, compute, requires_target=False, description=''):
+    """
+    Add a feature definition to the registry, replacing any with the same name.
+
+    Args:
+        name (str): Name of the created column
+        inputs (list): Columns the feature is computed from
+        compute (callable): Function taking one array per input
+        requires_target (bool): Whether the feature uses the target
+        description (str): Short explanation of the feature
+
+    Returns:
+        FeatureDefinition: The registered definition
+    """
+    definition = FeatureDefinition(name, inputs, compute, requires_target, description)
+    FEATURE_REGISTRY[name] = definition
+    return definition
+
+def _combine_labels(first, second):
+    """Join two label arrays with an underscore, keeping missing values missing."""
+    return (pd.Series(first, dtype=object) + '_' + pd.Series(second, dtype=object)).to_numpy()
+
+register_feature(
+    'PricePerBedroom', ['Price', 'Bedrooms'],
+    lambda price, bedrooms: safe_divide(price, bedrooms, fallback=price),
+    requires_target=True,
+    description='Price divided by bedrooms, or the price for studios'
+)
+register_feature(
+    'BathroomToBedroom', ['Bathrooms', 'Bedrooms'],
+    lambda bathrooms, bedrooms: safe_divide(bathrooms, bedrooms, fallback=bathrooms),
+    description='Bathrooms divided by bedrooms, or the bathrooms for studios'
+)
+register_feature(
+    'AreaUtilizationRatio', ['AreaNet', 'AreaGross'],
+    lambda area_net, area_gross: safe_divide(area_net, area_gross, fallback=0.0),
+    description='Net area divided by gross area, or 0 without a gross area'
+)
+register_feature(
+    'PropertyCategory', ['PropertyType', 'PropertySubType'],
+    _combine_labels,
+    description='Property type and subtype joined with an underscore'
+)
+
+def get_feature_definitions(names=None, serving=False):
+    """
+    Look up feature definitions in registration order.
+
+    Args:
+        names (list, optional): Feature names to select; unknown names are ignored.
+                                All registered features are selected by default.
+        serving (bool): Exclude features that require the target
+
+    Returns:
+        list: FeatureDefinition objects
+    """
+    selected = set(FEATURE_REGISTRY) if names is None else set(names)
+    return [
+        definition for name, definition in FEATURE_REGISTRY.items()
+        if name in selected and not (serving and definition.requires_target)
+    ]
+
+def compute_features(df, names=None, serving=False):
+    """
+    Add registered features to a DataFrame.
+
+    Features whose input columns are missing are skipped.
+
+    Args:
+        df (pd.DataFrame): Input data
+        names (list, optional): Feature names to compute, all registered features by default
+        serving (bool): Skip features that require the target
+
+    Returns:
+        pd.DataFrame: Copy of the data with the feature columns added
+    """
+    result = df.copy()
+    for definition in get_feature_definitions(names, serving):
+        if all(column in result.columns for column in definition.inputs):
+            values = definition.compute(*(result[column].to_numpy() for column in definition.inputs))
+            result[definition.name] = values
+    return result
+
+def compute_feature_array(X, columns, names=None, serving=True):
+    """
+    Append registered features to an encoded batch array.
+
+    Args:
+        X (np.ndarray): Two-dimensional array with one column per name in columns
+        columns (list): Column names of X
+        names (list, optional): Feature names to compute, all registered features by default
+        serving (bool): Skip features that require the target
+
+    Returns:
+        tuple: (array with the computed features appended, list of its column names)
+    """
+    X = np.asarray(X)
+    positions = {column: i for i, column in enumerate(columns)}
+    new_columns = []
+    new_values = []
+    for definition in get_feature_definitions(names, serving):
+        if all(column in positions for column in definition.inputs):
+            new_values.append(definition.compute(*(X[:, positions[column]] for column in definition.inputs)))
+            new_columns.append(definition.name)
+
+    if not new_values:
+        return X, list(columns)
+    return np.column_stack([X] + new_values), list(columns) + new_columns
+
+def add_serving_features(input_df, feature_names):
+    """
+    Compute the registered features a model expects from raw serving inputs.
+
+    Only features listed in feature_names and not requiring the target are added.
+
+    Args:
+        input_df (pd.DataFrame): Raw input rows
+        feature_names (list): Feature names expected by the model
+
+    Returns:
+        pd.DataFrame: Input rows with the available features added
+    """
+    names = [name for name in feature_names if name in FEATURE_REGISTRY]
+    if not names:
+        return input_df
+    return compute_features(input_df, names, serving=True)
@@ -0,0 +1,169 @@
+"""
+Model manifest helpers for the Lisbon House Price Prediction project.
+The manifest (manifest.json in the saved models directory) indexes every saved
+model with its artifact path, checksum, size, features, training time,
+hyperparameters and metrics, so listing and metadata lookups never need to scan
+the directory or unpickle anything.
+"""
+import os
+import json
+import datetime
+import numpy as np
+from .cache_utils import VersionedCache, get_file_version, get_file_checksum, write_json_atomic
+
+MANIFEST_FILENAME = 'manifest.json'
+MANIFEST_VERSION = 1
+
+# Parsed manifests kept in memory until the manifest file changes
+_manifest_cache = VersionedCache()
+
+def get_manifest_path(models_dir):
+    """
+    Get the path of the manifest file in a models directory.
+
+    Args:
+        models_dir (str): Directory containing the saved models
+
+    Returns:
+        str: Path to manifest.json
+    """
+    return os.path.join(models_dir, MANIFEST_FILENAME)
+
+def get_manifest_version(models_dir):
+    """
+    Get the version (mtime and size) of a models directory's manifest.
+
+    Args:
+        models_dir (str): Directory containing the saved models
+
+    Returns:
+        tuple or None: Manifest file version or None if there is no manifest
+    """
+    return get_file_version(get_manifest_path(models_dir))
+
+def _read_manifest(manifest_path):
+    """Read and validate a manifest file, returning None if it is missing or invalid."""
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(manifest, dict) or not isinstance(manifest.get('models'), dict):
+        return None
+    return manifest
+
+def load_manifest(models_dir):
+    """
+    Load the manifest of a models directory, reusing the parsed copy while the file is unchanged.
+
+    Args:
+        models_dir (str): Directory containing the saved models
+
+    Returns:
+        dict or None: Manifest dictionary or None if no valid manifest exists
+    """
+    manifest_path = get_manifest_path(models_dir)
+    version = get_file_version(manifest_path)
+    if version is None:
+        return None
+    return _manifest_cache.get_or_compute(manifest_path, version, lambda: _read_manifest(manifest_path))
+
+def list_manifest_models(models_dir):
+    """
+    List the model names recorded in a models directory's manifest.
+
+    Args:
+        models_dir (str): Directory containing the saved models
+
+    Returns:
+        list or None: Model names or None if no valid manifest exists
+    """
+    manifest = load_manifest(models_dir)
+    if manifest is None:
+        return None
+    return list(manifest['models'].keys())
+
+def get_manifest_entry(models_dir, model_name):
+    """
+    Get the manifest entry of a single model.
+
+    Args:
+        models_dir (str): Directory containing the saved models
+        model_name (str): Name of the model
+
+    Returns:
+        dict or None: Manifest entry or None if the model or manifest is missing
+    """
+    manifest = load_manifest(models_dir)
+    if manifest is None:
+        return None
+    return manifest['models'].get(model_name)
+
+def _to_json_value(value):
+    """Convert a hyperparameter or metric value into something JSON can store."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, tuple)):
+        return [_to_json_value(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _to_json_value(v) for k, v in value.items()}
+    return repr(value)
+
+def build_manifest_entry(model, model_name, model_path, feature_list, features_path=None,
+                         training_time=None, metrics=None, sparse_input=False):
+    """
+    Build the manifest entry describing a saved model.
+
+    Args:
+        model: Trained scikit-learn model
+        model_name (str): Name of the model
+        model_path (str): Path of the saved model artifact
+        feature_list (list): Feature names the model was trained on
+        features_path (str, optional): Path of the saved feature list artifact
+        training_time (float, optional): Training time in seconds
+        metrics (dict, optional): Metrics recorded at training time
+        sparse_input (bool): Whether the model was trained on a sparse (CSR) design matrix
+
+    Returns:
+        dict: Manifest entry
+    """
+    params = model.get_params(deep=False) if hasattr(model, 'get_params') else {}
+
+    return {
+        'name': model_name,
+        'model_type': type(model).__name__,
+        'artifact': os.path.basename(model_path),
+        'features_artifact': os.path.basename(features_path) if features_path else None,
+        'checksum': get_file_checksum(model_path),
+        'size': os.path.getsize(model_path),
+        'features': [str(feature) for feature in feature_list],
+        'feature_count': len(feature_list),
+        'sparse_input': bool(sparse_input),
+        'trained_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'training_time': training_time,
+        'hyperparameters': _to_json_value(params),
+        'metrics': _to_json_value(metrics or {})
+    }
+
+def update_manifest(models_dir, entry):
+    """
+    Add or replace a model's entry in the manifest, writing the file atomically.
+
+    Args:
+        models_dir (str): Directory containing the saved models
+        entry (dict): Manifest entry as returned by build_manifest_entry
+
+    Returns:
+        dict: Updated manifest
+    """
+    manifest_path = get_manifest_path(models_dir)
+    manifest = _read_manifest(manifest_path) or {'manifest_version': MANIFEST_VERSION, 'models': {}}
+
+    manifest['models'][entry['name']] = entry
+    manifest['updated_at'] = datetime.datetime.now().isoformat(timespec='seconds')
+
+    write_json_atomic(manifest, manifest_path, indent=2)
+    return manifest
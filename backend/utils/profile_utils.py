@@ -0,0 +1,550 @@
+"""
+Column profiling for the Lisbon House Price Prediction project.
+Contains a single-pass profiler that computes counts, missing values, distinct
+counts, moments, ranges, quantiles and correlation with the target for every
+column, either on a whole dataframe or chunk by chunk, and stores the result
+as a JSON profile next to the data file it describes, together with the
+profiler's mergeable state so appended rows can be merged in later.
+"""
+import os
+import json
+import numpy as np
+import pandas as pd
+from .cache_utils import get_path_checksum, write_json_atomic
+from .sketch_utils import KLLSketch, HyperLogLog
+
+PROFILE_VERSION = 1
+
+# Exact value counts are kept while a column has at most this many distinct values
+EXACT_DISTINCT_LIMIT = 1000
+
+def _is_number_dtype(dtype):
+    """Whether a dtype is selected by select_dtypes(include=['number'])."""
+    return pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+
+def _hash_values(values, numeric):
+    """64-bit hashes of non-null values; numbers hash by value so 2 and 2.0 are equal."""
+    if numeric:
+        return pd.util.hash_array(values.to_numpy(dtype=np.float64))
+    return pd.util.hash_array(values.astype(str).to_numpy(dtype=object))
+
+class CorrelationAccumulator:
+    """Mergeable co-moments for the Pearson correlation of two streamed columns."""
+
+    def __init__(self):
+        """Start with no observations."""
+        self.n = 0
+        self.mean_x = self.mean_y = 0.0
+        self.m2_x = self.m2_y = self.c_xy = 0.0
+
+    def update(self, x, y):
+        """Add paired observations, merging chunk moments with Chan's formulas."""
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        n_b = len(x)
+        if n_b == 0:
+            return
+
+        mean_x_b, mean_y_b = x.mean(), y.mean()
+        m2_x_b = ((x - mean_x_b) ** 2).sum()
+        m2_y_b = ((y - mean_y_b) ** 2).sum()
+        c_xy_b = ((x - mean_x_b) * (y - mean_y_b)).sum()
+        self._combine(n_b, mean_x_b, mean_y_b, m2_x_b, m2_y_b, c_xy_b)
+
+    def merge(self, other):
+        """Add the observations of another accumulator."""
+        if other.n > 0:
+            self._combine(other.n, other.mean_x, other.mean_y, other.m2_x, other.m2_y, other.c_xy)
+        return self
+
+    def _combine(self, n_b, mean_x_b, mean_y_b, m2_x_b, m2_y_b, c_xy_b):
+        """Combine these co-moments with those of another part."""
+        n = self.n + n_b
+        delta_x, delta_y = mean_x_b - self.mean_x, mean_y_b - self.mean_y
+        self.m2_x += m2_x_b + delta_x ** 2 * self.n * n_b / n
+        self.m2_y += m2_y_b + delta_y ** 2 * self.n * n_b / n
+        self.c_xy += c_xy_b + delta_x * delta_y * self.n * n_b / n
+        self.mean_x += delta_x * n_b / n
+        self.mean_y += delta_y * n_b / n
+        self.n = n
+
+    def to_state(self):
+        """Serialize the co-moments to a JSON-compatible dictionary."""
+        return {'n': int(self.n), 'mean_x': float(self.mean_x), 'mean_y': float(self.mean_y),
+                'm2_x': float(self.m2_x), 'm2_y': float(self.m2_y), 'c_xy': float(self.c_xy)}
+
+    @classmethod
+    def from_state(cls, state):
+        """Restore co-moments serialized with to_state."""
+        accumulator = cls()
+        for key, value in state.items():
+            setattr(accumulator, key, value)
+        return accumulator
+
+    def correlation(self):
+        """Return the correlation, or NaN when it is undefined."""
+        denominator = np.sqrt(self.m2_x * self.m2_y)
+        if self.n < 2 or denominator == 0:
+            return np.nan
+        return self.c_xy / denominator
+
+class ColumnProfile:
+    """Running profile of a single column."""
+
+    def __init__(self, name):
+        """
+        Initialize an empty column profile.
+
+        Args:
+            name (str): Column name
+        """
+        self.name = name
+        self.numeric = None
+        self.count = 0
+        self.nulls = 0
+        self.distinct_sketch = HyperLogLog()
+        self.value_counts = pd.Series(dtype=np.int64)
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+        self.quantile_sketch = None
+        self.target_moments = None
+
+    def update(self, series, target=None):
+        """
+        Add the values of a chunk of the column.
+
+        Args:
+            series (pd.Series): Values of the column
+            target (pd.Series, optional): Target values of the same rows, for the correlation
+        """
+        missing = series.isna().to_numpy()
+        values = series[~missing]
+        self.nulls += int(missing.sum())
+        if len(values) == 0:
+            return
+
+        numeric = _is_number_dtype(series.dtype)
+        if self.numeric is None:
+            self.numeric = numeric
+            if numeric:
+                self.quantile_sketch = KLLSketch()
+                self.target_moments = CorrelationAccumulator()
+        elif numeric != self.numeric:
+            raise ValueError(f"Column {self.name} mixes numeric and non-numeric values")
+
+        self.count += len(values)
+        self.distinct_sketch.update_hashes(_hash_values(values, numeric))
+        if self.value_counts is not None:
+            chunk_counts = (values if numeric else values.astype(object)).value_counts()
+            self.value_counts = self.value_counts.add(chunk_counts, fill_value=0)
+            if len(self.value_counts) > EXACT_DISTINCT_LIMIT:
+                self.value_counts = None
+
+        if numeric:
+            x = values.to_numpy(dtype=np.float64)
+            self._combine_moments(len(x), x.mean(), ((x - x.mean()) ** 2).sum(), x.min(), x.max())
+            self.quantile_sketch.update_many(x)
+            if target is not None:
+                y = target.to_numpy(dtype=np.float64)
+                paired = ~missing & ~np.isnan(y)
+                self.target_moments.update(series.to_numpy(dtype=np.float64)[paired], y[paired])
+
+    def _combine_moments(self, n_b, mean_b, m2_b, min_b, max_b):
+        """Combine the running mean and squared deviations with those of another part."""
+        n_a = self.count - n_b
+        delta = mean_b - self.mean
+        self.m2 += m2_b + delta ** 2 * n_a * n_b / self.count
+        self.mean += delta * n_b / self.count
+        self.min = float(min_b) if self.min is None else min(self.min, float(min_b))
+        self.max = float(max_b) if self.max is None else max(self.max, float(max_b))
+
+    def merge(self, other):
+        """
+        Merge the profile of the same column computed on other rows.
+
+        Args:
+            other (ColumnProfile): Profile of other rows
+
+        Returns:
+            ColumnProfile: This profile
+        """
+        self.nulls += other.nulls
+        if other.count == 0:
+            return self
+        if self.numeric is not None and other.numeric != self.numeric:
+            raise ValueError(f"Column {self.name} mixes numeric and non-numeric values")
+
+        if self.numeric is None:
+            self.numeric = other.numeric
+            if other.numeric:
+                self.quantile_sketch = KLLSketch()
+                self.target_moments = CorrelationAccumulator()
+
+        self.count += other.count
+        self.distinct_sketch.merge(other.distinct_sketch)
+        if self.value_counts is not None and other.value_counts is not None:
+            self.value_counts = self.value_counts.add(other.value_counts, fill_value=0)
+            if len(self.value_counts) > EXACT_DISTINCT_LIMIT:
+                self.value_counts = None
+        else:
+            self.value_counts = None
+
+        if self.numeric:
+            self._combine_moments(other.count, other.mean, other.m2, other.min, other.max)
+            self.quantile_sketch.merge(other.quantile_sketch)
+            self.target_moments.merge(other.target_moments)
+        return self
+
+    def to_state(self):
+        """
+        Serialize the running profile, sketches included, so it can be merged into later.
+
+        Returns:
+            dict: JSON-compatible profile state
+        """
+        return {
+            'name': self.name,
+            'numeric': self.numeric,
+            'count': int(self.count),
+            'nulls': int(self.nulls),
+            'distinct_sketch': self.distinct_sketch.to_dict(),
+            'value_counts': None if self.value_counts is None else [
+                [value.item() if isinstance(value, np.generic) else value, int(count)]
+                for value, count in self.value_counts.items()
+            ],
+            'mean': float(self.mean),
+            'm2': float(self.m2),
+            'min': self.min,
+            'max': self.max,
+            'quantile_sketch': self.quantile_sketch.to_dict() if self.quantile_sketch is not None else None,
+            'target_moments': self.target_moments.to_state() if self.target_moments is not None else None
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        Restore a running profile serialized with to_state.
+
+        Args:
+            state (dict): Profile state
+
+        Returns:
+            ColumnProfile: Restored profile
+        """
+        column_profile = cls(state['name'])
+        column_profile.numeric = state['numeric']
+        column_profile.count = state['count']
+        column_profile.nulls = state['nulls']
+        column_profile.distinct_sketch = HyperLogLog.from_dict(state['distinct_sketch'])
+        if state['value_counts'] is None:
+            column_profile.value_counts = None
+        elif state['value_counts']:
+            values, counts = zip(*state['value_counts'])
+            column_profile.value_counts = pd.Series(counts, index=list(values), dtype=np.int64)
+        column_profile.mean = state['mean']
+        column_profile.m2 = state['m2']
+        column_profile.min = state['min']
+        column_profile.max = state['max']
+        if state['quantile_sketch'] is not None:
+            column_profile.quantile_sketch = KLLSketch.from_dict(state['quantile_sketch'])
+        if state['target_moments'] is not None:
+            column_profile.target_moments = CorrelationAccumulator.from_state(state['target_moments'])
+        return column_profile
+
+    @property
+    def distinct(self):
+        """Number of distinct non-null values, exact while value counts are kept."""
+        if self.value_counts is not None:
+            return int(len(self.value_counts))
+        return int(round(self.distinct_sketch.estimate()))
+
+    def to_dict(self, rows, is_target=False):
+        """
+        Summarize the column profile.
+
+        Args:
+            rows (int): Number of rows profiled
+            is_target (bool): Whether this column is the target
+
+        Returns:
+            dict: JSON-compatible column profile
+        """
+        profile = {
+            'kind': 'numeric' if self.numeric else 'text' if self.numeric is not None else 'empty',
+            'count': self.count,
+            'nulls': self.nulls,
+            'null_pct': round(self.nulls / rows * 100, 2) if rows else 0.0,
+            'distinct': self.distinct,
+            'distinct_exact': self.value_counts is not None
+        }
+
+        if self.numeric:
+            q25, q50, q75 = self.quantile_sketch.quantiles([0.25, 0.5, 0.75])
+            correlation = 1.0 if is_target else self.target_moments.correlation()
+            profile.update({
+                'mean': float(self.mean),
+                'std': float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else None,
+                'min': self.min,
+                '25%': q25,
+                '50%': q50,
+                '75%': q75,
+                'max': self.max,
+                'corr_with_target': None if np.isnan(correlation) else float(correlation)
+            })
+        elif self.numeric is False and self.value_counts is not None:
+            counts = self.value_counts.astype(np.int64).sort_values(ascending=False, kind='stable')
+            profile['value_counts'] = {str(value): int(count) for value, count in counts.items()}
+        return profile
+
+class DataProfiler:
+    """Profile of every column of a dataset, built from whole dataframes or chunks."""
+
+    def __init__(self, target_column='Price'):
+        """
+        Initialize an empty profiler.
+
+        Args:
+            target_column (str): Column that numeric columns are correlated with
+        """
+        self.target_column = target_column
+        self.rows = 0
+        self.columns = {}
+
+    def update(self, df):
+        """
+        Add a chunk of rows.
+
+        Args:
+            df (pd.DataFrame): Rows to profile
+        """
+        self.rows += len(df)
+        target = None
+        if self.target_column in df.columns and _is_number_dtype(df[self.target_column].dtype):
+            target = df[self.target_column]
+
+        for col in df.columns:
+            if col not in self.columns:
+                self.columns[col] = ColumnProfile(col)
+                # Rows of earlier chunks without this column count as missing
+                self.columns[col].nulls = self.rows - len(df)
+            self.columns[col].update(df[col], target)
+        for col, column_profile in self.columns.items():
+            if col not in df.columns:
+                column_profile.nulls += len(df)
+        return self
+
+    def merge(self, other):
+        """
+        Merge a profile of other rows, e.g. another shard.
+
+        Args:
+            other (DataProfiler): Profile of other rows
+
+        Returns:
+            DataProfiler: This profiler
+        """
+        for col in list(self.columns):
+            if col not in other.columns:
+                self.columns[col].nulls += other.rows
+        for col, column_profile in other.columns.items():
+            if col not in self.columns:
+                self.columns[col] = ColumnProfile(col)
+                self.columns[col].nulls = self.rows
+            self.columns[col].merge(column_profile)
+        self.rows += other.rows
+        return self
+
+    def to_state(self):
+        """
+        Serialize the profiler, so rows appended to the data can be merged in later.
+
+        Returns:
+            dict: JSON-compatible profiler state
+        """
+        return {
+            'target_column': self.target_column,
+            'rows': int(self.rows),
+            'columns': [column_profile.to_state() for column_profile in self.columns.values()]
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        Restore a profiler serialized with to_state.
+
+        Args:
+            state (dict): Profiler state
+
+        Returns:
+            DataProfiler: Restored profiler
+        """
+        profiler = cls(state['target_column'])
+        profiler.rows = state['rows']
+        for column_state in state['columns']:
+            profiler.columns[column_state['name']] = ColumnProfile.from_state(column_state)
+        return profiler
+
+    def to_dict(self):
+        """
+        Summarize the profile.
+
+        Returns:
+            dict: JSON-compatible profile with one entry per column
+        """
+        return {
+            'profile_version': PROFILE_VERSION,
+            'rows': self.rows,
+            'target_column': self.target_column,
+            'columns': {
+                col: column_profile.to_dict(self.rows, is_target=col == self.target_column)
+                for col, column_profile in self.columns.items()
+            }
+        }
+
+def profile_dataframe(df, target_column='Price'):
+    """
+    Profile every column of a dataframe in one pass.
+
+    Args:
+        df (pd.DataFrame): Data to profile
+        target_column (str): Column that numeric columns are correlated with
+
+    Returns:
+        dict: Profile, see DataProfiler.to_dict
+    """
+    return DataProfiler(target_column).update(df).to_dict()
+
+def profile_chunks(chunks, target_column='Price'):
+    """
+    Profile a dataset given as an iterable of dataframes, holding one chunk at a time.
+
+    Args:
+        chunks (iterable): Dataframes with the rows of the dataset
+        target_column (str): Column that numeric columns are correlated with
+
+    Returns:
+        dict: Profile, see DataProfiler.to_dict
+    """
+    profiler = DataProfiler(target_column)
+    for chunk in chunks:
+        profiler.update(chunk)
+    return profiler.to_dict()
+
+def get_profile_path(filepath):
+    """
+    Get the path of the JSON profile stored next to a data file.
+
+    Args:
+        filepath (str): Path to the data file or store
+
+    Returns:
+        str: Path to the profile file
+    """
+    root, extension = os.path.splitext(str(filepath).rstrip('/\\'))
+    if extension.lower() in ('', '.csv'):
+        return f"{root}_profile.json"
+    return f"{root}_{extension.lstrip('.')}_profile.json"
+
+def save_profile(profile, filepath, profiler=None):
+    """
+    Write the profile of a data file next to it, tied to the file contents by checksum.
+
+    Args:
+        profile (dict): Profile of the data exactly as it was written to filepath
+        filepath (str): Path of the profiled data file
+        profiler (DataProfiler, optional): Profiler the profile was summarized from; its
+            state is stored too, so update_profile can merge appended rows into it
+
+    Returns:
+        bool: True if the profile was written, False otherwise
+    """
+    try:
+        profile_path = get_profile_path(filepath)
+        artifact = {'source_checksum': get_path_checksum(filepath), 'profile': profile}
+        if profiler is not None:
+            artifact['state'] = profiler.to_state()
+        write_json_atomic(artifact, profile_path)
+        print(f"Data profile saved to {profile_path}")
+        return True
+    except Exception as e:
+        print(f"Error saving data profile: {e}")
+        return False
+
+def _load_current_artifact(filepath):
+    """Read the profile artifact of a data file, returning None if it is missing, unreadable or stale."""
+    try:
+        with open(get_profile_path(filepath), 'r', encoding='utf-8') as f:
+            artifact = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    checksum = artifact.get('source_checksum')
+    if checksum is None or checksum != get_path_checksum(filepath):
+        return None
+    return artifact
+
+def load_profile(filepath):
+    """
+    Load the profile of a data file if it still matches the file contents.
+
+    Args:
+        filepath (str): Path of the data file the profile was computed from
+
+    Returns:
+        dict or None: Profile or None if missing, unreadable, stale or of another version
+    """
+    artifact = _load_current_artifact(filepath)
+    if artifact is None:
+        return None
+    profile = artifact.get('profile')
+    if not isinstance(profile, dict) or profile.get('profile_version') != PROFILE_VERSION:
+        return None
+    return profile
+
+def load_profiler(filepath):
+    """
+    Restore the profiler of a data file if its profile still matches the file contents.
+
+    Args:
+        filepath (str): Path of the data file the profile was computed from
+
+    Returns:
+        DataProfiler or None: Profiler, or None if the profile is missing, stale, of another
+                              version or was saved without its state
+    """
+    if load_profile(filepath) is None:
+        return None
+    try:
+        return DataProfiler.from_state(_load_current_artifact(filepath)['state'])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+def update_profile(filepath, added_df, previous_profiler):
+    """
+    Refresh the profile of a data file after rows were appended to it.
+
+    The profile of the added rows is merged into the profiler of the existing
+    rows, so the existing rows are not read again. Without a previous profiler
+    the profile is recomputed from the whole file.
+
+    Args:
+        filepath (str): Path of the data file the rows were appended to
+        added_df (pd.DataFrame): Appended rows exactly as they were written
+        previous_profiler (DataProfiler or None): Profiler of the file before the append,
+                                                  see load_profiler
+
+    Returns:
+        bool: True if the profile was written, False otherwise
+    """
+    try:
+        if previous_profiler is None:
+            from .data_utils import read_table
+            profiler = DataProfiler().update(read_table(filepath, typed=True))
+        else:
+            profiler = previous_profiler.merge(DataProfiler(previous_profiler.target_column).update(added_df))
+        return save_profile(profiler.to_dict(), filepath, profiler)
+    except Exception as e:
+        print(f"Error updating data profile: {e}")
+        return False
@@ -0,0 +1,410 @@
+"""
+Streaming sketches for the Lisbon House Price Prediction project.
+Contains a mergeable KLL sketch that summarizes a numeric column in bounded
+memory, so quantiles can be computed chunk by chunk or across processes, and
+a HyperLogLog sketch that estimates the number of distinct values the same way.
+"""
+import math
+import random
+import numpy as np
+
+# Sketch size parameter: the rank error is roughly 1.7 / k and up to k values are kept exactly
+DEFAULT_K = 2048
+
+# Each level below the top one has this fraction of the capacity of the level above
+_CAPACITY_DECAY = 2.0 / 3.0
+_MIN_CAPACITY = 2
+
+def _lerp(a, b, t):
+    """Linear interpolation computed the same way as numpy's 'linear' quantile method."""
+    diff = b - a
+    if t >= 0.5:
+        return b - diff * (1 - t)
+    return a + diff * t
+
+class KLLSketch:
+    """
+    KLL quantile sketch (Karnin, Lang and Liberty) over float values.
+
+    Values are kept in a hierarchy of compactors where an item on level h stands
+    for 2**h input values. While no compaction has happened the sketch is exact
+    and its quantiles equal numpy's linear interpolation; afterwards quantile
+    ranks are accurate to about 1.7 / k. Missing values (NaN) are ignored.
+    """
+
+    def __init__(self, k=DEFAULT_K, seed=0):
+        """
+        Initialize an empty sketch.
+
+        Args:
+            k (int): Size parameter controlling accuracy and memory
+            seed (int): Seed of the random compaction offsets, for reproducible results
+        """
+        if k < 8:
+            raise ValueError(f"Sketch size k must be at least 8, got {k}")
+        self.k = int(k)
+        self.seed = seed
+        self.n = 0
+        self.min = None
+        self.max = None
+        self._levels = [np.empty(0)]
+        self._height = 1
+        self._compactions = 0
+        self._rng = random.Random(seed)
+
+    @classmethod
+    def from_values(cls, values, k=DEFAULT_K, seed=0):
+        """
+        Build a sketch from an array of values.
+
+        Args:
+            values (array-like): Values to summarize
+            k (int): Size parameter
+            seed (int): Seed of the random compaction offsets
+
+        Returns:
+            KLLSketch: Sketch of the values
+        """
+        sketch = cls(k=k, seed=seed)
+        sketch.update_many(values)
+        return sketch
+
+    @property
+    def is_exact(self):
+        """Whether no information has been discarded by compaction yet."""
+        return self._compactions == 0
+
+    def _capacity(self, level):
+        """Maximum number of items a level may hold before it is compacted."""
+        # Levels only reached by update_repeated do not shrink the capacity of those below
+        depth = max(0, self._height - level - 1)
+        return max(_MIN_CAPACITY, int(math.ceil(self.k * _CAPACITY_DECAY ** depth)))
+
+    def _track_range(self, low, high):
+        """Update the exact minimum and maximum."""
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+
+    def update(self, value):
+        """
+        Add a single value.
+
+        Args:
+            value (float): Value to add
+        """
+        self.update_many([value])
+
+    def update_many(self, values):
+        """
+        Add an array of values.
+
+        Args:
+            values (array-like): Values to add
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+
+        self.n += len(values)
+        self._track_range(float(values.min()), float(values.max()))
+        self._levels[0] = np.concatenate([self._levels[0], values])
+        self._compress()
+
+    def update_repeated(self, value, count):
+        """
+        Add the same value count times without materializing the copies.
+
+        The count is split into powers of two, each stored as one item on the
+        level with that weight, so the sketch stays exact if it was.
+
+        Args:
+            value (float): Value to add
+            count (int): Number of copies
+        """
+        count = int(count)
+        if count <= 0 or value is None or np.isnan(value):
+            return
+        if count <= self.k:
+            self.update_many(np.full(count, value, dtype=np.float64))
+            return
+
+        self.n += count
+        self._track_range(float(value), float(value))
+        level = 0
+        while count:
+            if count & 1:
+                while len(self._levels) <= level:
+                    self._levels.append(np.empty(0))
+                self._levels[level] = np.append(self._levels[level], float(value))
+            count >>= 1
+            level += 1
+        self._compress()
+
+    def merge(self, other):
+        """
+        Merge another sketch into this one.
+
+        Args:
+            other (KLLSketch): Sketch of other values (e.g. another chunk or process)
+
+        Returns:
+            KLLSketch: This sketch
+        """
+        if other.n == 0:
+            return self
+
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0))
+        for level, items in enumerate(other._levels):
+            self._levels[level] = np.concatenate([self._levels[level], items])
+
+        self.n += other.n
+        self._height = max(self._height, other._height)
+        self._compactions += other._compactions
+        self._track_range(other.min, other.max)
+        self._compress()
+        return self
+
+    def _compress(self):
+        """Compact levels until the sketch fits its total capacity."""
+        while sum(len(items) for items in self._levels) > sum(
+            self._capacity(level) for level in range(len(self._levels))
+        ):
+            for level in range(len(self._levels)):
+                if len(self._levels[level]) >= self._capacity(level):
+                    self._compact(level)
+                    break
+            else:
+                return
+
+    def _compact(self, level):
+        """Sort a level and promote every other item to the level above."""
+        if level + 1 == len(self._levels):
+            self._levels.append(np.empty(0))
+
+        items = np.sort(self._levels[level])
+        leftover, items = items[:len(items) % 2], items[len(items) % 2:]
+        promoted = items[self._rng.randint(0, 1)::2]
+
+        self._levels[level] = leftover
+        self._levels[level + 1] = np.concatenate([self._levels[level + 1], promoted])
+        self._height = max(self._height, level + 2)
+        self._compactions += 1
+
+    def _sorted_items(self):
+        """All retained items sorted, with the cumulative number of values they stand for."""
+        items = np.concatenate(self._levels)
+        weights = np.concatenate([
+            np.full(len(level_items), 2 ** level, dtype=np.int64)
+            for level, level_items in enumerate(self._levels)
+        ])
+        order = np.argsort(items, kind='stable')
+        return items[order], np.cumsum(weights[order])
+
+    def quantile(self, q):
+        """
+        Estimate a quantile.
+
+        Args:
+            q (float): Quantile between 0 and 1
+
+        Returns:
+            float: Quantile value, or NaN for an empty sketch
+        """
+        return self.quantiles([q])[0]
+
+    def quantiles(self, qs):
+        """
+        Estimate several quantiles at once.
+
+        Args:
+            qs (list): Quantiles between 0 and 1
+
+        Returns:
+            list: Quantile values (NaN for an empty sketch)
+        """
+        if any(q < 0 or q > 1 for q in qs):
+            raise ValueError(f"Quantiles must be between 0 and 1, got {qs}")
+        if self.n == 0:
+            return [float('nan')] * len(qs)
+
+        items, cumulative = self._sorted_items()
+        results = []
+        for q in qs:
+            if self.is_exact:
+                # Same positions and interpolation as numpy's 'linear' method
+                position = q * (self.n - 1)
+                lower = math.floor(position)
+                upper = min(lower + 1, self.n - 1)
+                lower_value = items[np.searchsorted(cumulative, lower, side='right')]
+                upper_value = items[np.searchsorted(cumulative, upper, side='right')]
+                results.append(float(_lerp(lower_value, upper_value, position - lower)))
+            elif q == 0:
+                results.append(self.min)
+            elif q == 1:
+                results.append(self.max)
+            else:
+                index = np.searchsorted(cumulative, q * cumulative[-1], side='left')
+                results.append(float(items[min(index, len(items) - 1)]))
+        return results
+
+    def rank(self, value):
+        """
+        Estimate the fraction of values less than or equal to a value.
+
+        Args:
+            value (float): Value to rank
+
+        Returns:
+            float: Normalized rank between 0 and 1
+        """
+        if self.n == 0:
+            return float('nan')
+        items, cumulative = self._sorted_items()
+        index = np.searchsorted(items, value, side='right')
+        return float(cumulative[index - 1] / cumulative[-1]) if index > 0 else 0.0
+
+    def to_dict(self):
+        """
+        Serialize the sketch to a JSON-compatible dictionary.
+
+        Returns:
+            dict: Sketch state
+        """
+        return {
+            'k': self.k,
+            'seed': self.seed,
+            'n': self.n,
+            'min': self.min,
+            'max': self.max,
+            'height': self._height,
+            'compactions': self._compactions,
+            'levels': [items.tolist() for items in self._levels]
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Restore a sketch serialized with to_dict.
+
+        Args:
+            data (dict): Sketch state
+
+        Returns:
+            KLLSketch: Restored sketch
+        """
+        sketch = cls(k=data['k'], seed=data['seed'])
+        sketch.n = data['n']
+        sketch.min = data['min']
+        sketch.max = data['max']
+        sketch._height = data['height']
+        sketch._compactions = data['compactions']
+        sketch._levels = [np.asarray(items, dtype=np.float64) for items in data['levels']] or [np.empty(0)]
+        sketch._rng = random.Random(f"{data['seed']}:{data['compactions']}")
+        return sketch
+
+# HyperLogLog precision: 2**p registers, relative error about 1.04 / sqrt(2**p)
+DEFAULT_HLL_PRECISION = 12
+
+def _bit_length(values):
+    """Number of significant bits of each uint64 value (0 for 0), computed exactly."""
+    values = np.asarray(values, dtype=np.uint64)
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    # frexp is exact for 32-bit halves and returns the bit length as the exponent
+    high_bits = np.frexp(high)[1]
+    low_bits = np.frexp(low)[1]
+    return np.where(high > 0, 32 + high_bits, low_bits)
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct-count sketch (Flajolet et al.) over 64-bit hashes.
+
+    Each hash selects a register with its top p bits and records the position
+    of the first set bit in the remaining ones. Sketches with the same precision
+    merge by taking the register-wise maximum.
+    """
+
+    def __init__(self, p=DEFAULT_HLL_PRECISION):
+        """
+        Initialize an empty sketch.
+
+        Args:
+            p (int): Precision; the sketch keeps 2**p one-byte registers
+        """
+        if not 4 <= p <= 18:
+            raise ValueError(f"HyperLogLog precision must be between 4 and 18, got {p}")
+        self.p = int(p)
+        self.registers = np.zeros(1 << self.p, dtype=np.uint8)
+
+    def update_hashes(self, hashes):
+        """
+        Add an array of 64-bit hashes.
+
+        Args:
+            hashes (np.ndarray): uint64 hashes of the values (e.g. from pandas.util.hash_array)
+        """
+        hashes = np.asarray(hashes, dtype=np.uint64).ravel()
+        if len(hashes) == 0:
+            return
+        remaining_bits = 64 - self.p
+        index = (hashes >> np.uint64(remaining_bits)).astype(np.intp)
+        remainder = hashes & np.uint64((1 << remaining_bits) - 1)
+        rank = (remaining_bits - _bit_length(remainder) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        """
+        Merge another sketch with the same precision into this one.
+
+        Args:
+            other (HyperLogLog): Sketch of other values
+
+        Returns:
+            HyperLogLog: This sketch
+        """
+        if other.p != self.p:
+            raise ValueError(f"Cannot merge HyperLogLog sketches with precisions {self.p} and {other.p}")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self):
+        """
+        Estimate the number of distinct hashes added.
+
+        Returns:
+            float: Estimated distinct count
+        """
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        empty = int(np.count_nonzero(self.registers == 0))
+        # Linear counting is more accurate while many registers are still empty
+        if raw <= 2.5 * m and empty > 0:
+            return float(m * math.log(m / empty))
+        return float(raw)
+
+    def to_dict(self):
+        """
+        Serialize the sketch to a JSON-compatible dictionary.
+
+        Returns:
+            dict: Sketch state
+        """
+        return {'p': self.p, 'registers': self.registers.tobytes().hex()}
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Restore a sketch serialized with to_dict.
+
+        Args:
+            data (dict): Sketch state
+
+        Returns:
+            HyperLogLog: Restored sketch
+        """
+        sketch = cls(p=data['p'])
+        sketch.registers = np.frombuffer(bytes.fromhex(data['registers']), dtype=np.uint8).copy()
+        return sketch
@@ -0,0 +1,170 @@
+"""
+Persisted cleaning statistics for the Lisbon House Price Prediction project.
+The medians, modes and outlier bounds fitted by the preprocessing pipeline are
+saved next to the models (preprocessing_stats.json), so serving can impute and
+cap inputs exactly like training without reading the training data again.
+"""
+import os
+import json
+import datetime
+import numpy as np
+from .cache_utils import VersionedCache, get_file_version, get_path_checksum, write_json_atomic
+
+STATS_FILENAME = 'preprocessing_stats.json'
+STATS_VERSION = 1
+
+# Columns derived from the target are never present in serving inputs
+TARGET_COLUMNS = ['Price', 'Price M2']
+
+# Parsed statistics kept in memory until the file changes
+_stats_cache = VersionedCache()
+
+def get_stats_path(models_dir):
+    """
+    Get the path of the cleaning statistics file in a models directory.
+
+    Args:
+        models_dir (str): Directory containing the saved models
+
+    Returns:
+        str: Path to preprocessing_stats.json
+    """
+    return os.path.join(models_dir, STATS_FILENAME)
+
+def _to_json_value(value):
+    """Convert a fitted value (numpy scalars, tuples, categories) into something JSON can store."""
+    if value is None or isinstance(value, (bool, str)):
+        return value
+    if isinstance(value, (np.generic, int, float)):
+        value = value.item() if isinstance(value, np.generic) else value
+        return None if isinstance(value, float) and np.isnan(value) else value
+    if isinstance(value, (list, tuple)):
+        return [_to_json_value(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _to_json_value(v) for k, v in value.items()}
+    return str(value)
+
+def serialize_cleaning_stats(stats, source_path=None):
+    """
+    Convert cleaning statistics into the versioned JSON artifact.
+
+    Args:
+        stats (dict): Statistics returned by clean_data_with_stats or clean_data_chunked
+        source_path (str, optional): Raw data file the statistics were fitted on, recorded by checksum
+
+    Returns:
+        dict: JSON-compatible artifact
+    """
+    return {
+        'stats_version': STATS_VERSION,
+        'fitted_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'source_checksum': get_path_checksum(source_path) if source_path else None,
+        'dropped_columns': _to_json_value(stats['dropped_columns']),
+        'fill_values': _to_json_value(stats['fill_values']),
+        'outlier_bounds': _to_json_value(stats['outlier_bounds']),
+        'capped_columns': _to_json_value(stats['capped_columns']),
+        'late_dropped_columns': _to_json_value(stats['late_dropped_columns'])
+    }
+
+def deserialize_cleaning_stats(data):
+    """
+    Restore cleaning statistics from the JSON artifact.
+
+    Args:
+        data (dict): Artifact as written by save_cleaning_stats
+
+    Returns:
+        dict or None: Statistics in the form used by apply_cleaning_stats, or None if
+                      the artifact has an unsupported version or is malformed
+    """
+    if not isinstance(data, dict) or data.get('stats_version') != STATS_VERSION:
+        return None
+    try:
+        return {
+            'dropped_columns': list(data['dropped_columns']),
+            'fill_values': dict(data['fill_values']),
+            'outlier_bounds': {col: tuple(bounds) for col, bounds in data['outlier_bounds'].items()},
+            'capped_columns': list(data['capped_columns']),
+            'late_dropped_columns': list(data['late_dropped_columns']),
+            'fitted_at': data.get('fitted_at'),
+            'source_checksum': data.get('source_checksum')
+        }
+    except (KeyError, TypeError, ValueError):
+        return None
+
+def save_cleaning_stats(stats, models_dir, source_path=None):
+    """
+    Save cleaning statistics next to the models, writing the file atomically.
+
+    Args:
+        stats (dict): Statistics returned by clean_data_with_stats or clean_data_chunked
+        models_dir (str): Directory containing the saved models
+        source_path (str, optional): Raw data file the statistics were fitted on
+
+    Returns:
+        bool: True if saved successfully, False otherwise
+    """
+    try:
+        stats_path = get_stats_path(models_dir)
+        write_json_atomic(serialize_cleaning_stats(stats, source_path), stats_path, indent=2)
+        print(f"Cleaning statistics saved to {stats_path}")
+        return True
+    except Exception as e:
+        print(f"Error saving cleaning statistics: {e}")
+        return False
+
+def _read_stats(stats_path):
+    """Read and restore a statistics file, returning None if it is missing or invalid."""
+    try:
+        with open(stats_path, 'r', encoding='utf-8') as f:
+            return deserialize_cleaning_stats(json.load(f))
+    except (OSError, ValueError):
+        return None
+
+def load_cleaning_stats(models_dir):
+    """
+    Load the cleaning statistics of a models directory, reusing the parsed copy while the file is unchanged.
+
+    Args:
+        models_dir (str): Directory containing the saved models
+
+    Returns:
+        dict or None: Cleaning statistics or None if no valid file exists
+    """
+    stats_path = get_stats_path(models_dir)
+    version = get_file_version(stats_path)
+    if version is None:
+        return None
+    return _stats_cache.get_or_compute(stats_path, version, lambda: _read_stats(stats_path))
+
+def apply_serving_stats(input_df, stats):
+    """
+    Impute and cap serving inputs with the statistics fitted at training time.
+
+    Missing values and absent columns are filled with the training medians and
+    modes, then every column with outlier bounds is clipped to them. All steps
+    work on whole columns, so a batch costs the same number of operations as a
+    single input.
+
+    Args:
+        input_df (pd.DataFrame): Raw input rows
+        stats (dict): Cleaning statistics, see load_cleaning_stats
+
+    Returns:
+        pd.DataFrame: Imputed and capped copy of the input rows
+    """
+    result = input_df.copy()
+
+    for col, value in stats['fill_values'].items():
+        if col in TARGET_COLUMNS or value is None:
+            continue
+        if col not in result.columns:
+            result[col] = value
+        elif result[col].isna().any():
+            result[col] = result[col].where(result[col].notna(), value)
+
+    for col, (lower_bound, upper_bound) in stats['outlier_bounds'].items():
+        if col in result.columns and col not in TARGET_COLUMNS:
+            result[col] = result[col].astype(np.float64).clip(lower_bound, upper_bound)
+
+    return result
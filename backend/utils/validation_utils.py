@@ -0,0 +1,259 @@
+"""
+Ingest validation for the Lisbon House Price Prediction project.
+Contains named schema and range rules evaluated as vectorized boolean masks
+over whole chunks, and helpers to move failing rows to a quarantine file with
+their reason codes instead of passing them on to cleaning.
+"""
+import os
+import numpy as np
+import pandas as pd
+
+# Name of the column holding the reason codes in the quarantine file
+REASON_COLUMN = 'ValidationReasons'
+
+# Bounding box of the Lisbon municipality with a small margin
+LISBON_LATITUDE_RANGE = (38.68, 38.81)
+LISBON_LONGITUDE_RANGE = (-9.24, -9.08)
+
+# Studios (Bedrooms=0) priced above this are data entry errors rather than listings
+STUDIO_MAX_PRICE = 1000000
+
+KNOWN_LABELS = {
+    'Condition': ['For Refurbishment', 'Used', 'As New', 'New'],
+    'PropertyType': ['Homes', 'Single Habitation']
+}
+
+class ValidationRule:
+    """A named check flagging the rows that fail it."""
+
+    def __init__(self, code, inputs, check, description=''):
+        """
+        Initialize a validation rule.
+
+        Args:
+            code (str): Reason code recorded for failing rows
+            inputs (list): Columns the rule reads, in the order passed to check
+            check (callable): Function taking one Series per input and returning True for failing rows;
+                              missing values should pass, since cleaning imputes them
+            description (str): Short explanation of the rule
+        """
+        self.code = code
+        self.inputs = list(inputs)
+        self.check = check
+        self.description = description
+
+    def __repr__(self):
+        return f"ValidationRule({self.code!r}, inputs={self.inputs!r})"
+
+VALIDATION_RULES = {}
+
+def register_rule(code, inputs, check, description=''):
+    """
+    Add a validation rule to the registry, replacing any with the same code.
+
+    Args:
+        code (str): Reason code recorded for failing rows
+        inputs (list): Columns the rule reads
+        check (callable): Function taking one Series per input and returning the failing rows
+        description (str): Short explanation of the rule
+
+    Returns:
+        ValidationRule: The registered rule
+    """
+    rule = ValidationRule(code, inputs, check, description)
+    VALIDATION_RULES[code] = rule
+    return rule
+
+def _outside(values, lower, upper):
+    """Whether present values fall outside [lower, upper]; missing values are inside."""
+    values = np.asarray(values, dtype=np.float64)
+    return (values < lower) | (values > upper)
+
+def _unknown_label(known):
+    """Build a check flagging present labels that are not in a known set."""
+    def check(labels):
+        if isinstance(labels.dtype, pd.CategoricalDtype):
+            # Check each category once; code -1 (missing) picks the trailing False
+            unknown = np.append(~labels.cat.categories.isin(known), False)
+            return unknown[labels.cat.codes.to_numpy()]
+        return (labels.notna() & ~labels.isin(known)).to_numpy()
+    return check
+
+register_rule(
+    'non_positive_area', ['AreaNet'],
+    lambda area: np.asarray(area, dtype=np.float64) <= 0,
+    description='Net area is zero or negative'
+)
+register_rule(
+    'non_positive_gross_area', ['AreaGross'],
+    lambda area: np.asarray(area, dtype=np.float64) <= 0,
+    description='Gross area is zero or negative'
+)
+register_rule(
+    'non_positive_price', ['Price'],
+    lambda price: np.asarray(price, dtype=np.float64) <= 0,
+    description='Price is zero or negative'
+)
+register_rule(
+    'negative_rooms', ['Bedrooms', 'Bathrooms'],
+    lambda bedrooms, bathrooms: (np.asarray(bedrooms, dtype=np.float64) < 0) | (np.asarray(bathrooms, dtype=np.float64) < 0),
+    description='Negative number of bedrooms or bathrooms'
+)
+register_rule(
+    'negative_parking', ['Parking'],
+    lambda parking: np.asarray(parking, dtype=np.float64) < 0,
+    description='Negative number of parking spaces'
+)
+register_rule(
+    'studio_price', ['Bedrooms', 'Price'],
+    lambda bedrooms, price: (np.asarray(bedrooms, dtype=np.float64) == 0) & (np.asarray(price, dtype=np.float64) > STUDIO_MAX_PRICE),
+    description=f'No bedrooms but priced above {STUDIO_MAX_PRICE}'
+)
+register_rule(
+    'outside_lisbon', ['Latitude', 'Longitude'],
+    lambda latitude, longitude: _outside(latitude, *LISBON_LATITUDE_RANGE) | _outside(longitude, *LISBON_LONGITUDE_RANGE),
+    description='Coordinates outside the Lisbon municipality'
+)
+for _column, _labels in KNOWN_LABELS.items():
+    register_rule(
+        f'unknown_{_column.lower()}', [_column],
+        _unknown_label(_labels),
+        description=f'{_column} is not one of {_labels}'
+    )
+
+def get_validation_rules(codes=None):
+    """
+    Look up validation rules in registration order.
+
+    Args:
+        codes (list, optional): Rule codes to select; all registered rules by default
+
+    Returns:
+        list: ValidationRule objects
+    """
+    selected = set(VALIDATION_RULES) if codes is None else set(codes)
+    return [rule for code, rule in VALIDATION_RULES.items() if code in selected]
+
+def validate_rows(df, rules=None):
+    """
+    Evaluate validation rules on every row at once.
+
+    Each rule sets one bit of the result, so the cost is one boolean mask per rule
+    whatever the number of rows. Rules whose columns are absent are skipped.
+
+    Args:
+        df (pd.DataFrame): Raw rows
+        rules (list, optional): ValidationRule objects; all registered rules by default
+
+    Returns:
+        np.ndarray: uint32 failure bits per row, 0 for valid rows
+    """
+    rules = get_validation_rules() if rules is None else rules
+    failures = np.zeros(len(df), dtype=np.uint32)
+    for bit, rule in enumerate(rules):
+        if all(col in df.columns for col in rule.inputs):
+            failed = np.asarray(rule.check(*(df[col] for col in rule.inputs)), dtype=bool)
+            failures |= failed.astype(np.uint32) << np.uint32(bit)
+    return failures
+
+def describe_failures(failures, rules=None):
+    """
+    Translate failure bits into reason codes.
+
+    Args:
+        failures (np.ndarray): Failure bits from validate_rows
+        rules (list, optional): The rules validate_rows was called with
+
+    Returns:
+        np.ndarray: Reason codes joined with ';' per row, '' for valid rows
+    """
+    rules = get_validation_rules() if rules is None else rules
+    reasons = np.full(len(failures), '', dtype=object)
+    for bit, rule in enumerate(rules):
+        failed = (failures >> np.uint32(bit)) & np.uint32(1) == 1
+        reasons[failed] = np.where(reasons[failed] == '', rule.code, reasons[failed] + ';' + rule.code)
+    return reasons
+
+def split_invalid_rows(df, rules=None):
+    """
+    Separate the rows failing validation from the valid ones.
+
+    Args:
+        df (pd.DataFrame): Raw rows
+        rules (list, optional): ValidationRule objects; all registered rules by default
+
+    Returns:
+        tuple: (valid rows, invalid rows with their reason codes in REASON_COLUMN)
+    """
+    rules = get_validation_rules() if rules is None else rules
+    failures = validate_rows(df, rules)
+    invalid = failures != 0
+    if not invalid.any():
+        return df, df.iloc[:0].assign(**{REASON_COLUMN: pd.Series(dtype=object)})
+
+    invalid_rows = df.take(np.flatnonzero(invalid))
+    invalid_rows = invalid_rows.assign(**{REASON_COLUMN: describe_failures(failures[invalid], rules)})
+    return df.take(np.flatnonzero(~invalid)), invalid_rows
+
+def get_quarantine_path(output_filepath):
+    """
+    Get the path of the quarantine file kept next to the processed data.
+
+    Args:
+        output_filepath (str): Path of the processed CSV
+
+    Returns:
+        str: Path of the quarantine CSV
+    """
+    root, _ = os.path.splitext(output_filepath)
+    return f"{root}_quarantine.csv"
+
+def write_quarantine(invalid_rows, quarantine_path, append=False):
+    """
+    Write rows that failed validation to the quarantine CSV.
+
+    Args:
+        invalid_rows (pd.DataFrame): Rows with their reason codes, see split_invalid_rows
+        quarantine_path (str): Path of the quarantine CSV
+        append (bool): Add to an existing quarantine file instead of replacing it
+
+    Returns:
+        int: Number of rows written
+    """
+    if len(invalid_rows) == 0:
+        return 0
+    os.makedirs(os.path.dirname(os.path.abspath(quarantine_path)), exist_ok=True)
+    
+    rows = invalid_rows
+    append = append and os.path.isfile(quarantine_path)
+    if append:
+        # Match the columns already in the file, rewriting it when new columns appear
+        existing_columns = pd.read_csv(quarantine_path, nrows=0).columns.tolist()
+        if set(rows.columns) <= set(existing_columns):
+            rows = rows.reindex(columns=existing_columns)
+        else:
+            rows = pd.concat([pd.read_csv(quarantine_path), rows], ignore_index=True)
+            append = False
+    rows.to_csv(quarantine_path, mode='a' if append else 'w', header=not append, index=False)
+    return len(invalid_rows)
+
+def quarantine_invalid_rows(df, quarantine_path=None, append=True, rules=None):
+    """
+    Drop the rows failing validation, writing them to the quarantine file.
+
+    Args:
+        df (pd.DataFrame): Raw rows
+        quarantine_path (str, optional): Path of the quarantine CSV; failing rows are only dropped when None
+        append (bool): Add to an existing quarantine file instead of replacing it
+        rules (list, optional): ValidationRule objects; all registered rules by default
+
+    Returns:
+        pd.DataFrame: Valid rows
+    """
+    valid_rows, invalid_rows = split_invalid_rows(df, rules)
+    if len(invalid_rows) > 0:
+        counts = pd.Series(invalid_rows[REASON_COLUMN].str.split(';').explode()).value_counts()
+        print(f"Quarantined {len(invalid_rows)} invalid rows: {counts.to_dict()}")
+        if quarantine_path is not None:
+            write_quarantine(invalid_rows, quarantine_path, append=append)
+    return valid_rows